@@ -0,0 +1,119 @@
+"""Benchmark kernel agregasi bincount vs jalur groupby lama.
+
+Jalankan dari root repo:
+
+    python benchmarks/bench_aggregate.py --base-rows 20000 --scales 1 10 100
+
+Tambahkan ``--backends pandas duckdb`` untuk membandingkan backend analitik
+(``service.backend``) atas frame yang sama; output tiap backend dicek identik.
+
+Data sintetis meniru sheet Trx_PJPJKT setelah skema ingest (Nama PJP
+kategorikal, periode int kecil, Jumlah int64, Nilai float64). Dengan
+``--workbook PATH`` sheet Trx_PJPJKT asli dibaca lewat jalur load aplikasi dan
+tiap scale mengulang baris sheet itu (``--scales 1`` = ukuran asli):
+
+    python benchmarks/bench_aggregate.py --workbook data/ltdbb.xlsx --scales 1 10
+"""
+from __future__ import annotations
+
+import argparse
+import calendar
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from service.backend import PANDAS, available_backends  # noqa: E402
+from service.preprocess import TRX_SHEET_NAME, preprocess_data, read_sheet  # noqa: E402
+from service.schema import TRX_SCHEMA, apply_schema  # noqa: E402
+
+_FIN = ['Fin Jumlah Inc', 'Fin Nilai Inc', 'Fin Jumlah Out', 'Fin Nilai Out', 'Fin Jumlah Dom', 'Fin Nilai Dom']
+
+
+def legacy_preprocess_data(df_non_agg: pd.DataFrame, is_trx: bool = False) -> pd.DataFrame:
+    """Jalur lama: groupby().agg + transform('sum') untuk market share."""
+    df = df_non_agg.copy()
+    for col in _FIN:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+    group_cols = ['Nama PJP', 'Year', 'Quarter', 'Month'] if is_trx else ['Nama PJP', 'Year', 'Quarter']
+    df = df.drop(columns=['Nama PJP Conv Final'], errors='ignore')
+    df = df.groupby(group_cols, observed=True).agg({c: 'sum' for c in _FIN})
+    df = df.rename(columns=lambda x: 'Sum of ' + x).reset_index()
+    df['Nama PJP'] = df['Nama PJP'].astype(object)
+    for col in group_cols[1:]:
+        df[col] = df[col].astype('int64')
+    df['Sum of Total Nom'] = df['Sum of Fin Nilai Inc'] + df['Sum of Fin Nilai Out'] + df['Sum of Fin Nilai Dom']
+    if is_trx:
+        df['Month'] = df['Month'].astype(object).map(lambda m: calendar.month_name[m])
+        df['Month'] = pd.Categorical(df['Month'], categories=list(calendar.month_name)[1:], ordered=True)
+        share_cols = ['Year', 'Quarter', 'Month']
+    else:
+        share_cols = ['Year', 'Quarter']
+    total = df.groupby(share_cols, observed=False)['Sum of Total Nom'].transform('sum')
+    df['Market Share (%)'] = ((df['Sum of Total Nom'] / total) * 100).round(2)
+    return df
+
+
+def make_frame(rows: int, n_pjp: int = 150, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    month = rng.integers(1, 13, rows)
+    df = pd.DataFrame({
+        'Nama PJP': np.array([f'PJP {i:03d}' for i in range(n_pjp)], dtype=object)[rng.integers(0, n_pjp, rows)],
+        'Year': rng.integers(2019, 2026, rows),
+        'Quarter': (month - 1) // 3 + 1,
+        'Month': month,
+    })
+    for col in _FIN:
+        if 'Jumlah' in col:
+            df[col] = rng.integers(0, 5_000, rows)
+        else:
+            df[col] = rng.integers(0, 10**10, rows).astype('float64')
+    return apply_schema(df, TRX_SCHEMA)[0]
+
+
+def workbook_frame(path: str, scale: int) -> pd.DataFrame:
+    """Sheet Trx_PJPJKT dari ``path`` diulang ``scale`` kali (dtype skema tetap)."""
+    df = read_sheet(path, TRX_SHEET_NAME)
+    return df if scale == 1 else pd.concat([df] * scale, ignore_index=True)
+
+
+def _best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--base-rows', type=int, default=20_000)
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backends', nargs='+', default=[PANDAS], choices=available_backends())
+    parser.add_argument('--workbook', metavar='PATH',
+                        help=f"workbook LTDBB asli; sheet {TRX_SHEET_NAME} dipakai sebagai frame dasar")
+    args = parser.parse_args()
+
+    header = ''.join(f"{name + ' (s)':>14}" for name in args.backends)
+    print(f"{'rows':>12} {'mode':>6} {'groupby (s)':>12}{header} {'speedup':>8}")
+    for scale in args.scales:
+        df = workbook_frame(args.workbook, scale) if args.workbook else make_frame(args.base_rows * scale)
+        for is_trx in (False, True):
+            old = legacy_preprocess_data(df, is_trx)
+            t_old = _best(lambda: legacy_preprocess_data(df, is_trx), args.repeat)
+            timings = []
+            for name in args.backends:
+                new = preprocess_data(df, is_trx, backend=name)
+                pd.testing.assert_frame_equal(old, new, check_exact=False, rtol=1e-9)
+                timings.append(_best(lambda: preprocess_data(df, is_trx, backend=name), args.repeat))
+            cells = ''.join(f"{t:>14.3f}" for t in timings)
+            print(f"{len(df):>12,} {'trx' if is_trx else 'pjp':>6} {t_old:>12.3f}{cells} {t_old / min(timings):>7.1f}x")
+
+if __name__ == '__main__':
+    main()
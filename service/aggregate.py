@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from service.numeric import coerce_numeric
+
+
+# Kernel agregasi LTDBB: key group di-factorize sekali, lalu keenam measure Fin
+# dijumlah dengan np.bincount dalam satu pass atas baris mentah. Penyebut market
+# share dihitung dari total per group (ukuran G, bukan N), jadi tidak ada
+# groupby/transform kedua atas data mentah.
+
+FIN_MEASURES: list[str] = [
+    'Fin Jumlah Inc', 'Fin Nilai Inc',
+    'Fin Jumlah Out', 'Fin Nilai Out',
+    'Fin Jumlah Dom', 'Fin Nilai Dom',
+]
+_NILAI_MEASURES: list[str] = ['Fin Nilai Inc', 'Fin Nilai Out', 'Fin Nilai Dom']
+
+
+@dataclass
+class GroupedSums:
+    keys: pd.DataFrame          # satu baris per group, urut seperti groupby(sort=True)
+    sums: dict[str, np.ndarray]  # measure -> array panjang G
+    codes: dict[str, np.ndarray]  # kode factorize per key, level group (panjang G)
+
+    def denominator(self, by: list[str], measure: str) -> np.ndarray:
+        """Total ``measure`` per kombinasi ``by``, di-broadcast kembali ke tiap group."""
+        gid, _, _ = _combine_codes([self.codes[c] for c in by])
+        totals = np.bincount(gid, weights=self.sums[measure])
+        return totals[gid]
+
+
+# Batas ukuran ruang id (produk kardinalitas key) untuk jalur tabel padat O(N)
+_DENSE_LIMIT = 10_000_000
+
+
+def _factorize(s: pd.Series) -> tuple[np.ndarray, pd.Index]:
+    # Kategorikal: pakai kode kategori (urutan sama dengan groupby observed=True)
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy(np.int64), pd.Index(s.cat.categories)
+    if pd.api.types.is_integer_dtype(s) and not pd.api.types.is_extension_array_dtype(s) and len(s):
+        # Key periode (Year/Quarter/Month) int kecil: kode = nilai - min, tanpa hashing
+        values = s.to_numpy()
+        lo, hi = int(values.min()), int(values.max())
+        if hi - lo < _DENSE_LIMIT:
+            return values.astype(np.int64) - lo, pd.Index(np.arange(lo, hi + 1, dtype=values.dtype))
+    codes, uniques = pd.factorize(s, sort=True)
+    return codes.astype(np.int64, copy=False), pd.Index(uniques)
+
+
+def _combine_codes(codes: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray, tuple[int, ...]]:
+    """Gabung kode beberapa key jadi satu id group padat.
+
+    Return ``(inverse, unique_ids, sizes)``; ``unique_ids`` terurut sehingga
+    urutan group sama dengan ``groupby(sort=True)``.
+    """
+    sizes = tuple(int(c.max()) + 1 if len(c) else 1 for c in codes)
+    flat = np.ravel_multi_index(codes, sizes)
+    space = int(np.prod(sizes, dtype=np.float64))
+    if space <= _DENSE_LIMIT:
+        # Ruang id kecil: tandai id yang muncul lalu padatkan dengan cumsum (tanpa sort)
+        present = np.bincount(flat, minlength=space) > 0
+        dense = np.cumsum(present) - 1
+        return dense[flat], np.flatnonzero(present), sizes
+    uniq, inverse = np.unique(flat, return_inverse=True)
+    return inverse.reshape(-1), uniq, sizes
+
+
+def _measure_values(df: pd.DataFrame, col: str) -> tuple[np.ndarray, bool]:
+    s = df[col]
+    if not pd.api.types.is_numeric_dtype(s):
+        s = coerce_numeric(s)[0]
+    values = s.to_numpy(dtype=np.float64, na_value=np.nan)
+    # fillna(0) seperti jalur lama
+    return np.where(np.isnan(values), 0.0, values), pd.api.types.is_integer_dtype(s)
+
+
+def group_sums(df: pd.DataFrame, keys: list[str], measures: list[str]) -> GroupedSums:
+    """Jumlah ``measures`` per ``keys`` dalam satu pass (baris dengan key kosong dibuang)."""
+    key_codes: list[np.ndarray] = []
+    key_uniques: list[pd.Index] = []
+    for k in keys:
+        codes, uniques = _factorize(df[k])
+        key_codes.append(codes)
+        key_uniques.append(uniques)
+
+    valid = np.ones(len(df), dtype=bool)
+    for codes in key_codes:
+        valid &= codes >= 0
+    if not valid.all():
+        key_codes = [c[valid] for c in key_codes]
+
+    if not len(key_codes[0]):
+        empty = pd.DataFrame({k: pd.Series([], dtype=df[k].dtype) for k in keys})
+        return GroupedSums(empty, {m: np.zeros(0) for m in measures}, {k: np.zeros(0, np.int64) for k in keys})
+
+    inverse, uniq, sizes = _combine_codes(key_codes)
+    n_groups = len(uniq)
+    # Kode per key di level group didekode langsung dari id group
+    group_codes = dict(zip(keys, np.unravel_index(uniq, sizes)))
+    key_frame = pd.DataFrame({
+        k: key_uniques[i].take(group_codes[k]) for i, k in enumerate(keys)
+    })
+
+    sums: dict[str, np.ndarray] = {}
+    for m in measures:
+        values, is_int = _measure_values(df, m)
+        if not valid.all():
+            values = values[valid]
+        total = np.bincount(inverse, weights=values, minlength=n_groups)
+        sums[m] = np.rint(total).astype(np.int64) if is_int else total
+    return GroupedSums(key_frame, sums, group_codes)
+
+
+def aggregate_fin(df: pd.DataFrame, group_cols: list[str]) -> tuple[pd.DataFrame, GroupedSums]:
+    """Padanan ``aggregate_data`` berbasis bincount; return ``(frame, grouped)``.
+
+    ``frame`` berisi key + ``Sum of Fin ...`` + ``Sum of Total Nom`` dengan dtype
+    yang sama seperti jalur groupby lama (Nama PJP object, key periode int64).
+    """
+    measures = [m for m in FIN_MEASURES if m in df.columns]
+    grouped = group_sums(df, group_cols, measures)
+
+    out = grouped.keys.copy()
+    if 'Nama PJP' in out.columns:
+        out['Nama PJP'] = out['Nama PJP'].astype(object)
+    for col in group_cols:
+        if col != 'Nama PJP' and pd.api.types.is_integer_dtype(out[col]):
+            out[col] = out[col].astype('int64')
+    for m in measures:
+        out[f'Sum of {m}'] = grouped.sums[m]
+
+    total = np.zeros(len(out))
+    for m in _NILAI_MEASURES:
+        if m in grouped.sums:
+            total = total + grouped.sums[m]
+    out['Sum of Total Nom'] = total
+    grouped.sums['Sum of Total Nom'] = total
+    return out, grouped
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from service.aggregate import FIN_MEASURES
+from service.numeric import coerce_numeric
+
+try:
+    import duckdb
+except ImportError:  # backend opsional; tanpa duckdb selalu pakai pandas
+    duckdb = None
+
+
+# Backend analitik LTDBB: agregasi GROUP BY bisa dijalankan sebagai SQL DuckDB
+# in-process atas frame yang di-register (scan Arrow/pandas tanpa copy), atau
+# lewat pandas. Output kedua backend identik (urutan group, dtype key/measure).
+# Pilih lewat env ``LTDBB_BACKEND=duckdb`` (default proses) atau parameter
+# ``backend=`` eksplisit di fungsi preprocess (mis. benchmark); tidak ada state
+# global yang bisa hilang saat rerun Streamlit atau bocor ke sesi lain.
+
+PANDAS = "pandas"
+DUCKDB = "duckdb"
+
+_DEFAULT_BACKEND = os.environ.get("LTDBB_BACKEND", PANDAS).strip().lower()
+_local = threading.local()
+
+
+def available_backends() -> list[str]:
+    return [PANDAS, DUCKDB] if duckdb is not None else [PANDAS]
+
+
+def get_backend(name: str | None = None) -> str:
+    """Backend yang dipakai: ``name`` eksplisit (divalidasi) atau default dari env.
+
+    Default env ``duckdb`` tanpa paket duckdb jatuh ke pandas.
+    """
+    if name is not None:
+        return _checked(name)
+    return DUCKDB if _DEFAULT_BACKEND == DUCKDB and duckdb is not None else PANDAS
+
+
+def _checked(name: str) -> str:
+    name = str(name).strip().lower()
+    if name not in (PANDAS, DUCKDB):
+        raise ValueError(f"Backend tidak dikenal: {name}")
+    if name == DUCKDB and duckdb is None:
+        raise ValueError("Backend duckdb butuh paket 'duckdb' (pip install duckdb)")
+    return name
+
+
+def _connection():
+    # Koneksi DuckDB tidak aman dipakai bersamaan; satu koneksi per thread (sesi Streamlit)
+    con = getattr(_local, "con", None)
+    if con is None:
+        con = duckdb.connect(database=":memory:")
+        _local.con = con
+    return con
+
+
+def _quote(name: str) -> str:
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _measure_expr(s: pd.Series, name: str) -> str:
+    col = _quote(name)
+    if pd.api.types.is_integer_dtype(s) or pd.api.types.is_bool_dtype(s):
+        return f"CAST(COALESCE(SUM({col}), 0) AS BIGINT) AS {col}"
+    # NaN dihitung kosong seperti pandas sum
+    return (f"CAST(COALESCE(SUM(CASE WHEN isnan(CAST({col} AS DOUBLE)) THEN NULL ELSE {col} END), 0) "
+            f"AS DOUBLE) AS {col}")
+
+
+def _key_expr(s: pd.Series, name: str) -> str:
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return f"CAST({_quote(name)} AS VARCHAR) AS {_quote(name)}"
+    return _quote(name)
+
+
+def _restore_keys(out: pd.DataFrame, df: pd.DataFrame, keys: list[str]) -> None:
+    for k in keys:
+        dtype = df[k].dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            out[k] = pd.Categorical(out[k], categories=dtype.categories, ordered=dtype.ordered)
+        elif out[k].dtype != dtype:
+            out[k] = out[k].astype(dtype)
+
+
+def _full_product(out: pd.DataFrame, df: pd.DataFrame, keys: list[str], measures: list[str]) -> pd.DataFrame:
+    """Padanan ``observed=False``: semua kombinasi kategori (group kosong = 0)."""
+    levels = []
+    for k in keys:
+        s = df[k]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            levels.append(pd.CategoricalIndex(s.cat.categories, categories=s.cat.categories,
+                                              ordered=s.cat.ordered, name=k))
+        else:
+            levels.append(pd.Index(s.dropna().unique(), name=k).sort_values())
+    full = pd.MultiIndex.from_product(levels, names=keys)
+    dtypes = out[measures].dtypes
+    out = out.set_index(keys).reindex(full, fill_value=0).reset_index()
+    return out.astype(dtypes.to_dict())
+
+
+def group_sum(df: pd.DataFrame, keys: list[str], measures: list[str], *, observed: bool = True) -> pd.DataFrame:
+    """``df.groupby(keys, observed=observed)[measures].sum().reset_index()`` lewat SQL DuckDB."""
+    con = _connection()
+    view = "ltdbb_frame"
+    con.register(view, df[keys + measures])
+    try:
+        sql = (
+            f"SELECT {', '.join(_key_expr(df[k], k) for k in keys)}, "
+            f"{', '.join(_measure_expr(df[m], m) for m in measures)} "
+            f"FROM {view} "
+            f"WHERE {' AND '.join(f'{_quote(k)} IS NOT NULL' for k in keys)} "
+            f"GROUP BY {', '.join(_quote(k) for k in keys)}"
+        )
+        out = con.execute(sql).df()
+    finally:
+        con.unregister(view)
+
+    _restore_keys(out, df, keys)
+    has_categorical = any(isinstance(df[k].dtype, pd.CategoricalDtype) for k in keys)
+    if not observed and has_categorical:
+        out = _full_product(out, df, keys, measures)
+    # Urutan group seperti groupby(sort=True): kategori per kode, lainnya urut nilai
+    return out.sort_values(keys, kind="stable").reset_index(drop=True)
+
+
+def aggregate_fin_sql(df: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
+    """Padanan frame ``service.aggregate.aggregate_fin`` lewat DuckDB."""
+    measures = [m for m in FIN_MEASURES if m in df.columns]
+    src = df[group_cols + measures]
+    text_cols = [m for m in measures if not pd.api.types.is_numeric_dtype(src[m])]
+    if text_cols:
+        # Teks angka dari Excel dikonversi dulu seperti jalur pandas
+        src = src.copy()
+        for m in text_cols:
+            src[m] = coerce_numeric(src[m])[0]
+    out = group_sum(src, group_cols, measures, observed=True)
+
+    if 'Nama PJP' in out.columns:
+        out['Nama PJP'] = out['Nama PJP'].astype(object)
+    for col in group_cols:
+        if col != 'Nama PJP' and pd.api.types.is_integer_dtype(out[col]):
+            out[col] = out[col].astype('int64')
+    for m in measures:
+        values = out.pop(m)
+        out[f'Sum of {m}'] = values.astype('int64') if pd.api.types.is_integer_dtype(src[m]) else values
+
+    total = np.zeros(len(out))
+    for m in ('Fin Nilai Inc', 'Fin Nilai Out', 'Fin Nilai Dom'):
+        if m in measures:
+            total = total + out[f'Sum of {m}'].to_numpy(np.float64)
+    out['Sum of Total Nom'] = total
+    return out
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+from service.growth import SUM_TYPES
+from service.period import MONTH
+from service.pjp_matrix import FLOWS, PjpPeriodMatrix, matrix_measure, previous_period
+
+
+# Dekomposisi kontribusi growth LTDBB: dari matriks PJP x periode, delta tiap
+# PJP terhadap periode pembanding (QtQ/MtM = 'prev', YoY = 'yoy') dihitung
+# sekali untuk semua flow x measure x periode sebagai array 3D. Kontribusi
+# (pp) = delta PJP / total periode pembanding x 100, jadi jumlahnya sama dengan
+# growth total. Driver naratif dipilih per kolom periode lewat argmax/argmin.
+
+KINDS: tuple[str, ...] = ('prev', 'yoy')
+
+
+@dataclass
+class GrowthContribution:
+    matrix: PjpPeriodMatrix
+    measures: list[str]  # urutan sumbu 0 array di bawah
+    previous: dict[str, np.ndarray]  # kind -> kolom periode pembanding per kolom (-1 = tidak ada)
+    delta: dict[str, np.ndarray]  # kind -> [measure, pjp, periode]; NaN = PJP tidak ada di kedua periode
+    points: dict[str, np.ndarray]  # kind -> kontribusi pp, NaN kalau total pembanding 0
+    total_prev: dict[str, np.ndarray]  # kind -> [measure, periode]
+    total_delta: dict[str, np.ndarray]  # kind -> [measure, periode]
+    drivers: dict[str, np.ndarray]  # kind -> [measure, periode] baris PJP driver (-1 = tidak ada)
+    _series: dict[tuple, pd.Series] = field(default_factory=dict, repr=False)
+    _views: dict[tuple, object] = field(default_factory=dict, repr=False)
+
+    def memo(self, key: tuple, build: Callable[[], object]):
+        """Hasil ``build()`` (mis. tabel detail per PJP di halaman Growth) di-memo per ``key``.
+
+        Objek kontribusi ikut cache cube, jadi rerun fragment (ganti gaya
+        grafik) memakai ulang hasilnya. Jangan dimutasi.
+        """
+        if key not in self._views:
+            self._views[key] = build()
+        return self._views[key]
+
+    def _locate(self, kind: str, year, sub, flow: str, sum_type: str) -> tuple[int, int]:
+        if kind not in KINDS:
+            raise ValueError(f"Jenis periode pembanding tidak dikenal: {kind}")
+        measure = matrix_measure(sum_type, flow)
+        m = self.measures.index(measure) if measure in self.measures else -1
+        return m, self.matrix.position(year, sub)
+
+    def _per_pjp(self, name: str, kind: str, year, sub, flow: str, sum_type: str) -> pd.Series:
+        key = (name, kind, int(year), int(sub), str(flow), str(sum_type))
+        if key not in self._series:
+            m, col = self._locate(kind, year, sub, flow, sum_type)
+            if m < 0 or col < 0:
+                self._series[key] = pd.Series(dtype=float)
+            else:
+                values = getattr(self, name)[kind][m, :, col]
+                rows = np.flatnonzero(~np.isnan(self.delta[kind][m, :, col]))
+                self._series[key] = pd.Series(
+                    values[rows],
+                    index=pd.Index(self.matrix.pjps[rows].astype(str), name='Nama PJP'),
+                )
+        return self._series[key]
+
+    def delta_series(self, kind: str, year, sub, flow: str, sum_type: str) -> pd.Series:
+        """Delta tiap PJP yang ada di periode atau pembandingnya (yang tidak ada dihitung 0).
+
+        Di-memo; periode/measure tidak ada -> Series kosong. Jangan dimutasi.
+        """
+        return self._per_pjp('delta', kind, year, sub, flow, sum_type)
+
+    def points_series(self, kind: str, year, sub, flow: str, sum_type: str) -> pd.Series:
+        """Kontribusi (pp) tiap PJP terhadap growth total ``flow``; index sama dengan ``delta_series``."""
+        return self._per_pjp('points', kind, year, sub, flow, sum_type)
+
+    def total(self, kind: str, year, sub, flow: str, sum_type: str) -> tuple[float, float] | None:
+        """``(delta_total, total_pembanding)`` semua PJP; None kalau periode/measure tidak ada."""
+        m, col = self._locate(kind, year, sub, flow, sum_type)
+        if m < 0 or col < 0:
+            return None
+        return float(self.total_delta[kind][m, col]), float(self.total_prev[kind][m, col])
+
+    def driver(self, kind: str, year, sub, flow: str, sum_type: str) -> str | None:
+        """PJP driver searah total: delta positif terbesar kalau total naik/tetap,
+        negatif terbesar kalau turun; fallback |delta| lalu nilai periode terbesar."""
+        m, col = self._locate(kind, year, sub, flow, sum_type)
+        if m < 0 or col < 0:
+            return None
+        row = int(self.drivers[kind][m, col])
+        return str(self.matrix.pjps[row]) if row >= 0 else None
+
+
+def _first_sorted(values: np.ndarray, rows: np.ndarray, ascending: bool) -> int:
+    # Seri diputus persis seperti Series.sort_values(...).index[0] versi lama
+    # (quicksort, tidak stabil), jadi driver tidak berubah di data yang sama.
+    order = pd.Series(values[rows]).sort_values(ascending=ascending)
+    return int(rows[order.index[0]])
+
+
+def _pick_drivers(delta: np.ndarray, current: np.ndarray, total: np.ndarray) -> np.ndarray:
+    """Baris driver per [measure, periode]; seri diputus seperti sort_values lama."""
+    known = ~np.isnan(delta)
+    if known.shape[1] == 0:
+        return np.full(total.shape, -1, dtype=np.int64)
+    d = np.where(known, delta, 0.0)
+    pos, neg = known & (d > 0), known & (d < 0)
+    magnitude = np.where(known, np.abs(d), -1.0)
+    # Aturan berurutan: (skor argmax, kandidat, nilai yang dulu di-sort, ascending)
+    rules = [
+        (np.where(neg, -d, -np.inf), neg, d, True),
+        (np.where(pos, d, -np.inf), pos, d, False),
+        (magnitude, known, np.abs(d), False),
+        (np.where(known, current, -np.inf), known, current, False),
+    ]
+    rule = np.select(
+        [
+            (total < 0) & neg.any(axis=1),
+            (total >= 0) & pos.any(axis=1),
+            magnitude.max(axis=1) > 0,
+            np.where(known, current, 0.0).max(axis=1) != 0,
+        ],
+        list(range(len(rules))),
+        default=-1,
+    )
+    rule[~known.any(axis=1)] = -1
+
+    drivers = np.full(total.shape, -1, dtype=np.int64)
+    for r, (score, candidates, values, ascending) in enumerate(rules):
+        hit = rule == r
+        drivers[hit] = np.argmax(score, axis=1)[hit]
+        # Kolom dengan >1 PJP bernilai terbaik: ulangi urutan sort lama atas kandidat aturan itu
+        tied = hit & (((score == score.max(axis=1)[:, None, :]) & candidates).sum(axis=1) > 1)
+        for m, col in zip(*np.nonzero(tied)):
+            rows = np.flatnonzero(candidates[m, :, col])
+            drivers[m, col] = _first_sorted(values[m, :, col], rows, ascending)
+    return drivers
+
+
+def _previous_columns(matrix: PjpPeriodMatrix, kind: str) -> np.ndarray:
+    """Kolom periode pembanding untuk tiap kolom matriks (-1 kalau tidak ada)."""
+    width = 100 if matrix.grain == MONTH else 10
+    return np.array(
+        [matrix.position(*previous_period(matrix.grain, *divmod(int(key), width), kind)) for key in matrix.periods],
+        dtype=np.int64,
+    )
+
+
+def build_growth_contribution(matrix: PjpPeriodMatrix) -> GrowthContribution:
+    """Delta, kontribusi pp dan driver semua flow x measure x periode dalam satu pass per jenis."""
+    measures = [matrix_measure(s, t) for s in SUM_TYPES for t in FLOWS if matrix_measure(s, t) in matrix.values]
+    n_pjp, n_period = matrix.present.shape
+    if measures:
+        values = np.stack([matrix.values[m].astype(np.float64) for m in measures])
+    else:
+        values = np.zeros((0, n_pjp, n_period))
+
+    previous, delta, points, total_prev, total_delta, drivers = {}, {}, {}, {}, {}, {}
+    for kind in KINDS:
+        prev_col = _previous_columns(matrix, kind)
+        has_prev = prev_col >= 0
+        prev_present = matrix.present[:, np.maximum(prev_col, 0)] & has_prev
+        prev_values = np.where(prev_present, values[:, :, np.maximum(prev_col, 0)], 0.0)
+
+        # Nilai matriks 0 untuk PJP yang tidak ada di periode, jadi cur - prev = fillna(0)
+        known = matrix.present | prev_present
+        d = np.where(known, values - prev_values, np.nan)
+        base = prev_values.sum(axis=1)
+        change = np.nansum(d, axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pp = np.where(base[:, None, :] != 0, d / base[:, None, :] * 100, np.nan)
+
+        previous[kind] = prev_col
+        delta[kind] = d
+        points[kind] = pp
+        total_prev[kind] = base
+        total_delta[kind] = change
+        drivers[kind] = _pick_drivers(d, values, change)
+        for arr in (prev_col, d, pp, base, change, drivers[kind]):
+            arr.flags.writeable = False  # dipakai bersama lewat cache cube
+
+    return GrowthContribution(matrix, measures, previous, delta, points, total_prev, total_delta, drivers)
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from service.contribution import GrowthContribution, build_growth_contribution
+from service.dataset_store import store_aggregate
+from service.growth import build_growth_frame
+from service.memo import DatasetHandle, memoize
+from service.period import QUARTER
+from service.pjp_matrix import PjpPeriodMatrix, build_pjp_matrix
+from service.preprocess import (
+    calculate_market_share,
+    get_all_pjp_growth_data,
+    preprocess_aggregated,
+    preprocess_data,
+)
+
+
+# Cube agregat LTDBB: dibangun sekali per dataset (grain PJP x Year x Quarter x
+# Month), rollup lain (Year-Quarter, Year-Month, Year, PJP, ...) dihitung dari
+# grain tersebut dan di-cache di objek cube. Halaman cukup query cube, jadi
+# ganti selectbox tidak memicu groupby atas data mentah. Cube di-memo per
+# handle dataset (digest sumber + mode multilicense + parameter halaman).
+
+TRX_MEASURES: list[str] = [
+    'Sum of Fin Jumlah Inc', 'Sum of Fin Nilai Inc',
+    'Sum of Fin Jumlah Out', 'Sum of Fin Nilai Out',
+    'Sum of Fin Jumlah Dom', 'Sum of Fin Nilai Dom',
+    'Sum of Total Nom',
+]
+
+
+class AggregateCube:
+    """Frame dasar + rollup ber-cache. ``base``/``rollup`` dikembalikan sebagai copy."""
+
+    def __init__(self, base: pd.DataFrame, measures: list[str]):
+        self._base = base
+        self.measures = [m for m in measures if m in base.columns]
+        self._rollups: dict[tuple, pd.DataFrame] = {}
+
+    @property
+    def base(self) -> pd.DataFrame:
+        return self._base.copy()
+
+    def rollup(self, *by: str, observed: bool = False) -> pd.DataFrame:
+        """Jumlah measure per ``by``; ``observed`` diteruskan ke groupby (Month kategorikal)."""
+        key = (by, observed)
+        if key not in self._rollups:
+            self._rollups[key] = (
+                self._base.groupby(list(by), observed=observed)[self.measures].sum().reset_index()
+            )
+        return self._rollups[key].copy()
+
+
+class TrxCube(AggregateCube):
+    """Cube Trx_PJPJKT; ``base`` = ``preprocess_data(df, is_trx=True)``.
+
+    Frame growth (``growth_frame``/``pjp_growth``) dan matriks dipakai bersama
+    tanpa copy karena dibaca tiap rerun; pemanggil yang perlu mengubahnya
+    wajib ``.copy()`` sendiri.
+    """
+
+    def __init__(self, monthly: pd.DataFrame):
+        super().__init__(monthly, TRX_MEASURES)
+        self._quarterly: pd.DataFrame | None = None
+        self._growth: dict[bool, pd.DataFrame] = {}
+        self._pjp_matrix: dict[str, PjpPeriodMatrix] = {}
+        self._pjp_growth: dict[bool, pd.DataFrame] = {}
+        self._contribution: dict[str, GrowthContribution] = {}
+
+    def quarterly(self) -> pd.DataFrame:
+        """Padanan ``preprocess_data(df)``: per PJP x Year x Quarter plus market share."""
+        if self._quarterly is None:
+            df = self.rollup('Nama PJP', 'Year', 'Quarter', observed=True)
+            total_sum_of_nom = df.groupby(['Year', 'Quarter'], observed=False)['Sum of Total Nom'].transform('sum')
+            self._quarterly = calculate_market_share(df, total_sum_of_nom)
+        return self._quarterly.copy()
+
+    def growth_frame(self, is_month: bool = False) -> pd.DataFrame:
+        """Frame growth lebar (``build_growth_frame``) per Year-Quarter atau Year-Month; read-only."""
+        if is_month not in self._growth:
+            period = 'Month' if is_month else 'Quarter'
+            self._growth[is_month] = build_growth_frame(
+                self.rollup('Year', period), is_month, self._base['Year'].min()
+            )
+        return self._growth[is_month]
+
+    def pjp_growth(self, is_month: bool = False) -> pd.DataFrame:
+        """Growth total + per flow semua PJP (``get_all_pjp_growth_data``), long, index Nama PJP; read-only."""
+        if is_month not in self._pjp_growth:
+            self._pjp_growth[is_month] = get_all_pjp_growth_data(self._base, is_month)
+        return self._pjp_growth[is_month]
+
+    def pjp_matrix(self, grain: str = QUARTER) -> PjpPeriodMatrix:
+        """Matriks PJP x periode (``service.pjp_matrix``) per grain; dipakai bersama, read-only."""
+        if grain not in self._pjp_matrix:
+            self._pjp_matrix[grain] = build_pjp_matrix(self._base, grain)
+        return self._pjp_matrix[grain]
+
+    def growth_contribution(self, grain: str = QUARTER) -> GrowthContribution:
+        """Delta & kontribusi pp tiap PJP (``service.contribution``) dari ``pjp_matrix(grain)``; read-only."""
+        if grain not in self._contribution:
+            self._contribution[grain] = build_growth_contribution(self.pjp_matrix(grain))
+        return self._contribution[grain]
+
+
+@memoize(max_entries=8, copy=False)
+def build_cube(handle: DatasetHandle, df: pd.DataFrame) -> TrxCube:
+    """Bangun cube sekali per ``handle``; ``df`` = data yang diwakili handle tersebut.
+
+    Kalau ``df`` adalah frame gabungan dataset lokal, agregat per partisi yang
+    sudah tersimpan dipakai langsung (hanya bulan baru yang pernah diagregasi).
+    """
+    aggregated = store_aggregate(df)
+    if aggregated is not None:
+        return TrxCube(preprocess_aggregated(aggregated, is_trx=True))
+    return TrxCube(preprocess_data(df.copy(), is_trx=True))
+
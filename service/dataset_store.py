@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import uuid
+import weakref
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from service.backend import PANDAS
+from service.preprocess import aggregate_data
+from service.schema import NATIONAL_SCHEMA, TRX_SCHEMA, ColumnSpec, apply_schema
+
+try:
+    import fcntl
+except ImportError:  # Windows: cukup lock antar thread dalam satu proses
+    fcntl = None
+
+
+# Dataset lokal LTDBB yang dipartisi per (Year, Month). Upload workbook penuh
+# maupun file satu bulan di-append ke sini; partisi yang isinya tidak berubah
+# dilewati, jadi upload kuartalan hanya menulis bulan yang baru/direvisi.
+# Untuk tabel trx, agregat per PJP x periode (``aggregate_data``) disimpan dalam
+# satu file: saat append hanya baris bulan yang ditulis yang diganti dengan
+# agregat partisi barunya, dan cube memakai file itu alih-alih mengagregasi
+# ulang seluruh riwayat.
+_STORE_DIR = Path(os.environ.get("LTDBB_STORE_DIR", ".cache/dataset"))
+_MANIFEST_FILE = "manifest.json"
+_LOCK_FILE = ".lock"
+
+# Sesi Streamlit = thread dalam satu proses; lock file menjaga antar proses
+_THREAD_LOCK = threading.RLock()
+
+TRX_TABLE = "trx"
+NATIONAL_TABLE = "national"
+
+_TABLE_SCHEMAS: dict[str, list[ColumnSpec]] = {
+    TRX_TABLE: TRX_SCHEMA,
+    NATIONAL_TABLE: NATIONAL_SCHEMA,
+}
+
+# Tabel yang agregatnya ikut disimpan (dibangun dari agregat per partisi)
+_AGGREGATED_TABLES = {TRX_TABLE}
+_AGG_KEYS = ['Nama PJP', 'Year', 'Quarter', 'Month']
+
+# id(df gabungan dari read_store) -> (weakref ke df, agregat gabungan)
+_MERGED_AGGREGATES: dict[int, tuple[weakref.ref, pd.DataFrame]] = {}
+_MERGED_LOCK = threading.Lock()
+
+
+@dataclass
+class AppendReport:
+    table: str
+    written: list[tuple[int, int]] = field(default_factory=list)
+    unchanged: list[tuple[int, int]] = field(default_factory=list)
+    dropped_rows: int = 0  # baris tanpa Year/Month valid, tidak bisa dipartisi
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _root(store_dir: Path | None) -> Path:
+    return store_dir or _STORE_DIR
+
+
+def _partition_key(year: int, month: int) -> str:
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+def _partition_path(table: str, year: int, month: int, store_dir: Path | None = None) -> Path:
+    return _root(store_dir) / table / f"year={int(year)}" / f"month={int(month):02d}.parquet"
+
+
+def _aggregate_path(table: str, token: str, store_dir: Path | None = None) -> Path:
+    # Token isi partisi di nama file: agregat hanya terbaca kalau manifest
+    # (ditulis terakhir) memuat partisi yang sama persis
+    return _root(store_dir) / table / f"aggregate-{token[:16]}.parquet"
+
+
+def _drop_aggregates(table: str, store_dir: Path | None = None, keep: Path | None = None) -> None:
+    for path in (_root(store_dir) / table).glob("aggregate-*.parquet"):
+        if path != keep:
+            path.unlink(missing_ok=True)
+
+
+@contextmanager
+def _store_lock(store_dir: Path | None = None):
+    """Kunci eksklusif store selama read-modify-write manifest / hapus store."""
+    root = _root(store_dir)
+    with _THREAD_LOCK:
+        if fcntl is None:
+            yield
+            return
+        root.mkdir(parents=True, exist_ok=True)
+        with open(root / _LOCK_FILE, "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _tmp_path(path: Path) -> Path:
+    # uuid, bukan pid: sesi dalam satu proses berbagi pid yang sama
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _read_manifest(store_dir: Path | None = None) -> dict[str, dict[str, dict]]:
+    path = _root(store_dir) / _MANIFEST_FILE
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(manifest: dict, store_dir: Path | None = None) -> None:
+    root = _root(store_dir)
+    root.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(root / _MANIFEST_FILE)
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp, root / _MANIFEST_FILE)
+
+
+def _frame_digest(df: pd.DataFrame) -> str:
+    """Hash isi partisi (tanpa index) untuk mendeteksi bulan yang tidak berubah."""
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _partition_aggregate(part: pd.DataFrame) -> pd.DataFrame:
+    # Jalur pandas selalu: hasilnya harus identik dengan agregasi data gabungan
+    return aggregate_data(part, is_trx=True, backend=PANDAS)
+
+
+def _partitions_token(entries: dict[str, dict]) -> str:
+    """Token isi tabel (digest semua partisi) untuk memvalidasi file agregat."""
+    items = sorted((key, entry.get("digest")) for key, entry in entries.items())
+    return hashlib.sha256(json.dumps(items).encode("utf-8")).hexdigest()
+
+
+def _load_aggregate(table: str, entries: dict[str, dict], store_dir: Path | None = None) -> pd.DataFrame | None:
+    """Agregat ``table`` yang mewakili tepat partisi ``entries``; None kalau hilang/basi."""
+    if not entries:
+        return pd.DataFrame()
+    path = _aggregate_path(table, _partitions_token(entries), store_dir)
+    return pd.read_parquet(path) if path.is_file() else None
+
+
+def _save_aggregate(agg: pd.DataFrame, table: str, entries: dict[str, dict],
+                    store_dir: Path | None = None) -> pd.DataFrame:
+    # Group tidak melintasi partisi (key memuat Year & Month), cukup diurutkan ulang
+    agg = agg.sort_values(_AGG_KEYS, kind="mergesort", ignore_index=True)
+    path = _aggregate_path(table, _partitions_token(entries), store_dir)
+    _write_parquet(agg, path)
+    _drop_aggregates(table, store_dir, keep=path)
+    return agg
+
+
+def _write_parquet(df: pd.DataFrame, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _tmp_path(path)
+    try:
+        df.to_parquet(tmp, index=False)
+        # rename atomik supaya pembaca tidak pernah melihat partisi setengah jadi
+        os.replace(tmp, path)
+    except Exception:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def _period_keys(df: pd.DataFrame) -> tuple[pd.Series, pd.Series, pd.Series]:
+    year = pd.to_numeric(df["Year"], errors="coerce")
+    month = pd.to_numeric(df["Month"], errors="coerce")
+    valid = year.notna() & month.notna() & (year == year.round()) & month.between(1, 12)
+    return year, month, valid
+
+
+def append_partitions(
+    df: pd.DataFrame, table: str, store_dir: Path | None = None
+) -> AppendReport:
+    """Tulis setiap (Year, Month) di ``df`` sebagai partisi; partisi lama di-replace.
+
+    Partisi yang isinya identik dengan yang sudah tersimpan tidak ditulis ulang.
+    """
+    report = AppendReport(table=table)
+    if df is None or df.empty or not {"Year", "Month"} <= set(df.columns):
+        return report
+
+    year, month, valid = _period_keys(df)
+    report.dropped_rows = int((~valid).sum())
+    df = df.loc[valid.to_numpy()]
+    if df.empty:
+        return report
+
+    with _store_lock(store_dir):
+        manifest = _read_manifest(store_dir)
+        entries = manifest.setdefault(table, {})
+        aggregated = table in _AGGREGATED_TABLES
+        agg = _load_aggregate(table, entries, store_dir) if aggregated else None
+        new_aggs: list[pd.DataFrame] = []
+        keys = pd.DataFrame({"y": year[valid].to_numpy("int64"), "m": month[valid].to_numpy("int64")})
+
+        # .indices = posisi baris, aman untuk index duplikat (mis. hasil concat)
+        for (y, m), pos in sorted(keys.groupby(["y", "m"]).indices.items()):
+            part = df.iloc[pos].reset_index(drop=True)
+            part.attrs = {}
+            key = _partition_key(y, m)
+            digest = _frame_digest(part)
+            path = _partition_path(table, y, m, store_dir)
+            if entries.get(key, {}).get("digest") == digest and path.is_file():
+                report.unchanged.append((int(y), int(m)))
+                continue
+
+            if aggregated and not report.written:
+                # Agregat lama tidak valid lagi begitu partisi pertama ditimpa;
+                # kalau proses mati di tengah, agregat dibangun ulang saat dibaca
+                _drop_aggregates(table, store_dir)
+            _write_parquet(part, path)
+            if agg is not None:
+                new_aggs.append(_partition_aggregate(part))
+            entries[key] = {"digest": digest, "rows": int(len(part))}
+            report.written.append((int(y), int(m)))
+
+        if report.written:
+            if agg is not None:
+                kept = []
+                if len(agg):
+                    written = {y * 100 + m for y, m in report.written}
+                    kept = [agg.loc[~(agg["Year"] * 100 + agg["Month"]).isin(written)]]
+                _save_aggregate(pd.concat(kept + new_aggs, ignore_index=True), table, entries, store_dir)
+            _write_manifest(manifest, store_dir)
+    return report
+
+
+def list_partitions(table: str, store_dir: Path | None = None) -> list[tuple[int, int]]:
+    """Daftar (Year, Month) yang tersimpan untuk ``table``, urut periode."""
+    out: list[tuple[int, int]] = []
+    for key in _read_manifest(store_dir).get(table, {}):
+        y, m = key.split("-")
+        if _partition_path(table, int(y), int(m), store_dir).is_file():
+            out.append((int(y), int(m)))
+    return sorted(out)
+
+
+def read_table(table: str, store_dir: Path | None = None) -> pd.DataFrame | None:
+    """Gabungkan semua partisi ``table``; None kalau belum ada data."""
+    partitions = list_partitions(table, store_dir)
+    if not partitions:
+        return None
+    frames = [pd.read_parquet(_partition_path(table, y, m, store_dir)) for y, m in partitions]
+    # Kategori antar partisi bisa berbeda -> concat jadi object; skema dipasang ulang
+    df = pd.concat(frames, ignore_index=True)
+    df, report = apply_schema(df, _TABLE_SCHEMAS.get(table, []))
+    df.attrs['schema_report'] = report.as_dict()
+    return df
+
+
+def _read_aggregate(table: str, df: pd.DataFrame, store_dir: Path | None = None) -> pd.DataFrame:
+    """Agregat ``table`` untuk ``df`` (hasil :func:`read_table` di bawah lock yang sama).
+
+    File agregat yang hilang/basi (store versi lama, proses mati saat append)
+    dibangun ulang sekali dari ``df`` lalu disimpan.
+    """
+    stored = {_partition_key(y, m) for y, m in list_partitions(table, store_dir)}
+    # Hanya partisi yang benar-benar terbaca di df; token berbeda -> dibangun ulang
+    entries = {k: v for k, v in _read_manifest(store_dir).get(table, {}).items() if k in stored}
+    agg = _load_aggregate(table, entries, store_dir)
+    if agg is None:
+        agg = _save_aggregate(_partition_aggregate(df), table, entries, store_dir)
+    return agg
+
+
+def store_aggregate(df: pd.DataFrame) -> pd.DataFrame | None:
+    """Agregat per partisi untuk ``df`` kalau ``df`` adalah frame trx dari :func:`read_store`.
+
+    Frame lain (termasuk hasil filter/copy dari frame store) -> None, jadi
+    pemanggil mengagregasi ``df`` sendiri. Jangan dimutasi.
+    """
+    with _MERGED_LOCK:
+        cached = _MERGED_AGGREGATES.get(id(df))
+    if cached is None or cached[0]() is not df:
+        return None
+    return cached[1]
+
+
+def _register_aggregate(df: pd.DataFrame, agg: pd.DataFrame) -> None:
+    # dtype measure mengikuti kolom sumber gabungan (count int64 hanya kalau
+    # seluruh partisi int), sama seperti aggregate_data atas df
+    for col in agg.columns:
+        src = col.removeprefix("Sum of ")
+        if src != col and src in df.columns:
+            agg[col] = agg[col].astype("int64" if pd.api.types.is_integer_dtype(df[src]) else "float64")
+    key = id(df)
+    with _MERGED_LOCK:
+        _MERGED_AGGREGATES[key] = (
+            weakref.ref(df, lambda _ref, key=key: _MERGED_AGGREGATES.pop(key, None)), agg
+        )
+
+
+def append_workbook(
+    df: pd.DataFrame | None, df_national: pd.DataFrame | None, store_dir: Path | None = None
+) -> dict[str, AppendReport]:
+    """Append kedua sheet workbook ke store; sheet yang None dilewati."""
+    reports: dict[str, AppendReport] = {}
+    for table, frame in ((TRX_TABLE, df), (NATIONAL_TABLE, df_national)):
+        if frame is not None:
+            reports[table] = append_partitions(frame, table, store_dir)
+    return reports
+
+
+def read_store(store_dir: Path | None = None) -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """Return ``(df, df_national)`` gabungan; None kalau salah satu tabel masih kosong."""
+    # Satu lock untuk data mentah + agregat supaya keduanya dari isi store yang sama
+    with _store_lock(store_dir):
+        df = read_table(TRX_TABLE, store_dir)
+        df_national = read_table(NATIONAL_TABLE, store_dir)
+        if df is None or df_national is None:
+            return None
+        _register_aggregate(df, _read_aggregate(TRX_TABLE, df, store_dir))
+    return df, df_national
+
+
+def clear_store(store_dir: Path | None = None) -> None:
+    """Hapus semua tabel + manifest; file lock dibiarkan (bisa sedang ditunggu sesi lain)."""
+    root = _root(store_dir)
+    with _store_lock(store_dir):
+        if not root.is_dir():
+            return
+        for child in list(root.iterdir()):
+            if child.name == _LOCK_FILE:
+                continue
+            if child.is_dir():
+                shutil.rmtree(child, ignore_errors=True)
+            else:
+                child.unlink(missing_ok=True)
@@ -3,6 +3,14 @@ import pandas as pd
 import joblib
 import os
 import io
+import multiprocessing
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pyarrow as pa
+import pyarrow.dataset as ds
+
 
 def load_models(folder_path="./models"):
     models = {}
@@ -12,14 +20,108 @@ def load_models(folder_path="./models"):
             models[filename] = joblib.load(filepath)
     return models
 
+# Kolom yang dipakai pipeline FDS (scoring model, screening negara/nama,
+# deteksi fan-in/fan-out dan rata-rata nominal). Untuk ``columns=`` reader
+# kalau hanya butuh hasil deteksi; halaman fraud membaca semua kolom karena
+# tabel mentah dan unduhannya menampilkan baris lengkap.
+FDS_COLUMNS = [
+    'FORM_NO', 'SANDI_PELAPOR',
+    'NAMA_PENGIRIM', 'NAMA_PENERIMA', 'Nama_Pengirim', 'Nama_Penerima',
+    'NOMINAL_TRX', 'Nominal_TRX', 'FREKUENSI', 'FREKUENSI_PENGIRIMAN',
+    'TUJUAN', 'TUJUAN_TRX', 'NEGARA_TUJUAN', 'NEGARA_ASAL',
+    'Form_Period',
+]
+# Kolom tanggal/periode (8 digit YYYYMMDD) dideteksi dinamis di fraud.py
+_PERIOD_COLUMN_PATTERN = re.compile(r"period|tanggal|tgl|date", re.IGNORECASE)
+
+# Mode string Arrow: kolom teks (nama, negara, dst.) disimpan sebagai buffer
+# Arrow yang ringkas, bukan satu objek str Python per sel.
+ARROW_STRING_DTYPE = pd.StringDtype("pyarrow")
+
+
+def _arrow_string_mapper(arrow_type: pa.DataType):
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return ARROW_STRING_DTYPE
+    return None
+
+
+def arrow_table_to_pandas(table: pa.Table | pa.RecordBatch, arrow_strings: bool = False) -> pd.DataFrame:
+    return table.to_pandas(types_mapper=_arrow_string_mapper if arrow_strings else None)
+
+
+def is_text_dtype(s: pd.Series) -> bool:
+    return s.dtype == object or isinstance(s.dtype, pd.StringDtype)
+
+
+def to_arrow_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Ubah kolom object yang murni teks ke ``string[pyarrow]`` (frame dari Excel)."""
+    cast = {
+        col: ARROW_STRING_DTYPE
+        for col in df.columns
+        if df[col].dtype == object and pd.api.types.infer_dtype(df[col], skipna=True) == "string"
+    }
+    return df.astype(cast) if cast else df
+
+
+def text_memory_report(df: pd.DataFrame) -> pd.DataFrame:
+    """Bandingkan memori kolom teks sebagai object vs string Arrow (byte)."""
+    rows = []
+    for col in df.columns:
+        s = df[col]
+        if not is_text_dtype(s):
+            continue
+        if s.dtype == object and pd.api.types.infer_dtype(s, skipna=True) != "string":
+            continue
+        rows.append({
+            "Kolom": col,
+            "Object (byte)": int(s.astype(object).memory_usage(deep=True, index=False)),
+            "Arrow (byte)": int(s.astype(ARROW_STRING_DTYPE).memory_usage(deep=True, index=False)),
+        })
+    return pd.DataFrame(rows, columns=["Kolom", "Object (byte)", "Arrow (byte)"])
+
+
+def _project_columns(schema: pa.Schema, columns) -> list[str] | None:
+    if columns is None:
+        return None
+    wanted = set(columns)
+    return [name for name in schema.names if name in wanted or _PERIOD_COLUMN_PATTERN.search(name)]
+
+
+def _pjp_filter(schema: pa.Schema, pjp_codes):
+    if pjp_codes is None:
+        return None
+    if 'SANDI_PELAPOR' not in schema.names:
+        raise KeyError('SANDI_PELAPOR')
+    field_type = schema.field('SANDI_PELAPOR').type
+    if pa.types.is_integer(field_type):
+        codes = [int(c) for c in pjp_codes if str(c).strip().isdigit()]
+    else:
+        codes = [str(c) for c in pjp_codes]
+    return ds.field('SANDI_PELAPOR').isin(pa.array(codes, type=field_type))
+
+
+def read_parquet_upload(files, pjp_codes=None, columns=None) -> pa.Table:
+    """Baca satu file parquet hasil upload langsung dari buffer-nya (tanpa copy).
+
+    ``columns`` membatasi kolom yang dibaca; ``pjp_codes`` di-push down sebagai
+    filter ``SANDI_PELAPOR`` sehingga row group tanpa PJP DKI dilewati.
+    """
+    fragment = ds.ParquetFileFormat().make_fragment(pa.BufferReader(pa.py_buffer(files.getbuffer())))
+    schema = fragment.physical_schema
+    return fragment.to_table(
+        columns=_project_columns(schema, columns),
+        filter=_pjp_filter(schema, pjp_codes),
+    )
+
+
 @st.cache_data
-def read_parquets(uploaded_file) -> pd.DataFrame:
-    dataframes = []
+def read_parquets(uploaded_file, pjp_codes=None, columns=None, arrow_strings: bool = False) -> pd.DataFrame:
+    tables = []
     for files in uploaded_file:
         if files.name.endswith(".parquet"):
-            df = pd.read_parquet(io.BytesIO(files.read()))
-            dataframes.append(df)
-    combined_df = pd.concat(dataframes, ignore_index=True)
+            tables.append(read_parquet_upload(files, pjp_codes, columns))
+    combined = pa.concat_tables(tables, promote_options="default")
+    combined_df = arrow_table_to_pandas(combined, arrow_strings)
     return combined_df
 
 def read_excel(uploaded_file) -> pd.DataFrame:
@@ -27,6 +129,117 @@ def read_excel(uploaded_file) -> pd.DataFrame:
     combined_df = pd.concat(excel_data.values(), ignore_index=True)
     return combined_df
 
+
+# Worker Excel di-spawn, bukan di-fork: server Streamlit multi-thread, dan fork
+# dari proses yang sedang memegang lock (logging, pyarrow, thread sesi lain)
+# bisa membuat worker deadlock.
+_EXCEL_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+
+def _read_excel_bytes(data: bytes) -> pd.DataFrame:
+    # Top-level supaya bisa dikirim (pickle) ke worker ProcessPoolExecutor
+    return read_excel(io.BytesIO(data))
+
+
+def _filter_projected_frame(df: pd.DataFrame, pjp_codes=None, columns=None) -> pd.DataFrame:
+    """Padanan projection + filter PJP read_parquet_upload untuk frame Excel."""
+    df = df.rename(columns=lambda c: str(c).strip())
+    if pjp_codes is not None:
+        if 'SANDI_PELAPOR' not in df.columns:
+            raise KeyError('SANDI_PELAPOR')
+        sandi = df['SANDI_PELAPOR']
+        if pd.api.types.is_numeric_dtype(sandi):
+            codes = [int(c) for c in pjp_codes if str(c).strip().isdigit()]
+            df = df[sandi.isin(codes)]
+        else:
+            df = df[sandi.astype(str).str.strip().isin([str(c) for c in pjp_codes])]
+    if columns is not None:
+        keep = _project_columns(pa.schema([(str(c), pa.null()) for c in df.columns]), columns)
+        df = df[keep]
+    return df
+
+
+def _normalize_schemas(frames: list[pd.DataFrame], arrow_strings: bool = False) -> list[pd.DataFrame]:
+    """Samakan dtype kolom yang beda antar file sebelum concat.
+
+    Kolom yang di satu file teks dan di file lain angka (mis. SANDI_PELAPOR)
+    dijadikan string (object, atau ``string[pyarrow]`` di mode Arrow);
+    campuran int/float dijadikan float.
+    """
+    dtypes: dict[str, set[str]] = {}
+    for df in frames:
+        for col, dtype in df.dtypes.items():
+            if df[col].notna().any():
+                dtypes.setdefault(col, set()).add(dtype.kind)
+
+    targets: dict[str, str] = {}
+    for col, kinds in dtypes.items():
+        if len(kinds) <= 1:
+            continue
+        if kinds <= {'i', 'u', 'f'}:
+            targets[col] = 'float64'
+        else:
+            targets[col] = 'string'
+
+    out = []
+    for df in frames:
+        cast = {c: t for c, t in targets.items() if c in df.columns}
+        if cast:
+            df = df.copy()
+            for col, t in cast.items():
+                s = df[col]
+                if t == 'float64':
+                    df[col] = s.astype('float64')
+                    continue
+                # 777930115.0 (float dari Excel) -> "777930115", bukan "777930115.0"
+                if pd.api.types.is_float_dtype(s) and bool((s.dropna() % 1 == 0).all()):
+                    s = s.astype('Int64')
+                s = s.astype('string')
+                df[col] = s.astype(ARROW_STRING_DTYPE) if arrow_strings else s.astype(object)
+        out.append(df)
+    return out
+
+
+@st.cache_data
+def read_fds_uploads(uploaded_files, pjp_codes=None, columns=None, max_workers: int | None = None,
+                     arrow_strings: bool = False) -> pd.DataFrame:
+    """Baca upload FDS campuran (parquet/xlsx/xls) secara paralel.
+
+    Parquet dibaca di thread pool (pyarrow melepas GIL), Excel di process pool
+    (worker spawn) karena parsing openpyxl/xlrd terikat GIL. Skema antar file disamakan dulu
+    sebelum digabung. ``arrow_strings=True`` menyimpan kolom teks sebagai
+    ``string[pyarrow]``.
+    """
+    parquet_files = [f for f in uploaded_files if f.name.lower().endswith('.parquet')]
+    excel_files = [f for f in uploaded_files if f.name.lower().endswith(('.xlsx', '.xls'))]
+    workers = max_workers or min(8, os.cpu_count() or 1)
+
+    frames: list[pd.DataFrame] = []
+    if parquet_files:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tables = list(pool.map(lambda f: read_parquet_upload(f, pjp_codes, columns), parquet_files))
+        frames.extend(arrow_table_to_pandas(t, arrow_strings) for t in tables)
+
+    if excel_files:
+        payloads = [f.getvalue() for f in excel_files]
+        if len(payloads) > 1 and workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=min(workers, len(payloads)),
+                                         mp_context=_EXCEL_MP_CONTEXT) as pool:
+                    excel_frames = list(pool.map(_read_excel_bytes, payloads))
+            except (BrokenProcessPool, OSError):
+                excel_frames = [_read_excel_bytes(p) for p in payloads]
+        else:
+            excel_frames = [_read_excel_bytes(p) for p in payloads]
+        for df in excel_frames:
+            df = _filter_projected_frame(df, pjp_codes, columns)
+            frames.append(to_arrow_strings(df) if arrow_strings else df)
+
+    if not frames:
+        raise ValueError("Tidak ada file parquet/xlsx/xls yang bisa dibaca.")
+    frames = _normalize_schemas(frames, arrow_strings)
+    return pd.concat(frames, ignore_index=True)
+
 def get_unique_tujuan(df) -> pd.DataFrame:
     unique_values = df['TUJUAN'].unique()
     return unique_values
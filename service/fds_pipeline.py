@@ -0,0 +1,608 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from service.fds import (
+    _filter_projected_frame,
+    _normalize_schemas,
+    _pjp_filter,
+    _project_columns,
+    _read_excel_bytes,
+    arrow_table_to_pandas,
+    get_ml_model,
+    split_df,
+    text_memory_report,
+    to_arrow_strings,
+)
+
+
+# Pipeline FDS per batch: cleaning -> screening negara/nama -> scoring model ->
+# detektor fan-out/fan-in/rata-rata. Mode biasa = satu batch berisi seluruh
+# data; mode streaming = batch dari row group parquet, sehingga memori puncak
+# mengikuti ukuran batch + state per grup, bukan ukuran file.
+
+DEFAULT_BATCH_ROWS = 100_000
+PREVIEW_ROWS = 1_000
+
+_FORM_SPECS: dict[str, dict] = {
+    "FORMG0001": {
+        "tipe": "Outgoing",
+        "negara_col": "NEGARA_TUJUAN",
+        "negara_text": "ke",
+        "models": {1: "isolation_forest_model_out_1.joblib", 2: "isolation_forest_model_out_2.joblib",
+                   3: "isolation_forest_model_out_3.joblib"},
+        "predict_cols": ['FREKUENSI', 'NOMINAL_TRX', 'TUJUAN'],
+    },
+    "FORMG0002": {
+        "tipe": "Incoming",
+        "negara_col": "NEGARA_ASAL",
+        "negara_text": "dari",
+        "models": ["isolation_forest_model_inc.joblib"],
+        "predict_cols": ['FREKUENSI', 'NOMINAL_TRX'],
+    },
+}
+_DOMESTIK_SPEC: dict = {
+    "tipe": "Domestik",
+    "negara_col": None,
+    "negara_text": None,
+    "models": {1: "isolation_forest_model_dom_1.joblib", 2: "isolation_forest_model_dom_2.joblib",
+               3: "isolation_forest_model_dom_3.joblib"},
+    "predict_cols": ['FREKUENSI_PENGIRIMAN', 'NOMINAL_TRX', 'TUJUAN_TRX'],
+}
+
+
+def form_spec(form_no: str) -> dict:
+    return _FORM_SPECS.get(form_no, _DOMESTIK_SPEC)
+
+
+# ---------------------------------------------------------------- cleaning
+
+def _clean_text(val):
+    try:
+        if pd.isna(val):
+            return val
+        s = str(val)
+        # Normalize Unicode (compatibility decomposition -> composition)
+        try:
+            s = unicodedata.normalize("NFKC", s)
+        except Exception:
+            pass
+        # Replace NBSP with normal space
+        s = s.replace("\u00A0", " ")
+        # Remove control characters and non-printable ranges
+        s = re.sub(r"[\u0000-\u001F\u007F-\u009F]", "", s)
+        # Remove zero-width and BOM/word joiners
+        s = re.sub(r"[\u200B\u200C\u200D\u2060\uFEFF]", "", s)
+        # Remove bidi control chars and line/paragraph separators
+        s = re.sub(r"[\u2028\u2029\u202A-\u202E\u2066-\u2069\u200E\u200F]", "", s)
+        # Remove Unicode replacement character explicitly
+        s = s.replace("\uFFFD", "")
+        # Strip stray surrogate code units if any (defensive)
+        s = re.sub(r"[\uD800-\uDFFF]", "", s)
+        # Strip stray surrogate code units if any (defensive)
+        s = s.encode("utf-8", errors="ignore").decode("utf-8", errors="ignore")
+        return s
+    except Exception:
+        # If anything goes wrong, fallback to safe string casting
+        try:
+            return str(val)
+        except Exception:
+            return ""
+
+
+# Teks ASCII printable tidak diubah oleh _clean_text
+_NEEDS_CLEAN = r"[^\x20-\x7E]"
+
+
+def clean_text_columns(df: pd.DataFrame, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """Sanitize kolom teks (encoding rusak / control chars) supaya aman dirender.
+
+    Kolom ``string[pyarrow]`` hanya berisi str/NA, jadi cukup sel non-ASCII yang
+    diproses dan kolom tetap berupa buffer Arrow.
+    """
+    for col in (df.columns if columns is None else [c for c in columns if c in df.columns]):
+        s = df[col]
+        if isinstance(s.dtype, pd.StringDtype):
+            dirty = s.str.contains(_NEEDS_CLEAN, regex=True).fillna(False).to_numpy(bool)
+            if dirty.any():
+                s = s.copy()
+                s[dirty] = s[dirty].map(_clean_text).astype(s.dtype)
+                df[col] = s
+        elif s.dtype == object:
+            df[col] = s.map(_clean_text)
+    return df
+
+
+def _as_text(s: pd.Series) -> pd.Series:
+    # string[pyarrow] dipakai langsung; selain itu astype(str) seperti semula
+    return s if isinstance(s.dtype, pd.StringDtype) else s.astype(str)
+
+
+# ---------------------------------------------------------------- batches
+
+def iter_upload_batches(uploaded_files, pjp_codes=None, columns=None,
+                        batch_rows: int = DEFAULT_BATCH_ROWS,
+                        arrow_strings: bool = False) -> Iterator[pd.DataFrame]:
+    """Yield batch DataFrame dari upload FDS tanpa memuat seluruh file.
+
+    Parquet dibaca per record batch (projection + filter PJP di-push down).
+    Excel tidak bisa di-stream oleh pandas, jadi dibaca per file lalu dipotong.
+    """
+    for f in uploaded_files:
+        name = f.name.lower()
+        if name.endswith(".parquet"):
+            fragment = ds.ParquetFileFormat().make_fragment(pa.BufferReader(pa.py_buffer(f.getbuffer())))
+            schema = fragment.physical_schema
+            for batch in fragment.to_batches(
+                columns=_project_columns(schema, columns),
+                filter=_pjp_filter(schema, pjp_codes),
+                batch_size=batch_rows,
+            ):
+                if batch.num_rows:
+                    yield arrow_table_to_pandas(batch, arrow_strings)
+        elif name.endswith((".xlsx", ".xls")):
+            df = _filter_projected_frame(_read_excel_bytes(f.getvalue()), pjp_codes, columns)
+            if arrow_strings:
+                df = to_arrow_strings(df)
+            for start in range(0, len(df), batch_rows):
+                yield df.iloc[start:start + batch_rows].reset_index(drop=True)
+            del df
+
+
+# ---------------------------------------------------------------- detectors
+
+def _pick_col(df: pd.DataFrame, *names: str) -> str | None:
+    return next((c for c in names if c in df.columns), None)
+
+
+def find_period_column(df: pd.DataFrame) -> str | None:
+    """Kolom periode: 'Form_Period', atau kolom teks pertama berisi tanggal 8 digit."""
+    if "Form_Period" in df.columns:
+        return "Form_Period"
+    for c in df.columns:
+        if not (df[c].dtype == object or str(df[c].dtype).startswith("string")):
+            continue
+        try:
+            vals = df[c].astype(str).str.replace(r"\D", "", regex=True)
+            if vals.str.match(r"^\d{8}$").any():
+                return c
+        except Exception:
+            continue
+    return None
+
+
+def _periode(df: pd.DataFrame, period_col: str | None) -> pd.Series:
+    periode = pd.Series(pd.NA, index=df.index, dtype="string")
+    if period_col is None or period_col not in df.columns:
+        return periode
+    vals = df[period_col].astype(str).str.replace(r"\D", "", regex=True)
+    mask8 = vals.str.match(r"^\d{8}$")
+    periode.loc[mask8] = vals.loc[mask8].str.slice(0, 4) + "-" + vals.loc[mask8].str.slice(4, 6)
+    return periode
+
+
+def _similar_mask(mn: pd.Series, mx: pd.Series, avg: pd.Series, require_pos_avg: bool) -> pd.Series:
+    rng = mx - mn
+    rel = rng < 0.01 * avg
+    if require_pos_avg:
+        rel = rel & (avg > 0)
+    return (rng < 100_000) | rel
+
+
+class _PairDetector:
+    """State fan-out / fan-in yang diakumulasi lintas batch.
+
+    ``key`` = pihak yang di-group (pengirim untuk fan-out, penerima untuk
+    fan-in), ``other`` = lawan transaksinya. Pass 1 (``update``) menyimpan
+    statistik nominal per grup dan pasangan unik; pass 2 (``collect``) hanya
+    menyimpan baris milik grup yang terdeteksi, untuk daftar detail.
+    Kolom periode dideteksi per batch (isi batch streaming bisa berbeda) dan
+    hasil pass 1 dipakai ulang di pass 2.
+    """
+
+    def __init__(self, key_names: tuple[str, str], other_names: tuple[str, str], track_dup_nominal: bool):
+        self.key_names = key_names
+        self.other_names = other_names
+        self.track_dup_nominal = track_dup_nominal
+        self.key_col: str | None = None
+        self.other_col: str | None = None
+        self.nominal_col: str | None = None
+        self.ready = False
+        self._stats: pd.DataFrame | None = None
+        self._pairs: pd.DataFrame | None = None
+        self._dup: pd.DataFrame | None = None
+        self._flagged: pd.DataFrame | None = None
+        self._detail: list[pd.DataFrame] = []
+        self._period_cols: dict[int, str | None] = {}  # baris pertama batch -> kolom periode
+
+    def bind(self, first_batch: pd.DataFrame) -> bool:
+        self.key_col = _pick_col(first_batch, *self.key_names)
+        self.other_col = _pick_col(first_batch, *self.other_names)
+        self.nominal_col = _pick_col(first_batch, "Nominal_TRX", "NOMINAL_TRX")
+        self.ready = all([self.key_col, self.other_col, self.nominal_col])
+        return self.ready
+
+    def _period_col(self, batch: pd.DataFrame) -> str | None:
+        start = int(batch.index[0])
+        if start not in self._period_cols:
+            self._period_cols[start] = find_period_column(batch)
+        return self._period_cols[start]
+
+    @property
+    def period_columns(self) -> list[str]:
+        """Kolom periode yang terdeteksi, urut kemunculan; >1 berarti batch tidak seragam."""
+        return list(dict.fromkeys(c for c in self._period_cols.values() if c))
+
+    def _work(self, batch: pd.DataFrame) -> pd.DataFrame:
+        nom_str = batch[self.nominal_col].astype(str).str.replace(r"[^0-9]", "", regex=True)
+        work = pd.DataFrame({
+            "Periode": _periode(batch, self._period_col(batch)),
+            "_key": batch[self.key_col],
+            "_other": _as_text(batch[self.other_col]).str.strip(),
+            "_nom": pd.to_numeric(nom_str, errors="coerce").astype("Int64"),
+            "_raw_other": batch[self.other_col],
+            "_row": batch.index,
+        })
+        valid = (
+            work["Periode"].notna()
+            & work["_key"].notna() & (_as_text(work["_key"]).str.strip() != "")
+            & batch[self.other_col].notna() & (work["_other"] != "")
+            & work["_nom"].notna()
+        )
+        return work.loc[valid.fillna(False).to_numpy(bool)]
+
+    @property
+    def columns(self) -> set[str]:
+        return {c for c in (*self.period_columns, self.key_col, self.other_col, self.nominal_col) if c}
+
+    @staticmethod
+    def _merge_stats(a: pd.DataFrame | None, b: pd.DataFrame) -> pd.DataFrame:
+        if a is None:
+            return b
+        both = pd.concat([a, b])
+        return both.groupby(level=[0, 1]).agg({"n": "sum", "mn": "min", "mx": "max", "sm": "sum"})
+
+    def update(self, batch: pd.DataFrame) -> None:
+        if not self.ready:
+            return
+        work = self._work(batch)
+        if work.empty:
+            return
+        keys = ["Periode", "_key"]
+        stats = work.groupby(keys)["_nom"].agg(n="count", mn="min", mx="max", sm="sum")
+        self._stats = self._merge_stats(self._stats, stats.astype("float64"))
+
+        pairs = work[keys + ["_other"]].drop_duplicates()
+        self._pairs = pairs if self._pairs is None else pd.concat([self._pairs, pairs]).drop_duplicates()
+
+        if self.track_dup_nominal:
+            dup = work[keys + ["_nom", "_raw_other"]].drop_duplicates()
+            self._dup = dup if self._dup is None else pd.concat([self._dup, dup]).drop_duplicates()
+
+    def finalize_flags(self) -> None:
+        if self._stats is None:
+            self._flagged = pd.DataFrame()
+            return
+        stats = self._stats
+        n_unique = self._pairs.groupby(["Periode", "_key"]).size().reindex(stats.index, fill_value=0)
+        avg = stats["sm"] / stats["n"]
+        similar = _similar_mask(stats["mn"], stats["mx"], avg, require_pos_avg=self.track_dup_nominal)
+        if self.track_dup_nominal:
+            multi = self._dup.groupby(["Periode", "_key", "_nom"])["_raw_other"].nunique() >= 2
+            dup_any = multi.groupby(level=[0, 1]).any().reindex(stats.index, fill_value=False)
+            similar = similar | dup_any
+        flag = (n_unique > 1) & (stats["n"] >= 2) & similar
+        flagged = stats.loc[flag].copy()
+        flagged["n_unique"] = n_unique[flag]
+        self._flagged = flagged
+        # State pass 1 tidak diperlukan lagi
+        self._pairs = None
+        self._dup = None
+
+    @property
+    def has_flags(self) -> bool:
+        return self._flagged is not None and not self._flagged.empty
+
+    def collect(self, batch: pd.DataFrame) -> None:
+        if not self.ready or not self.has_flags:
+            return
+        work = self._work(batch)
+        idx = pd.MultiIndex.from_frame(work[["Periode", "_key"]])
+        keep = idx.isin(self._flagged.index)
+        if keep.any():
+            self._detail.append(work.loc[keep, ["Periode", "_key", "_other", "_nom", "_row"]])
+
+    def detail(self) -> pd.DataFrame:
+        if not self._detail:
+            return pd.DataFrame(columns=["Periode", "_key", "_other", "_nom", "_row"])
+        return pd.concat(self._detail).sort_values("_row", kind="stable")
+
+
+class FanOutDetector(_PairDetector):
+    """Pengirim -> >1 penerima dengan nominal mirip dalam satu periode."""
+
+    def __init__(self):
+        super().__init__(("Nama_Pengirim", "NAMA_PENGIRIM"), ("Nama_Penerima", "NAMA_PENERIMA"), False)
+
+    def results(self) -> pd.DataFrame:
+        if not self.has_flags:
+            return pd.DataFrame()
+        rows = []
+        for (periode, pengirim), g in self.detail().groupby(["Periode", "_key"], sort=True):
+            st_ = self._flagged.loc[(periode, pengirim)]
+            rng = st_["mx"] - st_["mn"]
+            avg = st_["sm"] / st_["n"]
+            if st_["mn"] == st_["mx"]:
+                ket = "Identik"
+            elif rng < 100_000:
+                ket = "Range < 100k"
+            elif rng < 0.01 * avg:
+                ket = "Range < 1% rata-rata"
+            else:
+                ket = "Mirip"
+            rows.append({
+                "Periode": periode,
+                "Nama_Pengirim": pengirim,
+                "Jumlah_Penerima_Unique": int(st_["n_unique"]),
+                "Daftar_Penerima": g["_other"].unique().tolist(),
+                "Daftar_Penerima_Semua": g["_other"].tolist(),
+                "Daftar_Nominal": g["_nom"].astype(int).tolist(),
+                "Row_Index": g["_row"].tolist(),
+                "Flag": "Suspicious",
+                "Keterangan_Kemiripan": ket,
+            })
+        return pd.DataFrame(rows)
+
+
+class FanInDetector(_PairDetector):
+    """Penerima <- >1 pengirim dengan nominal mirip/identik dalam satu periode."""
+
+    def __init__(self):
+        super().__init__(("Nama_Penerima", "NAMA_PENERIMA"), ("Nama_Pengirim", "NAMA_PENGIRIM"), True)
+
+    def results(self) -> pd.DataFrame:
+        if not self.has_flags:
+            return pd.DataFrame()
+        rows = []
+        for (periode, penerima), g in self.detail().groupby(["Periode", "_key"], sort=True):
+            st_ = self._flagged.loc[(periode, penerima)]
+            rows.append({
+                "Periode": periode,
+                "Nama_Penerima": penerima,
+                "Jumlah_Pengirim_Unique": int(st_["n_unique"]),
+                "Daftar_Pengirim": g["_other"].unique().tolist(),
+                "Daftar_Nominal": g["_nom"].astype(int).tolist(),
+                "Row_Index": g["_row"].tolist(),
+                "Flag": "Suspicious",
+            })
+        return pd.DataFrame(rows)
+
+
+def over_avg_rows(batch: pd.DataFrame, freq_col: str, threshold: float = 100_000_000) -> pd.DataFrame:
+    """Baris dengan rata-rata nominal per transaksi > threshold."""
+    nominal = pd.to_numeric(batch["NOMINAL_TRX"], errors="coerce")
+    frek = pd.to_numeric(batch[freq_col], errors="coerce")
+    valid = nominal.notna() & frek.notna() & (frek > 0)
+    rata2 = nominal[valid] / frek[valid]
+    over = rata2[rata2 > threshold].index
+    out = batch.loc[over].copy()
+    out["_NOMINAL_TRX"] = nominal.loc[over]
+    out["_FREK"] = frek.loc[over]
+    out["RATA2_NOMINAL_PER_TRX"] = rata2.loc[over]
+    return out
+
+
+_BULAN_MAP = {
+    "01": "Januari", "02": "Februari", "03": "Maret", "04": "April",
+    "05": "Mei", "06": "Juni", "07": "Juli", "08": "Agustus",
+    "09": "September", "10": "Oktober", "11": "November", "12": "Desember"
+}
+
+
+def annotate_form_period(df_over_avg: pd.DataFrame) -> pd.DataFrame:
+    """Tambah kolom FORM_PERIODE_* dari kolom teks tanggal 8 digit (YYYYMMDD)."""
+    period_col = None
+    vals = None
+    for c in df_over_avg.columns:
+        if not (df_over_avg[c].dtype == object or str(df_over_avg[c].dtype).startswith("string")):
+            continue
+        try:
+            v = df_over_avg[c].astype(str).str.replace(r"\D", "", regex=True)
+            if v.str.match(r"^\d{8}$").any():
+                period_col, vals = c, v
+                break
+        except Exception:
+            continue
+    if period_col is None:
+        return df_over_avg
+    valid8 = vals.str.match(r"^\d{8}$")
+    df_over_avg["FORM_PERIODE_RAW"] = df_over_avg[period_col]
+    df_over_avg.loc[valid8, "FORM_PERIODE_TAHUN"] = vals[valid8].str.slice(0, 4)
+    df_over_avg.loc[valid8, "FORM_PERIODE_BULAN"] = vals[valid8].str.slice(4, 6)
+    if "FORM_PERIODE_BULAN" in df_over_avg.columns:
+        df_over_avg["FORM_PERIODE_NAMA_BULAN"] = df_over_avg["FORM_PERIODE_BULAN"].map(_BULAN_MAP)
+    else:
+        df_over_avg["FORM_PERIODE_NAMA_BULAN"] = pd.NA
+    return df_over_avg
+
+
+# ---------------------------------------------------------------- runner
+
+@dataclass
+class FdsRunResult:
+    form_no: str
+    tipe_laporan: str
+    negara_text: str | None
+    negara_col: str | None
+    total_rows: int = 0
+    preview: pd.DataFrame = field(default_factory=pd.DataFrame)
+    predicted_tkm: pd.DataFrame = field(default_factory=pd.DataFrame)
+    greylisted: pd.DataFrame | None = None
+    blacklisted: pd.DataFrame | None = None
+    suspected_person: pd.DataFrame = field(default_factory=pd.DataFrame)
+    freq_col: str | None = None
+    over_avg: pd.DataFrame | None = None
+    fanout: FanOutDetector = field(default_factory=FanOutDetector)
+    fanin: FanInDetector = field(default_factory=FanInDetector)
+    batches: int = 0
+    text_memory: pd.DataFrame | None = None  # object vs Arrow per kolom teks (byte)
+    errors: dict[str, str] = field(default_factory=dict)  # detektor -> pesan error (lihat DETECTORS)
+
+
+# Nama detektor untuk FdsRunResult.errors
+DETECTORS: tuple[str, ...] = ("screening_negara", "screening_nama", "scoring", "over_avg", "fanout", "fanin")
+
+
+def _run_detector(result: FdsRunResult, name: str, step: Callable[[], None]) -> None:
+    """Jalankan satu langkah detektor; error dicatat di ``result.errors``.
+
+    Detektor yang gagal dilewati untuk batch/pass berikutnya dan hasilnya
+    dikosongkan, detektor lain tetap jalan.
+    """
+    if name in result.errors:
+        return
+    try:
+        step()
+    except Exception as e:
+        result.errors[name] = f"kolom {e} tidak ditemukan" if isinstance(e, KeyError) else str(e)
+
+
+def _concat(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    frames = [f for f in frames if f is not None and not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    arrow_strings = any(isinstance(dt, pd.StringDtype) for f in frames for dt in f.dtypes)
+    return pd.concat(_normalize_schemas(frames, arrow_strings))
+
+
+def _score_batch(batch: pd.DataFrame, spec: dict, models: dict) -> pd.Series:
+    selected_model = get_ml_model(spec["tipe"], models)  # dict {nama file : model}
+    predict_cols = spec["predict_cols"]
+    predicted = pd.Series(np.nan, index=batch.index, dtype="float64")
+    if spec["tipe"] == "Incoming":
+        model_predict = selected_model.get(spec["models"][0])
+        predicted[:] = model_predict.predict(batch[predict_cols])
+        return predicted
+    for key, part in split_df(batch, spec["tipe"]).items():
+        model_predict = selected_model.get(spec["models"].get(key))
+        predicted.loc[part.index] = model_predict.predict(part[predict_cols].copy())
+    return predicted
+
+
+def run_fds_pipeline(
+    batch_source: Callable[[], Iterable[pd.DataFrame]],
+    *,
+    models: dict,
+    list_code_blacklisted: list,
+    list_code_greylisted: list,
+    list_name_sus_person: list,
+    preview_rows: int | None = PREVIEW_ROWS,
+    on_batch: Callable[[int, int], None] | None = None,
+    memory_report: bool = False,
+) -> FdsRunResult | None:
+    """Jalankan pipeline FDS atas ``batch_source()`` (dipanggil dua kali).
+
+    Pass 1: cleaning, screening, scoring, rata-rata dan statistik fan-in/out.
+    Pass 2: kumpulkan detail baris untuk grup fan-in/out yang terdeteksi.
+    Index baris adalah nomor urut 1-based lintas batch, sama seperti mode biasa.
+    ``preview_rows=None`` menyimpan seluruh baris (mode biasa).
+    ``memory_report=True`` mengukur memori kolom teks tiap batch (object vs Arrow).
+    """
+    sus_names = [name.lower() for name in list_name_sus_person]
+    result: FdsRunResult | None = None
+    spec: dict = {}
+    preview, tkm, grey, black, sus, over, mem = [], [], [], [], [], [], []
+    kept = 0
+    offset = 0
+
+    for batch in batch_source():
+        if batch.empty:
+            continue
+        if memory_report:
+            mem.append(text_memory_report(batch))
+        batch = clean_text_columns(batch)
+        batch.index = pd.RangeIndex(offset + 1, offset + 1 + len(batch))
+        offset += len(batch)
+
+        if result is None:
+            form_no = batch['FORM_NO'].iloc[0]
+            spec = form_spec(form_no)
+            result = FdsRunResult(form_no, spec["tipe"], spec["negara_text"], spec["negara_col"])
+            result.freq_col = _pick_col(batch, "FREKUENSI", "FREKUENSI_PENGIRIMAN")
+            result.fanout.bind(batch)
+            result.fanin.bind(batch)
+
+        negara_col = spec["negara_col"]
+        if negara_col is not None:
+            def _screen_negara():
+                black.append(batch[batch[negara_col].isin(list_code_blacklisted)])
+                grey.append(batch[batch[negara_col].isin(list_code_greylisted)])
+            _run_detector(result, "screening_negara", _screen_negara)
+        _run_detector(result, "screening_nama", lambda: sus.append(batch[
+            (batch['NAMA_PENERIMA'].str.lower().isin(sus_names)) |
+            (batch['NAMA_PENGIRIM'].str.lower().isin(sus_names))
+        ]))
+
+        _run_detector(result, "fanout", lambda: result.fanout.update(batch))
+        _run_detector(result, "fanin", lambda: result.fanin.update(batch))
+        if result.freq_col is not None and "NOMINAL_TRX" in batch.columns:
+            _run_detector(result, "over_avg", lambda: over.append(over_avg_rows(batch, result.freq_col)))
+
+        def _score():
+            predicted = _score_batch(batch, spec, models)
+            batch['PREDICTED'] = predicted
+            tkm.append(batch[predicted == -1])
+        _run_detector(result, "scoring", _score)
+        if preview_rows is None or kept < preview_rows:
+            take = batch if preview_rows is None else batch.iloc[:preview_rows - kept]
+            preview.append(take)
+            kept += len(take)
+
+        result.batches += 1
+        if on_batch is not None:
+            on_batch(result.batches, offset)
+
+    if result is None:
+        return None
+
+    result.total_rows = offset
+    if mem:
+        result.text_memory = pd.concat(mem).groupby("Kolom", sort=False).sum().reset_index()
+    result.preview = _concat(preview)
+    # Hasil detektor yang gagal di tengah jalan tidak lengkap, jadi dibiarkan kosong
+    errors = result.errors
+    if "scoring" not in errors:
+        result.predicted_tkm = _concat(tkm)
+    if spec["negara_col"] is not None and "screening_negara" not in errors:
+        result.greylisted = _concat(grey)
+        result.blacklisted = _concat(black)
+    if "screening_nama" not in errors:
+        result.suspected_person = _concat(sus)
+    if result.freq_col is not None and over and "over_avg" not in errors:
+        _run_detector(result, "over_avg", lambda: setattr(result, "over_avg", annotate_form_period(_concat(over))))
+
+    _run_detector(result, "fanout", result.fanout.finalize_flags)
+    _run_detector(result, "fanin", result.fanin.finalize_flags)
+    collect = [(name, det) for name, det in (("fanout", result.fanout), ("fanin", result.fanin))
+               if det.has_flags and name not in errors]
+    if collect:
+        offset = 0
+        for batch in batch_source():
+            if batch.empty:
+                continue
+            batch = batch.copy()
+            batch.index = pd.RangeIndex(offset + 1, offset + 1 + len(batch))
+            offset += len(batch)
+            # Cukup bersihkan kolom yang dipakai detektor
+            batch = clean_text_columns(batch, result.fanout.columns | result.fanin.columns)
+            for name, det in collect:
+                _run_detector(result, name, lambda: det.collect(batch))
+    return result
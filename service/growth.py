@@ -0,0 +1,354 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from service.formatting import qround_float
+from service.memo import DatasetHandle, memoize
+from service.period import month_numbers, parse_quarter_labels
+
+
+# Engine growth LTDBB: periode pembanding tiap baris dicari sekali lewat join
+# key periode (Year*100 + Quarter/Month), lalu %YoY/%QtQ/%MtM untuk semua
+# measure dihitung vektor dari posisi tersebut. Tidak ada loop per baris.
+
+GROWTH_COLUMNS: dict[str, str] = {'yoy': '%YoY', 'qtq': '%QtQ', 'mtm': '%MtM'}
+
+
+@dataclass
+class GrowthRates:
+    kind: str
+    mask: np.ndarray  # baris yang punya periode pembanding (nilai dihitung)
+    rates: dict[str, np.ndarray] = field(default_factory=dict)
+
+    def assign(self, df: pd.DataFrame, measure: str, column: str | None = None) -> pd.DataFrame:
+        """Tulis rate ``measure`` ke ``column`` hanya di baris ``mask``; baris lain tidak disentuh."""
+        column = column or GROWTH_COLUMNS[self.kind]
+        rates = self.rates[measure]
+        if column in df.columns:
+            values = df[column].to_numpy(copy=True)
+            if values.dtype != object and not np.issubdtype(values.dtype, np.floating):
+                values = values.astype(np.float64)
+        else:
+            values = np.full(len(df), np.nan)
+        values[self.mask] = rates[self.mask]
+        df[column] = values
+        return df
+
+
+def _lookup(keys: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Posisi baris pertama dengan key == target; -1 kalau tidak ada."""
+    index = pd.Index(keys)
+    if index.is_unique:
+        return index.get_indexer(targets)
+    first = ~index.duplicated(keep='first')
+    found = index[first].get_indexer(targets)
+    return np.where(found >= 0, np.flatnonzero(first)[np.maximum(found, 0)], -1)
+
+
+# Jarak key antar grup (``group``): jauh di atas rentang key yyyymm
+_GROUP_STRIDE = 10_000_000.0
+
+
+def _previous_positions(df: pd.DataFrame, kind: str, first_year,
+                        from_first_row: bool,
+                        group: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """Return ``(prev_pos, mask)`` untuk ``kind`` ('yoy', 'qtq', 'mtm')."""
+    n = len(df)
+    year = pd.to_numeric(df['Year'], errors='coerce').to_numpy(np.float64)
+    after_first = year > first_year
+    # Key periode digeser per grup supaya pembanding hanya ditemukan di grup yang sama
+    offset = 0.0 if group is None else np.asarray(group, dtype=np.float64) * _GROUP_STRIDE
+
+    if kind == 'qtq':
+        # Baris sebelumnya secara posisi (input sudah urut periode)
+        prev = np.arange(n) - 1
+        mask = prev >= 0 if from_first_row else after_first
+        if group is not None and n:
+            group = np.asarray(group)
+            mask = mask & (prev >= 0) & (group[np.maximum(prev, 0)] == group)
+        return prev, mask
+
+    if kind == 'yoy':
+        sub = ('Quarter' if 'Quarter' in df.columns else 'Month')
+        period = (month_numbers(df[sub]) if sub == 'Month'
+                  else pd.to_numeric(df[sub], errors='coerce').to_numpy(np.float64))
+        keys = offset + year * 100 + period
+        prev = _lookup(keys, keys - 100)
+        return prev, after_first & (prev >= 0)
+
+    if kind == 'mtm':
+        month = month_numbers(df['Month'])
+        keys = offset + year * 100 + month
+        prev = _lookup(keys, keys - 1)
+        # Bulan sebelumnya tidak ada -> pakai Desember tahun lalu
+        fallback = _lookup(keys, offset + (year - 1) * 100 + 12)
+        prev = np.where(prev >= 0, prev, fallback)
+        eligible = after_first | ((year == first_year) & (month > 1))
+        return prev, eligible & (prev >= 0)
+
+    raise ValueError(f"Jenis growth tidak dikenal: {kind}")
+
+
+def _measure_array(s: pd.Series) -> np.ndarray:
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_extension_array_dtype(s):
+        return s.to_numpy()
+    return pd.to_numeric(s, errors='coerce').to_numpy(np.float64, na_value=np.nan)
+
+
+def _pct_change(cur: np.ndarray, prev: np.ndarray, guard_zero: bool) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.round(((cur - prev) / prev) * 100, 2).astype(np.float64)
+    if guard_zero:
+        out[(prev == 0) | np.isnan(prev.astype(np.float64))] = np.nan
+    return out
+
+
+def compute_growth(df: pd.DataFrame, measures: list[str], kinds: tuple[str, ...] = ('yoy', 'qtq'),
+                   first_year=None, *, guard_zero: bool = False,
+                   from_first_row: bool = False,
+                   group: np.ndarray | None = None) -> dict[str, GrowthRates]:
+    """Hitung growth (%) semua ``measures`` untuk tiap ``kinds`` sekaligus.
+
+    - yoy: periode sama (Quarter/Month) tahun sebelumnya, hanya untuk Year > first_year.
+    - qtq: baris sebelumnya; mulai Year > first_year, atau baris ke-2 kalau ``from_first_row``.
+    - mtm: bulan sebelumnya, fallback Desember tahun lalu.
+
+    ``guard_zero`` membuat pembanding 0/kosong menghasilkan NaN (bukan inf).
+    ``df`` diasumsikan sudah urut periode dengan satu baris per periode.
+
+    ``group`` (kode integer per baris, mis. PJP) menghitung banyak seri
+    sekaligus: ``df`` urut per grup lalu periode, pembanding hanya diambil dari
+    grup yang sama, dan ``first_year`` boleh berupa array per baris.
+    """
+    if first_year is None:
+        first_year = df['Year'].min()
+    values = {m: _measure_array(df[m]) for m in measures}
+    out: dict[str, GrowthRates] = {}
+    for kind in kinds:
+        prev_pos, mask = _previous_positions(df, kind, first_year, from_first_row, group)
+        result = GrowthRates(kind, mask)
+        # Posisi tanpa pembanding di-clip; hasilnya tidak pernah ditulis (mask False)
+        take = prev_pos if kind == 'qtq' else np.maximum(prev_pos, 0)
+        for m, cur in values.items():
+            result.rates[m] = (_pct_change(cur, cur[take], guard_zero) if len(cur)
+                               else np.zeros(0))
+        out[kind] = result
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Frame growth lebar: satu frame per grain waktu (Quarter atau Month) berisi
+# keenam measure Fin, total Jumlah/Nilai, dan seluruh kolom growth. Halaman
+# Growth dan chart cukup memilih kolom dari frame ini.
+
+SUM_TYPES: tuple[str, ...] = ('Jumlah', 'Nilai')
+FLOW_TYPES: tuple[str, ...] = ('Inc', 'Out', 'Dom')
+TOTAL_MEASURES: list[str] = [f'Sum of Fin {s} Total' for s in SUM_TYPES]
+
+
+def growth_kinds(is_month: bool) -> tuple[str, ...]:
+    return ('mtm',) if is_month else ('yoy', 'qtq')
+
+
+def growth_column(kind: str, sum_trx_type: str, trx_type: str = 'Total') -> str:
+    """Nama kolom growth di frame lebar, mis. ``%YoY Nilai Inc``; total: ``%YoY Nilai``."""
+    if trx_type == 'Total':
+        return f'{GROWTH_COLUMNS[kind]} {sum_trx_type}'
+    return f'{GROWTH_COLUMNS[kind]} {sum_trx_type} {trx_type}'
+
+
+def build_growth_frame(df_sum: pd.DataFrame, is_month: bool, first_year=None) -> pd.DataFrame:
+    """Frame lebar dari ``cube.rollup('Year', 'Quarter'|'Month')``.
+
+    Aturan growth sama dengan jalur per-flow lama: per jenis transaksi YoY/QtQ
+    tanpa guard nol (kolom object, belum dihitung = pd.NA), MtM dengan guard;
+    kolom total (``%YoY Jumlah`` dst.) bertipe float.
+    """
+    period = 'Month' if is_month else 'Quarter'
+    kinds = growth_kinds(is_month)
+    flow_measures = [f'Sum of Fin {s} {t}' for s in SUM_TYPES for t in FLOW_TYPES]
+    if first_year is None:
+        first_year = df_sum['Year'].min()
+
+    wide = df_sum[['Year', period] + flow_measures].copy()
+    for s in SUM_TYPES:
+        # float seperti jalur lama (concat per-flow -> groupby sum)
+        wide[f'Sum of Fin {s} Total'] = sum(wide[f'Sum of Fin {s} {t}'].astype(np.float64) for t in FLOW_TYPES)
+
+    guard_zero = is_month
+    flows = compute_growth(wide, flow_measures, kinds, first_year, guard_zero=guard_zero)
+    for s in SUM_TYPES:
+        for t in FLOW_TYPES:
+            for kind in kinds:
+                column = growth_column(kind, s, t)
+                wide[column] = pd.NA
+                flows[kind].assign(wide, f'Sum of Fin {s} {t}', column)
+
+    totals = compute_growth(wide, TOTAL_MEASURES, kinds, first_year, guard_zero=guard_zero)
+    for s in SUM_TYPES:
+        for kind in kinds:
+            totals[kind].assign(wide, f'Sum of Fin {s} Total', growth_column(kind, s))
+    return wide
+
+
+def _period_col(wide: pd.DataFrame) -> str:
+    return 'Month' if 'Month' in wide.columns else 'Quarter'
+
+
+def _kinds_of(wide: pd.DataFrame) -> tuple[str, ...]:
+    return growth_kinds(_period_col(wide) == 'Month')
+
+
+def flow_view(wide: pd.DataFrame, sum_trx_type: str, trx_type: str) -> pd.DataFrame:
+    """Bentuk per-flow lama: Year, periode, ``Sum of Fin <sum> <trx>``, ``%YoY``/``%QtQ`` (atau ``%MtM``)."""
+    kinds = _kinds_of(wide)
+    cols = ['Year', _period_col(wide), f'Sum of Fin {sum_trx_type} {trx_type}']
+    cols += [growth_column(k, sum_trx_type, trx_type) for k in kinds]
+    return wide[cols].rename(columns={growth_column(k, sum_trx_type, trx_type): GROWTH_COLUMNS[k] for k in kinds})
+
+
+def flow_pair_view(wide: pd.DataFrame, trx_type: str) -> pd.DataFrame:
+    """Jumlah + Nilai satu jenis transaksi dengan kolom ``%YoY Jumlah``/``%YoY Nom`` (untuk tabel)."""
+    kinds = _kinds_of(wide)
+    cols = ['Year', _period_col(wide)]
+    renames: dict[str, str] = {}
+    for s, label in zip(SUM_TYPES, ('Jumlah', 'Nom')):
+        cols.append(f'Sum of Fin {s} {trx_type}')
+        for k in kinds:
+            cols.append(growth_column(k, s, trx_type))
+            renames[growth_column(k, s, trx_type)] = f'{GROWTH_COLUMNS[k]} {label}'
+    return wide[cols].rename(columns=renames)
+
+
+def total_view(wide: pd.DataFrame) -> pd.DataFrame:
+    """Year, periode, total Jumlah/Nilai dan growth total (``%YoY Jumlah`` dst.)."""
+    kinds = _kinds_of(wide)
+    cols = ['Year', _period_col(wide)] + TOTAL_MEASURES
+    cols += [growth_column(k, s) for s in SUM_TYPES for k in kinds]
+    return wide[cols].copy()
+
+
+def resolve_growth_column(df: pd.DataFrame, kind: str, sum_trx_type: str, trx_type: str,
+                          is_combined: bool = False) -> str:
+    """Kolom growth yang dipakai chart: nama frame lebar kalau ada, selain itu nama lama."""
+    wide = growth_column(kind, sum_trx_type, trx_type)
+    if wide in df.columns:
+        return wide
+    return f'{GROWTH_COLUMNS[kind]} {sum_trx_type}' if is_combined else GROWTH_COLUMNS[kind]
+
+
+@memoize(max_entries=16, copy=False)
+def overall_detail_view(
+    handle: DatasetHandle,
+    wide: pd.DataFrame,
+    sum_trx_type: str,
+    shown_periods: tuple[str, ...],
+) -> tuple[pd.DataFrame, str]:
+    """Tabel detail Total/Inc/Out/Dom x periode kuartal ``"YYYY Qn"`` (nilai + YoY/QtQ, dibulatkan 2 desimal).
+
+    Mengembalikan ``(tabel, nama kolom nilai)``; di-memo per isi ``wide`` karena
+    dibangun ulang di tiap rerun fragment Growth. Jangan dimutasi.
+    """
+    # Parse "YYYY Qn" menjadi key yyyyq berurutan
+    period_keys = parse_quarter_labels(list(shown_periods))
+    if not len(period_keys):
+        return pd.DataFrame(), ''
+
+    if sum_trx_type == 'Jumlah':
+        value_unit = 'Volume (Jutaan)'
+        scale = 1e6
+    else:
+        value_unit = 'Nilai (Rp Triliun)'
+        scale = 1e12
+
+    period_keys = pd.unique(period_keys)
+    periods_df = pd.DataFrame({'Year': period_keys // 10, 'Quarter': period_keys % 10})
+
+    total_val_col = f'Sum of Fin {sum_trx_type} Total'
+    total_yoy_col = growth_column('yoy', sum_trx_type)
+    total_qoq_col = growth_column('qtq', sum_trx_type)
+
+    inc_val_col = f'Sum of Fin {sum_trx_type} Inc'
+    out_val_col = f'Sum of Fin {sum_trx_type} Out'
+    dom_val_col = f'Sum of Fin {sum_trx_type} Dom'
+
+    def _num(v):
+        return pd.to_numeric(v, errors='coerce')
+
+    def _build_block(
+        df_src: pd.DataFrame,
+        *,
+        jenis: str,
+        value_col: str,
+        yoy_col: str,
+        qoq_col: str,
+    ) -> pd.DataFrame:
+        if df_src is None or df_src.empty:
+            return pd.DataFrame()
+        if not {'Year', 'Quarter'}.issubset(set(df_src.columns)):
+            return pd.DataFrame()
+        needed = {value_col, yoy_col, qoq_col}
+        if not needed.issubset(set(df_src.columns)):
+            return pd.DataFrame()
+
+        dfc = df_src[['Year', 'Quarter', value_col, yoy_col, qoq_col]].copy()
+        dfc['Year'] = dfc['Year'].astype(int)
+        dfc['Quarter'] = dfc['Quarter'].astype(int)
+
+        # Join ke daftar periode yg sedang ditampilkan agar urut & hanya yg dipilih
+        dfc = periods_df.merge(dfc, on=['Year', 'Quarter'], how='left')
+        dfc['Periode'] = 'Q' + dfc['Quarter'].astype(int).astype(str) + ' ' + dfc['Year'].astype(int).astype(str)
+        dfc['Jenis'] = jenis
+        dfc[value_unit] = (_num(dfc[value_col]) / scale).map(lambda x: qround_float(x, decimals=2, none=0.0))
+        dfc['YoY (%)'] = _num(dfc[yoy_col]).map(lambda x: qround_float(x, decimals=2, none=0.0))
+        dfc['QtQ (%)'] = _num(dfc[qoq_col]).map(lambda x: qround_float(x, decimals=2, none=0.0))
+        return dfc[['Periode', 'Jenis', value_unit, 'YoY (%)', 'QtQ (%)']]
+
+    df_total_block = _build_block(
+        wide,
+        jenis='Total',
+        value_col=total_val_col,
+        yoy_col=total_yoy_col,
+        qoq_col=total_qoq_col,
+    )
+    df_inc_block = _build_block(
+        wide,
+        jenis='Incoming',
+        value_col=inc_val_col,
+        yoy_col=growth_column('yoy', sum_trx_type, 'Inc'),
+        qoq_col=growth_column('qtq', sum_trx_type, 'Inc'),
+    )
+    df_out_block = _build_block(
+        wide,
+        jenis='Outgoing',
+        value_col=out_val_col,
+        yoy_col=growth_column('yoy', sum_trx_type, 'Out'),
+        qoq_col=growth_column('qtq', sum_trx_type, 'Out'),
+    )
+    df_dom_block = _build_block(
+        wide,
+        jenis='Domestik',
+        value_col=dom_val_col,
+        yoy_col=growth_column('yoy', sum_trx_type, 'Dom'),
+        qoq_col=growth_column('qtq', sum_trx_type, 'Dom'),
+    )
+
+    # Make Total display consistent with the sum of displayed components
+    if not df_total_block.empty and not df_inc_block.empty and not df_out_block.empty and not df_dom_block.empty:
+        comp = (
+            df_inc_block[['Periode', value_unit]]
+            .rename(columns={value_unit: '__inc__'})
+            .merge(df_out_block[['Periode', value_unit]].rename(columns={value_unit: '__out__'}), on='Periode', how='left')
+            .merge(df_dom_block[['Periode', value_unit]].rename(columns={value_unit: '__dom__'}), on='Periode', how='left')
+        )
+        comp['__inc__'] = pd.to_numeric(comp['__inc__'], errors='coerce').fillna(0.0)
+        comp['__out__'] = pd.to_numeric(comp['__out__'], errors='coerce').fillna(0.0)
+        comp['__dom__'] = pd.to_numeric(comp['__dom__'], errors='coerce').fillna(0.0)
+        comp[value_unit] = (comp['__inc__'] + comp['__out__'] + comp['__dom__']).map(lambda x: qround_float(x, decimals=2, none=0.0))
+        df_total_block = df_total_block.drop(columns=[value_unit]).merge(comp[['Periode', value_unit]], on='Periode', how='left')
+
+    df_detail = pd.concat([df_total_block, df_inc_block, df_out_block, df_dom_block], ignore_index=True)
+    return df_detail, value_unit
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+import pandas as pd
+
+
+# Memo hasil preprocessing LTDBB berbasis handle dataset: kunci = digest isi
+# dataset sumber + mode multilicense + parameter, bukan isi DataFrame hasil
+# turunan. Digest dihitung sekali per objek DataFrame di session_state, jadi
+# rerun berikutnya cukup membandingkan tuple kecil.
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    digest: str
+    multilicense_mode: str = "include"
+    params: tuple = ()
+
+    def with_params(self, *params) -> DatasetHandle:
+        return DatasetHandle(self.digest, self.multilicense_mode, self.params + params)
+
+
+# id(df) -> (weakref ke df, penanda blok, digest); entri mati dibuang saat objeknya di-GC
+_DIGESTS: dict[int, tuple[weakref.ref, tuple, str]] = {}
+_DIGEST_LOCK = threading.Lock()
+
+
+def _block_marker(df: pd.DataFrame) -> tuple:
+    # Assign/tambah/hapus kolom, ubah dtype atau sort inplace mengganti blok
+    # internal df, jadi cukup dibandingkan identitas bloknya (weakref, bukan id,
+    # supaya alamat blok lama yang dipakai ulang tidak dianggap sama).
+    return df.shape, tuple(df.columns), tuple(weakref.ref(blk) for blk in df._mgr.blocks)
+
+
+def _same_blocks(df: pd.DataFrame, marker: tuple) -> bool:
+    shape, columns, blocks = marker
+    current = df._mgr.blocks
+    return (
+        df.shape == shape
+        and len(current) == len(blocks)
+        and all(ref() is blk for ref, blk in zip(blocks, current))
+        and tuple(df.columns) == columns
+    )
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """SHA-256 isi ``df`` (kolom + nilai, tanpa index); di-cache per objek.
+
+    Cache dibuang kalau blok internal ``df`` berganti (assign kolom, dll.).
+    Tulis nilai in-place ke blok yang sama (``df.loc[i, c] = v``) tidak
+    terdeteksi: frame sumber di session_state dan hasil ``memoize(copy=False)``
+    diperlakukan read-only; salin dulu sebelum diubah.
+    """
+    key = id(df)
+    with _DIGEST_LOCK:
+        cached = _DIGESTS.get(key)
+        if cached is not None and cached[0]() is df and _same_blocks(df, cached[1]):
+            return cached[2]
+
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update("|".join(map(str, df.dtypes)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest = h.hexdigest()
+
+    with _DIGEST_LOCK:
+        _DIGESTS[key] = (
+            weakref.ref(df, lambda _ref, key=key: _DIGESTS.pop(key, None)), _block_marker(df), digest
+        )
+    return digest
+
+
+def dataset_handle(df: pd.DataFrame, multilicense_mode: str = "include", *params) -> DatasetHandle:
+    """Handle untuk ``df`` sumber (objek session_state), mode multilicense dan parameter tambahan."""
+    return DatasetHandle(frame_digest(df), str(multilicense_mode), tuple(params))
+
+
+def _copy_result(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, tuple):
+        return tuple(_copy_result(v) for v in value)
+    return value
+
+
+def memoize(max_entries: int = 8, copy: bool = True) -> Callable:
+    """Cache LRU per fungsi dengan kunci ``(handle, argumen non-DataFrame)``.
+
+    Fungsi yang dibungkus menerima :class:`DatasetHandle` sebagai argumen
+    pertama. Argumen DataFrame/Series hanya payload (isinya sudah diwakili
+    handle) dan tidak ikut kunci; argumen lain harus hashable. Hasil
+    DataFrame/Series dikembalikan sebagai copy kalau ``copy``.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+
+        def _key(handle, args, kwargs):
+            if not isinstance(handle, DatasetHandle):
+                raise TypeError(f"{fn.__name__}: argumen pertama harus DatasetHandle")
+            plain = tuple(a for a in args if not isinstance(a, (pd.DataFrame, pd.Series)))
+            named = tuple(sorted(
+                (k, v) for k, v in kwargs.items() if not isinstance(v, (pd.DataFrame, pd.Series))
+            ))
+            return handle, plain, named
+
+        @functools.wraps(fn)
+        def wrapper(handle, *args, **kwargs):
+            key = _key(handle, args, kwargs)
+            with lock:
+                if key in cache:
+                    cache.move_to_end(key)
+                    result = cache[key]
+                    return _copy_result(result) if copy else result
+
+            result = fn(handle, *args, **kwargs)
+            with lock:
+                cache[key] = result
+                cache.move_to_end(key)
+                while len(cache) > max_entries:
+                    cache.popitem(last=False)
+            return _copy_result(result) if copy else result
+
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+
+        wrapper.cache_clear = cache_clear
+        wrapper.cache_len = lambda: len(cache)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import dataclasses
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from service.memo import DatasetHandle, memoize
+
+
+# Engine multilicense LTDBB: aturan dikompilasi sekali menjadi tabel lookup
+# (sandi / nama ter-normalisasi -> key yyyymm efektif). Per dataset cukup
+# memetakan nilai unik nama, kode dan bulan, lalu membandingkan key periode
+# tiap baris dengan key efektif; mask di-cache per handle dataset.
+
+# Rules multilicense: aktif mulai tanggal efektif (inclusive)
+MULTILICENSE_RULES: list[dict] = [
+    {"sandi": "777930115", "pjp": "Brankas Teknologi Indonesia", "effective": date(2024, 9, 20)},
+    {"sandi": "777930112", "pjp": "Durian Pay Indonesia", "effective": date(2025, 6, 25)},
+    {"sandi": "777962497", "pjp": "Ionpay Network", "effective": date(2021, 7, 1)},
+    {"sandi": "777930038", "pjp": "Kharisma Catur Mandala", "effective": date(2021, 7, 1)},
+    {"sandi": "777962104", "pjp": "MCP Indo Utama", "effective": date(2021, 7, 1)},
+    {"sandi": "777930118", "pjp": "Smart Fintech For You", "effective": date(2024, 4, 24)},
+]
+
+INCLUDE = "include"
+EXCLUDE = "exclude"
+
+_NAME_COLUMNS = ["Nama PJP", "PJP"]
+_CODE_COLUMNS = ["Sandi PJP", "Sandi_PJP", "SandiPJP", "Kode PJP", "Kode_PJP", "Kode"]
+
+_MONTHS = {
+    "january": 1, "february": 2, "march": 3, "april": 4,
+    "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+    "januari": 1, "februari": 2, "maret": 3,
+    "mei": 5, "juni": 6, "juli": 7, "agustus": 8,
+    "oktober": 10, "desember": 12,
+}
+
+
+def _norm_text(value) -> str:
+    if value is None:
+        return ""
+    return " ".join(str(value).strip().lower().split())
+
+
+def _norm_code(value) -> str:
+    return "".join(ch for ch in str(value) if ch.isdigit())
+
+
+def _compile_rules(rules: list[dict]) -> tuple[dict[str, int], dict[str, int]]:
+    """Return ``(nama -> key efektif, sandi -> key efektif)``; key = yyyymm, ambil yang paling awal.
+
+    Periode dievaluasi di akhir bulan, jadi "akhir bulan >= tanggal efektif"
+    setara dengan ``yyyymm >= yyyymm(tanggal efektif)``.
+    """
+    by_name: dict[str, int] = {}
+    by_code: dict[str, int] = {}
+    for rule in rules:
+        effective = pd.Timestamp(rule.get("effective"))
+        key = effective.year * 100 + effective.month
+        name = _norm_text(rule.get("pjp"))
+        code = str(rule.get("sandi", "")).strip()
+        if name:
+            by_name[name] = min(key, by_name.get(name, key))
+        if code:
+            by_code[code] = min(key, by_code.get(code, key))
+    return by_name, by_code
+
+
+_EFFECTIVE_BY_NAME, _EFFECTIVE_BY_CODE = _compile_rules(MULTILICENSE_RULES)
+
+
+def _month_to_int(value) -> float:
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.nan
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        m = int(value)
+        return m if 1 <= m <= 12 else np.nan
+    s = str(value).strip().lower()
+    if s.isdigit():
+        m = int(s)
+        return m if 1 <= m <= 12 else np.nan
+    return _MONTHS.get(s, np.nan)
+
+
+def _map_unique(s: pd.Series, fn, na_value) -> np.ndarray:
+    """``fn`` per nilai unik ``s`` lalu broadcast ke tiap baris (float64, NaN = tidak ada)."""
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    lookup = np.array([fn(v) for v in uniques] + [na_value], dtype=np.float64)
+    return lookup[codes]  # kode -1 (NA) -> elemen terakhir
+
+
+def _period_keys(df: pd.DataFrame) -> np.ndarray:
+    """Key yyyymm per baris: Month, akhir kuartal kalau hanya ada Quarter, Desember kalau tidak ada keduanya."""
+    year = pd.to_numeric(df["Year"], errors="coerce").to_numpy(np.float64) if "Year" in df.columns \
+        else np.full(len(df), np.nan)
+    if "Month" in df.columns:
+        month = _map_unique(df["Month"], _month_to_int, np.nan)
+    elif "Quarter" in df.columns:
+        month = pd.to_numeric(df["Quarter"], errors="coerce").to_numpy(np.float64) * 3
+        month[(month < 1) | (month > 12)] = np.nan
+    else:
+        month = np.full(len(df), 12.0)
+    return np.trunc(year) * 100 + month
+
+
+def _effective_keys(df: pd.DataFrame) -> np.ndarray | None:
+    """Key efektif paling awal per baris dari nama atau sandi (NaN = bukan multilicense)."""
+    name_col = next((c for c in _NAME_COLUMNS if c in df.columns), None)
+    code_col = next((c for c in _CODE_COLUMNS if c in df.columns), None)
+    if name_col is None and code_col is None:
+        return None
+
+    effective = np.full(len(df), np.nan)
+    if name_col is not None:
+        by_name = _map_unique(df[name_col], lambda v: _EFFECTIVE_BY_NAME.get(_norm_text(v), np.nan),
+                              _EFFECTIVE_BY_NAME.get("nan", np.nan))
+        effective = np.fmin(effective, by_name)
+    if code_col is not None:
+        by_code = _map_unique(df[code_col], lambda v: _EFFECTIVE_BY_CODE.get(_norm_code(v), np.nan), np.nan)
+        effective = np.fmin(effective, by_code)
+    return effective
+
+
+def multilicense_mask(df: pd.DataFrame) -> pd.Series:
+    """True untuk baris PJP multilicense yang periodenya sudah >= tanggal efektif."""
+    if df is None or df.empty:
+        return pd.Series([], dtype=bool)
+    effective = _effective_keys(df)
+    if effective is None:
+        return pd.Series(False, index=df.index)
+    with np.errstate(invalid="ignore"):
+        hit = _period_keys(df) >= effective  # NaN (periode/aturan tidak ada) -> False
+    return pd.Series(hit, index=df.index)
+
+
+@memoize(max_entries=8, copy=False)
+def _cached_mask(handle: DatasetHandle, df: pd.DataFrame) -> pd.Series:
+    return multilicense_mask(df)
+
+
+@memoize(max_entries=8, copy=False)
+def _cached_excluded(handle: DatasetHandle, df: pd.DataFrame, mask: pd.Series) -> pd.DataFrame:
+    return df.loc[~mask.to_numpy()]
+
+
+def apply_multilicense_mode(df: pd.DataFrame, mode: str,
+                            handle: DatasetHandle | None = None) -> tuple[pd.DataFrame, pd.Series]:
+    """Return ``(df_mode, mask)``; mode ``include`` mengembalikan ``df`` apa adanya (tanpa copy).
+
+    Dengan ``handle`` (data yang diwakili ``df``) mask dan frame exclude
+    di-cache, jadi ganti mode di halaman mana pun tidak menghitung ulang.
+    Hasil dipakai bersama; jangan dimutasi in-place.
+    """
+    if df is None or df.empty:
+        return df, pd.Series([], dtype=bool)
+    if handle is None:
+        mask = multilicense_mask(df)
+        return (df.loc[~mask.to_numpy()] if str(mode) == EXCLUDE else df), mask
+
+    # Mask tidak bergantung mode -> satu entri cache untuk include & exclude
+    mask = _cached_mask(dataclasses.replace(handle, multilicense_mode=INCLUDE), df)
+    if str(mode) == EXCLUDE:
+        return _cached_excluded(dataclasses.replace(handle, multilicense_mode=EXCLUDE), df, mask), mask
+    return df, mask
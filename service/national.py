@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from service.memo import DatasetHandle, memoize
+from service.period import month_numbers
+
+
+# Normalizer sheet Raw_JKTNasional: dibersihkan sekali saat load menjadi satu
+# baris per periode (Year, Quarter, Month). Halaman membaca rollup/lookup dari
+# index tersebut, bukan mengulang drop kolom dan fallback total. Baris identik
+# tidak di-dedupe: dua baris dengan nilai sama bisa sah (mis. dua PJP).
+
+NOM_MEASURES: list[str] = ['Nom Nasional Out', 'Nom Nasional Inc', 'Nom Nasional Dom', 'Nom Nasional Total']
+FREK_MEASURES: list[str] = ['Frek Nasional Out', 'Frek Nasional Inc', 'Frek Nasional Dom', 'Frek Nasional Total']
+NATIONAL_MEASURES: list[str] = NOM_MEASURES + FREK_MEASURES
+
+# Nominal di sheet nasional dalam miliar Rupiah
+NOMINAL_SCALE_TO_RP = 1_000_000_000.0
+
+PERIOD_KEYS: list[str] = ['Year', 'Quarter', 'Month']
+
+# Sheet dianggap "total nasional diulang per baris PJP" kalau hampir semua
+# periode berisi nilai identik (toleransi 5% periode berbeda)
+_REPEATED_NOISE_LIMIT = 0.05
+
+
+@dataclass
+class NationalDataset:
+    periods: pd.DataFrame  # index (Year, Quarter, Month) unik & urut; kolom NATIONAL_MEASURES
+    repeated_totals: bool = False  # True: total per periode diambil sekali (max), bukan dijumlah
+    dropped_rows: int = 0  # baris dengan Year/Month kosong atau tidak valid yang dibuang
+    filled_totals: int = 0  # baris dengan Total kosong/0 yang diisi Inc+Out+Dom
+    _rollups: dict[tuple, pd.DataFrame] = field(default_factory=dict, repr=False)
+
+    @property
+    def base(self) -> pd.DataFrame:
+        return self.periods.reset_index()
+
+    def rollup(self, *by: str) -> pd.DataFrame:
+        """Jumlah measure per ``by`` (mis. ``'Year', 'Quarter'``) dari index periode."""
+        if by not in self._rollups:
+            self._rollups[by] = self.periods.groupby(level=list(by)).sum().reset_index()
+        return self._rollups[by].copy()
+
+    def lookup(self, year, quarter=None, month=None) -> pd.DataFrame:
+        """Baris periode untuk ``year`` (opsional ``quarter``/``month``) lewat index."""
+        idx = self.periods.index
+        mask = idx.get_level_values('Year') == int(year)
+        if quarter is not None:
+            mask &= idx.get_level_values('Quarter') == int(quarter)
+        if month is not None:
+            mask &= idx.get_level_values('Month') == int(month)
+        return self.periods[mask].reset_index()
+
+
+def national_totals(df: pd.DataFrame) -> tuple[float, float]:
+    """``(nominal_rp, frekuensi)`` total dari frame nasional ter-normalisasi (atau rollup-nya)."""
+    if df is None or df.empty:
+        return 0.0, 0.0
+    nom = float(pd.to_numeric(df['Nom Nasional Total'], errors='coerce').fillna(0).sum())
+    frek = float(pd.to_numeric(df['Frek Nasional Total'], errors='coerce').fillna(0).sum())
+    return nom * NOMINAL_SCALE_TO_RP, frek
+
+
+def _fill_totals(df: pd.DataFrame) -> int:
+    """Total kosong/0 sementara Inc/Out/Dom terisi -> Inc+Out+Dom. Return jumlah baris diisi."""
+    filled = np.zeros(len(df), dtype=bool)
+    for measures in (NOM_MEASURES, FREK_MEASURES):
+        total_col, parts = measures[-1], measures[:-1]
+        present = [c for c in parts if c in df.columns]
+        if total_col not in df.columns or not present:
+            continue
+        parts_sum = df[present].astype('float64').fillna(0).sum(axis=1).to_numpy()
+        total = df[total_col].astype('float64').to_numpy()
+        missing = (np.isnan(total) | (total == 0)) & (parts_sum != 0)
+        if missing.any():
+            values = df[total_col].astype('float64')
+            values[missing] = parts_sum[missing]
+            df[total_col] = values
+            filled |= missing
+    return int(filled.sum())
+
+
+def normalize_national(df_national: pd.DataFrame) -> NationalDataset:
+    """Bersihkan sheet nasional: buang kolom duplikat, isi total, satu baris per periode.
+
+    Baris dengan Year/Month kosong atau tidak valid dibuang dan dihitung di
+    ``dropped_rows`` supaya halaman bisa melaporkannya.
+    """
+    df = df_national.drop(columns=['Nom Nasional Total.1'], errors='ignore').copy()
+    measures = [m for m in NATIONAL_MEASURES if m in df.columns]
+
+    if 'Month' in df.columns:
+        # Quarter selalu diturunkan dari Month (nama bulan juga diterima)
+        month = month_numbers(df['Month'])
+        month = np.where((month >= 1) & (month <= 12), month, np.nan)
+        df['Month'] = month
+        df['Quarter'] = (month - 1) // 3 + 1
+    if 'Year' in df.columns:
+        df['Year'] = pd.to_numeric(df['Year'], errors='coerce')
+    keys = [k for k in PERIOD_KEYS if k in df.columns]
+    valid = df[keys].notna().all(axis=1)
+    dropped_rows = int((~valid).sum())
+    df = df.loc[valid]
+    for k in keys:
+        df[k] = df[k].astype('int64')
+
+    filled_totals = _fill_totals(df)
+
+    grouped = df.groupby(keys, sort=True)[measures]
+    repeated = False
+    if len(df) and (grouped.size() > 1).any():
+        totals = [m for m in ('Nom Nasional Total', 'Frek Nasional Total') if m in measures]
+        if totals:
+            noisy = (df.groupby(keys, sort=True)[totals].nunique() > 1).any(axis=1)
+            repeated = bool(noisy.mean() <= _REPEATED_NOISE_LIMIT)
+    periods = grouped.max() if repeated else grouped.sum()
+
+    return NationalDataset(periods, repeated, dropped_rows, filled_totals)
+
+
+@memoize(max_entries=4, copy=False)
+def build_national_dataset(handle: DatasetHandle, df_national: pd.DataFrame) -> NationalDataset:
+    """``normalize_national`` sekali per handle dataset."""
+    return normalize_national(df_national)
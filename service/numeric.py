@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+
+# Engine konversi teks angka dari Excel (format Indonesia "1.234,56" maupun
+# Inggris "1,234.56"). Locale ditebak per kolom dari sampel, lalu sel yang
+# formatnya pasti untuk locale itu (ribuan tepat 3 digit) di-parse dalam satu
+# pass vektor; sel lain (locale campuran, pemisah ambigu) di-parse per sel.
+
+_SAMPLE_SIZE = 2_000
+_NOISE_CHARS = "\u00a0 \t\r\n"
+_NON_NUMERIC = re.compile(r"[^0-9.,\-]")
+_DECIMAL_TAIL = re.compile(r"[.,](\d+)$")
+
+
+@dataclass
+class CoercionStats:
+    column: str
+    total: int = 0
+    passthrough: int = 0  # sudah angka (int/float) sebelum konversi
+    coerced: int = 0      # teks berhasil diubah jadi angka
+    fallback: int = 0     # berhasil, tapi lewat parse per sel
+    failed: int = 0       # teks tidak kosong yang tetap NaN
+    decimal_sep: str | None = None
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def _vote_decimal_sep(values: pd.Series) -> str | None:
+    """Tebak pemisah desimal dari sampel teks; None kalau tidak ada bukti."""
+    votes = {".": 0, ",": 0}
+    for v in values:
+        has_dot, has_comma = "." in v, "," in v
+        if has_dot and has_comma:
+            votes["." if v.rfind(".") > v.rfind(",") else ","] += 1
+            continue
+        sep = "." if has_dot else ("," if has_comma else None)
+        if sep is None:
+            continue
+        if v.count(sep) > 1:
+            # "1.234.567" -> sep adalah ribuan, yang lain desimal
+            votes["," if sep == "." else "."] += 1
+            continue
+        tail = _DECIMAL_TAIL.search(v)
+        if tail and len(tail.group(1)) != 3:
+            votes[sep] += 1
+        # tepat 3 digit ("1.234" / "1,234") ambigu -> tidak memberi suara
+    if votes["."] == votes[","]:
+        return None
+    return "." if votes["."] > votes[","] else ","
+
+
+def sniff_decimal_sep(series: pd.Series, sample_size: int = _SAMPLE_SIZE) -> str | None:
+    s = series.dropna()
+    if len(s) > sample_size:
+        s = s.sample(sample_size, random_state=0)
+    s = s[s.str.contains(r"[.,]", regex=True)]
+    if s.empty:
+        return None
+    return _vote_decimal_sep(s.str.replace(_NON_NUMERIC, "", regex=True))
+
+
+_NOISE = "[" + _NOISE_CHARS + "]"
+
+# Format yang aman untuk jalur vektor per locale: pemisah ribuan hanya di grup
+# tepat 3 digit. Tanpa locale (suara seri) hanya bilangan bulat, boleh dengan
+# ribuan satu jenis pemisah ("1.234.567" / "1,234,567").
+_FAST_FORMAT: dict[str | None, str] = {
+    ",": r"-?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?",
+    ".": r"-?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?",
+    None: r"-?(?:\d+|\d{1,3}(?:\.\d{3})+|\d{1,3}(?:,\d{3})+)",
+}
+
+
+def _normalize_separators(text: pd.Series, decimal_sep: str | None) -> pd.Series:
+    """Sel yang cocok ``_FAST_FORMAT[decimal_sep]`` -> teks angka bertitik desimal."""
+    if decimal_sep == ",":
+        return text.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    if decimal_sep == ".":
+        return text.str.replace(",", "", regex=False)
+    # Hanya grup ribuan (lihat _FAST_FORMAT[None]), jadi aman dibuang
+    return text.str.replace(r"[.,]", "", regex=True)
+
+
+def _parse_cell(text, decimal_sep: str | None) -> float:
+    if text is None or text is pd.NA:
+        return np.nan
+    raw = str(text).strip()
+    negative = raw.startswith("(") and raw.endswith(")")
+    v = _NON_NUMERIC.sub("", raw)
+    if not v or v in {"-", ".", ","}:
+        return np.nan
+
+    has_dot, has_comma = "." in v, "," in v
+    if has_dot and has_comma:
+        dec = "." if v.rfind(".") > v.rfind(",") else ","
+    elif has_dot or has_comma:
+        sep = "." if has_dot else ","
+        tail = _DECIMAL_TAIL.search(v)
+        if v.count(sep) == 1 and (sep == decimal_sep or (tail and len(tail.group(1)) != 3)):
+            dec = sep
+        else:
+            dec = None
+    else:
+        dec = None
+
+    thousands = {".", ","} - ({dec} if dec else set())
+    for t in thousands:
+        v = v.replace(t, "")
+    if dec == ",":
+        v = v.replace(",", ".")
+    try:
+        out = float(v)
+    except ValueError:
+        return np.nan
+    return -out if negative else out
+
+
+def coerce_numeric(series: pd.Series) -> tuple[pd.Series, CoercionStats]:
+    """Konversi kolom ke float; return ``(hasil, statistik)``."""
+    stats = CoercionStats(column=str(series.name), total=int(len(series)))
+    if pd.api.types.is_numeric_dtype(series):
+        stats.passthrough = int(series.notna().sum())
+        return series, stats
+
+    out = pd.Series(np.nan, index=series.index, dtype="float64", name=series.name)
+
+    # Nilai yang sudah int/float (kolom object campuran) dipakai apa adanya
+    if pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        is_text = series.notna()
+    else:
+        is_text = series.map(lambda v: isinstance(v, str))
+        native = series.notna() & ~is_text
+        if native.any():
+            out[native] = pd.to_numeric(series[native], errors="coerce")
+            stats.passthrough = int(out[native].notna().sum())
+            stats.failed += int(native.sum()) - stats.passthrough
+
+    text = original = series[is_text].astype(str)
+    if text.empty:
+        return out, stats
+
+    decimal_sep = sniff_decimal_sep(text)
+    stats.decimal_sep = decimal_sep
+
+    sample = text.head(_SAMPLE_SIZE)
+    if bool(sample.str.contains(r"[^\d.,\-\s\u00a0]", regex=True).any()):
+        # Prefix mata uang ("Rp") dll. -> buang di level kolom, bukan per sel
+        text = text.str.replace(r"(?i)rp\.?|[^\d.,\-()]", "", regex=True)
+
+    raw = text
+    # Regex/replace vektor lewat buffer Arrow (jauh lebih cepat dari object)
+    text = text.astype("string[pyarrow]").str.replace(_NOISE, "", regex=True)
+    empty = text == ""
+    if empty.any():
+        # Sel yang hanya berisi teks non-angka (mis. "abc", "-") dihitung gagal
+        stats.failed += int((original[empty].str.strip() != "").sum())
+        text = text[~empty]
+    # Jalur vektor hanya untuk sel berformat pasti; sisanya (mis. "12,5" dan
+    # "3.75" di kolom yang sama, atau "1234.5" di kolom desimal koma) per sel
+    fast = text.str.fullmatch(_FAST_FORMAT[decimal_sep]).to_numpy(bool)
+    parsed = pd.to_numeric(_normalize_separators(text[fast], decimal_sep), errors="coerce")
+    ok = parsed.notna()
+    out[parsed.index[ok]] = parsed[ok].astype("float64")
+    stats.coerced = int(ok.sum())
+    stats.failed += int((~ok).sum())
+
+    bad = raw.loc[text.index[~fast]]
+    if not bad.empty:
+        fixed = bad.map(lambda v: _parse_cell(v, decimal_sep)).astype("float64")
+        good = fixed.notna()
+        out[fixed.index[good]] = fixed[good]
+        stats.fallback = int(good.sum())
+        stats.coerced += stats.fallback
+        stats.failed += int((~good).sum())
+    return out, stats
+
+
+def coerce_numeric_columns(df: pd.DataFrame, cols: list[str]) -> tuple[pd.DataFrame, dict[str, CoercionStats]]:
+    report: dict[str, CoercionStats] = {}
+    for col in cols:
+        if col in df.columns:
+            df[col], report[col] = coerce_numeric(df[col])
+    return df, report
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import calendar
+from typing import Mapping
+
+import numpy as np
+import pandas as pd
+
+
+# Key periode integer LTDBB: yyyymm (Year*100 + Month) dan yyyyq (Year*10 +
+# Quarter). Filter rentang periode cukup membandingkan satu key; kalau key
+# sudah urut (hasil groupby/rollup) rentang diambil dengan searchsorted.
+
+MONTHS: list[str] = list(calendar.month_name)[1:]
+_MONTH_NUMBER: dict[str, int] = {name.lower(): i for i, name in enumerate(MONTHS, start=1)}
+
+MONTH = 'month'
+QUARTER = 'quarter'
+
+
+def month_numbers(month: pd.Series) -> np.ndarray:
+    """Nama bulan (atau angka 1-12) -> float 1..12; tidak dikenal -> NaN."""
+    month = pd.Series(month)
+    if isinstance(month.dtype, pd.CategoricalDtype):
+        # Cukup petakan kategori, lalu ambil lewat kode
+        lookup = month_numbers(pd.Series(month.cat.categories, dtype=object))
+        codes = month.cat.codes.to_numpy()
+        return np.where(codes >= 0, lookup[np.maximum(codes, 0)] if len(lookup) else np.nan, np.nan)
+    if pd.api.types.is_numeric_dtype(month):
+        return month.to_numpy(np.float64, na_value=np.nan)
+    text = month.astype(object)
+    named = text.map(lambda v: _MONTH_NUMBER.get(v.strip().lower()) if isinstance(v, str) else None)
+    numeric = pd.to_numeric(text, errors='coerce')
+    return pd.to_numeric(named, errors='coerce').fillna(numeric).to_numpy(np.float64)
+
+
+def period_key(year, sub, grain: str) -> int:
+    """Key satu periode; ``year`` di-cast ke int Python (Year dari schema bisa int16)."""
+    return int(year) * (100 if grain == MONTH else 10) + int(sub)
+
+
+def quarter_key(year, quarter) -> np.ndarray:
+    """yyyyq."""
+    return (np.asarray(year, dtype=np.float64) * 10
+            + pd.to_numeric(pd.Series(quarter), errors='coerce').to_numpy(np.float64))
+
+
+def frame_period_key(df: pd.DataFrame, grain: str) -> np.ndarray:
+    """Key periode per baris ``df``; grain quarter diturunkan dari Month kalau ada."""
+    year = pd.to_numeric(df['Year'], errors='coerce').to_numpy(np.float64)
+    if grain == MONTH:
+        return year * 100 + month_numbers(df['Month'])
+    if 'Month' in df.columns:
+        return year * 10 + (month_numbers(df['Month']) - 1) // 3 + 1
+    return quarter_key(year, df['Quarter'])
+
+
+def range_positions(keys: np.ndarray, start, end) -> np.ndarray:
+    """Posisi baris dengan ``start <= key <= end``."""
+    keys = np.asarray(keys, dtype=np.float64)
+    if len(keys) and not np.isnan(keys).any() and (np.diff(keys) >= 0).all():
+        lo = np.searchsorted(keys, start, side='left')
+        hi = np.searchsorted(keys, end, side='right')
+        return np.arange(lo, max(lo, hi))
+    return np.flatnonzero((keys >= start) & (keys <= end))
+
+
+def filter_period_range(df: pd.DataFrame, grain: str, start: tuple[int, int],
+                        end: tuple[int, int]) -> pd.DataFrame:
+    """Baris ``df`` antara periode ``start`` dan ``end`` (inklusif), ``(year, month|quarter)``."""
+    keys = frame_period_key(df, grain)
+    return df.take(range_positions(keys, period_key(*start, grain), period_key(*end, grain)))
+
+
+def filter_year_range(df: pd.DataFrame, start_year, end_year) -> pd.DataFrame:
+    year = pd.to_numeric(df['Year'], errors='coerce').to_numpy(np.float64)
+    return df.take(range_positions(year, start_year, end_year))
+
+
+def _period_axis(df: pd.DataFrame) -> tuple[str, np.ndarray, np.ndarray]:
+    """Sumbu periode ``df``: kolom sub-periode, Year, dan nilai sub-periode (kode kalau kategori)."""
+    col = 'Month' if 'Month' in df.columns else 'Quarter'
+    sub = df[col]
+    sub = sub.cat.codes.to_numpy() if isinstance(sub.dtype, pd.CategoricalDtype) else sub.to_numpy()
+    return col, df['Year'].to_numpy(), sub
+
+
+def _same_axis(a: tuple[str, np.ndarray, np.ndarray], b: tuple[str, np.ndarray, np.ndarray]) -> bool:
+    return a[0] == b[0] and len(a[1]) == len(b[1]) and np.array_equal(a[1], b[1]) and np.array_equal(a[2], b[2])
+
+
+def _trim_zero_rows(df: pd.DataFrame, cols: list[str]) -> np.ndarray:
+    """Mask baris yang tersisa setelah bulan kosong (measure ``cols`` = 0) di tahun terakhir dibuang.
+
+    Sama dengan ``filter_start_end_year(..., is_month=True)``: per kolom, tahun
+    terakhir dihitung ulang dari baris yang tersisa.
+    """
+    year = pd.to_numeric(df['Year'], errors='coerce').to_numpy(np.float64)
+    keep = np.ones(len(df), dtype=bool)
+    for col in cols:
+        if not keep.any():
+            break
+        last_year = np.nanmax(np.where(keep, year, np.nan))
+        keep &= ~((df[col].to_numpy() == 0) & (year == last_year))
+    return keep
+
+
+def _select_rows(df: pd.DataFrame, mask: np.ndarray) -> pd.DataFrame:
+    pos = np.flatnonzero(mask)
+    if len(pos) == 0:
+        return df.iloc[0:0]
+    if pos[-1] - pos[0] + 1 == len(pos):
+        # Rentang kontinyu (frame urut periode): slice tanpa copy
+        return df.iloc[pos[0]:pos[-1] + 1]
+    return df.take(pos)
+
+
+def filter_period_frames(frames: Mapping[str, pd.DataFrame], start: tuple[int, int], end: tuple[int, int],
+                         trim_zero: Mapping[str, list[str]] | None = None) -> dict[str, pd.DataFrame]:
+    """Filter banyak frame sekaligus ke rentang Year-Quarter ``start``..``end`` (inklusif).
+
+    Mask periode dihitung sekali per sumbu periode (grain + nilai Year/Quarter
+    atau Month yang sama) lalu dipakai ulang oleh frame lain di sumbu itu.
+    ``trim_zero`` (nama frame -> kolom) membuang bulan kosong di tahun terakhir
+    seperti ``filter_start_end_year(..., is_month=True)``. Hasil berupa slice
+    dari frame asal bila rentangnya kontinyu; jangan dimutasi in-place.
+    """
+    lo, hi = period_key(*start, QUARTER), period_key(*end, QUARTER)
+    masks: list[tuple[tuple[str, np.ndarray, np.ndarray], np.ndarray]] = []
+    out: dict[str, pd.DataFrame] = {}
+    for name, df in frames.items():
+        if 'Month' not in df.columns and 'Quarter' not in df.columns:
+            out[name] = df
+            continue
+        axis = _period_axis(df)
+        mask = next((m for a, m in masks if _same_axis(a, axis)), None)
+        if mask is None:
+            keys = frame_period_key(df, QUARTER)
+            mask = (keys >= lo) & (keys <= hi)
+            masks.append((axis, mask))
+        if trim_zero and trim_zero.get(name):
+            mask = mask & _trim_zero_rows(df, trim_zero[name])
+        out[name] = _select_rows(df, mask)
+    return out
+
+
+def parse_quarter_labels(labels) -> np.ndarray:
+    """Label "YYYY Qn" -> key yyyyq (int64), urutan dipertahankan; label tidak valid dibuang."""
+    parts = pd.Series(list(labels), dtype=object).astype(str).str.extract(r'^\s*(\d+)\s+[Qq](\d+)(?:\s|$)')
+    year = pd.to_numeric(parts[0], errors='coerce')
+    quarter = pd.to_numeric(parts[1], errors='coerce')
+    valid = year.notna() & quarter.between(1, 4)
+    return (year[valid] * 10 + quarter[valid]).to_numpy(np.int64)
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from service.growth import FLOW_TYPES, SUM_TYPES
+from service.period import MONTH, QUARTER, month_numbers, period_key, quarter_key
+
+
+# Matriks PJP x periode LTDBB: grain PJP x Year x Quarter x Month dijumlah
+# sekali per grain (quarter/month) menjadi array 2D per measure (baris = PJP
+# urut nama, kolom = key periode urut). Perbandingan periode mana pun cukup
+# indexing kolom, bukan filter + groupby + merge atas frame dasar.
+
+FLOWS: tuple[str, ...] = FLOW_TYPES + ('Total',)
+
+
+def matrix_measure(sum_type: str, flow: str) -> str:
+    """Nama measure di matriks, mis. ``Sum of Fin Nilai Inc`` / ``Sum of Fin Nilai Total``."""
+    return f'Sum of Fin {sum_type} {flow}'
+
+
+def previous_period(grain: str, year: int, sub: int, kind: str) -> tuple[int, int]:
+    """Periode pembanding ``(year, quarter|month)``; ``kind`` 'yoy' atau 'prev' (QtQ/MtM)."""
+    if kind == 'yoy':
+        return year - 1, sub
+    if kind == 'prev':
+        last = 12 if grain == MONTH else 4
+        return (year, sub - 1) if sub > 1 else (year - 1, last)
+    raise ValueError(f"Jenis periode pembanding tidak dikenal: {kind}")
+
+
+@dataclass
+class PjpPeriodMatrix:
+    grain: str
+    pjps: np.ndarray  # Nama PJP (object), urut
+    periods: np.ndarray  # key periode int64 (yyyyq / yyyymm), urut
+    present: np.ndarray  # bool [pjp, periode]: PJP punya baris di periode itu
+    values: dict[str, np.ndarray] = field(default_factory=dict)  # measure -> [pjp, periode]
+    _series: dict[tuple, pd.Series] = field(default_factory=dict, repr=False)
+
+    def position(self, year, sub) -> int:
+        """Kolom periode ``(year, quarter|month)``; -1 kalau tidak ada."""
+        key = period_key(year, sub, self.grain)
+        pos = int(np.searchsorted(self.periods, key))
+        return pos if pos < len(self.periods) and self.periods[pos] == key else -1
+
+    def series(self, year, sub, flow: str, sum_type: str) -> pd.Series:
+        """``sum_type`` (Jumlah/Nilai) ``flow`` per PJP yang ada di periode, index Nama PJP.
+
+        Di-memo per ``(year, sub, flow, sum_type)``; periode/measure tidak ada ->
+        Series kosong. Hasil dipakai bersama, jangan dimutasi.
+        """
+        key = (int(year), int(sub), str(flow), str(sum_type))
+        if key not in self._series:
+            measure = matrix_measure(sum_type, flow)
+            col = self.position(year, sub)
+            if col < 0 or measure not in self.values:
+                self._series[key] = pd.Series(dtype=float)
+            else:
+                rows = np.flatnonzero(self.present[:, col])
+                self._series[key] = pd.Series(
+                    self.values[measure][rows, col],
+                    index=pd.Index(self.pjps[rows].astype(str), name='Nama PJP'),
+                )
+        return self._series[key]
+
+    def compare(self, flow: str, current: tuple[int, int], **previous: tuple[int, int]) -> pd.DataFrame:
+        """Jumlah/Nilai ``flow`` tiap PJP yang ada di ``current``.
+
+        Tiap ``suffix=(year, sub)`` di ``previous`` menambah kolom
+        ``Jumlah_<suffix>``/``Nilai_<suffix>``; PJP yang tidak ada di periode
+        pembanding bernilai NaN (seperti merge left).
+        """
+        col = self.position(*current)
+        rows = np.flatnonzero(self.present[:, col]) if col >= 0 else np.zeros(0, dtype=np.int64)
+        out = pd.DataFrame({'Nama PJP': self.pjps[rows]})
+        for s in SUM_TYPES:
+            out[s] = self.values[matrix_measure(s, flow)][rows, col] if len(rows) else np.zeros(0)
+        for suffix, period in previous.items():
+            pos = self.position(*period)
+            hit = self.present[rows, pos] if pos >= 0 else np.zeros(len(rows), dtype=bool)
+            for s in SUM_TYPES:
+                prev = np.full(len(rows), np.nan)
+                prev[hit] = self.values[matrix_measure(s, flow)][rows[hit], pos]
+                out[f'{s}_{suffix}'] = prev
+        return out
+
+
+def build_pjp_matrix(df_base: pd.DataFrame, grain: str = QUARTER) -> PjpPeriodMatrix:
+    """Matriks dari ``cube.base`` (PJP x Year x Quarter x Month); total dijumlah per baris dulu."""
+    year = pd.to_numeric(df_base['Year'], errors='coerce').to_numpy(np.float64)
+    if grain == MONTH:
+        keys = year * 100 + month_numbers(df_base['Month'])
+    else:
+        keys = quarter_key(year, df_base['Quarter'])
+    valid = ~np.isnan(keys) & df_base['Nama PJP'].notna().to_numpy()
+
+    frame = df_base.loc[valid, ['Nama PJP']].copy()
+    frame['_period'] = keys[valid].astype(np.int64)
+    measures: list[str] = []
+    for s in SUM_TYPES:
+        for t in FLOW_TYPES:
+            frame[matrix_measure(s, t)] = df_base.loc[valid, matrix_measure(s, t)]
+        # Total per baris lalu dijumlah, sama seperti Inc+Out+Dom di frame dasar
+        frame[matrix_measure(s, 'Total')] = sum(frame[matrix_measure(s, t)] for t in FLOW_TYPES)
+        measures += [matrix_measure(s, t) for t in FLOWS]
+
+    sums = frame.groupby(['Nama PJP', '_period'], sort=True)[measures].sum()
+    i, j = sums.index.codes
+    pjps = sums.index.levels[0].to_numpy(dtype=object)
+    periods = sums.index.levels[1].to_numpy(np.int64)
+
+    present = np.zeros((len(pjps), len(periods)), dtype=bool)
+    present[i, j] = True
+    values: dict[str, np.ndarray] = {}
+    for m in measures:
+        column = sums[m].to_numpy()
+        arr = np.zeros((len(pjps), len(periods)), dtype=column.dtype)
+        arr[i, j] = column
+        arr.flags.writeable = False  # dipakai bersama lewat cache cube
+        values[m] = arr
+    present.flags.writeable = False
+    return PjpPeriodMatrix(grain, pjps, periods, present, values)
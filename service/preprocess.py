@@ -1,9 +1,19 @@
 import pandas as pd
 import streamlit as st
 import calendar
+import time
 import numpy as np
 
+from service.aggregate import aggregate_fin, group_sums
+from service.backend import DUCKDB, aggregate_fin_sql, get_backend, group_sum
+from service.growth import GROWTH_COLUMNS, compute_growth
+from service.national import national_totals, normalize_national
+from service.numeric import CoercionStats, coerce_numeric, coerce_numeric_columns
+from service.period import QUARTER, filter_year_range, frame_period_key, period_key, range_positions
+from service.schema import NATIONAL_SCHEMA, TRX_SCHEMA, apply_schema
 from service.units import pick_rupiah_unit, rupiah_unit_suffix
+from service.workbook_cache import get_cached_workbook, put_cached_workbook
+from service.workbook_check import prescan_workbook
 
 
 def _to_number(series: pd.Series) -> pd.Series:
@@ -11,52 +21,160 @@ def _to_number(series: pd.Series) -> pd.Series:
 
     Handles common Excel/text cases like thousand separators (',' / '.'),
     Indonesian decimal comma, and currency prefixes (e.g., 'Rp').
+    Locale ditebak per kolom oleh ``service.numeric.coerce_numeric``.
     """
-    if pd.api.types.is_numeric_dtype(series):
-        return series
-
-    s = series.astype("string").str.strip()
-    # Common noise
-    s = s.str.replace("\u00a0", "", regex=False)  # non-breaking space
-    s = s.str.replace("Rp", "", regex=False)
-    s = s.str.replace(" ", "", regex=False)
-
-    has_comma = s.str.contains(",", na=False)
-    has_dot = s.str.contains("\\.", na=False)
-
-    if bool((has_comma & has_dot).any()):
-        # Assume '.' thousands and ',' decimals: 1.234,56 -> 1234.56
-        s = s.str.replace(".", "", regex=False)
-        s = s.str.replace(",", ".", regex=False)
-    elif bool(has_comma.any()):
-        # If it looks like a decimal comma (e.g. 12,5), convert to '.'
-        looks_decimal = s.str.contains(r",\d{1,2}$", regex=True, na=False)
-        if bool(looks_decimal.any()):
-            s = s.str.replace(",", ".", regex=False)
-        else:
-            s = s.str.replace(",", "", regex=False)
-    elif bool(has_dot.any()):
-        # If it doesn't look like a decimal dot, treat '.' as thousands
-        looks_decimal = s.str.contains(r"\.\d{1,2}$", regex=True, na=False)
-        if not bool(looks_decimal.any()):
-            s = s.str.replace(".", "", regex=False)
+    return coerce_numeric(series)[0]
 
-    # Keep digits, minus sign, and decimal dot
-    s = s.str.replace(r"[^0-9\.-]", "", regex=True)
-    return pd.to_numeric(s, errors="coerce")
 
+def _coerce_numeric_columns(df: pd.DataFrame, cols: list[str],
+                            report: dict[str, CoercionStats] | None = None) -> pd.DataFrame:
+    df, col_report = coerce_numeric_columns(df, cols)
+    if report is not None:
+        report.update(col_report)
+    return df
 
-def _coerce_numeric_columns(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    for col in cols:
-        if col in df.columns:
-            df[col] = _to_number(df[col])
+
+TRX_SHEET_NAME = 'Trx_PJPJKT'
+NATIONAL_SHEET_NAME = 'Raw_JKTNasional'
+
+_LOAD_NUMERIC_COLUMNS: list[str] = [
+    # LTDBB (PJP)
+    'Fin Jumlah Inc', 'Fin Nilai Inc',
+    'Fin Jumlah Out', 'Fin Nilai Out',
+    'Fin Jumlah Dom', 'Fin Nilai Dom',
+    # Nasional
+    'Nom Nasional Out', 'Nom Nasional Inc', 'Nom Nasional Dom', 'Nom Nasional Total',
+    'Frek Nasional Out', 'Frek Nasional Inc', 'Frek Nasional Dom', 'Frek Nasional Total',
+]
+
+# Kolom minimum per sheet yang dipakai halaman lain (dicek pre-scan sebelum parse penuh)
+_REQUIRED_COLUMNS: dict[str, list[str]] = {
+    TRX_SHEET_NAME: [
+        'Nama PJP', 'Kode', 'Year', 'Quarter', 'Month',
+        'Fin Jumlah Inc', 'Fin Nilai Inc',
+        'Fin Jumlah Out', 'Fin Nilai Out',
+        'Fin Jumlah Dom', 'Fin Nilai Dom',
+    ],
+    NATIONAL_SHEET_NAME: [
+        'Year', 'Month',
+        'Nom Nasional Out', 'Nom Nasional Inc', 'Nom Nasional Dom', 'Nom Nasional Total',
+        'Frek Nasional Out', 'Frek Nasional Inc', 'Frek Nasional Dom', 'Frek Nasional Total',
+    ],
+}
+
+
+def validate_workbook(uploaded_file, sheet_names: list[str] | None = None) -> float | None:
+    """Pre-scan header workbook; tampilkan error dan return None kalau file ditolak.
+
+    Return durasi pre-scan (detik) kalau lolos.
+    """
+    sheet_names = sheet_names or list(_REQUIRED_COLUMNS)
+    check = prescan_workbook(uploaded_file, {name: _REQUIRED_COLUMNS[name] for name in sheet_names})
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    for message in check.errors:
+        st.error(message)
+    return check.elapsed if check.ok else None
+
+
+def _apply_sheet_schema(df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+    schema = TRX_SCHEMA if sheet_name == TRX_SHEET_NAME else NATIONAL_SCHEMA
+    df, report = apply_schema(df, schema)
+    df.attrs['schema_report'] = report.as_dict()
     return df
 
+
+def _coerce_loaded_sheet(df: pd.DataFrame, sheet_name: str) -> pd.DataFrame:
+    # Make numeric columns stable across environments (local vs Streamlit Cloud)
+    report: dict[str, CoercionStats] = {}
+    df = _coerce_numeric_columns(df, _LOAD_NUMERIC_COLUMNS, report)
+    df = _apply_sheet_schema(df, sheet_name)
+    df.attrs['coercion_report'] = {col: stats.as_dict() for col, stats in report.items()}
+    return df
+
+
+def _parse_sheet(xls: pd.ExcelFile, sheet_name: str) -> pd.DataFrame:
+    return _coerce_loaded_sheet(xls.parse(sheet_name=sheet_name), sheet_name)
+
+
+def read_sheet(source, sheet_name: str = TRX_SHEET_NAME) -> pd.DataFrame:
+    """Satu sheet workbook dengan koersi + skema yang sama seperti ``load_workbook_data``, tanpa cache."""
+    with pd.ExcelFile(source) as xls:
+        return _parse_sheet(xls, sheet_name)
+
+
+@st.cache_data
+def load_workbook_data(
+    _uploaded_file, digest: str
+) -> tuple[pd.DataFrame | None, pd.DataFrame | None, dict[str, float]]:
+    """Baca sheet Trx_PJPJKT dan Raw_JKTNasional dalam satu kali buka workbook.
+
+    ``digest`` adalah ``workbook_digest`` dari isi upload, dihitung sekali oleh
+    pemanggil: dipakai sebagai kunci ``st.cache_data`` (file upload sendiri
+    tidak di-hash ulang, lihat prefiks ``_``) dan kunci cache Parquet.
+
+    Workbook hanya di-unzip/di-parse sekali (openpyxl read-only untuk .xlsx),
+    lalu kedua sheet dibaca dari handle yang sama. Mengembalikan
+    ``(df, df_national, timings)`` dengan ``timings`` berisi durasi parse
+    (detik) per sheet plus ``'open'`` untuk membuka workbook.
+
+    Hasil parse disimpan ke cache Parquet di disk (kunci = hash isi file),
+    sehingga upload ulang file yang sama cukup membaca Parquet
+    (``timings == {'parquet_cache': ...}``). Sebelum parse penuh, header
+    di-pre-scan (``validate_workbook``) supaya file salah format langsung ditolak.
+    """
+    uploaded_file = _uploaded_file
+    timings: dict[str, float] = {}
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+
+    t0 = time.perf_counter()
+    cached = get_cached_workbook(digest)
+    if cached is not None:
+        timings['parquet_cache'] = time.perf_counter() - t0
+        return cached[0], cached[1], timings
+
+    prescan = validate_workbook(uploaded_file)
+    if prescan is None:
+        return None, None, timings
+    timings['prescan'] = prescan
+
+    t0 = time.perf_counter()
+    try:
+        xls = pd.ExcelFile(uploaded_file)
+    except Exception as e:
+        st.error(f"An error occurred while loading the data: {e}")
+        return None, None, timings
+    timings['open'] = time.perf_counter() - t0
+
+    frames: dict[str, pd.DataFrame | None] = {}
+    with xls:
+        for sheet_name in (TRX_SHEET_NAME, NATIONAL_SHEET_NAME):
+            if sheet_name not in xls.sheet_names:
+                st.error(f"Sheet '{sheet_name}' not found in the uploaded file. Please upload the file according to the format.")
+                frames[sheet_name] = None
+                continue
+            t0 = time.perf_counter()
+            try:
+                frames[sheet_name] = _parse_sheet(xls, sheet_name)
+            except Exception as e:
+                st.error(f"An error occurred while loading the data: {e}")
+                frames[sheet_name] = None
+            timings[sheet_name] = time.perf_counter() - t0
+
+    df, df_national = frames[TRX_SHEET_NAME], frames[NATIONAL_SHEET_NAME]
+    if df is not None and df_national is not None:
+        put_cached_workbook(digest, df, df_national)
+    return df, df_national, timings
+
+
 @st.cache_data
 def load_data(uploaded_file, is_trx_nasional: bool = False):
-    sheet_name = 'Trx_PJPJKT'
+    sheet_name = TRX_SHEET_NAME
     if is_trx_nasional:
-        sheet_name = 'Raw_JKTNasional'
+        sheet_name = NATIONAL_SHEET_NAME
+    if validate_workbook(uploaded_file, [sheet_name]) is None:
+        return None
     try:
         df = pd.read_excel(uploaded_file, sheet_name=sheet_name)
     except ValueError as e:
@@ -65,20 +183,7 @@ def load_data(uploaded_file, is_trx_nasional: bool = False):
     except Exception as e:
         st.error(f"An error occurred while loading the data: {e}")
         return None
-    # Make numeric columns stable across environments (local vs Streamlit Cloud)
-    df = _coerce_numeric_columns(
-        df,
-        [
-            # LTDBB (PJP)
-            'Fin Jumlah Inc', 'Fin Nilai Inc',
-            'Fin Jumlah Out', 'Fin Nilai Out',
-            'Fin Jumlah Dom', 'Fin Nilai Dom',
-            # Nasional
-            'Nom Nasional Out', 'Nom Nasional Inc', 'Nom Nasional Dom', 'Nom Nasional Total',
-            'Frek Nasional Out', 'Frek Nasional Inc', 'Frek Nasional Dom', 'Frek Nasional Total',
-        ],
-    )
-    return df
+    return _coerce_loaded_sheet(df, sheet_name)
 
 
 def format_to_rupiah(amount):
@@ -87,7 +192,7 @@ def format_to_rupiah(amount):
 
 def filter_data(df, selected_pjp=None, selected_year=None,
                 selected_quarter=None, selected_month=None,
-                group_by_pjp=False):
+                group_by_pjp=False, backend=None):
     if selected_year and selected_year != 'All':
         df = df[df['Year'] == selected_year]
     if selected_quarter and selected_quarter != 'All':
@@ -98,14 +203,12 @@ def filter_data(df, selected_pjp=None, selected_year=None,
         df = df[df['Nama PJP'] == selected_pjp]
 
     if group_by_pjp:
-        df = df.groupby('Nama PJP').agg({
-            'Sum of Fin Nilai Out': 'sum',
-            'Sum of Fin Nilai Inc': 'sum',
-            'Sum of Fin Nilai Dom': 'sum',
-            'Sum of Fin Jumlah Out': 'sum',
-            'Sum of Fin Jumlah Inc': 'sum',
-            'Sum of Fin Jumlah Dom': 'sum',
-        }).reset_index()
+        measures = ['Sum of Fin Nilai Out', 'Sum of Fin Nilai Inc', 'Sum of Fin Nilai Dom',
+                    'Sum of Fin Jumlah Out', 'Sum of Fin Jumlah Inc', 'Sum of Fin Jumlah Dom']
+        if get_backend(backend) == DUCKDB:
+            df = group_sum(df, ['Nama PJP'], measures, observed=False)
+        else:
+            df = df.groupby('Nama PJP').agg({m: 'sum' for m in measures}).reset_index()
 
         df['Sum of Total Nom'] = df[['Sum of Fin Nilai Inc', 'Sum of Fin Nilai Out', 'Sum of Fin Nilai Dom']].sum(
             axis=1)
@@ -117,13 +220,14 @@ def filter_data(df, selected_pjp=None, selected_year=None,
     return df
 
 
-def filter_start_end_year(df, start_year, end_year, is_month: bool = False):
+def filter_start_end_year(df, start_year, end_year, is_month: bool = False,
+                          zero_cols: list[str] | None = None):
     if is_month:
-        for col in df.columns:
-            if 'Sum of Fin' in col:
-                df = df[~((df[col] == 0) & (df['Year'] == df['Year'].max()))]
-    df_filtered = df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
-    return df_filtered
+        # Buang bulan kosong (measure 0) di tahun terakhir; default: semua kolom Sum of Fin
+        cols = zero_cols if zero_cols is not None else [c for c in df.columns if 'Sum of Fin' in c]
+        for col in cols:
+            df = df[~((df[col] == 0) & (df['Year'] == df['Year'].max()))]
+    return filter_year_range(df, start_year, end_year)
 
 
 def compute_average_ticket_size(df_jkt: pd.DataFrame, df_national: pd.DataFrame) -> dict:
@@ -133,8 +237,8 @@ def compute_average_ticket_size(df_jkt: pd.DataFrame, df_national: pd.DataFrame)
     - avg_dki = total_nominal_dki / total_freq_dki
     - avg_outside = (total_nominal_national - total_nominal_dki) / (total_freq_national - total_freq_dki)
 
-    The national sheet sometimes repeats the same national totals for every PJP row in a period.
-    We try to detect that and aggregate per-period totals safely.
+    ``df_national`` is the normalized national data (``service.national``) or a rollup of it,
+    so repeated per-PJP totals are already collapsed and nominal is converted to Rupiah.
     """
 
     def _safe_sum(df: pd.DataFrame, cols: list[str]) -> float:
@@ -155,45 +259,8 @@ def compute_average_ticket_size(df_jkt: pd.DataFrame, df_national: pd.DataFrame)
 
         return nom, frek
 
-    def _get_national_totals(df: pd.DataFrame) -> tuple[float, float]:
-        if "Nom Nasional Total" in df.columns and "Frek Nasional Total" in df.columns:
-            group_cols: list[str] = []
-            for col in ["Year", "Quarter", "Month"]:
-                if col in df.columns and df[col].notna().any():
-                    group_cols.append(col)
-
-            if group_cols:
-                tmp = df[group_cols + ["Nom Nasional Total", "Frek Nasional Total"]].copy()
-
-                # Heuristic: if within-period values are mostly identical, treat as repeated totals.
-                nunique_nom = tmp.groupby(group_cols, dropna=False)["Nom Nasional Total"].nunique()
-                nunique_frek = tmp.groupby(group_cols, dropna=False)["Frek Nasional Total"].nunique()
-                noisy_groups = ((nunique_nom > 1) | (nunique_frek > 1)).mean() if len(nunique_nom) else 0.0
-
-                if noisy_groups <= 0.05:
-                    # Repeated totals -> take max per period then sum periods
-                    per_period = tmp.groupby(group_cols, dropna=False).agg(
-                        {"Nom Nasional Total": "max", "Frek Nasional Total": "max"}
-                    )
-                    return float(per_period["Nom Nasional Total"].sum()), float(per_period["Frek Nasional Total"].sum())
-                else:
-                    # Values vary per row -> treat as per-row contributions
-                    return float(tmp["Nom Nasional Total"].sum()), float(tmp["Frek Nasional Total"].sum())
-
-            # No period columns -> safest is to de-duplicate identical pairs (avoid obvious overcount)
-            dedup = df[["Nom Nasional Total", "Frek Nasional Total"]].drop_duplicates()
-            return float(dedup["Nom Nasional Total"].sum()), float(dedup["Frek Nasional Total"].sum())
-
-        # Fallback: if only transaction-like columns exist, approximate via sums
-        nom = _safe_sum(df, ["Nom Nasional Inc", "Nom Nasional Out", "Nom Nasional Dom", "Nom Nasional Total"])
-        frek = _safe_sum(df, ["Frek Nasional Inc", "Frek Nasional Out", "Frek Nasional Dom", "Frek Nasional Total"])
-        if nom == 0.0 and frek == 0.0:
-            nom = _safe_sum(df, ["Fin Nilai Inc", "Fin Nilai Out", "Fin Nilai Dom"])
-            frek = _safe_sum(df, ["Fin Jumlah Inc", "Fin Jumlah Out", "Fin Jumlah Dom"])
-        return nom, frek
-
     jkt_nom, jkt_frek = _get_jkt_totals(df_jkt)
-    nat_nom, nat_frek = _get_national_totals(df_national)
+    nat_nom, nat_frek = national_totals(df_national)
 
     outside_nom = max(nat_nom - jkt_nom, 0.0)
     outside_frek = max(nat_frek - jkt_frek, 0.0)
@@ -216,40 +283,20 @@ def filter_by_quarter(df, start_year, start_quarter, end_year, end_quarter):
     Filter data berdasarkan Year-Quarter range yang kontinyu
     Contoh: 2024-Q1 sampai 2025-Q3 akan include semua quarter dalam range itu
     """
-    import calendar
-    
     quarter_order = {'Q1': 1, 'Q2': 2, 'Q3': 3, 'Q4': 4}
     start_q = quarter_order[start_quarter]
     end_q = quarter_order[end_quarter]
-    
-    df_copy = df.copy()
-    
-    # Hitung quarter dari month jika ada
-    if 'Month' in df_copy.columns:
-        # Convert Month ke month number dan pastikan integer
-        df_copy['MonthNum'] = df_copy['Month'].apply(
-            lambda m: list(calendar.month_name).index(str(m)) if str(m) in calendar.month_name else int(m)
-        ).astype(int)
-        df_copy['Quarter'] = ((df_copy['MonthNum'] - 1) // 3 + 1).astype(int)
-    elif 'Quarter' not in df_copy.columns:
+
+    if 'Month' not in df.columns and 'Quarter' not in df.columns:
         # Jika tidak ada Quarter dan Month, return as-is
         return df
-    
-    # Filter: kombinasi Year dan Quarter dengan range kontinu
-    # Start: Year == start_year dan Quarter >= start_q, atau Year > start_year
-    # End: Year == end_year dan Quarter <= end_q, atau Year < end_year
-    
-    start_condition = (df_copy['Year'] > start_year) | ((df_copy['Year'] == start_year) & (df_copy['Quarter'] >= start_q))
-    end_condition = (df_copy['Year'] < end_year) | ((df_copy['Year'] == end_year) & (df_copy['Quarter'] <= end_q))
-    
-    df_filtered = df_copy[start_condition & end_condition]
-    
-    # Hapus kolom helper
-    if 'MonthNum' in df_filtered.columns:
-        df_filtered = df_filtered.drop(['MonthNum'], axis=1, errors='ignore')
-    if 'Quarter' in df_filtered.columns and 'Quarter' not in df.columns:
-        df_filtered = df_filtered.drop(['Quarter'], axis=1, errors='ignore')
-    
+
+    # Key yyyyq (Quarter diturunkan dari Month kalau ada), lalu range scan
+    keys = frame_period_key(df, QUARTER)
+    pos = range_positions(keys, period_key(start_year, start_q, QUARTER), period_key(end_year, end_q, QUARTER))
+    df_filtered = df.take(pos)
+    if 'Month' in df.columns and 'Quarter' in df.columns:
+        df_filtered['Quarter'] = (keys[pos] % 10).astype(int)
     return df_filtered
 
 
@@ -263,6 +310,10 @@ def ensure_session_state_defaults() -> None:
     st.session_state.setdefault('df', None)
     st.session_state.setdefault('df_national', None)
     st.session_state.setdefault('file_name', None)
+    st.session_state.setdefault('file_digest', None)
+    st.session_state.setdefault('load_timings', {})
+    st.session_state.setdefault('file_store_mode', None)
+    st.session_state.setdefault('store_report', None)
 
 
 def set_page_settings():
@@ -497,230 +548,84 @@ def set_page_visuals(condition):
     with st.sidebar:
         st.image(".static/Logo.png", use_container_width=True)
 
-def aggregate_data(df, is_trx=False):
-    # Ensure aggregation inputs are numeric; Excel uploads sometimes load as strings
-    df = _coerce_numeric_columns(
-        df,
-        [
-            'Fin Jumlah Inc', 'Fin Nilai Inc',
-            'Fin Jumlah Out', 'Fin Nilai Out',
-            'Fin Jumlah Dom', 'Fin Nilai Dom',
-        ],
-    )
-    for col in ['Fin Jumlah Inc', 'Fin Nilai Inc', 'Fin Jumlah Out', 'Fin Nilai Out', 'Fin Jumlah Dom', 'Fin Nilai Dom']:
-        if col in df.columns:
-            df[col] = df[col].fillna(0)
-
+def _aggregate_group_cols(is_trx: bool) -> list[str]:
     if is_trx:
-        group_cols = ['Nama PJP', 'Year', 'Quarter', 'Month']
+        return ['Nama PJP', 'Year', 'Quarter', 'Month']
+    return ['Nama PJP', 'Year', 'Quarter']
+
+
+def aggregate_data(df, is_trx=False, backend=None):
+    # Satu pass factorize + bincount (service.aggregate); teks angka dari Excel
+    # tetap dikonversi dan nilai kosong dihitung 0 seperti sebelumnya
+    if get_backend(backend) == DUCKDB:
+        return aggregate_fin_sql(df, _aggregate_group_cols(is_trx))
+    return aggregate_fin(df, _aggregate_group_cols(is_trx))[0]
+
+
+def _share_cols(is_trx: bool) -> list[str]:
+    return ['Year', 'Quarter', 'Month'] if is_trx else ['Year', 'Quarter']
+
+
+def preprocess_data(df_non_agg, is_trx=False, backend=None):
+    share_cols = _share_cols(is_trx)
+    if get_backend(backend) == DUCKDB:
+        df = aggregate_fin_sql(df_non_agg, _aggregate_group_cols(is_trx))
+        total_sum_of_nom = df.groupby(share_cols)['Sum of Total Nom'].transform('sum').to_numpy()
     else:
-        group_cols = ['Nama PJP', 'Year', 'Quarter']
-    df = df.drop(columns=['Nama PJP Conv Final'], errors='ignore')
-    df = df.groupby(group_cols).agg({'Fin Jumlah Inc': 'sum', 'Fin Nilai Inc': 'sum',
-                                     'Fin Jumlah Out': 'sum', 'Fin Nilai Out': 'sum',
-                                     'Fin Jumlah Dom': 'sum', 'Fin Nilai Dom': 'sum', })
-    df = df.rename(columns=lambda x: 'Sum of ' + x)
-    df = df.reset_index()
-
-    df = _coerce_numeric_columns(
-        df,
-        ['Sum of Fin Nilai Inc', 'Sum of Fin Nilai Out', 'Sum of Fin Nilai Dom'],
-    )
-    df['Sum of Total Nom'] = (
-        df['Sum of Fin Nilai Inc'].fillna(0)
-        + df['Sum of Fin Nilai Out'].fillna(0)
-        + df['Sum of Fin Nilai Dom'].fillna(0)
-    )
-    return df
+        df, grouped = aggregate_fin(df_non_agg, _aggregate_group_cols(is_trx))
+        # Penyebut market share dari total per group yang sama (tanpa groupby kedua)
+        total_sum_of_nom = grouped.denominator(share_cols, 'Sum of Total Nom')
+    return _finish_preprocess(df, is_trx, total_sum_of_nom)
+
+
+def preprocess_aggregated(df, is_trx=False):
+    """Padanan ``preprocess_data`` untuk frame hasil ``aggregate_data`` (mis. gabungan agregat per partisi).
+
+    ``df`` harus urut per key group seperti output ``aggregate_data``; penyebut
+    market share dijumlah dengan urutan yang sama sehingga hasilnya identik.
+    """
+    grouped = group_sums(df, _aggregate_group_cols(is_trx), ['Sum of Total Nom'])
+    total_sum_of_nom = grouped.denominator(_share_cols(is_trx), 'Sum of Total Nom')
+    return _finish_preprocess(df.copy(), is_trx, total_sum_of_nom)
 
 
-def preprocess_data(df_non_agg, is_trx=False):
+def _finish_preprocess(df, is_trx, total_sum_of_nom):
     if is_trx:
-        df = aggregate_data(df_non_agg, is_trx=is_trx)
         # Month can be int (1-12) or already a month name
         if 'Month' in df.columns:
             month_num = pd.to_numeric(df['Month'], errors='coerce')
-            if month_num.notna().any():
-                df.loc[month_num.notna(), 'Month'] = month_num[month_num.notna()].astype(int).apply(
-                    lambda x: calendar.month_name[x]
-                )
+            is_num = month_num.notna()
+            if is_num.any():
+                month = df['Month'].astype(object)
+                month[is_num] = np.array(calendar.month_name, dtype=object)[month_num[is_num].astype(int)]
+                df['Month'] = month
 
         months = ["January", "February", "March", "April", "May", "June",
                   "July", "August", "September", "October", "November", "December"]
         df['Month'] = pd.Categorical(df['Month'], categories=months, ordered=True)
 
-        group_cols = ['Year', 'Quarter', 'Month']
-    else:
-        df = aggregate_data(df_non_agg)
-        group_cols = ['Year', 'Quarter']
-
-    total_sum_of_nom = df.groupby(group_cols, observed=False)['Sum of Total Nom'].transform('sum')
-
     df = calculate_market_share(df, total_sum_of_nom)
 
     return df
 
 
-def preprocess_data_growth(df, is_month: bool):
-    df['%YoY'] = pd.NA
-    df['%QtQ'] = pd.NA
-    df['%MtM'] = pd.NA
-
-    first_year = df['Year'].min()
-    df.loc[df['Year'] == first_year, ['%YoY', '%QtQ', '%MtM']] = pd.NA
-
-    # TODO: Logic calculations for %YoY, %QtQ, and %MtM
-    if is_month:
-        df_jumlah_inc_month = df[['Year', 'Month', 'Sum of Fin Jumlah Inc', '%MtM']].copy()
-        df_jumlah_inc_month = calculate_month_to_month(df_jumlah_inc_month, first_year, 'Jumlah', 'Inc')
-
-        df_jumlah_out_month = df[['Year', 'Month', 'Sum of Fin Jumlah Out', '%MtM']].copy()
-        df_jumlah_out_month = calculate_month_to_month(df_jumlah_out_month, first_year, 'Jumlah', 'Out')
-
-        df_jumlah_dom_month = df[['Year', 'Month', 'Sum of Fin Jumlah Dom', '%MtM']].copy()
-        df_jumlah_dom_month = calculate_month_to_month(df_jumlah_dom_month, first_year, 'Jumlah', 'Dom')
-
-        df_nom_inc_month = df[['Year', 'Month', 'Sum of Fin Nilai Inc', '%MtM']].copy()
-        df_nom_inc_month = calculate_month_to_month(df_nom_inc_month, first_year, 'Nilai', 'Inc')
-
-        df_nom_out_month = df[['Year', 'Month', 'Sum of Fin Nilai Out', '%MtM']].copy()
-        df_nom_out_month = calculate_month_to_month(df_nom_out_month, first_year, 'Nilai', 'Out')
-
-        df_nom_dom_month = df[['Year', 'Month', 'Sum of Fin Nilai Dom', '%MtM']].copy()
-        df_nom_dom_month = calculate_month_to_month(df_nom_dom_month, first_year, 'Nilai', 'Dom')
-
-        return (df_jumlah_inc_month, df_jumlah_out_month, df_jumlah_dom_month,
-                df_nom_inc_month, df_nom_out_month, df_nom_dom_month)
-    else:
-        df_jumlah_inc = df[['Year', 'Quarter', 'Sum of Fin Jumlah Inc', '%YoY', '%QtQ']].copy()
-        df_jumlah_inc = calculate_growth(df_jumlah_inc, first_year, 'Jumlah', 'Inc')
-
-        df_jumlah_out = df[['Year', 'Quarter', 'Sum of Fin Jumlah Out', '%YoY', '%QtQ']].copy()
-        df_jumlah_out = calculate_growth(df_jumlah_out, first_year, 'Jumlah', 'Out')
-
-        df_jumlah_dom = df[['Year', 'Quarter', 'Sum of Fin Jumlah Dom', '%YoY', '%QtQ']].copy()
-        df_jumlah_dom = calculate_growth(df_jumlah_dom, first_year, 'Jumlah', 'Dom')
-
-        df_nom_inc = df[['Year', 'Quarter', 'Sum of Fin Nilai Inc', '%YoY', '%QtQ']].copy()
-        df_nom_inc = calculate_growth(df_nom_inc, first_year, 'Nilai', 'Inc')
-
-        df_nom_out = df[['Year', 'Quarter', 'Sum of Fin Nilai Out', '%YoY', '%QtQ']].copy()
-        df_nom_out = calculate_growth(df_nom_out, first_year, 'Nilai', 'Out')
-
-        df_nom_dom = df[['Year', 'Quarter', 'Sum of Fin Nilai Dom', '%YoY', '%QtQ']].copy()
-        df_nom_dom = calculate_growth(df_nom_dom, first_year, 'Nilai', 'Dom')
-
-        return df_jumlah_inc, df_jumlah_out, df_jumlah_dom, df_nom_inc, df_nom_out, df_nom_dom
-
-
 def preprocess_data_national(df: pd.DataFrame, is_year: bool = False, is_quarter: bool = False) -> pd.DataFrame:
-    df_copy = df.copy()
-
-    if 'Nom Nasional Total.1' in df_copy.columns:
-        df_copy.drop('Nom Nasional Total.1', axis=1, inplace=True)
-
-    aggregation_dict = {
-        'Nom Nasional Out': 'sum',
-        'Nom Nasional Inc': 'sum',
-        'Nom Nasional Dom': 'sum',
-        'Nom Nasional Total': 'sum',
-        'Frek Nasional Out': 'sum',
-        'Frek Nasional Inc': 'sum',
-        'Frek Nasional Dom': 'sum',
-        'Frek Nasional Total': 'sum',
-    }
-
+    national = normalize_national(df)
     if is_year:
-        if is_quarter:
-            grouped_df = df_copy.groupby(['Year', 'Quarter']).agg(aggregation_dict).reset_index()
-        else:
-            grouped_df = df_copy.groupby('Year').agg(aggregation_dict).reset_index()
-    else:
-        grouped_df = df_copy.groupby(['Year', 'Month']).agg(aggregation_dict).reset_index()
-
-    return grouped_df
-
-def process_combined_df(df_inc: pd.DataFrame, df_out: pd.DataFrame, df_dom: pd.DataFrame,
-                        is_month: bool = False) -> pd.DataFrame:
-    if is_month:
-        group_cols = ['Year', 'Month']
-    else:
-        group_cols = ['Year', 'Quarter']
-    df_total = pd.concat([df_inc, df_out, df_dom])
-
-    df_total = df_total.groupby(group_cols, observed=False).sum().reset_index()
-
-    trx_type = "Jumlah"
-
-    for col in df_total.columns:
-        if "Nilai" in col or "Nom" in col:
-            trx_type = "Nilai"
-            break
-
-    df_total[f'Sum of Fin {trx_type} Total'] = df_total[f'Sum of Fin {trx_type} Inc'] + df_total[
-        f'Sum of Fin {trx_type} Out'] + \
-                                               df_total[f'Sum of Fin {trx_type} Dom']
+        return national.rollup('Year', 'Quarter') if is_quarter else national.rollup('Year')
+    return national.rollup('Year', 'Month')
 
-    return df_total
 
-
-def process_growth_combined(df_jumlah_total: pd.DataFrame, df_nom_total: pd.DataFrame, first_year: int,
-                            is_month: bool = False) -> pd.DataFrame:
-    if is_month:
-        group_cols = ['Year', 'Month']
-        drop_cols_jumlah = ['%MtM', 'Sum of Fin Jumlah Inc',
-                            'Sum of Fin Jumlah Out', 'Sum of Fin Jumlah Dom']
-        drop_cols_nom = ['%MtM', 'Sum of Fin Nilai Inc',
-                         'Sum of Fin Nilai Out', 'Sum of Fin Nilai Dom']
-    else:
-        group_cols = ['Year', 'Quarter']
-        drop_cols_jumlah = ['%YoY', '%QtQ', 'Sum of Fin Jumlah Inc',
-                            'Sum of Fin Jumlah Out', 'Sum of Fin Jumlah Dom']
-        drop_cols_nom = ['%YoY', '%QtQ', 'Sum of Fin Nilai Inc',
-                         'Sum of Fin Nilai Out', 'Sum of Fin Nilai Dom']
-    df_jumlah_total.drop(drop_cols_jumlah, axis=1, inplace=True)
-    df_nom_total.drop(drop_cols_nom, axis=1, inplace=True)
-
-    df_total = pd.merge(df_jumlah_total, df_nom_total, on=group_cols)
-
-    if not is_month:
-        df_total_jumlah = calculate_growth(df_total, first_year, "Jumlah", "Total")
-        df_total_nilai = calculate_growth(df_total, first_year, "Nilai", "Total")
-        df_total_combined = (
-            pd.merge(df_total_jumlah, df_total_nilai, on=group_cols)
-            .drop(['Sum of Fin Jumlah Total_y', 'Sum of Fin Nilai Total_y'], axis=1)
-            .rename(columns={'Sum of Fin Jumlah Total_x': 'Sum of Fin Jumlah Total',
-                             'Sum of Fin Nilai Total_x': 'Sum of Fin Nilai Total',
-                             '%YoY_x': '%YoY Jumlah', '%YoY_y': '%YoY Nilai',
-                             '%QtQ_x': '%QtQ Jumlah', '%QtQ_y': '%QtQ Nilai', })
-        )
-    else:
-        df_total_jumlah = calculate_month_to_month(df_total, first_year, "Jumlah", "Total")
-        df_total_nilai = calculate_month_to_month(df_total, first_year, "Nilai", "Total")
-        df_total_combined = (
-            pd.merge(df_total_jumlah, df_total_nilai, on=group_cols)
-            .drop(['Sum of Fin Jumlah Total_y', 'Sum of Fin Nilai Total_y'], axis=1)
-            .rename(columns={'Sum of Fin Jumlah Total_x': 'Sum of Fin Jumlah Total',
-                             'Sum of Fin Nilai Total_x': 'Sum of Fin Nilai Total',
-                             '%MtM_x': '%MtM Jumlah', '%MtM_y': '%MtM Nilai'})
-        )
-    return df_total_combined
-
-
-def sum_data_time(df, is_month):
+def sum_data_time(df, is_month, backend=None):
     if is_month:
         group_cols = ['Year', 'Month']
     else:
         group_cols = ['Year', 'Quarter']
-    df_sum = df.groupby(group_cols, observed=False).agg({
-        'Sum of Fin Jumlah Inc': 'sum',
-        'Sum of Fin Nilai Inc': 'sum',
-        'Sum of Fin Jumlah Out': 'sum',
-        'Sum of Fin Nilai Out': 'sum',
-        'Sum of Fin Jumlah Dom': 'sum',
-        'Sum of Fin Nilai Dom': 'sum',
-        'Sum of Total Nom': 'sum',
-    }).reset_index()
+    measures = ['Sum of Fin Jumlah Inc', 'Sum of Fin Nilai Inc', 'Sum of Fin Jumlah Out',
+                'Sum of Fin Nilai Out', 'Sum of Fin Jumlah Dom', 'Sum of Fin Nilai Dom', 'Sum of Total Nom']
+    if get_backend(backend) == DUCKDB:
+        return group_sum(df, group_cols, measures, observed=False)
+    df_sum = df.groupby(group_cols, observed=False).agg({m: 'sum' for m in measures}).reset_index()
     return df_sum
 
 
@@ -729,75 +634,6 @@ def calculate_market_share(df, total_sum_of_nom):
     return df
 
 
-def calculate_growth(df: pd.DataFrame, first_year: int, sum_trx_type: str, trx_type: str):
-    df_copy = df.copy()
-    df_copy = calculate_year_on_year(df_copy, first_year, sum_trx_type, trx_type)
-    df_copy = calculate_quarter_to_quarter(df_copy, first_year, sum_trx_type, trx_type)
-    return df_copy
-
-
-def calculate_year_on_year(df: pd.DataFrame, first_year: int, sum_trx_type: str, trx_type: str):
-    for i in range(len(df)):
-        if df.iloc[i]['Year'] > first_year:
-            current_value = df.iloc[i][f'Sum of Fin {sum_trx_type} {trx_type}']
-            previous_year_value = df[(df['Year'] == df.iloc[i]['Year'] - 1) &
-                                     (df['Quarter'] == df.iloc[i]['Quarter'])][
-                f'Sum of Fin {sum_trx_type} {trx_type}']
-
-            if not previous_year_value.empty:
-                previous_year_value = previous_year_value.values[0]
-                growth_val = (((current_value - previous_year_value) / previous_year_value) * 100).round(2)
-                df.at[i, '%YoY'] = growth_val
-    return df
-
-
-def calculate_quarter_to_quarter(df: pd.DataFrame, first_year: int, sum_trx_type: str, trx_type: str):
-    for i in range(len(df)):
-        if df.iloc[i]['Year'] > first_year:
-            current_value = df.iloc[i][f'Sum of Fin {sum_trx_type} {trx_type}']
-            previous_year_value = df.iloc[i - 1][f'Sum of Fin {sum_trx_type} {trx_type}']
-            if not previous_year_value is None:
-                growth_val = (((current_value - previous_year_value) / previous_year_value) * 100).round(2)
-                df.at[i, '%QtQ'] = growth_val
-    return df
-
-
-def calculate_month_to_month(df_original: pd.DataFrame, first_year: int, sum_trx_type: str, trx_type: str):
-    df = df_original.copy()
-    df['Month'] = df['Month'].apply(lambda x: list(calendar.month_name).index(x))
-
-    for i in range(len(df)):
-        if df.iloc[i]['Year'] > first_year or (df.iloc[i]['Year'] == first_year and df.iloc[i]['Month'] > 1):
-            current_value = df.iloc[i][f'Sum of Fin {sum_trx_type} {trx_type}']
-            previous_month_value = df[(df['Year'] == df.iloc[i]['Year']) & (df['Month'] == df.iloc[i]['Month'] - 1)]
-
-            if previous_month_value.empty:
-                previous_month_value = df[(df['Year'] == df.iloc[i]['Year'] - 1) & (df['Month'] == 12)]
-
-            if not previous_month_value.empty:
-                previous_month_value = previous_month_value[f'Sum of Fin {sum_trx_type} {trx_type}'].values[0]
-
-                if previous_month_value == 0 or np.isnan(previous_month_value):
-                    growth_val = np.nan
-                else:
-                    growth_val = (((current_value - previous_month_value) / previous_month_value) * 100).round(2)
-
-                df.at[i, '%MtM'] = growth_val
-
-    df['Month'] = df['Month'].apply(lambda x: calendar.month_name[x])
-    return df
-
-
-def merge_df_growth(left_df, right_df, is_month: bool = False):
-    if not is_month:
-        df_combined = pd.merge(left_df, right_df, "inner", on=['Year', 'Quarter'])
-        df_combined.rename(columns={"%YoY_x": "%YoY Jumlah", "%QtQ_x": "%QtQ Jumlah",
-                                    "%YoY_y": "%YoY Nom", "%QtQ_y": "%QtQ Nom"}, inplace=True)
-    else:
-        df_combined = pd.merge(left_df, right_df, "inner", on=['Year', 'Month'])
-        df_combined.rename(columns={"%MtM_x": "%MtM Jumlah", "%MtM_y": "%MtM Nom"}, inplace=True)
-    return df_combined
-
 def compile_data_profile(df: pd.DataFrame, df_national: pd.DataFrame, sum_trx_type: str, trx_type: str) -> pd.DataFrame:
     if len(df_national) <= 0:
         return pd.DataFrame()
@@ -1091,103 +927,124 @@ def get_pjp_growth_data(df: pd.DataFrame, pjp_name: str, is_month: bool = False)
     for col in numeric_cols:
         df_agg[col] = pd.to_numeric(df_agg[col], errors='coerce')
     
-    # Calculate growth rates untuk Total
-    if not is_month:
-        # YoY & QtQ untuk quarterly
-        df_agg['%YoY'] = np.nan
-        df_agg['%QtQ'] = np.nan
-        
-        # YoY calculation untuk total
-        for i in range(len(df_agg)):
-            if df_agg.iloc[i]['Year'] > first_year:
-                current_val = df_agg.iloc[i]['Sum of Fin Nilai Total']
-                prev_year_data = df_agg[
-                    (df_agg['Year'] == df_agg.iloc[i]['Year'] - 1) & 
-                    (df_agg['Quarter'] == df_agg.iloc[i]['Quarter'])
-                ]
-                if not prev_year_data.empty:
-                    prev_val = prev_year_data.iloc[0]['Sum of Fin Nilai Total']
-                    if prev_val != 0:
-                        df_agg.at[i, '%YoY'] = round(((current_val - prev_val) / prev_val) * 100, 2)
-        
-        # QtQ calculation untuk total
-        for i in range(len(df_agg)):
-            if i > 0:
-                current_val = df_agg.iloc[i]['Sum of Fin Nilai Total']
-                prev_val = df_agg.iloc[i - 1]['Sum of Fin Nilai Total']
-                if prev_val != 0:
-                    df_agg.at[i, '%QtQ'] = round(((current_val - prev_val) / prev_val) * 100, 2)
-    
-    # Prepare breakdown untuk setiap tipe transaksi dengan growth
-    def add_growth_to_breakdown(df_breakdown, col_base, group_cols, first_year):
-        """Helper function untuk tambah YoY & QtQ ke breakdown"""
-        df_breakdown['%YoY'] = np.nan
-        df_breakdown['%QtQ'] = np.nan
-        
-        # YoY calculation
-        for i in range(len(df_breakdown)):
-            if df_breakdown.iloc[i]['Year'] > first_year:
-                current_val = df_breakdown.iloc[i][col_base]
-                prev_year_data = df_breakdown[
-                    (df_breakdown['Year'] == df_breakdown.iloc[i]['Year'] - 1) & 
-                    (df_breakdown['Quarter'] == df_breakdown.iloc[i]['Quarter'])
-                ]
-                if not prev_year_data.empty:
-                    prev_val = prev_year_data.iloc[0][col_base]
-                    if pd.notna(prev_val) and prev_val != 0:
-                        df_breakdown.at[i, '%YoY'] = round(((current_val - prev_val) / prev_val) * 100, 2)
-        
-        # QtQ calculation
-        for i in range(len(df_breakdown)):
-            if i > 0:
-                current_val = df_breakdown.iloc[i][col_base]
-                prev_val = df_breakdown.iloc[i - 1][col_base]
-                if pd.notna(prev_val) and prev_val != 0:
-                    df_breakdown.at[i, '%QtQ'] = round(((current_val - prev_val) / prev_val) * 100, 2)
-        
-        return df_breakdown
-    
-    # Incoming breakdown dengan growth
-    df_inc = df_agg[group_cols + ['Sum of Fin Jumlah Inc', 'Sum of Fin Nilai Inc']].copy()
-    df_inc = df_inc.rename(columns={
-        'Sum of Fin Jumlah Inc': 'Frekuensi',
-        'Sum of Fin Nilai Inc': 'Nominal',
-    })
-    # Ensure numeric
-    df_inc['Frekuensi'] = pd.to_numeric(df_inc['Frekuensi'], errors='coerce')
-    df_inc['Nominal'] = pd.to_numeric(df_inc['Nominal'], errors='coerce')
-    df_inc = add_growth_to_breakdown(df_inc, 'Nominal', group_cols, first_year)
-    
-    # Outgoing breakdown dengan growth
-    df_out = df_agg[group_cols + ['Sum of Fin Jumlah Out', 'Sum of Fin Nilai Out']].copy()
-    df_out = df_out.rename(columns={
-        'Sum of Fin Jumlah Out': 'Frekuensi',
-        'Sum of Fin Nilai Out': 'Nominal',
-    })
-    # Ensure numeric
-    df_out['Frekuensi'] = pd.to_numeric(df_out['Frekuensi'], errors='coerce')
-    df_out['Nominal'] = pd.to_numeric(df_out['Nominal'], errors='coerce')
-    df_out = add_growth_to_breakdown(df_out, 'Nominal', group_cols, first_year)
-    
-    # Domestik breakdown dengan growth
-    df_dom = df_agg[group_cols + ['Sum of Fin Jumlah Dom', 'Sum of Fin Nilai Dom']].copy()
-    df_dom = df_dom.rename(columns={
-        'Sum of Fin Jumlah Dom': 'Frekuensi',
-        'Sum of Fin Nilai Dom': 'Nominal',
-    })
-    # Ensure numeric
-    df_dom['Frekuensi'] = pd.to_numeric(df_dom['Frekuensi'], errors='coerce')
-    df_dom['Nominal'] = pd.to_numeric(df_dom['Nominal'], errors='coerce')
-    df_dom = add_growth_to_breakdown(df_dom, 'Nominal', group_cols, first_year)
-    
-    # Prepare result dictionary dengan breakdown per tipe
-    result = {
-        'total': df_agg,
-        'incoming': df_inc,
-        'outgoing': df_out,
-        'domestik': df_dom,
+    # Growth total + ketiga breakdown dihitung sekali (service.growth); pembanding
+    # 0/kosong -> NaN. QtQ/MtM mulai baris kedua, YoY mulai tahun kedua.
+    kinds = ('yoy', 'mtm') if is_month else ('yoy', 'qtq')
+    breakdowns = {
+        'incoming': ('Sum of Fin Jumlah Inc', 'Sum of Fin Nilai Inc'),
+        'outgoing': ('Sum of Fin Jumlah Out', 'Sum of Fin Nilai Out'),
+        'domestik': ('Sum of Fin Jumlah Dom', 'Sum of Fin Nilai Dom'),
     }
-    
+    nilai_cols = ['Sum of Fin Nilai Total'] + [nilai for _, nilai in breakdowns.values()]
+    growth = compute_growth(df_agg, nilai_cols, kinds, first_year, guard_zero=True, from_first_row=True)
+
+    for kind in kinds:
+        df_agg[GROWTH_COLUMNS[kind]] = np.nan
+        growth[kind].assign(df_agg, 'Sum of Fin Nilai Total')
+
+    result = {'total': df_agg}
+    for name, (jumlah_col, nilai_col) in breakdowns.items():
+        df_breakdown = df_agg[group_cols + [jumlah_col, nilai_col]].rename(columns={
+            jumlah_col: 'Frekuensi',
+            nilai_col: 'Nominal',
+        })
+        for kind in kinds:
+            df_breakdown[GROWTH_COLUMNS[kind]] = np.nan
+            growth[kind].assign(df_breakdown, nilai_col)
+        result[name] = df_breakdown
+
+    return result
+
+
+PJP_GROWTH_BREAKDOWNS: dict[str, tuple[str, str]] = {
+    'total': ('Sum of Fin Jumlah Total', 'Sum of Fin Nilai Total'),
+    'incoming': ('Sum of Fin Jumlah Inc', 'Sum of Fin Nilai Inc'),
+    'outgoing': ('Sum of Fin Jumlah Out', 'Sum of Fin Nilai Out'),
+    'domestik': ('Sum of Fin Jumlah Dom', 'Sum of Fin Nilai Dom'),
+}
+
+
+def get_all_pjp_growth_data(df: pd.DataFrame, is_month: bool = False) -> pd.DataFrame:
+    """
+    Batch ``get_pjp_growth_data`` untuk semua PJP: satu groupby + growth vektor.
+
+    Return frame long ber-index ``Nama PJP`` dengan kolom ``Breakdown``
+    ('total', 'incoming', 'outgoing', 'domestik'), periode, ``Frekuensi``,
+    ``Nominal`` dan kolom growth. ``pjp_growth_slice`` memotongnya kembali
+    menjadi dict per PJP seperti ``get_pjp_growth_data``.
+    """
+    group_cols = ['Year', 'Month'] if is_month else ['Year', 'Quarter']
+    flow_cols = [jumlah for name, (jumlah, _) in PJP_GROWTH_BREAKDOWNS.items() if name != 'total']
+    flow_cols += [nilai for name, (_, nilai) in PJP_GROWTH_BREAKDOWNS.items() if name != 'total']
+    kinds = ('yoy', 'mtm') if is_month else ('yoy', 'qtq')
+
+    df = df[df['Nama PJP'].notna()]
+    df_agg = df.groupby(['Nama PJP'] + group_cols, observed=True)[flow_cols].sum()
+    if is_month and isinstance(df['Month'].dtype, pd.CategoricalDtype):
+        # observed=False per PJP: semua bulan untuk tiap tahun yang dimiliki PJP tersebut
+        months = df['Month'].cat.categories
+        pairs = df_agg.index.droplevel('Month').unique()
+        full = pd.MultiIndex.from_arrays([
+            np.repeat(pairs.get_level_values('Nama PJP'), len(months)),
+            np.repeat(pairs.get_level_values('Year'), len(months)),
+            pd.Categorical(np.tile(months, len(pairs)), categories=months, ordered=df['Month'].cat.ordered),
+        ], names=['Nama PJP'] + group_cols)
+        df_agg = df_agg.reindex(full, fill_value=0)
+    df_agg = df_agg.reset_index()
+    if df_agg.empty:
+        return pd.DataFrame(columns=['Breakdown'] + group_cols + ['Frekuensi', 'Nominal']
+                            + [GROWTH_COLUMNS[k] for k in kinds]).rename_axis('Nama PJP')
+
+    df_agg['Sum of Fin Jumlah Total'] = (
+        df_agg['Sum of Fin Jumlah Inc'] + df_agg['Sum of Fin Jumlah Out'] + df_agg['Sum of Fin Jumlah Dom']
+    )
+    df_agg['Sum of Fin Nilai Total'] = (
+        df_agg['Sum of Fin Nilai Inc'] + df_agg['Sum of Fin Nilai Out'] + df_agg['Sum of Fin Nilai Dom']
+    )
+
+    # Satu pass growth untuk semua PJP: pembanding hanya dari PJP yang sama
+    codes = pd.factorize(df_agg['Nama PJP'], sort=True)[0]
+    first_year = df_agg.groupby('Nama PJP', sort=False)['Year'].transform('min').to_numpy()
+    nilai_cols = [nilai for _, nilai in PJP_GROWTH_BREAKDOWNS.values()]
+    growth = compute_growth(df_agg, nilai_cols, kinds, first_year, guard_zero=True,
+                            from_first_row=True, group=codes)
+
+    parts = []
+    for name, (jumlah_col, nilai_col) in PJP_GROWTH_BREAKDOWNS.items():
+        part = df_agg[['Nama PJP'] + group_cols + [jumlah_col, nilai_col]].rename(columns={
+            jumlah_col: 'Frekuensi',
+            nilai_col: 'Nominal',
+        })
+        part.insert(1, 'Breakdown', name)
+        for kind in kinds:
+            part[GROWTH_COLUMNS[kind]] = np.nan
+            growth[kind].assign(part, nilai_col)
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True).set_index('Nama PJP')
+
+
+def pjp_growth_slice(batch: pd.DataFrame, pjp_name: str) -> dict:
+    """Dict ``get_pjp_growth_data`` untuk satu PJP dari hasil ``get_all_pjp_growth_data``."""
+    if pjp_name not in batch.index:
+        return {}
+    rows = batch.loc[[pjp_name]].reset_index(drop=True)
+    growth_cols = [c for c in GROWTH_COLUMNS.values() if c in rows.columns]
+    group_cols = [c for c in ('Year', 'Quarter', 'Month') if c in rows.columns]
+
+    result = {}
+    for name in PJP_GROWTH_BREAKDOWNS:
+        result[name] = rows[rows['Breakdown'] == name].drop(columns='Breakdown').reset_index(drop=True)
+
+    # Frame total lama: keenam measure per flow + total + growth total
+    total = result['total'][group_cols].copy()
+    for i, sum_type in enumerate(('Frekuensi', 'Nominal')):
+        for name in ('incoming', 'outgoing', 'domestik'):
+            total[PJP_GROWTH_BREAKDOWNS[name][i]] = result[name][sum_type].to_numpy()
+    total['Sum of Fin Jumlah Total'] = result['total']['Frekuensi'].to_numpy()
+    total['Sum of Fin Nilai Total'] = result['total']['Nominal'].to_numpy()
+    for col in growth_cols:
+        total[col] = result['total'][col].to_numpy()
+    result['total'] = total
     return result
 
 
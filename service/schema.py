@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+
+# Skema ringkas untuk sheet Trx_PJPJKT dan Raw_JKTNasional. Diterapkan sekali
+# saat ingest (load_workbook_data/load_data) supaya halaman lain tidak perlu
+# pd.to_numeric ulang di setiap rerun.
+
+@dataclass(frozen=True)
+class ColumnSpec:
+    name: str
+    kind: str  # 'category' | 'period' | 'count' | 'amount'
+    dtype: str | None = None  # dtype numpy untuk kolom period (int8/int16)
+
+
+@dataclass
+class SchemaReport:
+    bytes_before: int
+    bytes_after: int
+    casts: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def saved_ratio(self) -> float:
+        if self.bytes_before <= 0:
+            return 0.0
+        return 1.0 - self.bytes_after / self.bytes_before
+
+    def as_dict(self) -> dict:
+        return {
+            "bytes_before": self.bytes_before,
+            "bytes_after": self.bytes_after,
+            "casts": dict(self.casts),
+        }
+
+
+PERIOD_COLUMNS: list[ColumnSpec] = [
+    ColumnSpec("Year", "period", "int16"),
+    ColumnSpec("Quarter", "period", "int8"),
+    ColumnSpec("Month", "period", "int8"),
+]
+
+TRX_SCHEMA: list[ColumnSpec] = [
+    ColumnSpec("Nama PJP", "category"),
+    ColumnSpec("Nama PJP Conv Final", "category"),
+    *PERIOD_COLUMNS,
+    ColumnSpec("Fin Jumlah Inc", "count"),
+    ColumnSpec("Fin Jumlah Out", "count"),
+    ColumnSpec("Fin Jumlah Dom", "count"),
+    ColumnSpec("Fin Nilai Inc", "amount"),
+    ColumnSpec("Fin Nilai Out", "amount"),
+    ColumnSpec("Fin Nilai Dom", "amount"),
+]
+
+NATIONAL_SCHEMA: list[ColumnSpec] = [
+    ColumnSpec("Nama PJP", "category"),
+    *PERIOD_COLUMNS,
+    ColumnSpec("Frek Nasional Out", "count"),
+    ColumnSpec("Frek Nasional Inc", "count"),
+    ColumnSpec("Frek Nasional Dom", "count"),
+    ColumnSpec("Frek Nasional Total", "count"),
+    ColumnSpec("Nom Nasional Out", "amount"),
+    ColumnSpec("Nom Nasional Inc", "amount"),
+    ColumnSpec("Nom Nasional Dom", "amount"),
+    ColumnSpec("Nom Nasional Total", "amount"),
+]
+
+
+def _to_period(s: pd.Series, dtype: str) -> pd.Series:
+    num = pd.to_numeric(s, errors="coerce")
+    if bool((num.isna() & s.notna()).any()):
+        # Ada nilai teks (mis. nama bulan); biarkan kolom apa adanya
+        return s
+    if pd.api.types.is_float_dtype(num):
+        num = num.where(np.isfinite(num.astype("float64")))
+        # nilai pecahan (mis. 2024.5) bukan periode valid
+        num = num.where(num.isna() | (num == num.round()))
+    info = np.iinfo(dtype)
+    if bool(((num < info.min) | (num > info.max)).fillna(False).any()):
+        dtype = "int64"
+    if num.isna().any():
+        # Nullable supaya baris kosong tetap terdeteksi (dan dibuang) di view
+        return num.astype(dtype.capitalize())
+    return num.astype(dtype)
+
+
+def _to_count(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(s, errors="coerce")
+    if num.isna().any():
+        return num.astype("float64")
+    f = num.astype("float64")
+    if bool((f == np.round(f)).all()):
+        return num.astype("int64")
+    return f
+
+
+def apply_schema(df: pd.DataFrame, schema: list[ColumnSpec]) -> tuple[pd.DataFrame, SchemaReport]:
+    """Cast kolom sesuai ``schema``; kolom yang tidak ada di frame dilewati."""
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    out = df.copy()
+    casts: dict[str, str] = {}
+
+    for spec in schema:
+        if spec.name not in out.columns:
+            continue
+        s = out[spec.name]
+        if spec.kind == "category":
+            if isinstance(s.dtype, pd.CategoricalDtype):
+                continue
+            new = s.astype("category")
+        elif spec.kind == "period":
+            new = _to_period(s, spec.dtype or "int16")
+        elif spec.kind == "count":
+            new = _to_count(s)
+        else:
+            new = pd.to_numeric(s, errors="coerce").astype("float64")
+        out[spec.name] = new
+        if str(new.dtype) != str(s.dtype):
+            casts[spec.name] = f"{s.dtype} -> {new.dtype}"
+
+    report = SchemaReport(bytes_before, int(out.memory_usage(deep=True).sum()), casts)
+    return out, report
+
+
+def has_clean_periods(df: pd.DataFrame, cols: list[str] | None = None) -> bool:
+    """True kalau kolom periode sudah integer non-nullable (hasil apply_schema tanpa NA)."""
+    cols = cols or [c.name for c in PERIOD_COLUMNS]
+    return all(
+        c in df.columns
+        and pd.api.types.is_integer_dtype(df[c])
+        and not pd.api.types.is_extension_array_dtype(df[c])
+        for c in cols
+    )
@@ -1,13 +1,170 @@
+import functools
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 
 from service.formatting import format_en_percent
+from service.growth import growth_column, resolve_growth_column
+from service.memo import frame_digest
 import streamlit as st
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.basedatatypes import BaseTraceType
 import calendar
 
 from service.units import pick_rupiah_unit, rupiah_unit_axis_label
 
+# Template plotly_white dipangkas ke yang dipakai modul ini (trace bar, scatter,
+# pie di sumbu 2D dengan warna diskrit; tanpa polar/ternary/scene/geo/mapbox dan
+# colorscale/coloraxis kontinu): tampilan sama, tapi validasi + copy template di
+# tiap figure jauh lebih murah.
+_PLOTLY_WHITE = go.layout.Template(
+    layout={
+        k: v
+        for k, v in pio.templates["plotly_white"].layout.to_plotly_json().items()
+        if k not in ("polar", "ternary", "scene", "geo", "mapbox", "coloraxis", "colorscale")
+    },
+    data={t: pio.templates["plotly_white"].data[t] for t in ("bar", "scatter", "pie")},
+)
+
+# Figure grafik Growth di-cache per (fungsi, isi data, argumen, gaya): rerun
+# fragment dengan data & gaya yang sama (ganti mode, kembali ke ukuran font
+# sebelumnya) cukup mengirim ulang figure tanpa membangun ulang objek Plotly.
+_FIGURE_CACHE_SIZE = 64
+_FIGURES: OrderedDict = OrderedDict()
+_FIGURE_LOCK = threading.Lock()
+
+
+def _merge_layout(target: dict, updates: dict) -> None:
+    for key, value in updates.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge_layout(target[key], value)
+        else:
+            target[key] = dict(value) if isinstance(value, dict) else value
+
+
+# Properti layout yang namanya memang mengandung "_" (bukan magic underscore)
+_LAYOUT_UNDERSCORE_PROPS = frozenset({"paper_bgcolor", "plot_bgcolor"})
+
+
+def _plain_layout(value):
+    """Layout dict dalam bentuk JSON hasil validasi Plotly.
+
+    ``font_size`` -> ``font.size``, ``title="..."`` -> ``title.text``, nilai None
+    atau dict kosong tidak di-set (sama seperti setter Plotly).
+    """
+    if isinstance(value, (list, tuple)):
+        return [_plain_layout(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    out: dict = {}
+    for key, item in value.items():
+        item = _plain_layout(item)
+        if item is None or item == {}:
+            continue
+        path = key.split("_") if "_" in key and key not in _LAYOUT_UNDERSCORE_PROPS else [key]
+        if path[-1] == "title" and isinstance(item, str):
+            item = {"text": item}
+        target = out
+        for part in path[:-1]:
+            target = target.setdefault(part, {})
+        if isinstance(item, dict) and isinstance(target.get(path[-1]), dict):
+            _merge_layout(target[path[-1]], item)
+        else:
+            target[path[-1]] = item
+    return out
+
+
+class _FigureDraft:
+    """Pengumpul trace & layout untuk builder grafik Growth.
+
+    ``update_layout`` pada ``go.Figure`` yang sudah jadi memicu relayout dan
+    validasi ulang tiap panggilan; draft hanya menggabungkan dict-nya (semantik
+    merge sama) lalu memvalidasi sekali di :meth:`build`.
+    """
+
+    def __init__(self):
+        self.data: list = []
+        self._layout: dict = {}
+        self._annotations: list[dict] = []
+
+    def add_trace(self, trace) -> "_FigureDraft":
+        self.data.append(trace)
+        return self
+
+    def update_layout(self, dict1: dict | None = None, **kwargs) -> "_FigureDraft":
+        _merge_layout(self._layout, {**(dict1 or {}), **kwargs})
+        return self
+
+    def add_annotation(self, **kwargs) -> "_FigureDraft":
+        self._annotations.append(kwargs)
+        return self
+
+    def build(self) -> go.Figure:
+        layout = dict(self._layout)
+        if self._annotations:
+            layout["annotations"] = list(layout.get("annotations") or []) + self._annotations
+        template = layout.pop("template", None)
+        if not isinstance(template, go.layout.Template) or not all(
+            isinstance(trace, BaseTraceType) for trace in self.data
+        ):
+            if template is not None:
+                layout["template"] = template
+            return go.Figure(data=self.data, layout=layout)
+
+        # Trace sudah divalidasi saat dibuat dan template sejak import; layout dari
+        # builder di modul ini cukup dinormalkan ke bentuk JSON-nya. Konstruktor
+        # Figure tanpa validasi ulang (copy trace, layout, template per figure)
+        # memangkas sebagian besar biaya build; JSON hasilnya sama.
+        layout = _plain_layout(layout)
+        layout["template"] = template
+        return go.Figure(data=self.data, layout=layout, _validate=False)
+
+
+def _figure_key(value):
+    if isinstance(value, pd.DataFrame):
+        return ("frame", frame_digest(value))
+    if isinstance(value, pd.Series):
+        return ("series", frame_digest(value.to_frame()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_figure_key(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_figure_key(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _figure_key(v)) for k, v in value.items()))
+    return value
+
+
+def _cached_chart(build):
+    """Bungkus builder figure (mengembalikan ``go.Figure`` atau None) jadi fungsi render.
+
+    Builder yang mengembalikan None sudah menampilkan pesan info/warning sendiri
+    dan tidak di-cache. Figure hasil cache dipakai bersama; jangan dimutasi.
+    """
+
+    @functools.wraps(build)
+    def render(*args, **kwargs):
+        key = (build.__qualname__, _figure_key(args), _figure_key(kwargs))
+        with _FIGURE_LOCK:
+            fig = _FIGURES.get(key)
+            if fig is not None:
+                _FIGURES.move_to_end(key)
+        if fig is None:
+            fig = build(*args, **kwargs)
+            if fig is None:
+                return
+            with _FIGURE_LOCK:
+                _FIGURES[key] = fig
+                while len(_FIGURES) > _FIGURE_CACHE_SIZE:
+                    _FIGURES.popitem(last=False)
+
+        chart_width = kwargs.get("chart_width")
+        st.plotly_chart(fig, use_container_width=not (chart_width is not None and int(chart_width) > 0))
+
+    return render
+
 
 def _tick_family_for_weight(weight: str | None) -> str:
     """Map ketebalan ke font-family (fallback aman lintas Windows/browser)."""
@@ -24,10 +181,9 @@ def _tick_family_for_weight(weight: str | None) -> str:
     return "Inter, Segoe UI, Arial, sans-serif"
 
 
+@_cached_chart
 def make_stacked_bar_line_chart_combined(
-    df_inc,
-    df_out,
-    df_dom,
+    df_growth,
     is_month: bool = False,
     *,
     font_size: int | None = None,
@@ -42,27 +198,26 @@ def make_stacked_bar_line_chart_combined(
 ):
     """
     Membuat grafik gabungan dengan stacked bar (Inc, Out, Dom) dan line growth (YoY)
+
+    ``df_growth`` adalah frame growth lebar (``build_growth_frame``); garis growth
+    memakai growth Nilai Domestik seperti sebelumnya.
     """
-    # Merge dataframes
+    nilai_cols = ['Sum of Fin Nilai Inc', 'Sum of Fin Nilai Out', 'Sum of Fin Nilai Dom']
     if is_month:
-        df_merged = df_inc[['Year', 'Month', 'Sum of Fin Nilai Inc']].copy()
-        df_merged = df_merged.merge(df_out[['Year', 'Month', 'Sum of Fin Nilai Out']], on=['Year', 'Month'], how='outer')
-        df_merged = df_merged.merge(df_dom[['Year', 'Month', 'Sum of Fin Nilai Dom', '%MtM Nom']], on=['Year', 'Month'], how='outer')
+        growth_col = growth_column('mtm', 'Nilai', 'Dom')
+        df_merged = df_growth[['Year', 'Month'] + nilai_cols + [growth_col]].copy()
         df_merged['Year-Month'] = df_merged['Year'].astype(str) + '-' + df_merged['Month'].astype(str)
         df_merged = df_merged.sort_values(['Year', 'Month'])
         x_col = 'Year-Month'
         period_label = "Bulan"
-        growth_col = '%MtM Nom'
         growth_label = 'Growth MtM (%)'
     else:
-        df_merged = df_inc[['Year', 'Quarter', 'Sum of Fin Nilai Inc']].copy()
-        df_merged = df_merged.merge(df_out[['Year', 'Quarter', 'Sum of Fin Nilai Out']], on=['Year', 'Quarter'], how='outer')
-        df_merged = df_merged.merge(df_dom[['Year', 'Quarter', 'Sum of Fin Nilai Dom', '%YoY Nom']], on=['Year', 'Quarter'], how='outer')
+        growth_col = growth_column('yoy', 'Nilai', 'Dom')
+        df_merged = df_growth[['Year', 'Quarter'] + nilai_cols + [growth_col]].copy()
         df_merged['Year-Quarter'] = df_merged['Year'].astype(str) + ' Q' + df_merged['Quarter'].astype(str)
         df_merged = df_merged.sort_values(['Year', 'Quarter'])
         x_col = 'Year-Quarter'
         period_label = "Kuartal"
-        growth_col = '%YoY Nom'
         growth_label = 'Growth YoY (%)'
     
     # Filter rows with valid growth data
@@ -95,7 +250,7 @@ def make_stacked_bar_line_chart_combined(
     x_tick_color = "#111827" if bool(axis_x_tick_bold) else "#374151"
     y_tick_color = "#111827" if bool(axis_y_tick_bold) else "#374151"
 
-    fig = go.Figure()
+    fig = _FigureDraft()
     
     # Stacked bars - Incoming (Pink)
     fig.add_trace(go.Bar(
@@ -181,7 +336,7 @@ def make_stacked_bar_line_chart_combined(
             showgrid=False,
             tickfont=dict(size=y_tick_fs, family=y_tick_family, color=y_tick_color)
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor='white',
         plot_bgcolor='#f9fafb',
         font=dict(family='Inter, Arial, sans-serif', size=fs),
@@ -209,15 +364,12 @@ def make_stacked_bar_line_chart_combined(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
+@_cached_chart
 def make_yearly_stacked_bar_yoy_chart(
-    df_inc: pd.DataFrame,
-    df_out: pd.DataFrame,
-    df_dom: pd.DataFrame,
+    df_growth: pd.DataFrame,
     *,
     font_size: int | None = None,
     label_font_size: int | None = None,
@@ -233,42 +385,19 @@ def make_yearly_stacked_bar_yoy_chart(
 ):
     """Grafik Tahunan: stacked bar (Nilai) + garis YoY (%) dengan label boxed (mirip contoh)."""
 
-    # Aggregate per year (respect partial year if filter by quarter makes incomplete years)
-    def _agg_year(df: pd.DataFrame, value_col: str) -> pd.DataFrame:
-        if df is None or df.empty:
-            return pd.DataFrame(columns=["Year", value_col, "_nq"])
-        d = df.copy()
-        if "Quarter" in d.columns:
-            g = d.groupby("Year", observed=False).agg({value_col: "sum", "Quarter": pd.Series.nunique}).reset_index()
-            g = g.rename(columns={"Quarter": "_nq"})
-        else:
-            g = d.groupby("Year", observed=False).agg({value_col: "sum"}).reset_index()
-            g["_nq"] = 4
-        return g
-
     inc_col = "Sum of Fin Nilai Inc"
     out_col = "Sum of Fin Nilai Out"
     dom_col = "Sum of Fin Nilai Dom"
 
-    inc_y = _agg_year(df_inc, inc_col)
-    out_y = _agg_year(df_out, out_col)
-    dom_y = _agg_year(df_dom, dom_col)
-
-    df_y = inc_y.merge(out_y[["Year", out_col, "_nq"]], on="Year", how="outer", suffixes=("", "_out"))
-    df_y = df_y.merge(dom_y[["Year", dom_col, "_nq"]], on="Year", how="outer", suffixes=("", "_dom"))
-
-    if df_y.empty:
+    # Aggregate per year dari frame growth lebar (respect partial year kalau filter quarter membuat tahun tidak lengkap)
+    if df_growth is None or df_growth.empty:
         st.info("Data tidak cukup untuk membuat grafik tahunan.")
         return
-
-    # consolidate nq (max across sources)
-    def _max3(a, b, c):
-        vals = [v for v in [a, b, c] if pd.notna(v)]
-        return int(max(vals)) if vals else 4
-
-    df_y["_nq_out"] = df_y.get("_nq_out")
-    df_y["_nq_dom"] = df_y.get("_nq_dom")
-    df_y["_nq"] = df_y.apply(lambda r: _max3(r.get("_nq"), r.get("_nq_out"), r.get("_nq_dom")), axis=1)
+    agg = {inc_col: "sum", out_col: "sum", dom_col: "sum"}
+    if "Quarter" in df_growth.columns:
+        agg["Quarter"] = pd.Series.nunique
+    df_y = df_growth.groupby("Year", observed=False).agg(agg).reset_index()
+    df_y["_nq"] = df_y.pop("Quarter") if "Quarter" in df_y.columns else 4
 
     df_y["YearInt"] = pd.to_numeric(df_y.get("Year"), errors="coerce")
     df_y = df_y.dropna(subset=["YearInt"]).copy()
@@ -309,7 +438,7 @@ def make_yearly_stacked_bar_yoy_chart(
     x_tick_color = "#111827" if (str(x_tick_weight_eff).lower() not in ("", "normal")) else "#374151"
     y_tick_color = "#111827" if (str(y_tick_weight_eff).lower() not in ("", "normal")) else "#374151"
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     x_years = df_y["YearInt"].astype(int).tolist()
     x_text = df_y["YearLabel"].astype(str).tolist()
@@ -417,7 +546,7 @@ def make_yearly_stacked_bar_yoy_chart(
             font=dict(size=title_fs, family="Inter, Arial, sans-serif", color="#1f2937", weight=700),
         ),
         barmode="stack",
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -480,15 +609,12 @@ def make_yearly_stacked_bar_yoy_chart(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
+@_cached_chart
 def make_yearly_stacked_bar_yoy_chart_ytd(
-    df_inc: pd.DataFrame,
-    df_out: pd.DataFrame,
-    df_dom: pd.DataFrame,
+    df_growth: pd.DataFrame,
     *,
     end_month: int = 9,
     cap_years: set[int] | None = None,
@@ -555,60 +681,44 @@ def make_yearly_stacked_bar_yoy_chart_ytd(
         except Exception:
             return None
 
-    def _agg_year_upto(df: pd.DataFrame, value_col: str, limit_month: int) -> pd.DataFrame:
-        if df is None or df.empty:
-            return pd.DataFrame(columns=["Year", value_col, "_nm"])
-        d = df.copy()
-        if "Year" not in d.columns or "Month" not in d.columns:
-            return pd.DataFrame(columns=["Year", value_col, "_nm"])
+    inc_col = "Sum of Fin Nilai Inc"
+    out_col = "Sum of Fin Nilai Out"
+    dom_col = "Sum of Fin Nilai Dom"
+
+    def _agg_year_upto(df: pd.DataFrame, limit_month: int) -> pd.DataFrame:
+        empty = pd.DataFrame(columns=["Year", inc_col, out_col, dom_col, "_nm"])
+        if df is None or df.empty or "Year" not in df.columns or "Month" not in df.columns:
+            return empty
 
+        d = df[["Year", "Month", inc_col, out_col, dom_col]].copy()
         d["YearInt"] = pd.to_numeric(d["Year"], errors="coerce")
         d["MonthInt"] = d["Month"].apply(_month_to_int)
         d = d.dropna(subset=["YearInt", "MonthInt"]).copy()
         if d.empty:
-            return pd.DataFrame(columns=["Year", value_col, "_nm"])
+            return empty
 
         d["YearInt"] = d["YearInt"].astype(int)
         d["MonthInt"] = d["MonthInt"].astype(int)
-        d[value_col] = pd.to_numeric(d.get(value_col), errors="coerce")
+        for col in (inc_col, out_col, dom_col):
+            d[col] = pd.to_numeric(d[col], errors="coerce")
 
-        limit_int = int(limit_month)
-        d = d[d["MonthInt"] <= limit_int].copy()
+        d = d[d["MonthInt"] <= int(limit_month)].copy()
         if d.empty:
-            return pd.DataFrame(columns=["Year", value_col, "_nm"])
+            return empty
 
-        g = (
+        return (
             d.groupby("YearInt", observed=False)
-            .agg({value_col: "sum", "MonthInt": pd.Series.nunique})
+            .agg({inc_col: "sum", out_col: "sum", dom_col: "sum", "MonthInt": pd.Series.nunique})
             .reset_index()
             .rename(columns={"YearInt": "Year", "MonthInt": "_nm"})
         )
-        return g
-
-    inc_col = "Sum of Fin Nilai Inc"
-    out_col = "Sum of Fin Nilai Out"
-    dom_col = "Sum of Fin Nilai Dom"
 
     # Precompute aggregates for two windows: capped window (end_month) and default window (default_end_month)
     def _build_window(limit_month: int):
-        inc_w = _agg_year_upto(df_inc, inc_col, limit_month)
-        out_w = _agg_year_upto(df_out, out_col, limit_month)
-        dom_w = _agg_year_upto(df_dom, dom_col, limit_month)
-
-        w = inc_w.merge(out_w[["Year", out_col, "_nm"]], on="Year", how="outer", suffixes=("", "_out"))
-        w = w.merge(dom_w[["Year", dom_col, "_nm"]], on="Year", how="outer", suffixes=("", "_dom"))
-
+        w = _agg_year_upto(df_growth, limit_month)
         if w.empty:
             return w
 
-        def _max3(a, b, c):
-            vals = [v for v in [a, b, c] if pd.notna(v)]
-            return int(max(vals)) if vals else 0
-
-        w["_nm_out"] = w.get("_nm_out")
-        w["_nm_dom"] = w.get("_nm_dom")
-        w["_nm"] = w.apply(lambda r: _max3(r.get("_nm"), r.get("_nm_out"), r.get("_nm_dom")), axis=1)
-
         w["YearInt"] = pd.to_numeric(w.get("Year"), errors="coerce")
         w = w.dropna(subset=["YearInt"]).copy()
         w["YearInt"] = w["YearInt"].astype(int)
@@ -736,7 +846,7 @@ def make_yearly_stacked_bar_yoy_chart_ytd(
     x_tick_color = "#111827" if bool(axis_x_tick_bold) else "#374151"
     y_tick_color = "#111827" if bool(axis_y_tick_bold) else "#374151"
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     x_years = df_y["YearInt"].astype(int).tolist()
     x_text = df_y["YearLabel"].astype(str).tolist()
@@ -855,7 +965,7 @@ def make_yearly_stacked_bar_yoy_chart_ytd(
             font=dict(size=title_fs, family="Inter, Arial, sans-serif", color="#1f2937", weight=700),
         ),
         barmode="stack",
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -918,9 +1028,7 @@ def make_yearly_stacked_bar_yoy_chart_ytd(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
 def make_quarter_across_years_chart(
@@ -966,10 +1074,7 @@ def make_quarter_across_years_chart(
         return
 
     bar_col = f"Sum of Fin {sum_trx_type} {trx_type}"
-    if is_combined:
-        growth_col = f"%YoY {sum_trx_type}"
-    else:
-        growth_col = "%YoY"
+    growth_col = resolve_growth_column(df, "yoy", sum_trx_type, trx_type, is_combined)
 
     if bar_col not in df.columns:
         st.warning(f"Kolom '{bar_col}' tidak ditemukan.")
@@ -1086,7 +1191,7 @@ def make_quarter_across_years_chart(
             showgrid=False,
             tickfont=dict(size=tick_fs, family="Inter, Arial, sans-serif")
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -1111,6 +1216,7 @@ def make_quarter_across_years_chart(
     st.plotly_chart(fig, use_container_width=True)
 
 
+@_cached_chart
 def make_quarter_vs_quarter_chart(
     df: pd.DataFrame,
     year_a: int,
@@ -1213,7 +1319,7 @@ def make_quarter_vs_quarter_chart(
     if pd.notna(val_a) and pd.notna(val_b) and float(val_a) != 0:
         delta_pct = ((float(val_b) - float(val_a)) / float(val_a)) * 100
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     fig.add_trace(
         go.Bar(
@@ -1279,7 +1385,7 @@ def make_quarter_vs_quarter_chart(
             zerolinecolor="#d1d5db",
             tickfont=dict(size=y_tick_fs, family=y_tick_family, color=y_tick_color)
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -1303,15 +1409,12 @@ def make_quarter_vs_quarter_chart(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
+@_cached_chart
 def make_quarter_vs_quarter_chart_total_breakdown(
-    df_inc: pd.DataFrame,
-    df_out: pd.DataFrame,
-    df_dom: pd.DataFrame,
+    df_growth: pd.DataFrame,
     year_a: int,
     quarter_a: int,
     year_b: int,
@@ -1330,12 +1433,12 @@ def make_quarter_vs_quarter_chart_total_breakdown(
 ):
     """VS chart khusus TOTAL: tampilkan stacked bar Inc/Out/Dom + garis perubahan untuk masing-masing + total."""
 
-    if df_inc is None or df_out is None or df_dom is None:
+    if df_growth is None:
         st.info("Data kosong.")
         return
 
     required_cols = {"Year", "Quarter"}
-    if not (required_cols.issubset(set(df_inc.columns)) and required_cols.issubset(set(df_out.columns)) and required_cols.issubset(set(df_dom.columns))):
+    if not required_cols.issubset(set(df_growth.columns)):
         st.warning("Kolom Year/Quarter tidak lengkap untuk membuat grafik.")
         return
 
@@ -1347,30 +1450,20 @@ def make_quarter_vs_quarter_chart_total_breakdown(
     col_out = f"Sum of Fin {sum_trx_type} Out"
     col_dom = f"Sum of Fin {sum_trx_type} Dom"
 
-    for c, name in [(col_inc, "Inc"), (col_out, "Out"), (col_dom, "Dom")]:
-        if c not in df_inc.columns and name == "Inc":
-            st.warning(f"Kolom '{c}' tidak ditemukan.")
-            return
-        if c not in df_out.columns and name == "Out":
-            st.warning(f"Kolom '{c}' tidak ditemukan.")
-            return
-        if c not in df_dom.columns and name == "Dom":
+    for c in (col_inc, col_out, col_dom):
+        if c not in df_growth.columns:
             st.warning(f"Kolom '{c}' tidak ditemukan.")
             return
 
-    def _get_val(df_src: pd.DataFrame, col: str, y: int, q: int):
-        dfx = df_src[(df_src["Year"].astype(int) == int(y)) & (df_src["Quarter"].astype(int) == int(q))]
+    def _get_vals(y: int, q: int):
+        dfx = df_growth[(df_growth["Year"].astype(int) == int(y)) & (df_growth["Quarter"].astype(int) == int(q))]
         if dfx.empty:
-            return None
-        return pd.to_numeric(dfx[col].iloc[0], errors="coerce")
-
-    inc_a = _get_val(df_inc, col_inc, year_a, quarter_a)
-    out_a = _get_val(df_out, col_out, year_a, quarter_a)
-    dom_a = _get_val(df_dom, col_dom, year_a, quarter_a)
+            return None, None, None
+        row = pd.to_numeric(dfx[[col_inc, col_out, col_dom]].iloc[0], errors="coerce")
+        return row[col_inc], row[col_out], row[col_dom]
 
-    inc_b = _get_val(df_inc, col_inc, year_b, quarter_b)
-    out_b = _get_val(df_out, col_out, year_b, quarter_b)
-    dom_b = _get_val(df_dom, col_dom, year_b, quarter_b)
+    inc_a, out_a, dom_a = _get_vals(year_a, quarter_a)
+    inc_b, out_b, dom_b = _get_vals(year_b, quarter_b)
 
     if any(v is None for v in [inc_a, out_a, dom_a, inc_b, out_b, dom_b]):
         st.info("Data untuk salah satu periode tidak ditemukan (A/B).")
@@ -1428,7 +1521,7 @@ def make_quarter_vs_quarter_chart_total_breakdown(
     x_tick_color = "#111827" if bool(axis_x_tick_bold) else "#374151"
     y_tick_color = "#111827" if bool(axis_y_tick_bold) else "#374151"
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     # Stacked bars seperti Grafik Gabungan
     fig.add_trace(go.Bar(
@@ -1518,7 +1611,7 @@ def make_quarter_vs_quarter_chart_total_breakdown(
             zerolinecolor="#d1d5db",
             tickfont=dict(size=y_tick_fs, family=y_tick_family, color=y_tick_color)
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -1542,9 +1635,7 @@ def make_quarter_vs_quarter_chart_total_breakdown(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
 def make_pie_chart_summary(df, top_n):
@@ -1561,7 +1652,7 @@ def make_pie_chart_summary(df, top_n):
                  values='Market Share (%)',
                  names='Nama PJP',
                  title=f'Top {top_n} PJPs by Market Share (Including Others)',
-                 template='plotly_white')
+                 template=_PLOTLY_WHITE)
 
     fig.update_traces(
         hovertemplate='%{label}: %{value:.2f}%',
@@ -1606,7 +1697,7 @@ def make_pie_chart_market_share(df: pd.DataFrame, trx_type: str, key: str ,is_no
                  names='Market Share',
                  values='Percentage',
                  title=f'Market Share {text} {trx_type} Jakarta VS National',
-                 template='plotly_white',
+                 template=_PLOTLY_WHITE,
                  color='Market Share',
                  color_discrete_map=color_map)
 
@@ -1666,7 +1757,7 @@ def make_grouped_bar_chart(df, mode, is_month):
                  barmode='group',
                  title=f'{label} Income, Outcome, and Domestic Transactions by {time_label}',
                  labels={'Value': label, time_label: time_label},
-                 template='plotly_white',
+                 template=_PLOTLY_WHITE,
                  color_discrete_map=color_map)
     
     fig.update_layout(
@@ -1697,6 +1788,7 @@ def make_grouped_bar_chart(df, mode, is_month):
     st.plotly_chart(fig, use_container_width=True)
 
 
+@_cached_chart
 def make_combined_bar_line_chart(
     df,
     sum_trx_type: str,
@@ -1713,26 +1805,19 @@ def make_combined_bar_line_chart(
     chart_height: int | None = None,
     chart_width: int | None = None,
 ):
-    df_copy = df.copy()
+    # Frame growth lebar: kolom growth per jenis transaksi; selain itu nama lama (%YoY / %YoY Jumlah)
+    yoy_col = resolve_growth_column(df, 'yoy', sum_trx_type, trx_type, is_combined)
+    qoq_col = resolve_growth_column(df, 'qtq', sum_trx_type, trx_type, is_combined)
+    mtm_col = resolve_growth_column(df, 'mtm', sum_trx_type, trx_type, is_combined)
 
-    if is_combined:
-        if is_month:
-            df_copy = df_copy[df_copy[f'%MtM {sum_trx_type}'].notnull()]
-            df_copy['Year-Month'] = df_copy['Year'].astype(str) + '-' + df_copy['Month'].astype(str)
-            target_col = 'Year-Month'
-        else:
-            df_copy = df_copy[(df_copy[f'%YoY {sum_trx_type}'].notnull()) & (df_copy[f'%QtQ {sum_trx_type}'].notnull())]
-            df_copy['Year-Quarter'] = df_copy['Year'].astype(str) + ' Q' + df_copy['Quarter'].astype(str)
-            target_col = 'Year-Quarter'
+    if is_month:
+        df_copy = df[df[mtm_col].notnull()].copy()
+        df_copy['Year-Month'] = df_copy['Year'].astype(str) + '-' + df_copy['Month'].astype(str)
+        target_col = 'Year-Month'
     else:
-        if is_month:
-            df_copy = df_copy[df_copy['%MtM'].notnull()]
-            df_copy['Year-Month'] = df_copy['Year'].astype(str) + '-' + df_copy['Month'].astype(str)
-            target_col = 'Year-Month'
-        else:
-            df_copy = df_copy[(df_copy['%YoY'].notnull()) & (df_copy['%QtQ'].notnull())]
-            df_copy['Year-Quarter'] = df_copy['Year'].astype(str) + ' Q' + df_copy['Quarter'].astype(str)
-            target_col = 'Year-Quarter'
+        df_copy = df[(df[yoy_col].notnull()) & (df[qoq_col].notnull())].copy()
+        df_copy['Year-Quarter'] = df_copy['Year'].astype(str) + ' Q' + df_copy['Quarter'].astype(str)
+        target_col = 'Year-Quarter'
 
     if sum_trx_type == "Jumlah":
         variabel_trx = "Frekuensi"
@@ -1777,7 +1862,7 @@ def make_combined_bar_line_chart(
     x_tick_color = "#111827" if bool(axis_x_tick_bold) else "#374151"
     y_tick_color = "#111827" if bool(axis_y_tick_bold) else "#374151"
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     # Bar trace dengan warna sesuai jenis transaksi
     fig.add_trace(go.Bar(
@@ -1793,74 +1878,39 @@ def make_combined_bar_line_chart(
     ))
 
     # Line traces untuk Growth dengan warna hijau gelap (#1E8449)
-    if is_combined:
-        if is_month:
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy[f'%MtM {sum_trx_type}'],
-                name='Growth MtM (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#1E8449', width=3),
-                marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>MtM Growth: %{y:.2f}%<extra></extra>'
-            ))
-        else:
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy[f'%YoY {sum_trx_type}'],
-                name='Growth YoY (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#1E8449', width=3),
-                marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>YoY Growth: %{y:.2f}%<extra></extra>'
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy[f'%QtQ {sum_trx_type}'],
-                name='Growth QtQ (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#16a34a', width=3, dash='dot'),
-                marker=dict(size=8, color='#16a34a', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>QtQ Growth: %{y:.2f}%<extra></extra>'
-            ))
+    if is_month:
+        fig.add_trace(go.Scatter(
+            x=df_copy[target_col],
+            y=df_copy[mtm_col],
+            name='Growth MtM (%)',
+            yaxis='y2',
+            mode='lines+markers',
+            line=dict(color='#1E8449', width=3),
+            marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
+            hovertemplate='%{x}<br>MtM Growth: %{y:.2f}%<extra></extra>'
+        ))
     else:
-        if is_month:
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy['%MtM'],
-                name='Growth MtM (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#1E8449', width=3),
-                marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>MtM Growth: %{y:.2f}%<extra></extra>'
-            ))
-        else:
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy['%YoY'],
-                name='Growth YoY (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#1E8449', width=3),
-                marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>YoY Growth: %{y:.2f}%<extra></extra>'
-            ))
-
-            fig.add_trace(go.Scatter(
-                x=df_copy[target_col],
-                y=df_copy['%QtQ'],
-                name='Growth QtQ (%)',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color='#16a34a', width=3, dash='dot'),
-                marker=dict(size=8, color='#16a34a', line=dict(color='white', width=2)),
-                hovertemplate='%{x}<br>QtQ Growth: %{y:.2f}%<extra></extra>'
-            ))
+        fig.add_trace(go.Scatter(
+            x=df_copy[target_col],
+            y=df_copy[yoy_col],
+            name='Growth YoY (%)',
+            yaxis='y2',
+            mode='lines+markers',
+            line=dict(color='#1E8449', width=3),
+            marker=dict(size=8, color='#1E8449', line=dict(color='white', width=2)),
+            hovertemplate='%{x}<br>YoY Growth: %{y:.2f}%<extra></extra>'
+        ))
+
+        fig.add_trace(go.Scatter(
+            x=df_copy[target_col],
+            y=df_copy[qoq_col],
+            name='Growth QtQ (%)',
+            yaxis='y2',
+            mode='lines+markers',
+            line=dict(color='#16a34a', width=3, dash='dot'),
+            marker=dict(size=8, color='#16a34a', line=dict(color='white', width=2)),
+            hovertemplate='%{x}<br>QtQ Growth: %{y:.2f}%<extra></extra>'
+        ))
 
     fig.update_layout(
         title=dict(
@@ -1895,7 +1945,7 @@ def make_combined_bar_line_chart(
             showgrid=False,
             tickfont=dict(size=y_tick_fs, family=y_tick_family, color=y_tick_color)
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor='white',
         plot_bgcolor='#f9fafb',
         font=dict(family='Inter, Arial, sans-serif', size=fs),
@@ -1921,17 +1971,12 @@ def make_combined_bar_line_chart(
     if chart_height is not None:
         fig.update_layout(height=int(chart_height))
 
-    if chart_width is not None and int(chart_width) > 0:
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
 
 
-def make_overall_total_stacked_growth_chart(
+@_cached_chart
+def _overall_total_stacked_growth_chart(
     df_total: pd.DataFrame,
-    df_inc: pd.DataFrame,
-    df_out: pd.DataFrame,
-    df_dom: pd.DataFrame,
     sum_trx_type: str,
     is_month: bool = False,
     show_breakdown_growth: bool = False,
@@ -1951,6 +1996,9 @@ def make_overall_total_stacked_growth_chart(
 
     Disamakan gaya grafiknya dengan chart TOTAL di Perbandingan Periode (stacked breakdown),
     tapi tetap mempertahankan garis Growth YoY dan Growth QtQ.
+
+    ``df_total`` adalah frame growth lebar: nilai Inc/Out/Dom dan growth per jenis
+    transaksi dibaca dari kolomnya sendiri, tanpa merge.
     """
 
     if df_total is None or df_total.empty:
@@ -2039,49 +2087,25 @@ def make_overall_total_stacked_growth_chart(
     out_col = f"Sum of Fin {sum_trx_type} Out"
     dom_col = f"Sum of Fin {sum_trx_type} Dom"
 
-    for src, col_name in [(df_inc, inc_col), (df_out, out_col), (df_dom, dom_col)]:
-        if src is None or src.empty or col_name not in src.columns:
+    for col_name in (inc_col, out_col, dom_col):
+        if col_name not in df_plot.columns:
             st.warning(f"Kolom '{col_name}' tidak ditemukan untuk stacked breakdown.")
             return
 
-    # Build lookup per periode agar align dengan df_plot
-    if is_month:
-        key_cols = ["Year", "Month"]
-        def _key(df_):
-            return df_["Year"].astype(int).astype(str) + "-" + df_["Month"].astype(str)
-    else:
-        key_cols = ["Year", "Quarter"]
-        def _key(df_):
-            return df_["Year"].astype(int).astype(str) + " Q" + df_["Quarter"].astype(int).astype(str)
-
-    df_inc_map = df_inc.copy()
-    df_out_map = df_out.copy()
-    df_dom_map = df_dom.copy()
-    df_inc_map[target_col] = _key(df_inc_map)
-    df_out_map[target_col] = _key(df_out_map)
-    df_dom_map[target_col] = _key(df_dom_map)
-
     # Optional: ambil growth YoY/QtQ per jenis transaksi (Inc/Out/Dom)
     if show_breakdown_growth and (not is_month):
-        for src_df, label in [(df_inc_map, "Incoming"), (df_out_map, "Outgoing"), (df_dom_map, "Domestik")]:
-            if "%YoY" not in src_df.columns or "%QtQ" not in src_df.columns:
-                st.warning(f"Kolom growth (%YoY/%QtQ) tidak ditemukan untuk {label}.")
-                show_breakdown_growth = False
+        breakdown_cols = {}
+        for flow, prefix in [("Inc", "_inc"), ("Out", "_out"), ("Dom", "_dom")]:
+            yoy_src = growth_column("yoy", sum_trx_type, flow)
+            qoq_src = growth_column("qtq", sum_trx_type, flow)
+            if yoy_src not in df_plot.columns or qoq_src not in df_plot.columns:
+                show_breakdown_growth = False  # sudah diperingatkan di make_overall_total_stacked_growth_chart
                 break
-
-    # Rename kolom growth agar tidak bentrok saat merge
-    if show_breakdown_growth and (not is_month):
-        df_inc_map = df_inc_map.rename(columns={"%YoY": "_inc_yoy", "%QtQ": "_inc_qoq"})
-        df_out_map = df_out_map.rename(columns={"%YoY": "_out_yoy", "%QtQ": "_out_qoq"})
-        df_dom_map = df_dom_map.rename(columns={"%YoY": "_dom_yoy", "%QtQ": "_dom_qoq"})
-
-    inc_merge_cols = [target_col, inc_col] + (["_inc_yoy", "_inc_qoq"] if show_breakdown_growth and (not is_month) else [])
-    out_merge_cols = [target_col, out_col] + (["_out_yoy", "_out_qoq"] if show_breakdown_growth and (not is_month) else [])
-    dom_merge_cols = [target_col, dom_col] + (["_dom_yoy", "_dom_qoq"] if show_breakdown_growth and (not is_month) else [])
-
-    df_plot = df_plot.merge(df_inc_map[inc_merge_cols], on=target_col, how="left")
-    df_plot = df_plot.merge(df_out_map[out_merge_cols], on=target_col, how="left")
-    df_plot = df_plot.merge(df_dom_map[dom_merge_cols], on=target_col, how="left")
+            breakdown_cols[f"{prefix}_yoy"] = df_plot[yoy_src]
+            breakdown_cols[f"{prefix}_qoq"] = df_plot[qoq_src]
+        if show_breakdown_growth:
+            df_plot = df_plot.assign(**breakdown_cols)
+    df_plot = df_plot.reset_index(drop=True)
 
     if df_plot[[inc_col, out_col, dom_col]].isna().all(axis=None):
         st.info("Data breakdown Inc/Out/Dom tidak tersedia.")
@@ -2108,7 +2132,7 @@ def make_overall_total_stacked_growth_chart(
         y_title = "Nilai (Rp Triliun)"
         scale_factor = 1e12
 
-    fig = go.Figure()
+    fig = _FigureDraft()
 
     def _lighten_hex(hex_color: str, amount: float = 0.35) -> str:
         """Lighten hex color by mixing with white (amount 0..1)."""
@@ -2434,7 +2458,7 @@ def make_overall_total_stacked_growth_chart(
             range=y2_range,
             tickfont=dict(size=y_tick_fs, family=y_tick_family, color=y_tick_color)
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor="white",
         plot_bgcolor="#f9fafb",
         font=dict(family="Inter, Arial, sans-serif", size=fs),
@@ -2476,9 +2500,33 @@ def make_overall_total_stacked_growth_chart(
 
     if chart_width is not None and int(chart_width) > 0:
         fig.update_layout(width=int(chart_width))
-        st.plotly_chart(fig, use_container_width=False)
-    else:
-        st.plotly_chart(fig, use_container_width=True)
+    return fig.build()
+
+
+def make_overall_total_stacked_growth_chart(
+    df_total: pd.DataFrame,
+    sum_trx_type: str,
+    is_month: bool = False,
+    show_breakdown_growth: bool = False,
+    visible_periods: list[str] | None = None,
+    **style,
+):
+    """Render :func:`_overall_total_stacked_growth_chart` (argumen gaya diteruskan apa adanya).
+
+    Kolom growth breakdown yang tidak ada diperingatkan di sini, bukan di builder,
+    supaya pesannya tetap tampil saat figure diambil dari cache.
+    """
+    if show_breakdown_growth and not is_month and df_total is not None:
+        for flow, label in [("Inc", "Incoming"), ("Out", "Outgoing"), ("Dom", "Domestik")]:
+            needed = (growth_column("yoy", sum_trx_type, flow), growth_column("qtq", sum_trx_type, flow))
+            if any(c not in df_total.columns for c in needed):
+                st.warning(f"Kolom growth (%YoY/%QtQ) tidak ditemukan untuk {label}.")
+                show_breakdown_growth = False
+                break
+    _overall_total_stacked_growth_chart(
+        df_total, sum_trx_type, is_month, show_breakdown_growth, visible_periods, **style
+    )
+
 
 def make_combined_bar_line_chart_profile(df: pd.DataFrame, trx_type: str, nama_pjp: str, selected_year: str):
     # Buat label time-series lintas tahun: YYYY-MM dan urutkan kronologis
@@ -2564,7 +2612,7 @@ def make_combined_bar_line_chart_profile(df: pd.DataFrame, trx_type: str, nama_p
             tickformat=",.0f",
             showgrid=False
         ),
-        template="plotly_white",
+        template=_PLOTLY_WHITE,
         paper_bgcolor='white',
         plot_bgcolor='#f9fafb',
         font=dict(family='Inter, Arial, sans-serif', size=12),
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import pandas as pd
+
+
+# Cache disk untuk workbook LTDBB yang sudah pernah di-parse. Kunci = SHA-256
+# dari byte upload + versi cache, jadi file yang sama (meski beda nama / beda
+# sesi) langsung dibaca dari Parquet tanpa parse Excel ulang.
+_CACHE_DIR = Path(os.environ.get("LTDBB_CACHE_DIR", ".cache/workbooks"))
+_CACHE_MAX_BYTES = int(os.environ.get("LTDBB_CACHE_MAX_MB", "512")) * 1024 * 1024
+
+# Naikkan kalau hasil parse berubah (coercion/schema di load_workbook_data,
+# kolom turunan, attrs): entry versi lama tidak dibaca lagi dan habis lewat LRU.
+_CACHE_VERSION = 2
+
+_TRX_FILE = "trx.parquet"
+_NATIONAL_FILE = "national.parquet"
+
+
+def workbook_digest(data: bytes) -> str:
+    """SHA-256 hex digest dari isi upload (kunci cache)."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _entry_dir(digest: str, cache_dir: Path | None = None) -> Path:
+    return (cache_dir or _CACHE_DIR) / f"v{_CACHE_VERSION}-{digest}"
+
+
+def _dir_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+
+
+def get_cached_workbook(
+    digest: str, cache_dir: Path | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame] | None:
+    """Return ``(df, df_national)`` dari cache, atau None kalau belum ada/rusak."""
+    entry = _entry_dir(digest, cache_dir)
+    trx_path = entry / _TRX_FILE
+    national_path = entry / _NATIONAL_FILE
+    if not (trx_path.is_file() and national_path.is_file()):
+        return None
+    try:
+        df = pd.read_parquet(trx_path)
+        df_national = pd.read_parquet(national_path)
+    except Exception:
+        shutil.rmtree(entry, ignore_errors=True)
+        return None
+    # mtime direktori = waktu akses terakhir (dipakai untuk LRU)
+    try:
+        os.utime(entry, None)
+    except OSError:
+        pass
+    return df, df_national
+
+
+def put_cached_workbook(
+    digest: str,
+    df: pd.DataFrame,
+    df_national: pd.DataFrame,
+    cache_dir: Path | None = None,
+    max_bytes: int | None = None,
+) -> bool:
+    """Simpan kedua frame sebagai Parquet; return False kalau gagal (cache opsional)."""
+    root = cache_dir or _CACHE_DIR
+    entry = _entry_dir(digest, root)
+    # nama unik per penulisan: thread lain di proses yang sama bisa menyimpan digest yang sama
+    tmp = root / f".{entry.name}.{uuid.uuid4().hex}.tmp"
+    try:
+        tmp.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(tmp / _TRX_FILE, index=False)
+        df_national.to_parquet(tmp / _NATIONAL_FILE, index=False)
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+        # rename atomik supaya sesi lain tidak pernah membaca entry setengah jadi
+        os.replace(tmp, entry)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        return False
+    evict_workbook_cache(max_bytes, cache_dir=root)
+    return True
+
+
+def evict_workbook_cache(max_bytes: int | None = None, cache_dir: Path | None = None) -> int:
+    """Hapus entry paling lama tidak diakses sampai total ukuran <= max_bytes.
+
+    Return jumlah entry yang dihapus.
+    """
+    root = cache_dir or _CACHE_DIR
+    limit = _CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    if not root.is_dir():
+        return 0
+
+    entries: list[tuple[float, int, Path]] = []
+    for p in root.iterdir():
+        if not p.is_dir() or p.name.startswith("."):
+            continue
+        try:
+            entries.append((p.stat().st_mtime, _dir_size(p), p))
+        except OSError:
+            continue
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= limit:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import io
+import time
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+
+# Pre-scan workbook sebelum parse penuh: hanya nama sheet, baris header, dan
+# beberapa baris sampel yang dibaca (openpyxl read-only, streaming), jadi file
+# yang salah format ditolak dalam hitungan milidetik.
+SAMPLE_ROWS = 5
+
+
+@dataclass
+class WorkbookCheck:
+    errors: list[str] = field(default_factory=list)
+    sheet_names: list[str] = field(default_factory=list)
+    scanned: bool = True  # False kalau format tidak bisa di-scan (mis. .xls)
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def _read_bytes(uploaded_file) -> bytes | None:
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    if isinstance(uploaded_file, (bytes, bytearray)):
+        return bytes(uploaded_file)
+    return None
+
+
+def _check_samples(sheet_name: str, header: list[str], rows: list[tuple],
+                   numeric_columns: list[str], check: WorkbookCheck) -> None:
+    if not rows:
+        check.errors.append(f"Sheet '{sheet_name}' tidak memiliki baris data.")
+        return
+    for col in numeric_columns:
+        if col not in header:
+            continue
+        pos = header.index(col)
+        values = pd.Series([r[pos] for r in rows if pos < len(r)], dtype=object).dropna()
+        if not values.empty and pd.to_numeric(values, errors="coerce").isna().all():
+            check.errors.append(
+                f"Kolom '{col}' di sheet '{sheet_name}' tidak berisi angka (contoh: {values.iloc[0]!r})."
+            )
+
+
+def prescan_workbook(uploaded_file, required: dict[str, list[str]],
+                     sample_rows: int = SAMPLE_ROWS) -> WorkbookCheck:
+    """Validasi nama sheet dan kolom header tanpa parse penuh.
+
+    ``required`` memetakan nama sheet -> kolom wajib. Nama kolom dicocokkan
+    persis, sama seperti yang nanti dipakai ``pd.read_excel``.
+    """
+    t0 = time.perf_counter()
+    check = WorkbookCheck()
+    data = _read_bytes(uploaded_file)
+    if data is None or not data.startswith(b"PK"):
+        # .xls (BIFF) tidak bisa di-stream openpyxl; validasi terjadi saat parse penuh
+        check.scanned = False
+        check.elapsed = time.perf_counter() - t0
+        return check
+
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    except Exception as e:
+        check.errors.append(f"File bukan workbook Excel yang valid: {e}")
+        check.elapsed = time.perf_counter() - t0
+        return check
+
+    try:
+        check.sheet_names = list(wb.sheetnames)
+        for sheet_name, columns in required.items():
+            if sheet_name not in wb.sheetnames:
+                check.errors.append(
+                    f"Sheet '{sheet_name}' not found in the uploaded file. Please upload the file according to the format."
+                )
+                continue
+            ws = wb[sheet_name]
+            rows = ws.iter_rows(min_row=1, max_row=1 + sample_rows, values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                check.errors.append(f"Sheet '{sheet_name}' kosong.")
+                continue
+            header = [str(v) if v is not None else "" for v in header_row]
+            missing = [c for c in columns if c not in header]
+            if missing:
+                check.errors.append(
+                    f"Sheet '{sheet_name}' tidak memiliki kolom: {', '.join(missing)}."
+                )
+                continue
+            # Month boleh berupa nama bulan; hanya Year/Quarter yang wajib angka
+            samples = [r for r in rows if any(v is not None for v in r)]
+            _check_samples(sheet_name, header, samples, ["Year", "Quarter"], check)
+    finally:
+        wb.close()
+
+    check.elapsed = time.perf_counter() - t0
+    return check
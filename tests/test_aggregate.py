@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from service import aggregate
+from service.aggregate import FIN_MEASURES, aggregate_fin, group_sums
+from service.numeric import coerce_numeric
+
+TRX_KEYS = ['Nama PJP', 'Year', 'Quarter', 'Month']
+
+
+def legacy_aggregate(df: pd.DataFrame, group_cols: list[str]) -> pd.DataFrame:
+    """``aggregate_data`` lama (groupby().agg) dari service/preprocess.py sebagai referensi."""
+    df = df.copy()
+    for col in FIN_MEASURES:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = coerce_numeric(df[col])[0]
+        df[col] = df[col].fillna(0)
+    out = df.groupby(group_cols, observed=True).agg({c: 'sum' for c in FIN_MEASURES})
+    out = out.rename(columns=lambda x: 'Sum of ' + x).reset_index()
+    if isinstance(out['Nama PJP'].dtype, pd.CategoricalDtype):
+        out['Nama PJP'] = out['Nama PJP'].astype(object)
+    for col in group_cols[1:]:
+        if pd.api.types.is_integer_dtype(out[col]):
+            out[col] = out[col].astype('int64')
+    out['Sum of Total Nom'] = out['Sum of Fin Nilai Inc'] + out['Sum of Fin Nilai Out'] + out['Sum of Fin Nilai Dom']
+    return out
+
+
+def make_frame(rows: int = 2_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    month = rng.integers(1, 13, rows)
+    return pd.DataFrame({
+        'Nama PJP': np.array(['PT Beta', 'PT Alfa', 'CV Gamma', 'PT alfa', 'Zeta'], dtype=object)[
+            rng.integers(0, 5, rows)],
+        'Year': rng.integers(2019, 2026, rows),
+        'Quarter': (month - 1) // 3 + 1,
+        'Month': month,
+        'Fin Jumlah Inc': rng.integers(0, 1_000, rows),
+        'Fin Jumlah Out': rng.integers(0, 1_000, rows),
+        'Fin Jumlah Dom': rng.integers(0, 1_000, rows),
+        'Fin Nilai Inc': rng.random(rows) * 1e9,
+        'Fin Nilai Out': rng.random(rows) * 1e7,
+        'Fin Nilai Dom': rng.random(rows) * 3e8,
+    })
+
+
+def _categorical_names(df):
+    df['Nama PJP'] = pd.Categorical(df['Nama PJP'], categories=sorted(set(df['Nama PJP'])) + ['Tidak Dipakai'])
+    return df
+
+
+def _missing_values(df):
+    df.loc[df.index[::7], 'Fin Nilai Inc'] = np.nan
+    df['Fin Jumlah Out'] = df['Fin Jumlah Out'].astype('float64')
+    df.loc[df.index[::11], 'Fin Jumlah Out'] = np.nan
+    return df
+
+
+def _missing_keys(df):
+    df.loc[df.index[::13], 'Nama PJP'] = None
+    df['Quarter'] = df['Quarter'].astype('Int8')
+    df.loc[df.index[::17], 'Quarter'] = pd.NA
+    return df
+
+
+def _text_measures(df):
+    df['Fin Jumlah Dom'] = df['Fin Jumlah Dom'].astype(str)
+    return df
+
+
+def _sparse_years(df):
+    df['Year'] = np.where(df['Year'] % 2 == 0, df['Year'], df['Year'] + 1000)
+    return df
+
+
+@pytest.mark.parametrize('prepare', [
+    lambda df: df, _categorical_names, _missing_values, _missing_keys, _text_measures, _sparse_years,
+])
+@pytest.mark.parametrize('keys', [TRX_KEYS, TRX_KEYS[:3]])
+def test_aggregate_fin_matches_groupby(prepare, keys):
+    df = prepare(make_frame())
+    expected = legacy_aggregate(df, keys)
+    actual, _ = aggregate_fin(df, keys)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+
+def test_aggregate_fin_sparse_id_space(monkeypatch):
+    # Ruang id di atas batas tabel padat -> jalur np.unique
+    monkeypatch.setattr(aggregate, '_DENSE_LIMIT', 10)
+    df = make_frame()
+    pd.testing.assert_frame_equal(
+        aggregate_fin(df, TRX_KEYS)[0], legacy_aggregate(df, TRX_KEYS), check_exact=False, rtol=1e-12
+    )
+
+
+@pytest.mark.parametrize('share_cols', [['Year', 'Quarter', 'Month'], ['Year', 'Quarter'], ['Nama PJP']])
+def test_denominator_matches_transform(share_cols):
+    df = _categorical_names(make_frame())
+    out, grouped = aggregate_fin(df, TRX_KEYS)
+    expected = out.groupby(share_cols, observed=True)['Sum of Total Nom'].transform('sum').to_numpy()
+    np.testing.assert_allclose(grouped.denominator(share_cols, 'Sum of Total Nom'), expected, rtol=1e-12)
+
+
+def test_group_sums_empty_after_missing_keys():
+    df = make_frame(20)
+    df['Nama PJP'] = None
+    grouped = group_sums(df, TRX_KEYS, FIN_MEASURES)
+    assert len(grouped.keys) == 0
+    assert all(len(v) == 0 for v in grouped.sums.values())
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from service import dataset_store
+from service.cube import build_cube
+from service.dataset_store import append_workbook, read_store, store_aggregate
+from service.memo import dataset_handle
+from service.preprocess import preprocess_aggregated, preprocess_data
+from service.schema import NATIONAL_SCHEMA, TRX_SCHEMA, apply_schema
+
+
+def make_trx(years, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    rows = []
+    for year in years:
+        for month in range(1, 13):
+            for pjp in ["PT Beta", "PT Alfa", "CV Gamma", "PT alfa"]:
+                for _ in range(int(rng.integers(1, 4))):
+                    rows.append({
+                        "Nama PJP": pjp, "Year": year, "Quarter": (month - 1) // 3 + 1, "Month": month,
+                        "Fin Jumlah Inc": int(rng.integers(0, 50)), "Fin Jumlah Out": int(rng.integers(0, 50)),
+                        "Fin Jumlah Dom": int(rng.integers(0, 50)),
+                        "Fin Nilai Inc": float(rng.random() * 1e9), "Fin Nilai Out": float(rng.random() * 1e7),
+                        "Fin Nilai Dom": float(rng.random() * 3e8),
+                    })
+    return apply_schema(pd.DataFrame(rows), TRX_SCHEMA)[0]
+
+
+def make_national(years) -> pd.DataFrame:
+    df = pd.DataFrame([
+        {"Nama PJP": "Nasional", "Year": y, "Quarter": (m - 1) // 3 + 1, "Month": m,
+         "Nom Nasional Total": 1e12, "Frek Nasional Total": 1000}
+        for y in years for m in range(1, 13)
+    ])
+    return apply_schema(df, NATIONAL_SCHEMA)[0]
+
+
+@pytest.fixture
+def store_dir(tmp_path):
+    return tmp_path / "store"
+
+
+def test_store_aggregate_matches_full_preprocess(store_dir):
+    append_workbook(make_trx([2022, 2023]), make_national([2022, 2023]), store_dir)
+    revised = make_trx([2023, 2024], seed=1)
+    revised.loc[0, "Fin Nilai Inc"] = np.nan  # kolom tetap float, count tetap int
+    append_workbook(revised, make_national([2024]), store_dir)
+
+    df, _ = read_store(store_dir)
+    aggregated = store_aggregate(df)
+    assert aggregated is not None
+    expected = preprocess_data(df.copy(), is_trx=True)
+    pd.testing.assert_frame_equal(preprocess_aggregated(aggregated, is_trx=True), expected, check_exact=True)
+    pd.testing.assert_frame_equal(build_cube(dataset_handle(df), df).base, expected, check_exact=True)
+
+
+def test_only_new_partitions_are_aggregated(store_dir, monkeypatch):
+    calls = []
+    aggregate = dataset_store._partition_aggregate
+    monkeypatch.setattr(dataset_store, "_partition_aggregate", lambda part: calls.append(1) or aggregate(part))
+
+    append_workbook(make_trx([2023]), make_national([2023]), store_dir)
+    assert len(calls) == 12
+    reports = append_workbook(make_trx([2023, 2024]), make_national([2023, 2024]), store_dir)
+    assert len(calls) == 24
+    assert len(reports["trx"].unchanged) == 12
+
+    df, _ = read_store(store_dir)
+    assert len(calls) == 24
+    assert store_aggregate(df) is not None
+
+
+def test_store_aggregate_ignores_derived_frames(store_dir):
+    append_workbook(make_trx([2023]), make_national([2023]), store_dir)
+    df, _ = read_store(store_dir)
+    assert store_aggregate(df.copy()) is None
+    assert store_aggregate(df[df["Nama PJP"] != "PT Beta"]) is None
+
+
+def test_missing_aggregate_is_rebuilt(store_dir):
+    append_workbook(make_trx([2023]), make_national([2023]), store_dir)
+    for path in (store_dir / "trx").glob("aggregate-*.parquet"):
+        path.unlink()
+    # Partisi yang hilang dari disk tidak boleh tersisa di agregat
+    dataset_store._partition_path("trx", 2023, 5, store_dir).unlink()
+
+    df, _ = read_store(store_dir)
+    assert len(list((store_dir / "trx").glob("aggregate-*.parquet"))) == 1
+    assert 5 not in set(df["Month"])
+    pd.testing.assert_frame_equal(
+        preprocess_aggregated(store_aggregate(df), is_trx=True), preprocess_data(df.copy(), is_trx=True)
+    )
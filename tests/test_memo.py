@@ -0,0 +1,102 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from service.memo import dataset_handle, frame_digest, memoize
+
+
+def fresh_digest(df: pd.DataFrame) -> str:
+    """Referensi: digest dihitung ulang tanpa cache per objek."""
+    h = hashlib.sha256()
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    h.update("|".join(map(str, df.dtypes)).encode("utf-8"))
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def make_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "Nama PJP": pd.Categorical(["A", "B", "A", "C"]),
+        "Year": [2023, 2023, 2024, 2024],
+        "Sum of Fin Nilai Inc": [1.5, 2.0, np.nan, 4.0],
+    })
+
+
+def _assign(df):
+    df["Year"] = [2020, 2021, 2022, 2023]
+
+
+def _add(df):
+    df["Extra"] = 1.0
+
+
+def _drop(df):
+    df.drop(columns="Year", inplace=True)
+
+
+def _astype(df):
+    df["Year"] = df["Year"].astype(float)
+
+
+def _sort(df):
+    df.sort_values("Sum of Fin Nilai Inc", inplace=True)
+
+
+def _rename(df):
+    df.rename(columns={"Year": "Tahun"}, inplace=True)
+
+
+@pytest.mark.parametrize("mutate", [_assign, _add, _drop, _astype, _sort, _rename])
+def test_frame_digest_follows_block_mutation(mutate):
+    df = make_frame()
+    assert frame_digest(df) == fresh_digest(df)
+    mutate(df)
+    assert frame_digest(df) == fresh_digest(df)
+
+
+def test_frame_digest_is_content_based():
+    df = make_frame()
+    assert frame_digest(df) == frame_digest(make_frame())
+    assert frame_digest(df) == frame_digest(df.set_axis([10, 11, 12, 13]))
+    assert frame_digest(df) != frame_digest(df.iloc[::-1])
+
+
+def test_memoize_matches_direct_call_and_copies():
+    calls = []
+
+    @memoize(max_entries=2)
+    def total(handle, df, column):
+        calls.append(column)
+        return df.groupby("Nama PJP", observed=True)[column].sum()
+
+    df = make_frame()
+    expected = df.groupby("Nama PJP", observed=True)["Sum of Fin Nilai Inc"].sum()
+    handle = dataset_handle(df)
+    first = total(handle, df, "Sum of Fin Nilai Inc")
+    pd.testing.assert_series_equal(first, expected)
+
+    first.iloc[0] = -1.0
+    pd.testing.assert_series_equal(total(handle, df, "Sum of Fin Nilai Inc"), expected)
+    assert calls == ["Sum of Fin Nilai Inc"]
+
+    _assign(df)
+    total(dataset_handle(df), df, "Sum of Fin Nilai Inc")
+    assert len(calls) == 2
+
+
+def test_memoize_lru_and_handle_check():
+    @memoize(max_entries=2, copy=False)
+    def ident(handle, value):
+        return object()
+
+    handle = dataset_handle(make_frame(), "exclude")
+    a = ident(handle, 1)
+    ident(handle, 2)
+    assert ident(handle, 1) is a
+    ident(handle, 3)
+    assert ident.cache_len() == 2
+    assert ident(handle.with_params("x"), 1) is not a
+    with pytest.raises(TypeError):
+        ident("bukan handle", 1)
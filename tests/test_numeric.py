@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from service.numeric import coerce_numeric
+
+
+def legacy_to_number(series: pd.Series) -> pd.Series:
+    """``_to_number`` lama dari service/preprocess.py (referensi per kolom satu locale)."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series
+    s = series.astype("string").str.strip()
+    s = s.str.replace("\u00a0", "", regex=False)
+    s = s.str.replace("Rp", "", regex=False)
+    s = s.str.replace(" ", "", regex=False)
+    has_comma = s.str.contains(",", na=False)
+    has_dot = s.str.contains("\\.", na=False)
+    if bool((has_comma & has_dot).any()):
+        s = s.str.replace(".", "", regex=False)
+        s = s.str.replace(",", ".", regex=False)
+    elif bool(has_comma.any()):
+        if bool(s.str.contains(r",\d{1,2}$", regex=True, na=False).any()):
+            s = s.str.replace(",", ".", regex=False)
+        else:
+            s = s.str.replace(",", "", regex=False)
+    elif bool(has_dot.any()):
+        if not bool(s.str.contains(r"\.\d{1,2}$", regex=True, na=False).any()):
+            s = s.str.replace(".", "", regex=False)
+    s = s.str.replace(r"[^0-9\.-]", "", regex=True)
+    return pd.to_numeric(s, errors="coerce")
+
+
+@pytest.mark.parametrize("values", [
+    ["1.234,56", "12,5", "Rp 1.000.000,00"],
+    ["12,5", "7,25", "100"],
+    ["1.234", "5.678.901", "12"],
+    ["1,234", "5,678,901", "12"],
+    ["3.75", "12.5", "100"],
+    ["Rp 1.500", "Rp 2.750.000", None],
+    [" 1.234,5 ", " 12 ", ""],
+])
+def test_matches_legacy_on_single_locale_columns(values):
+    series = pd.Series(values, dtype=object)
+    got, stats = coerce_numeric(series)
+    expected = legacy_to_number(series).astype("float64")
+    np.testing.assert_allclose(got.to_numpy(), expected.to_numpy(), equal_nan=True)
+    assert stats.failed == 0
+
+
+@pytest.mark.parametrize("values, expected", [
+    (["12,5", "3.75"], [12.5, 3.75]),
+    (["1.5", "2,5"], [1.5, 2.5]),
+    (["1,234.56", "12,5"], [1234.56, 12.5]),
+    (["10,25", "7.5", "100"], [10.25, 7.5, 100.0]),
+    (["1.234,5", "2.000,25", "1234.5"], [1234.5, 2000.25, 1234.5]),
+    (["1,234.5", "2,000.75", "1234,5"], [1234.5, 2000.75, 1234.5]),
+])
+def test_mixed_locale_cells_keep_their_decimals(values, expected):
+    got, stats = coerce_numeric(pd.Series(values, dtype=object))
+    np.testing.assert_allclose(got.to_numpy(), expected)
+    assert stats.failed == 0
+    assert stats.coerced == len(values)
+
+
+def test_native_numbers_and_failures_are_counted():
+    series = pd.Series([1.5, 2, "3,5", "abc", None, "(1.000)"], dtype=object)
+    got, stats = coerce_numeric(series)
+    np.testing.assert_allclose(got.to_numpy(), [1.5, 2.0, 3.5, np.nan, np.nan, -1000.0], equal_nan=True)
+    assert stats.passthrough == 2
+    assert stats.failed == 1
+
+
+def test_numeric_dtype_passes_through():
+    series = pd.Series([1, 2, 3], name="Fin Jumlah Inc")
+    got, stats = coerce_numeric(series)
+    assert got is series
+    assert stats.passthrough == 3
@@ -0,0 +1,101 @@
+import calendar
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from service.period import MONTH, QUARTER, filter_period_frames, filter_period_range, range_positions
+
+
+def legacy_quarter_mask(df: pd.DataFrame, start: tuple[int, int], end: tuple[int, int]) -> pd.Series:
+    """Mask ``filter_by_quarter`` lama (Quarter diturunkan dari nama/angka Month kalau ada)."""
+    if 'Month' in df.columns:
+        month = df['Month'].apply(
+            lambda m: list(calendar.month_name).index(str(m)) if str(m) in calendar.month_name else int(m)
+        ).astype(int)
+        quarter = (month - 1) // 3 + 1
+    else:
+        quarter = df['Quarter']
+    (start_year, start_q), (end_year, end_q) = start, end
+    start_condition = (df['Year'] > start_year) | ((df['Year'] == start_year) & (quarter >= start_q))
+    end_condition = (df['Year'] < end_year) | ((df['Year'] == end_year) & (quarter <= end_q))
+    return start_condition & end_condition
+
+
+def legacy_trim(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
+    """Buang bulan kosong di tahun terakhir seperti ``filter_start_end_year(..., is_month=True)``."""
+    for col in cols:
+        df = df[~((df[col] == 0) & (df['Year'] == df['Year'].max()))]
+    return df
+
+
+def quarter_frame() -> pd.DataFrame:
+    years, quarters = np.divmod(np.arange(2019 * 4, 2026 * 4), 4)
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({'Year': years, 'Quarter': quarters + 1, 'Sum of Fin Nilai Inc': rng.random(len(years))})
+
+
+def month_frame(shuffle: bool = False) -> pd.DataFrame:
+    years, months = np.divmod(np.arange(2019 * 12, 2026 * 12), 12)
+    df = pd.DataFrame({
+        'Year': years,
+        'Month': pd.Categorical(np.array(calendar.month_name)[months + 1], categories=list(calendar.month_name)[1:],
+                                ordered=True),
+        'Sum of Fin Nilai Inc': np.arange(len(years), dtype=float),
+        'Sum of Fin Jumlah Inc': np.arange(len(years), dtype=float),
+    })
+    # Bulan terakhir tahun 2025 kosong di salah satu / kedua measure
+    df.loc[df.index[-3:], 'Sum of Fin Nilai Inc'] = 0.0
+    df.loc[df.index[-2:], 'Sum of Fin Jumlah Inc'] = 0.0
+    if shuffle:
+        df = df.sample(frac=1.0, random_state=1)
+    return df
+
+
+@pytest.mark.parametrize('sort', [True, False])
+def test_range_positions_matches_mask(sort):
+    rng = np.random.default_rng(2)
+    keys = rng.integers(201901, 202512, 500).astype(float)
+    if sort:
+        keys.sort()
+    else:
+        keys[::9] = np.nan
+    for start, end in [(202001, 202306), (201001, 209912), (202306, 202001), (202512, 203001), (202203, 202203)]:
+        expected = np.flatnonzero((keys >= start) & (keys <= end))
+        np.testing.assert_array_equal(range_positions(keys, start, end), expected)
+
+
+@pytest.mark.parametrize('grain, df, start, end', [
+    (QUARTER, quarter_frame(), (2020, 3), (2023, 2)),
+    (MONTH, month_frame(shuffle=True), (2021, 11), (2022, 2)),
+])
+def test_filter_period_range_matches_mask(grain, df, start, end):
+    if grain == MONTH:
+        key = df['Year'] * 100 + df['Month'].cat.codes + 1
+        mask = (key >= start[0] * 100 + start[1]) & (key <= end[0] * 100 + end[1])
+    else:
+        mask = legacy_quarter_mask(df, start, end)
+    pd.testing.assert_frame_equal(filter_period_range(df, grain, start, end), df[mask])
+
+
+@pytest.mark.parametrize('start, end', [((2020, 2), (2024, 3)), ((2019, 1), (2025, 4)), ((2025, 4), (2025, 4)),
+                                        ((2024, 3), (2020, 2))])
+@pytest.mark.parametrize('shuffle', [False, True])
+def test_filter_period_frames_matches_legacy(start, end, shuffle):
+    cols = ['Sum of Fin Nilai Inc', 'Sum of Fin Jumlah Inc']
+    quarter = quarter_frame()
+    month = month_frame(shuffle)
+    no_period = pd.DataFrame({'Nama PJP': ['A', 'B']})
+    # Frame kedua dengan sumbu periode yang sama memakai ulang mask
+    quarter_copy = quarter.assign(**{'Sum of Fin Nilai Inc': 1.0})
+
+    out = filter_period_frames(
+        {'quarter': quarter, 'month': month, 'quarter_copy': quarter_copy, 'none': no_period},
+        start, end, trim_zero={'month': cols},
+    )
+
+    pd.testing.assert_frame_equal(out['quarter'], quarter[legacy_quarter_mask(quarter, start, end)])
+    pd.testing.assert_frame_equal(out['quarter_copy'], quarter_copy[legacy_quarter_mask(quarter_copy, start, end)])
+    trimmed = legacy_trim(month, cols)
+    pd.testing.assert_frame_equal(out['month'], trimmed[legacy_quarter_mask(trimmed, start, end)])
+    assert out['none'] is no_period
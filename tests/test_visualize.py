@@ -0,0 +1,67 @@
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from service.visualize import _PLOTLY_WHITE, _FigureDraft, make_combined_bar_line_chart
+
+
+def validated_figure(draft: _FigureDraft) -> go.Figure:
+    """Referensi: figure dari konstruktor Plotly dengan validasi penuh."""
+    layout = dict(draft._layout)
+    if draft._annotations:
+        layout["annotations"] = list(layout.get("annotations") or []) + draft._annotations
+    return go.Figure(data=draft.data, layout=layout)
+
+
+def spec(fig: go.Figure) -> dict:
+    return json.loads(fig.to_json())
+
+
+def test_draft_layout_matches_validated_figure():
+    draft = _FigureDraft()
+    draft.add_trace(go.Bar(x=["Q1", "Q2"], y=np.array([1.5, 2.5]), marker=dict(color="#F5B0CB", line=dict(width=0))))
+    draft.add_trace(go.Scatter(x=["Q1", "Q2"], y=pd.Series([3.0, None]), yaxis="y2", mode="lines+markers"))
+    draft.update_layout(
+        title=dict(text="Judul", font=dict(size=22, weight=700)),
+        xaxis=dict(title="Periode", tickangle=-45, tickfont=dict(size=11)),
+        yaxis2=dict(title=dict(text="Growth (%)"), overlaying="y", side="right", range=(-5.0, np.float64(12.5))),
+        template=_PLOTLY_WHITE,
+        paper_bgcolor="white",
+        plot_bgcolor="#f9fafb",
+        hoverlabel=dict(bgcolor="white", font_size=12, font_family="Inter, Arial, sans-serif"),
+        legend_font_size=13,
+        margin=dict(l=60, r=None),
+        yaxis=dict(title=None),
+        width=None,
+    )
+    draft.update_layout(height=560, xaxis=dict(type="category", categoryarray=["Q1", "Q2"]))
+    draft.add_annotation(x="Q2", y=3.0, text="+1,0%", showarrow=False, font=dict(size=12), yshift=18)
+
+    expected = spec(validated_figure(draft))
+    actual = spec(draft.build())
+    for fig in (expected, actual):
+        for trace in fig["data"]:
+            trace.pop("uid", None)
+    assert actual == expected
+
+
+def test_growth_chart_matches_validated_figure(monkeypatch):
+    df = pd.DataFrame({
+        "Year": [2023] * 4 + [2024] * 4,
+        "Quarter": [1, 2, 3, 4] * 2,
+        "Sum of Fin Jumlah Inc": np.arange(8, dtype=float) * 1e6 + 1e6,
+    })
+    df["%YoY Jumlah Inc"] = [None] * 4 + [10.0, 20.0, -5.0, 0.0]
+    df["%QtQ Jumlah Inc"] = [None, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0]
+    build = make_combined_bar_line_chart.__wrapped__
+    kwargs = dict(font_size=15, legend_font_size=11, axis_x_tick_bold=False, chart_height=600)
+
+    actual = spec(build(df, "Jumlah", "Inc", **kwargs))
+    monkeypatch.setattr(_FigureDraft, "build", validated_figure)
+    expected = spec(build(df, "Jumlah", "Inc", **kwargs))
+    for fig in (expected, actual):
+        for trace in fig["data"]:
+            trace.pop("uid", None)
+    assert actual == expected
@@ -1,13 +1,12 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import re
 import time
 from difflib import SequenceMatcher
-import unicodedata
 from service.preprocess import set_page_visuals
-from service.fds import load_models, read_excel, read_parquets, split_df, get_ml_model, \
+from service.fds import load_models, read_excel, read_fds_uploads, \
     get_pjp_suspected_blacklisted_greylisted
+from service.fds_pipeline import PREVIEW_ROWS, iter_upload_batches, run_fds_pipeline
 from datetime import datetime
 from service.database import connect_db, connect_db_safe, get_pjp_jkt, get_blacklisted_country, get_greylisted_country, get_sus_peoples, \
     upload_df, get_user_logs_data, get_country_participated, show_db_error_banner
@@ -629,6 +628,24 @@ with st.sidebar:
         st.session_state["_fraud_db_refs"] = None
         st.session_state.pop("_tools_ltdbb_db_last_error", None)
         st.rerun()
+    st.toggle(
+        "Mode streaming (hemat memori)",
+        key="fds_streaming_mode",
+        help="Proses file per batch row group. Cocok untuk file bulanan besar; "
+             "tabel data mentah hanya menampilkan sebagian baris pertama.",
+    )
+    st.toggle(
+        "String Arrow untuk kolom teks",
+        value=True,
+        key="fds_arrow_strings",
+        help="Kolom nama/negara disimpan sebagai string[pyarrow] (buffer Arrow) "
+             "alih-alih objek str Python, sehingga jauh lebih hemat memori.",
+    )
+    st.toggle(
+        "Laporan memori kolom teks",
+        key="fds_memory_report",
+        help="Bandingkan memori kolom teks sebagai object vs string Arrow.",
+    )
 
 show_db_error_banner(clear=False)
 
@@ -712,97 +729,70 @@ if st.session_state["uploaded_files"]:
         for pjp in list_pjp_dki:
             list_pjp_code_dki.append(pjp['code'])
 
-        df = read_parquets(uploaded_files)
-
-        # Sanitize text columns to avoid rendering/wrapping errors due to invalid encodings/control chars
-        def _clean_text(val):
-            try:
-                if pd.isna(val):
-                    return val
-                s = str(val)
-                # Normalize Unicode (compatibility decomposition -> composition)
-                try:
-                    s = unicodedata.normalize("NFKC", s)
-                except Exception:
-                    pass
-                # Replace NBSP with normal space
-                s = s.replace("\u00A0", " ")
-                # Remove control characters and non-printable ranges
-                s = re.sub(r"[\u0000-\u001F\u007F-\u009F]", "", s)
-                # Remove zero-width and BOM/word joiners
-                s = re.sub(r"[\u200B\u200C\u200D\u2060\uFEFF]", "", s)
-                # Remove bidi control chars and line/paragraph separators
-                s = re.sub(r"[\u2028\u2029\u202A-\u202E\u2066-\u2069\u200E\u200F]", "", s)
-                # Remove Unicode replacement character explicitly
-                s = s.replace("\uFFFD", "")
-                # Strip stray surrogate code units if any (defensive)
-                s = re.sub(r"[\uD800-\uDFFF]", "", s)
-                # Strip stray surrogate code units if any (defensive)
-                s = s.encode("utf-8", errors="ignore").decode("utf-8", errors="ignore")
-                return s
-            except Exception:
-                # If anything goes wrong, fallback to safe string casting
-                try:
-                    return str(val)
-                except Exception:
-                    return ""
-
-        # Apply cleaning only to object/string dtype columns
-        for col in df.columns:
-            if df[col].dtype == object or str(df[col].dtype).startswith("string"):
-                df[col] = df[col].map(_clean_text)
-
-        df = df[df['SANDI_PELAPOR'].isin(list_pjp_code_dki)]
-        df.index += 1
-
-        # Determine the report type based on FORM_NO
-        form_no = df['FORM_NO'].iloc[0]
-        if form_no == "FORMG0001":
-            df_blacklisted_filter = df[df['NEGARA_TUJUAN'].isin(list_code_blacklisted)]
-            df_greylisted_filter = df[df['NEGARA_TUJUAN'].isin(list_code_greylisted)]
-            df_suspected_person_filter = df[
-                (df['NAMA_PENERIMA'].str.lower().isin([name.lower() for name in list_name_sus_person])) |
-                (df['NAMA_PENGIRIM'].str.lower().isin([name.lower() for name in list_name_sus_person]))
-                ]
-            negara_text = "ke"
-            tipe_laporan = "Outgoing"
-            list_model_name = {1 : "isolation_forest_model_out_1.joblib", 2 : "isolation_forest_model_out_2.joblib",
-                               3 : "isolation_forest_model_out_3.joblib"}
-            predict_cols = ['FREKUENSI', 'NOMINAL_TRX', 'TUJUAN']
-            selected_model = get_ml_model(tipe_laporan, models)  # dict {nama file : model}
-            df_split = split_df(df, tipe_laporan)
-        elif form_no == "FORMG0002":
-            df_blacklisted_filter = df[df['NEGARA_ASAL'].isin(list_code_blacklisted)]
-            df_greylisted_filter = df[df['NEGARA_ASAL'].isin(list_code_greylisted)]
-            df_suspected_person_filter = df[
-                (df['NAMA_PENERIMA'].str.lower().isin([name.lower() for name in list_name_sus_person])) |
-                (df['NAMA_PENGIRIM'].str.lower().isin([name.lower() for name in list_name_sus_person]))
-                ]
-            negara_text = "dari"
-            tipe_laporan = "Incoming"
-            list_model_name = ["isolation_forest_model_inc.joblib"]
-            predict_cols = ['FREKUENSI', 'NOMINAL_TRX']
-            selected_model = get_ml_model(tipe_laporan, models)
-            df_split = None
+        streaming_mode = bool(st.session_state.get("fds_streaming_mode", False))
+        arrow_strings = bool(st.session_state.get("fds_arrow_strings", True))
+        if streaming_mode:
+            # Mode streaming: diproses per batch row group, memori puncak ~ ukuran batch.
+            # Semua kolom dibaca karena tabel mentah & unduhan menampilkan baris lengkap.
+            def _batch_source():
+                return iter_upload_batches(uploaded_files, pjp_codes=list_pjp_code_dki,
+                                           arrow_strings=arrow_strings)
+            preview_rows = PREVIEW_ROWS
         else:
-            df_blacklisted_filter = None
-            df_greylisted_filter = None
-            negara_text = None
-            df_suspected_person_filter = df[
-                (df['NAMA_PENERIMA'].str.lower().isin([name.lower() for name in list_name_sus_person])) |
-                (df['NAMA_PENGIRIM'].str.lower().isin([name.lower() for name in list_name_sus_person]))
-                ]
-            tipe_laporan = "Domestik"
-            list_model_name = { 1 : "isolation_forest_model_dom_1.joblib", 2 : "isolation_forest_model_dom_2.joblib",
-                                3 : "isolation_forest_model_dom_3.joblib"}
-            predict_cols = ['FREKUENSI_PENGIRIMAN', 'NOMINAL_TRX', 'TUJUAN_TRX']
-            selected_model = get_ml_model(tipe_laporan, models)
-            df_split = split_df(df, tipe_laporan)
+            # Filter PJP DKI di-push down ke reader (row group non-DKI tidak dibaca)
+            df_all = read_fds_uploads(uploaded_files, pjp_codes=list_pjp_code_dki,
+                                      arrow_strings=arrow_strings)
+
+            def _batch_source():
+                return [df_all]
+            preview_rows = None
+
+        batch_status = st.empty()
+
+        def _on_batch(n_batch: int, n_rows: int):
+            if streaming_mode:
+                batch_status.caption(f"Memproses batch {n_batch} ({n_rows:,} baris)...")
+
+        fds_result = run_fds_pipeline(
+            _batch_source,
+            models=models,
+            list_code_blacklisted=list_code_blacklisted,
+            list_code_greylisted=list_code_greylisted,
+            list_name_sus_person=list_name_sus_person,
+            preview_rows=preview_rows,
+            on_batch=_on_batch,
+            memory_report=bool(st.session_state.get("fds_memory_report", False)),
+        )
+        batch_status.empty()
+        if fds_result is None:
+            raise ValueError("Tidak ada transaksi PJP DKI pada file yang diupload.")
+
+        df = fds_result.preview
+        form_no = fds_result.form_no
+        tipe_laporan = fds_result.tipe_laporan
+        negara_text = fds_result.negara_text
+        df_blacklisted_filter = fds_result.blacklisted
+        df_greylisted_filter = fds_result.greylisted
+        df_suspected_person_filter = fds_result.suspected_person
 
         st.success("Data berhasil terbaca!")
         st.markdown(f"## Laporan Analisis Transaksi {tipe_laporan} ({st.session_state['selected_month']}, "
                     f"{st.session_state['selected_year']})")
-        st.dataframe(df)
+        if streaming_mode:
+            st.caption(f"Mode streaming: {fds_result.total_rows:,} baris diproses dalam {fds_result.batches} batch; "
+                       f"tabel di bawah hanya menampilkan {len(df):,} baris pertama.")
+        st.dataframe(df.drop(columns=["PREDICTED"], errors="ignore"))
+        if fds_result.text_memory is not None and not fds_result.text_memory.empty:
+            mem_report = fds_result.text_memory
+            total_obj = int(mem_report["Object (byte)"].sum())
+            total_arrow = int(mem_report["Arrow (byte)"].sum())
+            with st.expander("Laporan memori kolom teks", expanded=True):
+                st.caption(
+                    f"Object: {total_obj / 1e6:,.1f} MB | Arrow: {total_arrow / 1e6:,.1f} MB"
+                    + (f" ({total_arrow / total_obj:.0%} dari object)" if total_obj else "")
+                    + (" | mode aktif: Arrow" if arrow_strings else " | mode aktif: object")
+                )
+                st.dataframe(mem_report, hide_index=True, use_container_width=True)
         st.divider()
         st.markdown(f"### Informasi Data Transaksi")
 
@@ -811,30 +801,24 @@ if st.session_state["uploaded_files"]:
 
         col1, col2 = st.columns(2)
         with col1:
-            st.write(f"**Jumlah Data Transaksi**: {len(df):,}")
-
-        if df_split:
-            for key in df_split.keys():
-                selected_model_name = list_model_name.get(key)
-                model_predict = selected_model.get(selected_model_name)
-                selected_df_split = df_split[key][predict_cols].copy()
-                original_index = df_split[key].index
-                predictions = model_predict.predict(selected_df_split)
-                negative_predictions_count = sum(pred == -1 for pred in predictions)
-                df.loc[original_index, 'PREDICTED'] = predictions
+            st.write(f"**Jumlah Data Transaksi**: {fds_result.total_rows:,}")
+
+        if "scoring" in fds_result.errors:
+            st.warning(f"Gagal melakukan scoring model transaksi mencurigakan: {fds_result.errors['scoring']}")
         else:
-            model_predict = selected_model.get(list_model_name[0])
-            predictions = model_predict.predict(df[predict_cols])
-            df['PREDICTED'] = predictions
-        negative_predictions = df[df['PREDICTED'] == -1]
-        negative_predictions['PREDICTED'] = negative_predictions['PREDICTED'].replace(-1, 'TKM')
-        negative_predictions = negative_predictions.reset_index(drop=True)
-        negative_predictions.index += 1
-        formatted_number = f"{len(negative_predictions):,}".replace(',', '.')
-        st.warning(f"Ditemukan {formatted_number} transaksi yang diduga mencurigakan.")
-        st.dataframe(negative_predictions)
+            negative_predictions = fds_result.predicted_tkm.copy()
+            if not negative_predictions.empty:
+                negative_predictions['PREDICTED'] = negative_predictions['PREDICTED'].replace(-1, 'TKM')
+            negative_predictions = negative_predictions.reset_index(drop=True)
+            negative_predictions.index += 1
+            formatted_number = f"{len(negative_predictions):,}".replace(',', '.')
+            st.warning(f"Ditemukan {formatted_number} transaksi yang diduga mencurigakan.")
+            st.dataframe(negative_predictions)
         st.divider()
 
+        if "screening_negara" in fds_result.errors:
+            st.warning(f"Gagal melakukan screening negara greylisted/blacklisted: {fds_result.errors['screening_negara']}")
+
         # Tampilkan Greylisted (ringkasan PJP & Negara) tepat di bawah Transaksi Mencurigakan dan sebelum Fuzzy
         if df_greylisted_filter is not None and not df_greylisted_filter.empty:
             st.markdown(f"### Informasi Transaksi yang dilakukan {negara_text} Negara Greylisted")
@@ -944,145 +928,41 @@ if st.session_state["uploaded_files"]:
         # - Periode: gunakan YYYY-MM dari kolom tanggal 8 digit (prioritas 'Form_Period' jika ada).
         # - Satu pengirim ke >1 penerima unik dalam 1 bulan.
         # - Nominal mirip: (max-min) < 100.000 ATAU (max-min) < 1% dari rata-rata.
+        # State per grup diakumulasi lintas batch oleh FanOutDetector (service.fds_pipeline).
         try:
             st.markdown("### Deteksi Pola Fraud: Pengirim → >1 Penerima dengan Nominal Mirip (per Periode)")
 
-            with st.spinner("Memproses deteksi pola..."):
-                df_tmp = df.copy()
-                # Simpan Row Index asli (saat ini index sudah 1-based di app)
-                df_tmp["_ROW_INDEX"] = df_tmp.index
-
-                # 1) Normalisasi kolom periode ke 'Periode' (YYYY-MM)
-                period_col = None
-                if "Form_Period" in df_tmp.columns:
-                    period_col = "Form_Period"
-                else:
-                    # fallback: cari kolom string yang tampak seperti 8 digit tanggal
-                    cand_cols = [
-                        c for c in df_tmp.columns
-                        if df_tmp[c].dtype == object or str(df_tmp[c].dtype).startswith("string")
-                    ]
-                    for c in cand_cols:
-                        try:
-                            vals = df_tmp[c].astype(str).str.replace(r"\D", "", regex=True)
-                            if vals.str.match(r"^\d{8}$").any():
-                                period_col = c
-                                break
-                        except Exception:
-                            continue
-                if period_col is not None:
-                    vals = df_tmp[period_col].astype(str).str.replace(r"\D", "", regex=True)
-                    mask8 = vals.str.match(r"^\d{8}$")
-                    periode = pd.Series(pd.NA, index=df_tmp.index, dtype="string")
-                    periode.loc[mask8] = vals.loc[mask8].str.slice(0, 4) + "-" + vals.loc[mask8].str.slice(4, 6)
-                    df_tmp["Periode"] = periode
-                else:
-                    df_tmp["Periode"] = pd.NA
-
-                # 2) Normalisasi kolom nama pengirim/penerima dan nominal
-                pengirim_col = "Nama_Pengirim" if "Nama_Pengirim" in df_tmp.columns else ("NAMA_PENGIRIM" if "NAMA_PENGIRIM" in df_tmp.columns else None)
-                penerima_col = "Nama_Penerima" if "Nama_Penerima" in df_tmp.columns else ("NAMA_PENERIMA" if "NAMA_PENERIMA" in df_tmp.columns else None)
-                nominal_col = "Nominal_TRX" if "Nominal_TRX" in df_tmp.columns else ("NOMINAL_TRX" if "NOMINAL_TRX" in df_tmp.columns else None)
-
-                if not all([pengirim_col, penerima_col, nominal_col]):
-                    st.info("Kolom yang dibutuhkan (Nama_Pengirim/NAMA_PENGIRIM, Nama_Penerima/NAMA_PENERIMA, Nominal_TRX/NOMINAL_TRX) tidak lengkap untuk deteksi pola ini.")
-                else:
-                    # Konversi nominal ke integer: buang non-digit
-                    nom_str = df_tmp[nominal_col].astype(str).str.replace(r"[^0-9]", "", regex=True)
-                    df_tmp["Nominal_TRX_int"] = pd.to_numeric(nom_str, errors="coerce").astype("Int64")
-
-                    # Filter baris yang valid untuk perhitungan
-                    base_mask = (
-                        df_tmp["Periode"].notna() &
-                        df_tmp[pengirim_col].notna() & (df_tmp[pengirim_col].astype(str).str.strip() != "") &
-                        df_tmp[penerima_col].notna() & (df_tmp[penerima_col].astype(str).str.strip() != "") &
-                        df_tmp["Nominal_TRX_int"].notna()
+            period_cols = fds_result.fanout.period_columns or fds_result.fanin.period_columns
+            if len(period_cols) > 1:
+                st.warning(f"Kolom periode berbeda antar batch ({', '.join(period_cols)}); "
+                           f"periode tiap baris diambil dari kolom yang terdeteksi di batch-nya.")
+            if "fanout" in fds_result.errors:
+                st.warning(f"Gagal melakukan deteksi pola pengirim → >1 penerima dengan nominal mirip: {fds_result.errors['fanout']}")
+            elif not fds_result.fanout.ready:
+                st.info("Kolom yang dibutuhkan (Nama_Pengirim/NAMA_PENGIRIM, Nama_Penerima/NAMA_PENERIMA, Nominal_TRX/NOMINAL_TRX) tidak lengkap untuk deteksi pola ini.")
+            else:
+                suspicious_df = fds_result.fanout.results()
+                if not suspicious_df.empty:
+                    st.write(f"Ditemukan {len(suspicious_df):,} group pengirim-periode dengan >1 penerima dan nominal mirip.")
+                    st.data_editor(
+                        suspicious_df,
+                        key="df_suspicious_fanout_mirip",
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            "Periode": "Periode (YYYY-MM)",
+                            "Nama_Pengirim": "Nama Pengirim",
+                            "Jumlah_Penerima_Unique": st.column_config.NumberColumn("Jumlah Penerima Unik", min_value=0),
+                            "Daftar_Penerima": "Daftar Penerima",
+                            "Daftar_Penerima_Semua": "Daftar Penerima (Semua Baris)",
+                            "Daftar_Nominal": "Daftar Nominal",
+                            "Row_Index": "Row Index Asli",
+                            "Flag": "Flag",
+                            "Keterangan_Kemiripan": "Keterangan",
+                        }
                     )
-                    df_work = df_tmp.loc[base_mask, [
-                        "Periode", pengirim_col, penerima_col, "Nominal_TRX_int", "_ROW_INDEX"
-                    ]].copy()
-
-                    if df_work.empty:
-                        st.info("Tidak ada data yang valid untuk deteksi pola ini.")
-                    else:
-                        results = []
-                        # Group by Periode & Pengirim dengan progress bar dan ETA
-                        grouped = list(df_work.groupby(["Periode", pengirim_col], dropna=False))
-                        total_groups = len(grouped)
-                        prog = st.progress(0, text="Mengolah grup (fan-out)...")
-                        eta_placeholder = st.empty()
-                        start_time = time.time()
-                        for idx, ((periode, pengirim), g) in enumerate(grouped, start=1):
-                            # Daftar penerima unik
-                            penerima_list = (
-                                g[penerima_col].astype(str).str.strip().replace("", pd.NA).dropna().unique().tolist()
-                            )
-                            # Daftar penerima semua baris (tanpa deduplikasi)
-                            penerima_semua = g[penerima_col].astype(str).str.strip().tolist()
-                            jml_penerima = len(penerima_list)
-
-                            # Daftar nominal & indeks baris
-                            nom_list = g["Nominal_TRX_int"].dropna().astype(int).tolist()
-                            row_idx = g["_ROW_INDEX"].tolist()
-
-                            if jml_penerima > 1 and len(nom_list) >= 2:
-                                arr = np.array(nom_list, dtype=np.int64)
-                                rng = int(arr.max() - arr.min())
-                                avg = float(arr.mean()) if arr.size > 0 else 0.0
-                                identik = bool(arr.size > 0 and np.all(arr == arr[0]))
-                                similar = identik or (rng < 100_000) or (rng < 0.01 * avg)
-                                if similar:
-                                    if identik:
-                                        ket = "Identik"
-                                    elif rng < 100_000:
-                                        ket = "Range < 100k"
-                                    elif rng < 0.01 * avg:
-                                        ket = "Range < 1% rata-rata"
-                                    else:
-                                        ket = "Mirip"
-                                    results.append({
-                                        "Periode": periode,
-                                        "Nama_Pengirim": pengirim,
-                                        "Jumlah_Penerima_Unique": jml_penerima,
-                                        "Daftar_Penerima": penerima_list,
-                                        "Daftar_Penerima_Semua": penerima_semua,
-                                        "Daftar_Nominal": nom_list,
-                                        "Row_Index": row_idx,
-                                        "Flag": "Suspicious",
-                                        "Keterangan_Kemiripan": ket,
-                                    })
-                            # update progress & ETA
-                            elapsed = time.time() - start_time
-                            rate = elapsed / idx if idx > 0 else 0
-                            remaining = (total_groups - idx) * rate
-                            prog.progress(min(idx / total_groups, 1.0), text=f"Mengolah grup (fan-out)... {idx}/{total_groups}")
-                            eta_placeholder.caption(f"Perkiraan sisa waktu: {int(max(remaining,0)//60)} menit {int(max(remaining,0)%60)} detik")
-
-                        prog.progress(1.0, text="Selesai (fan-out)")
-                        eta_placeholder.empty()
-
-                        suspicious_df = pd.DataFrame(results)
-                        if not suspicious_df.empty:
-                            st.write(f"Ditemukan {len(suspicious_df):,} group pengirim-periode dengan >1 penerima dan nominal mirip.")
-                            st.data_editor(
-                                suspicious_df,
-                                key="df_suspicious_fanout_mirip",
-                                hide_index=True,
-                                use_container_width=True,
-                                column_config={
-                                    "Periode": "Periode (YYYY-MM)",
-                                    "Nama_Pengirim": "Nama Pengirim",
-                                    "Jumlah_Penerima_Unique": st.column_config.NumberColumn("Jumlah Penerima Unik", min_value=0),
-                                    "Daftar_Penerima": "Daftar Penerima",
-                                    "Daftar_Penerima_Semua": "Daftar Penerima (Semua Baris)",
-                                    "Daftar_Nominal": "Daftar Nominal",
-                                    "Row_Index": "Row Index Asli",
-                                    "Flag": "Flag",
-                                    "Keterangan_Kemiripan": "Keterangan",
-                                }
-                            )
-                        else:
-                            st.info("Tidak ditemukan pola pengirim → >1 penerima dengan nominal mirip pada periode yang sama.")
+                else:
+                    st.info("Tidak ditemukan pola pengirim → >1 penerima dengan nominal mirip pada periode yang sama.")
             st.divider()
         except Exception as _fanout_err:
             st.warning(f"Gagal melakukan deteksi pola pengirim → >1 penerima dengan nominal mirip: {_fanout_err}")
@@ -1094,125 +974,31 @@ if st.session_state["uploaded_files"]:
         # - Nominal mirip: (max-min) < 100.000 ATAU (max-min) < 1% dari rata-rata, ATAU ada nominal identik antar pengirim.
         try:
             st.markdown("### Deteksi Pola Fraud: Penerima ← >1 Pengirim dengan Nominal Mirip/Identik (per Periode)")
-            with st.spinner("Memproses deteksi pola fan-in..."):
-                df_tmp2 = df.copy()
-                df_tmp2["_ROW_INDEX"] = df_tmp2.index
-
-                # Normalisasi Periode (YYYY-MM)
-                period_col2 = None
-                if "Form_Period" in df_tmp2.columns:
-                    period_col2 = "Form_Period"
-                else:
-                    cand_cols2 = [
-                        c for c in df_tmp2.columns
-                        if df_tmp2[c].dtype == object or str(df_tmp2[c].dtype).startswith("string")
-                    ]
-                    for c in cand_cols2:
-                        try:
-                            vals = df_tmp2[c].astype(str).str.replace(r"\D", "", regex=True)
-                            if vals.str.match(r"^\d{8}$").any():
-                                period_col2 = c
-                                break
-                        except Exception:
-                            continue
-                if period_col2 is not None:
-                    vals2 = df_tmp2[period_col2].astype(str).str.replace(r"\D", "", regex=True)
-                    mask82 = vals2.str.match(r"^\d{8}$")
-                    periode2 = pd.Series(pd.NA, index=df_tmp2.index, dtype="string")
-                    periode2.loc[mask82] = vals2.loc[mask82].str.slice(0, 4) + "-" + vals2.loc[mask82].str.slice(4, 6)
-                    df_tmp2["Periode"] = periode2
-                else:
-                    df_tmp2["Periode"] = pd.NA
-
-                penerima_col2 = "Nama_Penerima" if "Nama_Penerima" in df_tmp2.columns else ("NAMA_PENERIMA" if "NAMA_PENERIMA" in df_tmp2.columns else None)
-                pengirim_col2 = "Nama_Pengirim" if "Nama_Pengirim" in df_tmp2.columns else ("NAMA_PENGIRIM" if "NAMA_PENGIRIM" in df_tmp2.columns else None)
-                nominal_col2 = "Nominal_TRX" if "Nominal_TRX" in df_tmp2.columns else ("NOMINAL_TRX" if "NOMINAL_TRX" in df_tmp2.columns else None)
-
-                if not all([penerima_col2, pengirim_col2, nominal_col2]):
-                    st.info("Kolom yang dibutuhkan (Nama_Penerima/NAMA_PENERIMA, Nama_Pengirim/NAMA_PENGIRIM, Nominal_TRX/NOMINAL_TRX) tidak lengkap untuk deteksi pola ini.")
-                else:
-                    nom_str2 = df_tmp2[nominal_col2].astype(str).str.replace(r"[^0-9]", "", regex=True)
-                    df_tmp2["Nominal_TRX_int"] = pd.to_numeric(nom_str2, errors="coerce").astype("Int64")
-
-                    base_mask2 = (
-                        df_tmp2["Periode"].notna() &
-                        df_tmp2[penerima_col2].notna() & (df_tmp2[penerima_col2].astype(str).str.strip() != "") &
-                        df_tmp2[pengirim_col2].notna() & (df_tmp2[pengirim_col2].astype(str).str.strip() != "") &
-                        df_tmp2["Nominal_TRX_int"].notna()
+            if "fanin" in fds_result.errors:
+                st.warning(f"Gagal melakukan deteksi pola penerima ← >1 pengirim dengan nominal mirip/identik: {fds_result.errors['fanin']}")
+            elif not fds_result.fanin.ready:
+                st.info("Kolom yang dibutuhkan (Nama_Penerima/NAMA_PENERIMA, Nama_Pengirim/NAMA_PENGIRIM, Nominal_TRX/NOMINAL_TRX) tidak lengkap untuk deteksi pola ini.")
+            else:
+                suspicious_df2 = fds_result.fanin.results()
+                if not suspicious_df2.empty:
+                    st.write(f"Ditemukan {len(suspicious_df2):,} group penerima-periode dengan >1 pengirim dan nominal mirip/identik.")
+                    st.data_editor(
+                        suspicious_df2,
+                        key="df_suspicious_fanin_mirip",
+                        hide_index=True,
+                        use_container_width=True,
+                        column_config={
+                            "Periode": "Periode (YYYY-MM)",
+                            "Nama_Penerima": "Nama Penerima",
+                            "Jumlah_Pengirim_Unique": st.column_config.NumberColumn("Jumlah Pengirim Unik", min_value=0),
+                            "Daftar_Pengirim": "Daftar Pengirim",
+                            "Daftar_Nominal": "Daftar Nominal",
+                            "Row_Index": "Row Index Asli",
+                            "Flag": "Flag",
+                        }
                     )
-                    df_work2 = df_tmp2.loc[base_mask2, [
-                        "Periode", penerima_col2, pengirim_col2, "Nominal_TRX_int", "_ROW_INDEX"
-                    ]].copy()
-
-                    if df_work2.empty:
-                        st.info("Tidak ada data yang valid untuk deteksi pola fan-in.")
-                    else:
-                        results2 = []
-                        grouped2 = list(df_work2.groupby(["Periode", penerima_col2], dropna=False))
-                        total_groups2 = len(grouped2)
-                        prog2 = st.progress(0, text="Mengolah grup (fan-in)...")
-                        eta_placeholder2 = st.empty()
-                        start_time2 = time.time()
-                        for idx2, ((periode_v, penerima_v), g2) in enumerate(grouped2, start=1):
-                            pengirim_unique2 = (
-                                g2[pengirim_col2].astype(str).str.strip().replace("", pd.NA).dropna().unique().tolist()
-                            )
-                            jml_pengirim2 = len(pengirim_unique2)
-
-                            nom_list2 = g2["Nominal_TRX_int"].dropna().astype(int).tolist()
-                            row_idx2 = g2["_ROW_INDEX"].tolist()
-
-                            if jml_pengirim2 > 1 and len(nom_list2) >= 2:
-                                arr2 = np.array(nom_list2, dtype=np.int64)
-                                rng2 = int(arr2.max() - arr2.min())
-                                avg2 = float(arr2.mean()) if arr2.size > 0 else 0.0
-                                similar2 = (rng2 < 100_000) or (avg2 > 0 and rng2 < 0.01 * avg2)
-
-                                # Nominal identik antar pengirim (ada nilai nominal yang dikirim >=2 pengirim berbeda)
-                                g_nom_sender2 = g2[[pengirim_col2, "Nominal_TRX_int"]].dropna()
-                                dup_across_senders2 = (g_nom_sender2.groupby("Nominal_TRX_int")[pengirim_col2].nunique() >= 2).any()
-
-                                if similar2 or dup_across_senders2:
-                                    results2.append({
-                                        "Periode": periode_v,
-                                        "Nama_Penerima": penerima_v,
-                                        "Jumlah_Pengirim_Unique": jml_pengirim2,
-                                        "Daftar_Pengirim": pengirim_unique2,
-                                        "Daftar_Nominal": nom_list2,
-                                        "Row_Index": row_idx2,
-                                        "Flag": "Suspicious",
-                                    })
-
-                            # update progress & ETA
-                            elapsed2 = time.time() - start_time2
-                            rate2 = elapsed2 / idx2 if idx2 > 0 else 0
-                            remaining2 = (total_groups2 - idx2) * rate2
-                            prog2.progress(min(idx2 / total_groups2, 1.0), text=f"Mengolah grup (fan-in)... {idx2}/{total_groups2}")
-                            eta_placeholder2.caption(f"Perkiraan sisa waktu: {int(max(remaining2,0)//60)} menit {int(max(remaining2,0)%60)} detik")
-
-                        prog2.progress(1.0, text="Selesai (fan-in)")
-                        eta_placeholder2.empty()
-
-                        suspicious_df2 = pd.DataFrame(results2)
-                        if not suspicious_df2.empty:
-                            st.write(f"Ditemukan {len(suspicious_df2):,} group penerima-periode dengan >1 pengirim dan nominal mirip/identik.")
-                            st.data_editor(
-                                suspicious_df2,
-                                key="df_suspicious_fanin_mirip",
-                                hide_index=True,
-                                use_container_width=True,
-                                column_config={
-                                    "Periode": "Periode (YYYY-MM)",
-                                    "Nama_Penerima": "Nama Penerima",
-                                    "Jumlah_Pengirim_Unique": st.column_config.NumberColumn("Jumlah Pengirim Unik", min_value=0),
-                                    "Daftar_Pengirim": "Daftar Pengirim",
-                                    "Daftar_Nominal": "Daftar Nominal",
-                                    "Row_Index": "Row Index Asli",
-                                    "Flag": "Flag",
-                                }
-                            )
-                        else:
-                            st.info("Tidak ditemukan pola penerima ← >1 pengirim dengan nominal mirip/identik pada periode yang sama.")
+                else:
+                    st.info("Tidak ditemukan pola penerima ← >1 pengirim dengan nominal mirip/identik pada periode yang sama.")
             st.divider()
         except Exception as _fanin_err:
             st.warning(f"Gagal melakukan deteksi pola penerima ← >1 pengirim dengan nominal mirip/identik: {_fanin_err}")
@@ -1221,59 +1007,14 @@ if st.session_state["uploaded_files"]:
         # ======= Deteksi Rata-rata Nominal per Transaksi > 100.000.000 =======
         try:
             st.markdown("### Deteksi Rata-rata Nominal per Transaksi > 100.000.000")
-            freq_col = None
-            if "FREKUENSI" in df.columns:
-                freq_col = "FREKUENSI"
-            elif "FREKUENSI_PENGIRIMAN" in df.columns:
-                freq_col = "FREKUENSI_PENGIRIMAN"
-
-            if (freq_col is not None) and ("NOMINAL_TRX" in df.columns):
-                df_avg = df.copy()
-                df_avg["_NOMINAL_TRX"] = pd.to_numeric(df_avg["NOMINAL_TRX"], errors="coerce")
-                df_avg["_FREK"] = pd.to_numeric(df_avg[freq_col], errors="coerce")
-                # Hindari bagi 0 / NaN
-                valid_mask = df_avg["_NOMINAL_TRX"].notna() & df_avg["_FREK"].notna() & (df_avg["_FREK"] > 0)
-                df_avg_valid = df_avg[valid_mask].copy()
-                df_avg_valid["RATA2_NOMINAL_PER_TRX"] = df_avg_valid["_NOMINAL_TRX"] / df_avg_valid["_FREK"]
-                over_mask = df_avg_valid["RATA2_NOMINAL_PER_TRX"] > 100_000_000
-                df_over_avg = df_avg_valid[over_mask].copy()
+            freq_col = fds_result.freq_col
+
+            if "over_avg" in fds_result.errors:
+                st.warning(f"Gagal menghitung rata-rata nominal per transaksi: {fds_result.errors['over_avg']}")
+            elif fds_result.over_avg is not None:
+                df_over_avg = fds_result.over_avg
                 if not df_over_avg.empty:
                     st.write(f"Ditemukan {len(df_over_avg):,} baris dengan rata-rata > 100.000.000.")
-                    # Tambahan: deteksi kolom periode form (8 digit, format YYYYMMDD)
-                    candidate_period_cols = [
-                        c for c in df_over_avg.columns
-                        if df_over_avg[c].dtype == object or str(df_over_avg[c].dtype).startswith("string")
-                    ]
-                    period_col = None
-                    period_mask_map = {}
-                    for c in candidate_period_cols:
-                        try:
-                            vals = df_over_avg[c].astype(str).str.replace(r"\D", "", regex=True)
-                            mask8 = vals.str.match(r"^\d{8}$")
-                            if mask8.any():
-                                period_col = c
-                                period_mask_map[c] = vals
-                                break
-                        except Exception:
-                            continue
-
-                    if period_col is not None:
-                        vals = period_mask_map.get(period_col)
-                        if vals is None:
-                            vals = df_over_avg[period_col].astype(str).str.replace(r"\D", "", regex=True)
-                        bulan_map = {
-                            "01": "Januari", "02": "Februari", "03": "Maret", "04": "April",
-                            "05": "Mei", "06": "Juni", "07": "Juli", "08": "Agustus",
-                            "09": "September", "10": "Oktober", "11": "November", "12": "Desember"
-                        }
-                        valid8 = vals.str.match(r"^\d{8}$")
-                        df_over_avg["FORM_PERIODE_RAW"] = df_over_avg[period_col]
-                        df_over_avg.loc[valid8, "FORM_PERIODE_TAHUN"] = vals[valid8].str.slice(0, 4)
-                        df_over_avg.loc[valid8, "FORM_PERIODE_BULAN"] = vals[valid8].str.slice(4, 6)
-                        if "FORM_PERIODE_BULAN" in df_over_avg.columns:
-                            df_over_avg["FORM_PERIODE_NAMA_BULAN"] = df_over_avg["FORM_PERIODE_BULAN"].map(bulan_map)
-                        else:
-                            df_over_avg["FORM_PERIODE_NAMA_BULAN"] = pd.NA
 
                     # Susun kolom yang ditampilkan: utamakan nominal, frekuensi, rata-rata
                     show_cols = []
@@ -1313,6 +1054,8 @@ if st.session_state["uploaded_files"]:
             st.warning(f"Gagal menghitung rata-rata nominal per transaksi: {_avg_err}")
 
 
+        if "screening_nama" in fds_result.errors:
+            st.warning(f"Gagal melakukan screening nama terduga: {fds_result.errors['screening_nama']}")
         if not df_suspected_person_filter.empty:
             st.markdown(f"### Informasi Transaksi dengan Nama Pengirim atau Nama Penerima Terduga")
             list_pjp_name = get_pjp_suspected_blacklisted_greylisted(df_suspected_person_filter, list_pjp_dki)
@@ -1,149 +1,19 @@
 import pandas as pd
 import streamlit as st
-from datetime import date
 
 from service.preprocess import *
 from service.visualize import *
+from service.contribution import GrowthContribution
+from service.cube import build_cube
+from service.growth import TOTAL_MEASURES, flow_pair_view, overall_detail_view, total_view
+from service.memo import dataset_handle
+from service.multilicense import apply_multilicense_mode
+from service.national import build_national_dataset
+from service.period import MONTH, QUARTER, filter_period_frames
+from service.pjp_matrix import PjpPeriodMatrix, previous_period
 from service.formatting import format_en_decimal, format_id_decimal, format_id_percent, qround_float
 
 
-# Rules multilicense: aktif mulai tanggal efektif (inclusive)
-_MULTILICENSE_RULES: list[dict] = [
-    {"sandi": "777930115", "pjp": "Brankas Teknologi Indonesia", "effective": date(2024, 9, 20)},
-    {"sandi": "777930112", "pjp": "Durian Pay Indonesia", "effective": date(2025, 6, 25)},
-    {"sandi": "777962497", "pjp": "Ionpay Network", "effective": date(2021, 7, 1)},
-    {"sandi": "777930038", "pjp": "Kharisma Catur Mandala", "effective": date(2021, 7, 1)},
-    {"sandi": "777962104", "pjp": "MCP Indo Utama", "effective": date(2021, 7, 1)},
-    {"sandi": "777930118", "pjp": "Smart Fintech For You", "effective": date(2024, 4, 24)},
-]
-
-
-def _norm_text(value) -> str:
-    if value is None:
-        return ""
-    return " ".join(str(value).strip().lower().split())
-
-
-def _month_to_int(value) -> int | None:
-    if value is None:
-        return None
-
-    if isinstance(value, (int, float)):
-        m = int(value)
-        return m if 1 <= m <= 12 else None
-
-    s = str(value).strip().lower()
-    if not s:
-        return None
-
-    if s.isdigit():
-        m = int(s)
-        return m if 1 <= m <= 12 else None
-
-    month_en = {
-        "january": 1, "february": 2, "march": 3, "april": 4,
-        "may": 5, "june": 6, "july": 7, "august": 8,
-        "september": 9, "october": 10, "november": 11, "december": 12,
-    }
-    month_id = {
-        "januari": 1, "februari": 2, "maret": 3, "april": 4,
-        "mei": 5, "juni": 6, "juli": 7, "agustus": 8,
-        "september": 9, "oktober": 10, "november": 11, "desember": 12,
-    }
-
-    return month_en.get(s) or month_id.get(s)
-
-
-def _effective_period_date(df: pd.DataFrame) -> pd.Series:
-    """Bangun tanggal periode untuk evaluasi aturan multilicense.
-
-    - Jika ada Month: gunakan akhir bulan (agar periode bulanan representatif)
-    - Jika hanya Quarter: gunakan akhir kuartal
-    - Jika tidak ada keduanya: gunakan akhir tahun
-    """
-    year = pd.to_numeric(df.get("Year"), errors="coerce")
-
-    month_series = None
-    if "Month" in df.columns:
-        month_series = df["Month"].map(_month_to_int)
-    elif "Quarter" in df.columns:
-        q = pd.to_numeric(df["Quarter"], errors="coerce")
-        month_series = (q * 3).astype("Int64")
-    else:
-        month_series = pd.Series([12] * len(df), index=df.index)
-
-    month_num = pd.to_numeric(month_series, errors="coerce")
-    out = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
-
-    valid = year.notna() & month_num.notna()
-    if valid.any():
-        y = year[valid].astype(int)
-        m = month_num[valid].astype(int)
-        # akhir bulan
-        out.loc[valid] = pd.to_datetime(
-            {"year": y, "month": m, "day": 1}, errors="coerce"
-        ) + pd.offsets.MonthEnd(0)
-
-    return out
-
-
-def _multilicense_mask(df: pd.DataFrame) -> pd.Series:
-    if df is None or df.empty:
-        return pd.Series([], dtype=bool)
-
-    name_col = "Nama PJP" if "Nama PJP" in df.columns else ("PJP" if "PJP" in df.columns else None)
-    code_candidates = ["Sandi PJP", "Sandi_PJP", "SandiPJP", "Kode PJP", "Kode_PJP", "Kode"]
-    code_col = next((c for c in code_candidates if c in df.columns), None)
-
-    if name_col is None and code_col is None:
-        return pd.Series([False] * len(df), index=df.index)
-
-    period_date = _effective_period_date(df)
-
-    if name_col is not None:
-        name_norm = df[name_col].astype(str).map(_norm_text)
-    else:
-        name_norm = pd.Series([""] * len(df), index=df.index)
-
-    if code_col is not None:
-        code_norm = (
-            df[code_col]
-            .astype("string")
-            .str.replace(r"\D", "", regex=True)
-            .fillna("")
-            .astype(str)
-        )
-    else:
-        code_norm = pd.Series([""] * len(df), index=df.index)
-
-    mask = pd.Series([False] * len(df), index=df.index)
-    for rule in _MULTILICENSE_RULES:
-        r_name = _norm_text(rule.get("pjp"))
-        r_code = str(rule.get("sandi", "")).strip()
-        r_date = pd.Timestamp(rule.get("effective"))
-
-        hit_name = (name_norm == r_name) if r_name else pd.Series([False] * len(df), index=df.index)
-        hit_code = (code_norm == r_code) if r_code else pd.Series([False] * len(df), index=df.index)
-        hit_entity = hit_name | hit_code
-
-        # aktif multilicense hanya saat periode >= tanggal efektif
-        hit_period = period_date.notna() & (period_date >= r_date)
-        mask = mask | (hit_entity & hit_period)
-
-    return mask
-
-
-def _apply_multilicense_mode(df: pd.DataFrame, mode: str) -> tuple[pd.DataFrame, pd.Series]:
-    """mode: include | exclude"""
-    if df is None or df.empty:
-        return df, pd.Series([], dtype=bool)
-
-    mask_ml = _multilicense_mask(df)
-    if str(mode) == "exclude":
-        return df.loc[~mask_ml].copy(), mask_ml
-    return df.copy(), mask_ml
-
-
 def _triwulan_label(year: int, quarter: int) -> str:
     roman = {1: "I", 2: "II", 3: "III", 4: "IV"}
     q = roman.get(int(quarter), str(quarter))
@@ -177,8 +47,11 @@ def _fmt_id_percent(value: float | None, decimals: int = 2) -> str:
     return format_id_percent(value, decimals=int(decimals), show_sign=True, none="-", space_before_percent=False)
 
 
+_PJP_DETAIL_FLOWS = {"Incoming": "Inc", "Outgoing": "Out", "Domestik": "Dom", "Total": "Total"}
+
+
 def _pjp_metric_value(
-    df_base: pd.DataFrame,
+    pjp_matrix: PjpPeriodMatrix,
     *,
     year: int,
     quarter: int,
@@ -186,55 +59,27 @@ def _pjp_metric_value(
     flow: str,
     measure: str,
 ) -> float | None:
-    """Get aggregated value for a PJP-period.
+    """Get aggregated value for a PJP-period (all PJPs when ``pjp_name`` is empty).
 
     flow: Incoming|Outgoing|Domestik|Total
     measure: Nilai|Jumlah
     """
-    if df_base is None or df_base.empty:
+    if pjp_matrix is None or str(flow) not in _PJP_DETAIL_FLOWS:
         return None
-    if not {"Nama PJP", "Year", "Quarter"}.issubset(set(df_base.columns)):
+    # Series per PJP di-memo di matriks (key year, quarter, flow, measure)
+    values = pjp_matrix.series(int(year), int(quarter), _PJP_DETAIL_FLOWS[str(flow)], str(measure))
+    if values.empty:
         return None
-
-    dfc = df_base
-    cur = dfc[(dfc["Year"].astype(int) == int(year)) & (dfc["Quarter"].astype(int) == int(quarter))]
     if pjp_name:
-        cur = cur[cur["Nama PJP"].astype(str) == str(pjp_name)]
-    if cur.empty:
-        return None
-
-    measure = str(measure)
-    flow = str(flow)
-
-    col_map = {
-        ("Nilai", "Incoming"): "Sum of Fin Nilai Inc",
-        ("Nilai", "Outgoing"): "Sum of Fin Nilai Out",
-        ("Nilai", "Domestik"): "Sum of Fin Nilai Dom",
-        ("Jumlah", "Incoming"): "Sum of Fin Jumlah Inc",
-        ("Jumlah", "Outgoing"): "Sum of Fin Jumlah Out",
-        ("Jumlah", "Domestik"): "Sum of Fin Jumlah Dom",
-    }
-
-    if flow == "Total":
-        cols = [
-            col_map.get((measure, "Incoming")),
-            col_map.get((measure, "Outgoing")),
-            col_map.get((measure, "Domestik")),
-        ]
-        cols = [c for c in cols if c and c in cur.columns]
-        if not cols:
+        if str(pjp_name) not in values.index:
             return None
-        return float(pd.to_numeric(cur[cols].sum(axis=1), errors="coerce").fillna(0).sum())
-
-    col = col_map.get((measure, flow))
-    if not col or col not in cur.columns:
-        return None
-    return float(pd.to_numeric(cur[col], errors="coerce").fillna(0).sum())
+        return float(values[str(pjp_name)])
+    return float(values.sum())
 
 
 def _render_pjp_supporting_tw_table(
     *,
-    df_base: pd.DataFrame,
+    contribution: GrowthContribution,
     year: int,
     quarter: int,
     key_prefix: str,
@@ -247,99 +92,14 @@ def _render_pjp_supporting_tw_table(
         "membentuk Triwulan a/b/c, lalu menghitung QtQ (c/b) dan YoY (c/a)."
     )
 
-    def _series_pjp_value(
-        *,
-        y: int,
-        q: int,
-        flow: str,
-        measure: str,
-    ) -> pd.Series:
-        if df_base is None or df_base.empty:
-            return pd.Series(dtype=float)
-        needed_cols = {"Nama PJP", "Year", "Quarter"}
-        if not needed_cols.issubset(set(df_base.columns)):
-            return pd.Series(dtype=float)
-
-        dfp = df_base[(df_base["Year"].astype(int) == int(y)) & (df_base["Quarter"].astype(int) == int(q))].copy()
-        if dfp.empty:
-            return pd.Series(dtype=float)
-
-        flow = str(flow)
-        measure = str(measure)
-
-        col_map = {
-            ("Nilai", "Incoming"): "Sum of Fin Nilai Inc",
-            ("Nilai", "Outgoing"): "Sum of Fin Nilai Out",
-            ("Nilai", "Domestik"): "Sum of Fin Nilai Dom",
-            ("Jumlah", "Incoming"): "Sum of Fin Jumlah Inc",
-            ("Jumlah", "Outgoing"): "Sum of Fin Jumlah Out",
-            ("Jumlah", "Domestik"): "Sum of Fin Jumlah Dom",
-        }
-
-        if flow == "Total":
-            cols = [
-                col_map.get((measure, "Incoming")),
-                col_map.get((measure, "Outgoing")),
-                col_map.get((measure, "Domestik")),
-            ]
-            cols = [c for c in cols if c and c in dfp.columns]
-            if not cols:
-                return pd.Series(dtype=float)
-            dfp["__val__"] = pd.to_numeric(dfp[cols].sum(axis=1), errors="coerce").fillna(0.0)
-        else:
-            col = col_map.get((measure, flow))
-            if not col or col not in dfp.columns:
-                return pd.Series(dtype=float)
-            dfp["__val__"] = pd.to_numeric(dfp[col], errors="coerce").fillna(0.0)
-
-        s = dfp.groupby("Nama PJP", observed=False)["__val__"].sum()
-        s.index = s.index.astype(str)
-        return s
+    pjp_matrix = contribution.matrix
 
     def _pick_driver_by_direction(*, flow: str, basis: str) -> str | None:
-        """Pick a driver PJP that matches total direction.
-
-        If total delta is positive/zero, pick the largest positive delta PJP.
-        If total delta is negative, pick the most negative delta PJP.
-        Falls back to absolute delta, then to largest current nominal.
-        """
-
-        basis_u = str(basis).upper()
-        flow = str(flow)
-
-        cur = _series_pjp_value(y=int(year), q=int(quarter), flow=flow, measure="Nilai")
-        if basis_u == "YOY":
-            prev = _series_pjp_value(y=int(year) - 1, q=int(quarter), flow=flow, measure="Nilai")
-        else:
-            prev_y, prev_q = _prev_quarter(int(year), int(quarter))
-            prev = _series_pjp_value(y=int(prev_y), q=int(prev_q), flow=flow, measure="Nilai")
-
-        if cur.empty and prev.empty:
+        """Driver PJP searah total delta Nilai (lihat ``GrowthContribution.driver``)."""
+        if str(flow) not in _PJP_DETAIL_FLOWS:
             return None
-
-        all_idx = cur.index.union(prev.index)
-        cur2 = cur.reindex(all_idx).fillna(0.0)
-        prev2 = prev.reindex(all_idx).fillna(0.0)
-        delta = cur2 - prev2
-
-        total_delta = float(delta.sum())
-
-        if total_delta < 0:
-            neg = delta[delta < 0]
-            if not neg.empty:
-                return str(neg.sort_values(ascending=True).index[0])
-        else:
-            pos = delta[delta > 0]
-            if not pos.empty:
-                return str(pos.sort_values(ascending=False).index[0])
-
-        if not delta.empty and float(delta.abs().max()) != 0.0:
-            return str(delta.abs().sort_values(ascending=False).index[0])
-
-        if not cur2.empty and float(cur2.max()) != 0.0:
-            return str(cur2.sort_values(ascending=False).index[0])
-
-        return None
+        kind = "yoy" if str(basis).upper() == "YOY" else "prev"
+        return contribution.driver(kind, int(year), int(quarter), _PJP_DETAIL_FLOWS[str(flow)], "Nilai")
 
 
     def _fmt_tril_id(amount_rp: float | None) -> str:
@@ -367,9 +127,9 @@ def _render_pjp_supporting_tw_table(
         flow = str(flow)
         prev_y, prev_q = _prev_quarter(int(year), int(quarter))
 
-        cur_total = _pjp_metric_value(df_base, year=int(year), quarter=int(quarter), pjp_name="", flow=flow, measure="Nilai")
-        prevq_total = _pjp_metric_value(df_base, year=int(prev_y), quarter=int(prev_q), pjp_name="", flow=flow, measure="Nilai")
-        prevy_total = _pjp_metric_value(df_base, year=int(year) - 1, quarter=int(quarter), pjp_name="", flow=flow, measure="Nilai")
+        cur_total = _pjp_metric_value(pjp_matrix, year=int(year), quarter=int(quarter), pjp_name="", flow=flow, measure="Nilai")
+        prevq_total = _pjp_metric_value(pjp_matrix, year=int(prev_y), quarter=int(prev_q), pjp_name="", flow=flow, measure="Nilai")
+        prevy_total = _pjp_metric_value(pjp_matrix, year=int(year) - 1, quarter=int(quarter), pjp_name="", flow=flow, measure="Nilai")
 
         delta_q = None if (cur_total is None or prevq_total is None) else (cur_total - prevq_total)
         delta_y = None if (cur_total is None or prevy_total is None) else (cur_total - prevy_total)
@@ -392,8 +152,8 @@ def _render_pjp_supporting_tw_table(
             else:
                 y0, q0 = _prev_quarter(int(year), int(quarter))
 
-            v_cur = _pjp_metric_value(df_base, year=int(year), quarter=int(quarter), pjp_name=pjp, flow=flow, measure="Nilai")
-            v_prev = _pjp_metric_value(df_base, year=int(y0), quarter=int(q0), pjp_name=pjp, flow=flow, measure="Nilai")
+            v_cur = _pjp_metric_value(pjp_matrix, year=int(year), quarter=int(quarter), pjp_name=pjp, flow=flow, measure="Nilai")
+            v_prev = _pjp_metric_value(pjp_matrix, year=int(y0), quarter=int(q0), pjp_name=pjp, flow=flow, measure="Nilai")
             d = None if (v_cur is None or v_prev is None) else (v_cur - v_prev)
             p = _pct_growth(v_cur, v_prev)
 
@@ -501,8 +261,8 @@ def _render_pjp_supporting_tw_table(
 
     # Editor (optional override)
     pjp_options = []
-    if df_base is not None and not df_base.empty and "Nama PJP" in df_base.columns:
-        pjp_options = sorted(df_base["Nama PJP"].dropna().astype(str).unique().tolist())
+    if pjp_matrix is not None:
+        pjp_options = sorted(pjp_matrix.pjps.astype(str).tolist())
 
     with st.expander("Konfigurasi kolom tabel (opsional)", expanded=False):
         left, right = st.columns([3, 2])
@@ -583,9 +343,9 @@ def _render_pjp_supporting_tw_table(
         col_names.append(col_name)
         col_meta.append((measure, flow))
 
-        va = _pjp_metric_value(df_base, year=a_year, quarter=a_q, pjp_name=pjp, flow=flow, measure=measure)
-        vb = _pjp_metric_value(df_base, year=b_year, quarter=b_q, pjp_name=pjp, flow=flow, measure=measure)
-        vc = _pjp_metric_value(df_base, year=c_year, quarter=c_q, pjp_name=pjp, flow=flow, measure=measure)
+        va = _pjp_metric_value(pjp_matrix, year=a_year, quarter=a_q, pjp_name=pjp, flow=flow, measure=measure)
+        vb = _pjp_metric_value(pjp_matrix, year=b_year, quarter=b_q, pjp_name=pjp, flow=flow, measure=measure)
+        vc = _pjp_metric_value(pjp_matrix, year=c_year, quarter=c_q, pjp_name=pjp, flow=flow, measure=measure)
 
         raw_a.append(va)
         raw_b.append(vb)
@@ -630,15 +390,32 @@ def _render_pjp_supporting_tw_table(
         flow = str(s.get("Arus", "Total")).strip() or "Total"
         measure = str(s.get("Ukuran", "Nilai")).strip() or "Nilai"
         # Only show breakdown for Nilai by default (it matches the report table)
-        v_cur = _pjp_metric_value(df_base, year=int(year), quarter=int(quarter), pjp_name=pjp, flow=flow, measure=measure)
-        v_prevq = _pjp_metric_value(df_base, year=int(prev_y), quarter=int(prev_q), pjp_name=pjp, flow=flow, measure=measure)
-        v_prevy = _pjp_metric_value(df_base, year=int(year) - 1, quarter=int(quarter), pjp_name=pjp, flow=flow, measure=measure)
+        v_cur = _pjp_metric_value(pjp_matrix, year=int(year), quarter=int(quarter), pjp_name=pjp, flow=flow, measure=measure)
+        v_prevq = _pjp_metric_value(pjp_matrix, year=int(prev_y), quarter=int(prev_q), pjp_name=pjp, flow=flow, measure=measure)
+        v_prevy = _pjp_metric_value(pjp_matrix, year=int(year) - 1, quarter=int(quarter), pjp_name=pjp, flow=flow, measure=measure)
 
         def _scale_for_breakdown(val: float | None) -> float | None:
             if val is None:
                 return None
             return val / (1e12 if measure == "Nilai" else 1e6)
 
+        def _change(kind: str) -> tuple[float | None, float | None]:
+            """(delta, kontribusi pp) dari engine kontribusi; tanpa Nama PJP = total semua PJP."""
+            if flow not in _PJP_DETAIL_FLOWS:
+                return None, None
+            code = _PJP_DETAIL_FLOWS[flow]
+            if not pjp:
+                total = contribution.total(kind, int(year), int(quarter), code, measure)
+                if total is None:
+                    return None, None
+                delta_total, base = total
+                return delta_total, (delta_total / base * 100.0 if base else None)
+            deltas = contribution.delta_series(kind, int(year), int(quarter), code, measure)
+            if pjp not in deltas.index:
+                return None, None
+            points = contribution.points_series(kind, int(year), int(quarter), code, measure)[pjp]
+            return float(deltas[pjp]), (None if pd.isna(points) else float(points))
+
         cur_s = _scale_for_breakdown(v_cur)
         prevq_s = _scale_for_breakdown(v_prevq)
         prevy_s = _scale_for_breakdown(v_prevy)
@@ -647,8 +424,10 @@ def _render_pjp_supporting_tw_table(
             prevq_s = None if (prevq_s is None or prevq_s == 0) else prevq_s
             prevy_s = None if (prevy_s is None or prevy_s == 0) else prevy_s
 
-        delta_q = None if (cur_s is None or prevq_s is None) else (cur_s - prevq_s)
-        delta_y = None if (cur_s is None or prevy_s is None) else (cur_s - prevy_s)
+        change_q, points_q = _change("prev")
+        change_y, points_y = _change("yoy")
+        delta_q = None if (cur_s is None or prevq_s is None) else _scale_for_breakdown(change_q)
+        delta_y = None if (cur_s is None or prevy_s is None) else _scale_for_breakdown(change_y)
         impact_rows.append(
             {
                 "Arus": flow,
@@ -657,9 +436,11 @@ def _render_pjp_supporting_tw_table(
                 "Prev Quarter": prevq_s,
                 "Delta QtQ": delta_q,
                 "QtQ (%)": _pct_growth(cur_s, prevq_s),
+                "Kontribusi QtQ (pp)": points_q,
                 "Prev Year": prevy_s,
                 "Delta YoY": delta_y,
                 "YoY (%)": _pct_growth(cur_s, prevy_s),
+                "Kontribusi YoY (pp)": points_y,
             }
         )
 
@@ -669,7 +450,8 @@ def _render_pjp_supporting_tw_table(
         st.markdown("**Komponen nilai & pengaruh (detail QtQ/YoY)**")
         st.caption(
             f"Current = Q{int(quarter)} {int(year)}, Prev Quarter = Q{int(prev_q)} {int(prev_y)}, Prev Year = Q{int(quarter)} {int(year) - 1}. "
-            f"Satuan: {unit_label}."
+            f"Satuan: {unit_label}. Kontribusi (pp) = delta PJP / total arus periode pembanding x 100 "
+            "(jumlah semua PJP = growth total)."
         )
 
         def _fmt_num_cell(v):
@@ -682,6 +464,9 @@ def _render_pjp_supporting_tw_table(
         for c in ["QtQ (%)", "YoY (%)"]:
             impact_df_display[c] = impact_df_display[c].apply(lambda x: x if pd.notna(x) else None)
             impact_df_display[c] = impact_df_display[c].apply(_fmt_id_percent)
+        for c in ["Kontribusi QtQ (pp)", "Kontribusi YoY (pp)"]:
+            impact_df_display[c] = impact_df_display[c].apply(lambda x: x if pd.notna(x) else None)
+            impact_df_display[c] = impact_df_display[c].apply(lambda x: _fmt_id_decimal(x, decimals=2))
 
         st.dataframe(
             impact_df_display,
@@ -750,95 +535,21 @@ def _get_growth_column_config(trx_var: str):
     }
 
 
-def _render_pjp_detail(df_base: pd.DataFrame, year: int, quarter: int, trx_type: str):
-    """Tampilkan detail growth per PJP untuk periode (year, quarter) dan tipe transaksi."""
-    col_map_jumlah = {
-        "Incoming": "Sum of Fin Jumlah Inc",
-        "Outgoing": "Sum of Fin Jumlah Out",
-        "Domestik": "Sum of Fin Jumlah Dom",
-    }
-    col_map_nilai = {
-        "Incoming": "Sum of Fin Nilai Inc",
-        "Outgoing": "Sum of Fin Nilai Out",
-        "Domestik": "Sum of Fin Nilai Dom",
-    }
-
-    # Filter current period
-    current = df_base[(df_base["Year"] == year) & (df_base["Quarter"] == quarter)].copy()
-    if current.empty:
-        st.warning("Data tidak ditemukan untuk periode tersebut")
-        return
-
-    if trx_type == "Total":
-        current["Jumlah"] = (
-            current["Sum of Fin Jumlah Inc"]
-            + current["Sum of Fin Jumlah Out"]
-            + current["Sum of Fin Jumlah Dom"]
-        )
-        current["Nilai"] = (
-            current["Sum of Fin Nilai Inc"]
-            + current["Sum of Fin Nilai Out"]
-            + current["Sum of Fin Nilai Dom"]
-        )
-    else:
-        current["Jumlah"] = current[col_map_jumlah[trx_type]]
-        current["Nilai"] = current[col_map_nilai[trx_type]]
-
-    # Grup per PJP
-    cur_group = current.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-
-    # Prev quarter
-    prev_q = quarter - 1 if quarter > 1 else 4
-    prev_y = year if quarter > 1 else year - 1
-    prev_q_df = df_base[(df_base["Year"] == prev_y) & (df_base["Quarter"] == prev_q)].copy()
-    if not prev_q_df.empty:
-        if trx_type == "Total":
-            prev_q_df["Jumlah"] = (
-                prev_q_df["Sum of Fin Jumlah Inc"]
-                + prev_q_df["Sum of Fin Jumlah Out"]
-                + prev_q_df["Sum of Fin Jumlah Dom"]
-            )
-            prev_q_df["Nilai"] = (
-                prev_q_df["Sum of Fin Nilai Inc"]
-                + prev_q_df["Sum of Fin Nilai Out"]
-                + prev_q_df["Sum of Fin Nilai Dom"]
-            )
-        else:
-            prev_q_df["Jumlah"] = prev_q_df[col_map_jumlah[trx_type]]
-            prev_q_df["Nilai"] = prev_q_df[col_map_nilai[trx_type]]
-        prev_q_group = prev_q_df.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-    else:
-        prev_q_group = pd.DataFrame(columns=["Nama PJP", "Jumlah", "Nilai"])
-
-    # Prev year same quarter
-    prev_y_df = df_base[(df_base["Year"] == year - 1) & (df_base["Quarter"] == quarter)].copy()
-    if not prev_y_df.empty:
-        if trx_type == "Total":
-            prev_y_df["Jumlah"] = (
-                prev_y_df["Sum of Fin Jumlah Inc"]
-                + prev_y_df["Sum of Fin Jumlah Out"]
-                + prev_y_df["Sum of Fin Jumlah Dom"]
-            )
-            prev_y_df["Nilai"] = (
-                prev_y_df["Sum of Fin Nilai Inc"]
-                + prev_y_df["Sum of Fin Nilai Out"]
-                + prev_y_df["Sum of Fin Nilai Dom"]
-            )
-        else:
-            prev_y_df["Jumlah"] = prev_y_df[col_map_jumlah[trx_type]]
-            prev_y_df["Nilai"] = prev_y_df[col_map_nilai[trx_type]]
-        prev_y_group = prev_y_df.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-    else:
-        prev_y_group = pd.DataFrame(columns=["Nama PJP", "Jumlah", "Nilai"])
-
-    # Merge for growth
-    detail = cur_group.merge(prev_q_group, on="Nama PJP", how="left", suffixes=("", "_PrevQ"))
-    detail = detail.merge(prev_y_group, on="Nama PJP", how="left", suffixes=("", "_PrevY"))
-
-    # Ensure numeric dtypes (sorting must be numeric, not lexicographic)
-    for col in ["Jumlah", "Nilai", "Jumlah_PrevQ", "Nilai_PrevQ", "Jumlah_PrevY", "Nilai_PrevY"]:
-        if col in detail.columns:
-            detail[col] = pd.to_numeric(detail[col], errors="coerce")
+def _pjp_detail_view(
+    contribution: GrowthContribution, year: int, quarter: int, trx_type: str
+) -> tuple[pd.DataFrame, list[str]] | None:
+    """Tabel detail growth per PJP (kolom tampil) + baris insight; None kalau periode kosong."""
+    # Periode sekarang, kuartal sebelumnya dan kuartal sama tahun lalu dibaca dari matriks PJP x kuartal
+    flow = _PJP_DETAIL_FLOWS[trx_type]
+    prev_y, prev_q = previous_period(QUARTER, year, quarter, 'prev')
+    detail = contribution.matrix.compare(
+        flow,
+        (year, quarter),
+        PrevQ=(prev_y, prev_q),
+        PrevY=previous_period(QUARTER, year, quarter, 'yoy'),
+    )
+    if detail.empty:
+        return None
 
     def pct_growth(cur: pd.Series, prev: pd.Series) -> pd.Series:
         """Percent growth in %.
@@ -862,15 +573,15 @@ def _render_pjp_detail(df_base: pd.DataFrame, year: int, quarter: int, trx_type:
     detail["Growth QtQ (%)"] = pct_growth(detail["Nilai"], detail.get("Nilai_PrevQ"))
     detail["Growth YoY (%)"] = pct_growth(detail["Nilai"], detail.get("Nilai_PrevY"))
 
-    # Delta (absolute change) - focus on nominal
-    if "Nilai_PrevQ" in detail.columns:
-        detail["Delta QtQ Nilai"] = (detail["Nilai"].fillna(0) - detail["Nilai_PrevQ"].fillna(0))
-    else:
-        detail["Delta QtQ Nilai"] = 0.0
-    if "Nilai_PrevY" in detail.columns:
-        detail["Delta YoY Nilai"] = (detail["Nilai"].fillna(0) - detail["Nilai_PrevY"].fillna(0))
-    else:
-        detail["Delta YoY Nilai"] = 0.0
+    # Delta (absolute change) & kontribusi pp ke growth total - focus on nominal
+    names = detail["Nama PJP"].astype(str)
+    for kind, label in (("prev", "QtQ"), ("yoy", "YoY")):
+        detail[f"Delta {label} Nilai"] = (
+            contribution.delta_series(kind, year, quarter, flow, "Nilai").reindex(names).to_numpy()
+        )
+        detail[f"Kontribusi {label} (pp)"] = (
+            contribution.points_series(kind, year, quarter, flow, "Nilai").reindex(names).to_numpy()
+        )
 
     # Display columns (hide helper prev columns)
     display_cols = [
@@ -879,8 +590,10 @@ def _render_pjp_detail(df_base: pd.DataFrame, year: int, quarter: int, trx_type:
         "Nilai",
         "Delta QtQ Nilai",
         "Growth QtQ (%)",
+        "Kontribusi QtQ (pp)",
         "Delta YoY Nilai",
         "Growth YoY (%)",
+        "Kontribusi YoY (pp)",
     ]
     display_cols = [c for c in display_cols if c in detail.columns]
 
@@ -987,11 +700,26 @@ def _render_pjp_detail(df_base: pd.DataFrame, year: int, quarter: int, trx_type:
                 f"  Namun tertahan oleh penurunan **{name2}** sebesar **Rp {_fmt_tril(abs(delta2))} triliun** ({_fmt_pct(pct2)} YoY)."
             )
 
+    return detail[display_cols], insight_lines
+
+
+def _render_pjp_detail(contribution: GrowthContribution, year: int, quarter: int, trx_type: str):
+    """Tampilkan detail growth per PJP untuk periode (year, quarter) dan tipe transaksi."""
+    # Tabel tidak bergantung gaya grafik: di-memo di objek kontribusi (ikut cache cube)
+    view = contribution.memo(
+        ("pjp_detail", int(year), int(quarter), trx_type),
+        lambda: _pjp_detail_view(contribution, year, quarter, trx_type),
+    )
+    if view is None:
+        st.warning("Data tidak ditemukan untuk periode tersebut")
+        return
+    detail, insight_lines = view
+
     if insight_lines:
         st.markdown("\n".join(insight_lines))
 
     st.dataframe(
-        detail[display_cols],
+        detail,
         use_container_width=True,
         hide_index=True,
         column_config={
@@ -1000,90 +728,31 @@ def _render_pjp_detail(df_base: pd.DataFrame, year: int, quarter: int, trx_type:
             "Nilai": st.column_config.NumberColumn("Nilai", format="%.0f"),
             "Delta QtQ Nilai": st.column_config.NumberColumn("Delta QtQ Nilai", format="%+.0f"),
             "Growth QtQ (%)": st.column_config.NumberColumn("Growth QtQ (%)", format="%+.2f%%"),
+            "Kontribusi QtQ (pp)": st.column_config.NumberColumn("Kontribusi QtQ (pp)", format="%+.2f"),
             "Delta YoY Nilai": st.column_config.NumberColumn("Delta YoY Nilai", format="%+.0f"),
             "Growth YoY (%)": st.column_config.NumberColumn("Growth YoY (%)", format="%+.2f%%"),
+            "Kontribusi YoY (pp)": st.column_config.NumberColumn("Kontribusi YoY (pp)", format="%+.2f"),
         },
     )
 
 
-def _render_pjp_detail_month(df_base: pd.DataFrame, year: int, month: str, trx_type: str):
-    """Tampilkan detail growth per PJP untuk periode (year, month) dengan MtM & YoY pada level bulan."""
+def _pjp_detail_month_view(
+    contribution: GrowthContribution, year: int, month: str, trx_type: str
+) -> pd.DataFrame | None:
+    """Tabel detail growth per PJP level bulan (MtM & YoY); None kalau periode kosong."""
     import calendar
 
-    col_map_jumlah = {
-        "Incoming": "Sum of Fin Jumlah Inc",
-        "Outgoing": "Sum of Fin Jumlah Out",
-        "Domestik": "Sum of Fin Jumlah Dom",
-    }
-    col_map_nilai = {
-        "Incoming": "Sum of Fin Nilai Inc",
-        "Outgoing": "Sum of Fin Nilai Out",
-        "Domestik": "Sum of Fin Nilai Dom",
-    }
-
     month_num = list(calendar.month_name).index(str(month)) if str(month) in calendar.month_name else int(month)
 
-    current = df_base[(df_base["Year"] == year) & (df_base["Month"].astype(str) == str(month))].copy()
-    if current.empty:
-        st.warning("Data tidak ditemukan untuk periode tersebut")
-        return
-
-    if trx_type == "Total":
-        current["Jumlah"] = (
-            current["Sum of Fin Jumlah Inc"]
-            + current["Sum of Fin Jumlah Out"]
-            + current["Sum of Fin Jumlah Dom"]
-        )
-        current["Nilai"] = (
-            current["Sum of Fin Nilai Inc"]
-            + current["Sum of Fin Nilai Out"]
-            + current["Sum of Fin Nilai Dom"]
-        )
-    else:
-        current["Jumlah"] = current[col_map_jumlah[trx_type]]
-        current["Nilai"] = current[col_map_nilai[trx_type]]
-
-    cur_group = current.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-
-    # Prev month
-    prev_m = 12 if month_num == 1 else month_num - 1
-    prev_y = year if month_num > 1 else year - 1
-    prev_m_name = calendar.month_name[prev_m]
-    prev_m_df = df_base[(df_base["Year"] == prev_y) & (df_base["Month"].astype(str) == str(prev_m_name))].copy()
-    if prev_m_df.empty:
-        prev_m_df = df_base[(df_base["Year"] == prev_y) & (df_base["Month"].astype(str) == str(prev_m))].copy()
-    if not prev_m_df.empty:
-        if trx_type == "Total":
-            prev_m_df["Jumlah"] = prev_m_df["Sum of Fin Jumlah Inc"] + prev_m_df["Sum of Fin Jumlah Out"] + prev_m_df["Sum of Fin Jumlah Dom"]
-            prev_m_df["Nilai"] = prev_m_df["Sum of Fin Nilai Inc"] + prev_m_df["Sum of Fin Nilai Out"] + prev_m_df["Sum of Fin Nilai Dom"]
-        else:
-            prev_m_df["Jumlah"] = prev_m_df[col_map_jumlah[trx_type]]
-            prev_m_df["Nilai"] = prev_m_df[col_map_nilai[trx_type]]
-        prev_m_group = prev_m_df.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-    else:
-        prev_m_group = pd.DataFrame(columns=["Nama PJP", "Jumlah", "Nilai"])
-
-    # Prev year same month
-    prev_y_df = df_base[(df_base["Year"] == year - 1) & (df_base["Month"].astype(str) == str(month))].copy()
-    if prev_y_df.empty:
-        prev_y_df = df_base[(df_base["Year"] == year - 1) & (df_base["Month"].astype(str) == str(month_num))].copy()
-    if not prev_y_df.empty:
-        if trx_type == "Total":
-            prev_y_df["Jumlah"] = prev_y_df["Sum of Fin Jumlah Inc"] + prev_y_df["Sum of Fin Jumlah Out"] + prev_y_df["Sum of Fin Jumlah Dom"]
-            prev_y_df["Nilai"] = prev_y_df["Sum of Fin Nilai Inc"] + prev_y_df["Sum of Fin Nilai Out"] + prev_y_df["Sum of Fin Nilai Dom"]
-        else:
-            prev_y_df["Jumlah"] = prev_y_df[col_map_jumlah[trx_type]]
-            prev_y_df["Nilai"] = prev_y_df[col_map_nilai[trx_type]]
-        prev_y_group = prev_y_df.groupby("Nama PJP", observed=False)[["Jumlah", "Nilai"]].sum().reset_index()
-    else:
-        prev_y_group = pd.DataFrame(columns=["Nama PJP", "Jumlah", "Nilai"])
-
-    detail = cur_group.merge(prev_m_group, on="Nama PJP", how="left", suffixes=("", "_PrevM"))
-    detail = detail.merge(prev_y_group, on="Nama PJP", how="left", suffixes=("", "_PrevY"))
-
-    for col in ["Jumlah", "Nilai", "Jumlah_PrevM", "Nilai_PrevM", "Jumlah_PrevY", "Nilai_PrevY"]:
-        if col in detail.columns:
-            detail[col] = pd.to_numeric(detail[col], errors="coerce")
+    flow = _PJP_DETAIL_FLOWS[trx_type]
+    detail = contribution.matrix.compare(
+        flow,
+        (year, month_num),
+        PrevM=previous_period(MONTH, year, month_num, 'prev'),
+        PrevY=previous_period(MONTH, year, month_num, 'yoy'),
+    )
+    if detail.empty:
+        return None
 
     def pct_growth(cur: pd.Series, prev: pd.Series) -> pd.Series:
         cur = pd.to_numeric(cur, errors="coerce")
@@ -1099,29 +768,61 @@ def _render_pjp_detail_month(df_base: pd.DataFrame, year: int, month: str, trx_t
     detail["Growth MtM (%)"] = pct_growth(detail["Nilai"], detail.get("Nilai_PrevM"))
     detail["Growth YoY (%)"] = pct_growth(detail["Nilai"], detail.get("Nilai_PrevY"))
 
-    display_cols = ["Nama PJP", "Jumlah", "Nilai", "Growth MtM (%)", "Growth YoY (%)"]
-    display_cols = [c for c in display_cols if c in detail.columns]
+    # Delta & kontribusi pp ke growth total dari matriks PJP x bulan
+    names = detail["Nama PJP"].astype(str)
+    for kind, label in (("prev", "MtM"), ("yoy", "YoY")):
+        detail[f"Delta {label} Nilai"] = (
+            contribution.delta_series(kind, year, month_num, flow, "Nilai").reindex(names).to_numpy()
+        )
+        detail[f"Kontribusi {label} (pp)"] = (
+            contribution.points_series(kind, year, month_num, flow, "Nilai").reindex(names).to_numpy()
+        )
+
+    display_cols = [
+        "Nama PJP",
+        "Jumlah",
+        "Nilai",
+        "Delta MtM Nilai",
+        "Growth MtM (%)",
+        "Kontribusi MtM (pp)",
+        "Delta YoY Nilai",
+        "Growth YoY (%)",
+        "Kontribusi YoY (pp)",
+    ]
+    return detail[[c for c in display_cols if c in detail.columns]]
+
+
+def _render_pjp_detail_month(contribution: GrowthContribution, year: int, month: str, trx_type: str):
+    """Tampilkan detail growth per PJP untuk periode (year, month) dengan MtM & YoY pada level bulan."""
+    detail = contribution.memo(
+        ("pjp_detail_month", int(year), str(month), trx_type),
+        lambda: _pjp_detail_month_view(contribution, year, month, trx_type),
+    )
+    if detail is None:
+        st.warning("Data tidak ditemukan untuk periode tersebut")
+        return
 
     st.dataframe(
-        detail[display_cols],
+        detail,
         use_container_width=True,
         hide_index=True,
         column_config={
             "Nama PJP": st.column_config.TextColumn("Nama PJP"),
             "Jumlah": st.column_config.NumberColumn("Jumlah", format="%.0f"),
             "Nilai": st.column_config.NumberColumn("Nilai", format="%.0f"),
+            "Delta MtM Nilai": st.column_config.NumberColumn("Delta MtM Nilai", format="%+.0f"),
             "Growth MtM (%)": st.column_config.NumberColumn("Growth MtM (%)", format="%+.2f%%"),
+            "Kontribusi MtM (pp)": st.column_config.NumberColumn("Kontribusi MtM (pp)", format="%+.2f"),
+            "Delta YoY Nilai": st.column_config.NumberColumn("Delta YoY Nilai", format="%+.0f"),
             "Growth YoY (%)": st.column_config.NumberColumn("Growth YoY (%)", format="%+.2f%%"),
+            "Kontribusi YoY (pp)": st.column_config.NumberColumn("Kontribusi YoY (pp)", format="%+.2f"),
         },
     )
 
 
 def _render_overall_growth_detail_table_quarterly(
     *,
-    df_total_combined: pd.DataFrame,
-    df_inc: pd.DataFrame,
-    df_out: pd.DataFrame,
-    df_dom: pd.DataFrame,
+    df_growth: pd.DataFrame,
     sum_trx_type: str,
     visible_periods: list[str] | None,
     ordered_periods: list[str],
@@ -1131,7 +832,7 @@ def _render_overall_growth_detail_table_quarterly(
     if sum_trx_type not in ("Jumlah", "Nilai"):
         return
 
-    if df_total_combined is None or df_total_combined.empty:
+    if df_growth is None or df_growth.empty:
         return
 
     # Tentukan periode yang benar-benar ditampilkan (urut sesuai pilihan)
@@ -1141,115 +842,9 @@ def _render_overall_growth_detail_table_quarterly(
         st.info("Tidak ada periode yang dipilih untuk tabel detail.")
         return
 
-    # Parse "YYYY Qn" menjadi list (Year, Quarter) berurutan
-    parsed = []
-    for p in shown_periods:
-        try:
-            parts = str(p).split()
-            if len(parts) >= 2 and parts[1].upper().startswith("Q"):
-                y = int(parts[0])
-                q = int(parts[1].upper().replace("Q", ""))
-                if 1 <= q <= 4:
-                    parsed.append((y, q))
-        except Exception:
-            continue
-
-    if not parsed:
-        return
-
-    if sum_trx_type == "Jumlah":
-        value_unit = "Volume (Jutaan)"
-        scale = 1e6
-    else:
-        value_unit = "Nilai (Rp Triliun)"
-        scale = 1e12
-
-    periods_df = pd.DataFrame(parsed, columns=["Year", "Quarter"]).drop_duplicates()
-
-    total_val_col = f"Sum of Fin {sum_trx_type} Total"
-    total_yoy_col = f"%YoY {sum_trx_type}"
-    total_qoq_col = f"%QtQ {sum_trx_type}"
-
-    inc_val_col = f"Sum of Fin {sum_trx_type} Inc"
-    out_val_col = f"Sum of Fin {sum_trx_type} Out"
-    dom_val_col = f"Sum of Fin {sum_trx_type} Dom"
-
-    def _num(v):
-        return pd.to_numeric(v, errors="coerce")
-
-    def _build_block(
-        df_src: pd.DataFrame,
-        *,
-        jenis: str,
-        value_col: str,
-        yoy_col: str,
-        qoq_col: str,
-    ) -> pd.DataFrame:
-        if df_src is None or df_src.empty:
-            return pd.DataFrame()
-        if not {"Year", "Quarter"}.issubset(set(df_src.columns)):
-            return pd.DataFrame()
-        needed = {value_col, yoy_col, qoq_col}
-        if not needed.issubset(set(df_src.columns)):
-            return pd.DataFrame()
-
-        dfc = df_src[["Year", "Quarter", value_col, yoy_col, qoq_col]].copy()
-        dfc["Year"] = dfc["Year"].astype(int)
-        dfc["Quarter"] = dfc["Quarter"].astype(int)
-
-        # Join ke daftar periode yg sedang ditampilkan agar urut & hanya yg dipilih
-        dfc = periods_df.merge(dfc, on=["Year", "Quarter"], how="left")
-        dfc["Periode"] = "Q" + dfc["Quarter"].astype(int).astype(str) + " " + dfc["Year"].astype(int).astype(str)
-        dfc["Jenis"] = jenis
-        dfc[value_unit] = (_num(dfc[value_col]) / scale).map(lambda x: qround_float(x, decimals=2, none=0.0))
-        dfc["YoY (%)"] = _num(dfc[yoy_col]).map(lambda x: qround_float(x, decimals=2, none=0.0))
-        dfc["QtQ (%)"] = _num(dfc[qoq_col]).map(lambda x: qround_float(x, decimals=2, none=0.0))
-        return dfc[["Periode", "Jenis", value_unit, "YoY (%)", "QtQ (%)"]]
-
-    df_total_block = _build_block(
-        df_total_combined,
-        jenis="Total",
-        value_col=total_val_col,
-        yoy_col=total_yoy_col,
-        qoq_col=total_qoq_col,
-    )
-    df_inc_block = _build_block(
-        df_inc,
-        jenis="Incoming",
-        value_col=inc_val_col,
-        yoy_col="%YoY",
-        qoq_col="%QtQ",
-    )
-    df_out_block = _build_block(
-        df_out,
-        jenis="Outgoing",
-        value_col=out_val_col,
-        yoy_col="%YoY",
-        qoq_col="%QtQ",
+    df_detail, value_unit = overall_detail_view(
+        dataset_handle(df_growth), df_growth, sum_trx_type, tuple(shown_periods)
     )
-    df_dom_block = _build_block(
-        df_dom,
-        jenis="Domestik",
-        value_col=dom_val_col,
-        yoy_col="%YoY",
-        qoq_col="%QtQ",
-    )
-
-    # Make Total display consistent with the sum of displayed components
-    if not df_total_block.empty and not df_inc_block.empty and not df_out_block.empty and not df_dom_block.empty:
-        comp = (
-            df_inc_block[["Periode", value_unit]]
-            .rename(columns={value_unit: "__inc__"})
-            .merge(df_out_block[["Periode", value_unit]].rename(columns={value_unit: "__out__"}), on="Periode", how="left")
-            .merge(df_dom_block[["Periode", value_unit]].rename(columns={value_unit: "__dom__"}), on="Periode", how="left")
-        )
-        comp["__inc__"] = pd.to_numeric(comp["__inc__"], errors="coerce").fillna(0.0)
-        comp["__out__"] = pd.to_numeric(comp["__out__"], errors="coerce").fillna(0.0)
-        comp["__dom__"] = pd.to_numeric(comp["__dom__"], errors="coerce").fillna(0.0)
-        comp[value_unit] = (comp["__inc__"] + comp["__out__"] + comp["__dom__"]).map(lambda x: qround_float(x, decimals=2, none=0.0))
-        df_total_block = df_total_block.drop(columns=[value_unit]).merge(comp[["Periode", value_unit]], on="Periode", how="left")
-
-    df_detail = pd.concat([df_total_block, df_inc_block, df_out_block, df_dom_block], ignore_index=True)
     if df_detail.empty:
         return
 
@@ -1265,458 +860,424 @@ def _render_overall_growth_detail_table_quarterly(
         },
     )
 
-# Initial Page Setup
-set_page_visuals("viz")
-
-if st.session_state['df'] is not None:
-    df_source = st.session_state['df']
-    df = df_source
-    with st.sidebar:
-        with st.expander("Filter Multilicense", True):
-            ml_mode_ui = st.radio(
-                "Mode Perhitungan",
-                options=["Termasuk Multilicense", "Tanpa Multilicense"],
-                index=0,
-                key="growth_multilicense_mode",
-                help=(
-                    "Termasuk = seluruh data. Tanpa = data PJP multilicense dikeluarkan mulai tanggal efektif masing-masing."
-                ),
-            )
-
-            ml_mode = "exclude" if ml_mode_ui == "Tanpa Multilicense" else "include"
-            df, _ml_mask = _apply_multilicense_mode(df_source, ml_mode)
-
-            if df_source is not None and not df_source.empty:
-                total_rows = int(len(df_source))
-                ml_rows = int(_ml_mask.sum()) if len(_ml_mask) else 0
-                shown_rows = int(len(df))
-                st.caption(
-                    f"Baris data: total {total_rows:,} | multilicense aktif {ml_rows:,} | digunakan {shown_rows:,}"
-                )
-
-        with st.expander("Filter Growth", True):
-            if df is None or df.empty:
-                st.warning("Tidak ada data setelah filter multilicense. Ubah mode perhitungan.")
-                st.stop()
-
-            unique_years = sorted(df['Year'].unique().tolist())
-            quarters = ['Q1', 'Q2', 'Q3', 'Q4']
-            
-            # Start Year & Quarter
-            col_y1, col_q1 = st.columns(2)
-            with col_y1:
-                selected_start_year = st.selectbox('Start Year:', unique_years)
-            with col_q1:
-                selected_start_quarter = st.selectbox('Start Quarter:', quarters)
-            
-            # End Year & Quarter
-            col_y2, col_q2 = st.columns(2)
-            with col_y2:
-                selected_end_year = st.selectbox('End Year:', unique_years, index=len(unique_years) - 1)
-            with col_q2:
-                selected_end_quarter = st.selectbox('End Quarter:', quarters, index=3)
-
-            jenis_transaksi = ['All', 'Incoming', 'Outgoing', 'Domestik']
-            selected_jenis_transaksi = st.selectbox('Select Jenis Transaksi:', jenis_transaksi)
-
-        with st.expander("Pengaturan Tampilan Grafik (Growth)", True):
-            st.slider(
-                "Ukuran Font (Global)",
-                min_value=9,
-                max_value=22,
-                value=int(st.session_state.get("growth_font_size", 12)),
-                step=1,
-                key="growth_font_size",
-                help="Mengatur ukuran seluruh tulisan di grafik (judul, axis, legend, hoverlabel).",
-            )
-            st.slider(
-                "Ukuran Angka Sumbu X",
-                min_value=8,
-                max_value=24,
-                value=int(st.session_state.get("growth_axis_x_tick_font_size", max(int(st.session_state.get("growth_font_size", 12)) - 1, 9))),
-                step=1,
-                key="growth_axis_x_tick_font_size",
-                help="Mengatur ukuran angka pada sumbu X (horizontal/periode).",
-            )
-            st.checkbox(
-                "Bold Angka Sumbu X",
-                value=bool(st.session_state.get("growth_axis_x_tick_bold", True)),
-                key="growth_axis_x_tick_bold",
-                help="Menebalkan angka pada sumbu X.",
-            )
-            st.selectbox(
-                "Ketebalan Angka Sumbu X",
-                options=["Normal", "Medium", "SemiBold", "Bold", "Black"],
-                index=["Normal", "Medium", "SemiBold", "Bold", "Black"].index(str(st.session_state.get("growth_axis_x_tick_weight", "SemiBold"))),
-                key="growth_axis_x_tick_weight",
-                help="Mengatur seberapa tebal angka pada sumbu X. Ini override checkbox Bold.",
-            )
-            st.slider(
-                "Ukuran Angka Sumbu Y",
-                min_value=8,
-                max_value=24,
-                value=int(st.session_state.get("growth_axis_y_tick_font_size", max(int(st.session_state.get("growth_font_size", 12)) - 1, 9))),
-                step=1,
-                key="growth_axis_y_tick_font_size",
-                help="Mengatur ukuran angka pada sumbu Y (kiri & kanan/nilai & growth).",
-            )
-            st.checkbox(
-                "Bold Angka Sumbu Y",
-                value=bool(st.session_state.get("growth_axis_y_tick_bold", True)),
-                key="growth_axis_y_tick_bold",
-                help="Menebalkan angka pada sumbu Y (termasuk sumbu kanan jika ada).",
-            )
-            st.selectbox(
-                "Ketebalan Angka Sumbu Y",
-                options=["Normal", "Medium", "SemiBold", "Bold", "Black"],
-                index=["Normal", "Medium", "SemiBold", "Bold", "Black"].index(str(st.session_state.get("growth_axis_y_tick_weight", "SemiBold"))),
-                key="growth_axis_y_tick_weight",
-                help="Mengatur seberapa tebal angka pada sumbu Y. Ini override checkbox Bold.",
-            )
-            st.slider(
-                "Ukuran Legend (Legenda Grafik)",
-                min_value=9,
-                max_value=24,
-                value=int(st.session_state.get("growth_legend_font_size", st.session_state.get("growth_font_size", 12))),
-                step=1,
-                key="growth_legend_font_size",
-                help="Mengatur ukuran tulisan pada legend/legenda grafik.",
-            )
-            st.slider(
-                "Ukuran Font Label (%)",
-                min_value=9,
-                max_value=26,
-                value=int(st.session_state.get("growth_label_font_size", 12)),
-                step=1,
-                key="growth_label_font_size",
-                help="Mengatur ukuran tulisan label persentase (YoY/QtQ) di titik terakhir.",
-            )
-            st.slider(
-                "Tinggi Grafik (px)",
-                min_value=380,
-                max_value=980,
-                value=int(st.session_state.get("growth_chart_height", 560)),
-                step=20,
-                key="growth_chart_height",
-                help="Atur tinggi grafik supaya tidak gepeng / terlalu tinggi.",
-            )
-            st.slider(
-                "Lebar Grafik (px)",
-                min_value=0,
-                max_value=2200,
-                value=int(st.session_state.get("growth_chart_width", 0)),
-                step=50,
-                key="growth_chart_width",
-                help="Atur lebar grafik. 0 = mengikuti lebar container (auto).",
-            )
-        st.info("Use the filters to adjust the year-quarter range and transaction type.")
-
-        _growth_font_size = int(st.session_state.get("growth_font_size", 12))
-        _growth_axis_x_tick_font_size = int(st.session_state.get("growth_axis_x_tick_font_size", max(_growth_font_size - 1, 9)))
-        _growth_axis_y_tick_font_size = int(st.session_state.get("growth_axis_y_tick_font_size", max(_growth_font_size - 1, 9)))
-        _growth_axis_x_tick_bold = bool(st.session_state.get("growth_axis_x_tick_bold", True))
-        _growth_axis_y_tick_bold = bool(st.session_state.get("growth_axis_y_tick_bold", True))
-        _growth_axis_x_tick_weight = str(st.session_state.get("growth_axis_x_tick_weight", "SemiBold"))
-        _growth_axis_y_tick_weight = str(st.session_state.get("growth_axis_y_tick_weight", "SemiBold"))
-        _growth_legend_font_size = int(st.session_state.get("growth_legend_font_size", _growth_font_size))
-        _growth_label_font_size = int(st.session_state.get("growth_label_font_size", 12))
-        _growth_chart_height = int(st.session_state.get("growth_chart_height", 560))
-        _growth_chart_width = int(st.session_state.get("growth_chart_width", 0))
-
-    with (st.spinner('Loading and filtering data...')):
-        df_preprocessed_time = preprocess_data(df, True)
-
-        df_sum_time = sum_data_time(df_preprocessed_time, False)
-        df_sum_time_month = sum_data_time(df_preprocessed_time, True)
-
-        df_tuple = preprocess_data_growth(df_sum_time, False)
-        df_tuple_month = preprocess_data_growth(df_sum_time_month, True)
-
-        df_jumlah_inc, df_jumlah_out, df_jumlah_dom, df_nom_inc, df_nom_out, df_nom_dom = df_tuple
-
-        (df_jumlah_inc_month, df_jumlah_out_month, df_jumlah_dom_month,
-         df_nom_inc_month, df_nom_out_month, df_nom_dom_month) = df_tuple_month
-
-        df_jumlah_total = process_combined_df(df_jumlah_inc, df_jumlah_out,
-                                              df_jumlah_dom, False)
-        df_nom_total = process_combined_df(df_nom_inc, df_nom_out,
-                                           df_nom_dom, False)
-
-        df_jumlah_total_month = process_combined_df(df_jumlah_inc_month, df_jumlah_out_month,
-                                                    df_jumlah_dom_month, True)
-        df_nom_total_month = process_combined_df(df_nom_inc_month, df_nom_out_month,
-                                                 df_nom_dom_month, True)
-
-        df_total_combined = process_growth_combined(df_jumlah_total, df_nom_total, df_preprocessed_time['Year'].min(),
-                                                    False)
-        df_total_month_combined = process_growth_combined(df_jumlah_total_month, df_nom_total_month,
-                                                          df_preprocessed_time['Year'].min(), True)
-
-        # Filter by year and quarter range (continuous)
-        df_total_combined = filter_start_end_year(df_total_combined, selected_start_year, selected_end_year)
-        df_total_combined = filter_by_quarter(df_total_combined, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_total_month_combined = filter_start_end_year(df_total_month_combined, selected_start_year, selected_end_year, True)
-        df_total_month_combined = filter_by_quarter(df_total_month_combined, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
+def _render_growth_style_controls() -> None:
+    """Kontrol gaya grafik Growth (font, tick, ukuran); nilai dibaca lewat key session_state."""
+    with st.expander("Pengaturan Tampilan Grafik (Growth)", False):
+        st.slider(
+            "Ukuran Font (Global)",
+            min_value=9,
+            max_value=22,
+            value=int(st.session_state.get("growth_font_size", 12)),
+            step=1,
+            key="growth_font_size",
+            help="Mengatur ukuran seluruh tulisan di grafik (judul, axis, legend, hoverlabel).",
+        )
+        st.slider(
+            "Ukuran Angka Sumbu X",
+            min_value=8,
+            max_value=24,
+            value=int(st.session_state.get("growth_axis_x_tick_font_size", max(int(st.session_state.get("growth_font_size", 12)) - 1, 9))),
+            step=1,
+            key="growth_axis_x_tick_font_size",
+            help="Mengatur ukuran angka pada sumbu X (horizontal/periode).",
+        )
+        st.checkbox(
+            "Bold Angka Sumbu X",
+            value=bool(st.session_state.get("growth_axis_x_tick_bold", True)),
+            key="growth_axis_x_tick_bold",
+            help="Menebalkan angka pada sumbu X.",
+        )
+        st.selectbox(
+            "Ketebalan Angka Sumbu X",
+            options=["Normal", "Medium", "SemiBold", "Bold", "Black"],
+            index=["Normal", "Medium", "SemiBold", "Bold", "Black"].index(str(st.session_state.get("growth_axis_x_tick_weight", "SemiBold"))),
+            key="growth_axis_x_tick_weight",
+            help="Mengatur seberapa tebal angka pada sumbu X. Ini override checkbox Bold.",
+        )
+        st.slider(
+            "Ukuran Angka Sumbu Y",
+            min_value=8,
+            max_value=24,
+            value=int(st.session_state.get("growth_axis_y_tick_font_size", max(int(st.session_state.get("growth_font_size", 12)) - 1, 9))),
+            step=1,
+            key="growth_axis_y_tick_font_size",
+            help="Mengatur ukuran angka pada sumbu Y (kiri & kanan/nilai & growth).",
+        )
+        st.checkbox(
+            "Bold Angka Sumbu Y",
+            value=bool(st.session_state.get("growth_axis_y_tick_bold", True)),
+            key="growth_axis_y_tick_bold",
+            help="Menebalkan angka pada sumbu Y (termasuk sumbu kanan jika ada).",
+        )
+        st.selectbox(
+            "Ketebalan Angka Sumbu Y",
+            options=["Normal", "Medium", "SemiBold", "Bold", "Black"],
+            index=["Normal", "Medium", "SemiBold", "Bold", "Black"].index(str(st.session_state.get("growth_axis_y_tick_weight", "SemiBold"))),
+            key="growth_axis_y_tick_weight",
+            help="Mengatur seberapa tebal angka pada sumbu Y. Ini override checkbox Bold.",
+        )
+        st.slider(
+            "Ukuran Legend (Legenda Grafik)",
+            min_value=9,
+            max_value=24,
+            value=int(st.session_state.get("growth_legend_font_size", st.session_state.get("growth_font_size", 12))),
+            step=1,
+            key="growth_legend_font_size",
+            help="Mengatur ukuran tulisan pada legend/legenda grafik.",
+        )
+        st.slider(
+            "Ukuran Font Label (%)",
+            min_value=9,
+            max_value=26,
+            value=int(st.session_state.get("growth_label_font_size", 12)),
+            step=1,
+            key="growth_label_font_size",
+            help="Mengatur ukuran tulisan label persentase (YoY/QtQ) di titik terakhir.",
+        )
+        st.slider(
+            "Tinggi Grafik (px)",
+            min_value=380,
+            max_value=980,
+            value=int(st.session_state.get("growth_chart_height", 560)),
+            step=20,
+            key="growth_chart_height",
+            help="Atur tinggi grafik supaya tidak gepeng / terlalu tinggi.",
+        )
+        st.slider(
+            "Lebar Grafik (px)",
+            min_value=0,
+            max_value=2200,
+            value=int(st.session_state.get("growth_chart_width", 0)),
+            step=50,
+            key="growth_chart_width",
+            help="Atur lebar grafik. 0 = mengikuti lebar container (auto).",
+        )
 
-        df_jumlah_inc_filtered = filter_start_end_year(df_jumlah_inc, selected_start_year, selected_end_year)
-        df_jumlah_inc_filtered = filter_by_quarter(df_jumlah_inc_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_jumlah_out_filtered = filter_start_end_year(df_jumlah_out, selected_start_year, selected_end_year)
-        df_jumlah_out_filtered = filter_by_quarter(df_jumlah_out_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_jumlah_dom_filtered = filter_start_end_year(df_jumlah_dom, selected_start_year, selected_end_year)
-        df_jumlah_dom_filtered = filter_by_quarter(df_jumlah_dom_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
 
-        df_nom_inc_filtered = filter_start_end_year(df_nom_inc, selected_start_year, selected_end_year)
-        df_nom_inc_filtered = filter_by_quarter(df_nom_inc_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_nom_out_filtered = filter_start_end_year(df_nom_out, selected_start_year, selected_end_year)
-        df_nom_out_filtered = filter_by_quarter(df_nom_out_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_nom_dom_filtered = filter_start_end_year(df_nom_dom, selected_start_year, selected_end_year)
-        df_nom_dom_filtered = filter_by_quarter(df_nom_dom_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
+def _set_view_mode(mode: str) -> None:
+    # Callback tombol mode: state diubah sebelum fragment dijalankan ulang, jadi tidak perlu st.rerun()
+    st.session_state['view_mode'] = mode
 
-        df_jumlah_inc_month_filtered = filter_start_end_year(df_jumlah_inc_month, selected_start_year, selected_end_year, True)
-        df_jumlah_inc_month_filtered = filter_by_quarter(df_jumlah_inc_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_jumlah_out_month_filtered = filter_start_end_year(df_jumlah_out_month, selected_start_year, selected_end_year, True)
-        df_jumlah_out_month_filtered = filter_by_quarter(df_jumlah_out_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_jumlah_dom_month_filtered = filter_start_end_year(df_jumlah_dom_month, selected_start_year, selected_end_year, True)
-        df_jumlah_dom_month_filtered = filter_by_quarter(df_jumlah_dom_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
 
-        df_nom_inc_month_filtered = filter_start_end_year(df_nom_inc_month, selected_start_year, selected_end_year, True)
-        df_nom_inc_month_filtered = filter_by_quarter(df_nom_inc_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-        
-        df_nom_out_month_filtered = filter_start_end_year(df_nom_out_month, selected_start_year, selected_end_year, True)
-        df_nom_out_month_filtered = filter_by_quarter(df_nom_out_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
+@st.fragment
+def _render_growth_charts(
+    *,
+    df_growth: pd.DataFrame,
+    df_growth_month: pd.DataFrame,
+    df_total_combined: pd.DataFrame,
+    df_total_month_combined: pd.DataFrame,
+    df_sum_time: pd.DataFrame,
+    df_preprocessed_time: pd.DataFrame,
+    pjp_contribution: GrowthContribution,
+    pjp_month_contribution: GrowthContribution,
+    selected_start_year: int,
+    selected_start_quarter: str,
+    selected_end_year: int,
+    selected_end_quarter: str,
+    selected_jenis_transaksi: str,
+) -> None:
+    """Tabel & grafik halaman Growth sebagai fragment.
+
+    Kontrol gaya ada di dalam fragment, jadi mengubah font/ukuran grafik hanya
+    menjalankan ulang fragment ini: multilicense, cube dan filter periode
+    tidak dihitung ulang. Figure di-cache per (data, argumen, gaya) di
+    ``service.visualize``, jadi hanya figure dengan gaya baru yang dibangun
+    ulang; tombol mode memakai callback sehingga hanya fragment ini yang
+    dijalankan ulang (tanpa ``st.rerun()`` lingkup app).
+    """
+    _growth_font_size = int(st.session_state.get("growth_font_size", 12))
+    _growth_axis_x_tick_font_size = int(st.session_state.get("growth_axis_x_tick_font_size", max(_growth_font_size - 1, 9)))
+    _growth_axis_y_tick_font_size = int(st.session_state.get("growth_axis_y_tick_font_size", max(_growth_font_size - 1, 9)))
+    _growth_axis_x_tick_bold = bool(st.session_state.get("growth_axis_x_tick_bold", True))
+    _growth_axis_y_tick_bold = bool(st.session_state.get("growth_axis_y_tick_bold", True))
+    _growth_axis_x_tick_weight = str(st.session_state.get("growth_axis_x_tick_weight", "SemiBold"))
+    _growth_axis_y_tick_weight = str(st.session_state.get("growth_axis_y_tick_weight", "SemiBold"))
+    _growth_legend_font_size = int(st.session_state.get("growth_legend_font_size", _growth_font_size))
+    _growth_label_font_size = int(st.session_state.get("growth_label_font_size", 12))
+    _growth_chart_height = int(st.session_state.get("growth_chart_height", 560))
+    _growth_chart_width = int(st.session_state.get("growth_chart_width", 0))
+
+    st.subheader("📈 Growth in Transactions")
+    _render_growth_style_controls()
+    
+    # Initialize default view mode
+    if 'view_mode' not in st.session_state:
+        st.session_state['view_mode'] = 'quarterly'
+    
+    # Toggle buttons dengan styling modern
+    col_space1, col_toggle1, col_toggle2, col_space2 = st.columns([2, 1.5, 1.5, 2])
+    
+    # CSS styling untuk toggle buttons
+    toggle_css = """
+    <style>
+        .toggle-container {
+            display: flex;
+            gap: 10px;
+            justify-content: center;
+            margin-bottom: 20px;
+        }
         
-        df_nom_dom_month_filtered = filter_start_end_year(df_nom_dom_month, selected_start_year, selected_end_year, True)
-        df_nom_dom_month_filtered = filter_by_quarter(df_nom_dom_month_filtered, selected_start_year, selected_start_quarter, selected_end_year, selected_end_quarter)
-
-        df_inc_combined = merge_df_growth(df_jumlah_inc_filtered, df_nom_inc_filtered)
-        df_out_combined = merge_df_growth(df_jumlah_out_filtered, df_nom_out_filtered)
-        df_dom_combined = merge_df_growth(df_jumlah_dom_filtered, df_nom_dom_filtered)
-
-        df_inc_combined_month = merge_df_growth(df_jumlah_inc_month_filtered, df_nom_inc_month_filtered, True)
-        df_out_combined_month = merge_df_growth(df_jumlah_out_month_filtered, df_nom_out_month_filtered, True)
-        df_dom_combined_month = merge_df_growth(df_jumlah_dom_month_filtered, df_nom_dom_month_filtered, True)
-
-        st.subheader("📈 Growth in Transactions")
+        .toggle-btn {
+            padding: 10px 20px;
+            border-radius: 8px;
+            border: 2px solid #e0e0e0;
+            background-color: #f8f9fa;
+            color: #333;
+            font-weight: 500;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            font-size: 15px;
+            min-width: 140px;
+        }
         
-        # Initialize default view mode
-        if 'view_mode' not in st.session_state:
-            st.session_state['view_mode'] = 'quarterly'
+        .toggle-btn:hover {
+            border-color: #3b82f6;
+            background-color: #eff6ff;
+            color: #1e40af;
+            transform: translateY(-2px);
+            box-shadow: 0 4px 8px rgba(59, 130, 246, 0.15);
+        }
         
-        # Toggle buttons dengan styling modern
-        col_space1, col_toggle1, col_toggle2, col_space2 = st.columns([2, 1.5, 1.5, 2])
+        .toggle-btn.active {
+            background: linear-gradient(135deg, #3b82f6 0%, #1e40af 100%);
+            color: white;
+            border-color: #1e40af;
+            box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);
+        }
         
-        # CSS styling untuk toggle buttons
-        toggle_css = """
+        .toggle-btn.active:hover {
+            transform: translateY(-2px);
+            box-shadow: 0 6px 16px rgba(59, 130, 246, 0.4);
+        }
+    </style>
+    """
+    st.markdown(toggle_css, unsafe_allow_html=True)
+    
+    # Render modern toggle slider
+    col_space1, col_toggle, col_space2 = st.columns([1.5, 3, 1.5])
+    
+    with col_toggle:
+        # Custom CSS untuk segmented control
+        segmented_css = """
         <style>
-            .toggle-container {
+            .segmented-control {
                 display: flex;
-                gap: 10px;
-                justify-content: center;
-                margin-bottom: 20px;
+                background: linear-gradient(to bottom, #f5f5f5, #efefef);
+                border-radius: 50px;
+                padding: 3px;
+                width: fit-content;
+                margin: 20px auto;
+                box-shadow: 
+                    inset 0 2px 4px rgba(255,255,255,0.5),
+                    inset 0 -2px 4px rgba(0,0,0,0.05),
+                    0 4px 12px rgba(0,0,0,0.08);
+                gap: 4px;
             }
             
-            .toggle-btn {
-                padding: 10px 20px;
-                border-radius: 8px;
-                border: 2px solid #e0e0e0;
-                background-color: #f8f9fa;
-                color: #333;
+            .segmented-control button {
+                flex: 1;
+                padding: 12px 24px;
+                border: none;
+                background: transparent;
+                color: #666;
                 font-weight: 500;
-                cursor: pointer;
-                transition: all 0.3s ease;
                 font-size: 15px;
-                min-width: 140px;
+                cursor: pointer;
+                border-radius: 48px;
+                transition: all 0.35s cubic-bezier(0.34, 1.56, 0.64, 1);
+                min-width: 130px;
+                white-space: nowrap;
             }
             
-            .toggle-btn:hover {
-                border-color: #3b82f6;
-                background-color: #eff6ff;
-                color: #1e40af;
-                transform: translateY(-2px);
-                box-shadow: 0 4px 8px rgba(59, 130, 246, 0.15);
+            .segmented-control button:hover {
+                background: rgba(59, 130, 246, 0.08);
+                color: #3b82f6;
             }
             
-            .toggle-btn.active {
-                background: linear-gradient(135deg, #3b82f6 0%, #1e40af 100%);
+            .segmented-control button.active {
+                background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
                 color: white;
-                border-color: #1e40af;
-                box-shadow: 0 4px 12px rgba(59, 130, 246, 0.3);
-            }
-            
-            .toggle-btn.active:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 6px 16px rgba(59, 130, 246, 0.4);
+                font-weight: 600;
+                box-shadow: 
+                    0 4px 12px rgba(59, 130, 246, 0.35),
+                    inset 0 1px 2px rgba(255,255,255,0.2);
             }
         </style>
         """
-        st.markdown(toggle_css, unsafe_allow_html=True)
+        st.markdown(segmented_css, unsafe_allow_html=True)
+    
+    # Create button group
+    col_q, col_m, col_y = st.columns([1, 1, 1], gap="small")
+    
+    with col_q:
+        is_quarterly = st.session_state['view_mode'] == 'quarterly'
+        btn_style = "primary" if is_quarterly else "secondary"
+        st.button("📊 Quarterly", key="toggle_quarterly", use_container_width=True, type=btn_style,
+                  on_click=_set_view_mode, args=("quarterly",))
+    
+    with col_m:
+        is_monthly = st.session_state['view_mode'] == 'monthly'
+        btn_style = "primary" if is_monthly else "secondary"
+        st.button("📅 Monthly", key="toggle_monthly", use_container_width=True, type=btn_style,
+                  on_click=_set_view_mode, args=("monthly",))
+
+    with col_y:
+        is_yearly = st.session_state['view_mode'] == 'yearly'
+        btn_style = "primary" if is_yearly else "secondary"
+        st.button("🗓️ Yearly", key="toggle_yearly", use_container_width=True, type=btn_style,
+                  on_click=_set_view_mode, args=("yearly",))
+    
+    st.divider()
+    
+    # QUARTERLY SECTION
+    if st.session_state['view_mode'] == 'quarterly':
+        st.subheader("📊 Data Transaksi Kuartalan")
         
-        # Render modern toggle slider
-        col_space1, col_toggle, col_space2 = st.columns([1.5, 3, 1.5])
+        # KPI Cards - Tampilkan total dari semua data
+        st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 Ringkasan Transaksi</h3>", unsafe_allow_html=True)
         
-        with col_toggle:
-            # Custom CSS untuk segmented control
-            segmented_css = """
-            <style>
-                .segmented-control {
-                    display: flex;
-                    background: linear-gradient(to bottom, #f5f5f5, #efefef);
-                    border-radius: 50px;
-                    padding: 3px;
-                    width: fit-content;
-                    margin: 20px auto;
-                    box-shadow: 
-                        inset 0 2px 4px rgba(255,255,255,0.5),
-                        inset 0 -2px 4px rgba(0,0,0,0.05),
-                        0 4px 12px rgba(0,0,0,0.08);
-                    gap: 4px;
-                }
-                
-                .segmented-control button {
-                    flex: 1;
-                    padding: 12px 24px;
-                    border: none;
-                    background: transparent;
-                    color: #666;
-                    font-weight: 500;
-                    font-size: 15px;
-                    cursor: pointer;
-                    border-radius: 48px;
-                    transition: all 0.35s cubic-bezier(0.34, 1.56, 0.64, 1);
-                    min-width: 130px;
-                    white-space: nowrap;
-                }
-                
-                .segmented-control button:hover {
-                    background: rgba(59, 130, 246, 0.08);
-                    color: #3b82f6;
-                }
-                
-                .segmented-control button.active {
-                    background: linear-gradient(135deg, #3b82f6 0%, #2563eb 100%);
-                    color: white;
-                    font-weight: 600;
-                    box-shadow: 
-                        0 4px 12px rgba(59, 130, 246, 0.35),
-                        inset 0 1px 2px rgba(255,255,255,0.2);
-                }
-            </style>
-            """
-            st.markdown(segmented_css, unsafe_allow_html=True)
+        # Calculate totals
+        total_inc_freq = df_growth['Sum of Fin Jumlah Inc'].sum()
+        total_inc_value = df_growth['Sum of Fin Nilai Inc'].sum()
+        total_out_freq = df_growth['Sum of Fin Jumlah Out'].sum()
+        total_out_value = df_growth['Sum of Fin Nilai Out'].sum()
+        total_dom_freq = df_growth['Sum of Fin Jumlah Dom'].sum()
+        total_dom_value = df_growth['Sum of Fin Nilai Dom'].sum()
+        total_all_freq = total_inc_freq + total_out_freq + total_dom_freq
+
+        inc_t = qround_float(total_inc_value / 1e12, decimals=2, none=0.0) or 0.0
+        out_t = qround_float(total_out_value / 1e12, decimals=2, none=0.0) or 0.0
+        dom_t = qround_float(total_dom_value / 1e12, decimals=2, none=0.0) or 0.0
+        tot_t = qround_float(inc_t + out_t + dom_t, decimals=2, none=0.0) or 0.0
         
-        # Create button group
-        col_q, col_m, col_y = st.columns([1, 1, 1], gap="small")
+        col1, col2, col3, col4 = st.columns(4)
         
-        with col_q:
-            is_quarterly = st.session_state['view_mode'] == 'quarterly'
-            btn_style = "primary" if is_quarterly else "secondary"
-            if st.button("📊 Quarterly", key="toggle_quarterly", use_container_width=True, 
-                        type=btn_style):
-                st.session_state['view_mode'] = 'quarterly'
-                st.rerun()
+        with col1:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #F5B0CB;">
+                <div class="kpi-title">📥 INCOMING</div>
+                <div class="kpi-value-main" style="color: #F5B0CB;">{total_inc_freq:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_t, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
         
-        with col_m:
-            is_monthly = st.session_state['view_mode'] == 'monthly'
-            btn_style = "primary" if is_monthly else "secondary"
-            if st.button("📅 Monthly", key="toggle_monthly", use_container_width=True,
-                        type=btn_style):
-                st.session_state['view_mode'] = 'monthly'
-                st.rerun()
-
-        with col_y:
-            is_yearly = st.session_state['view_mode'] == 'yearly'
-            btn_style = "primary" if is_yearly else "secondary"
-            if st.button("🗓️ Yearly", key="toggle_yearly", use_container_width=True,
-                        type=btn_style):
-                st.session_state['view_mode'] = 'yearly'
-                st.rerun()
+        with col2:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #F5CBA7;">
+                <div class="kpi-title">📤 OUTGOING</div>
+                <div class="kpi-value-main" style="color: #F5CBA7;">{total_out_freq:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_t, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
         
-        st.divider()
+        with col3:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #5DADE2;">
+                <div class="kpi-title">🏠 DOMESTIK</div>
+                <div class="kpi-value-main" style="color: #5DADE2;">{total_dom_freq:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_t, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
         
-        # QUARTERLY SECTION
-        if st.session_state['view_mode'] == 'quarterly':
-            st.subheader("📊 Data Transaksi Kuartalan")
-            
-            # KPI Cards - Tampilkan total dari semua data
-            st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 Ringkasan Transaksi</h3>", unsafe_allow_html=True)
-            
-            # Calculate totals
-            total_inc_freq = df_inc_combined['Sum of Fin Jumlah Inc'].sum()
-            total_inc_value = df_inc_combined['Sum of Fin Nilai Inc'].sum()
-            total_out_freq = df_out_combined['Sum of Fin Jumlah Out'].sum()
-            total_out_value = df_out_combined['Sum of Fin Nilai Out'].sum()
-            total_dom_freq = df_dom_combined['Sum of Fin Jumlah Dom'].sum()
-            total_dom_value = df_dom_combined['Sum of Fin Nilai Dom'].sum()
-            total_all_freq = total_inc_freq + total_out_freq + total_dom_freq
-            total_all_value = total_inc_value + total_out_value + total_dom_value
-
-            inc_t = qround_float(total_inc_value / 1e12, decimals=2, none=0.0) or 0.0
-            out_t = qround_float(total_out_value / 1e12, decimals=2, none=0.0) or 0.0
-            dom_t = qround_float(total_dom_value / 1e12, decimals=2, none=0.0) or 0.0
-            tot_t = qround_float(inc_t + out_t + dom_t, decimals=2, none=0.0) or 0.0
-            
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #F5B0CB;">
-                    <div class="kpi-title">📥 INCOMING</div>
-                    <div class="kpi-value-main" style="color: #F5B0CB;">{total_inc_freq:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_t, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #F5CBA7;">
-                    <div class="kpi-title">📤 OUTGOING</div>
-                    <div class="kpi-value-main" style="color: #F5CBA7;">{total_out_freq:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_t, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #5DADE2;">
-                    <div class="kpi-title">🏠 DOMESTIK</div>
-                    <div class="kpi-value-main" style="color: #5DADE2;">{total_dom_freq:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_t, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col4:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #6366f1;">
-                    <div class="kpi-title">💰 TOTAL</div>
-                    <div class="kpi-value-main" style="color: #6366f1;">{total_all_freq:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_t, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
-            
-            # Grafik Gabungan (Stacked Bar + Line)
-            st.markdown("<h3 style='margin-bottom: 15px;'>📊 Grafik Gabungan - Nilai Transaksi</h3>", unsafe_allow_html=True)
-            make_stacked_bar_line_chart_combined(
-                df_inc_combined,
-                df_out_combined,
-                df_dom_combined,
-                is_month=False,
+        with col4:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #6366f1;">
+                <div class="kpi-title">💰 TOTAL</div>
+                <div class="kpi-value-main" style="color: #6366f1;">{total_all_freq:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_t, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
+        
+        # Grafik Gabungan (Stacked Bar + Line)
+        st.markdown("<h3 style='margin-bottom: 15px;'>📊 Grafik Gabungan - Nilai Transaksi</h3>", unsafe_allow_html=True)
+        make_stacked_bar_line_chart_combined(
+            df_growth,
+            is_month=False,
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+
+        # Perbandingan Periode (Quarter) - VS
+        st.markdown("<h3 style='margin-top: 25px; margin-bottom: 10px;'>🆚 Perbandingan Periode (Kuartal)</h3>", unsafe_allow_html=True)
+        st.markdown(
+            "<p style='color:#6b7280; margin-top:-6px; margin-bottom:12px;'>Pilih 2 periode (tahun & kuartal) untuk dibandingkan. Grafik hanya menampilkan 2 batang yang relevan.</p>",
+            unsafe_allow_html=True,
+        )
+
+        # Sinkronkan default Periode A/B dengan filter sidebar (Start/End)
+        _start_q_int = int(str(selected_start_quarter).replace("Q", ""))
+        _end_q_int = int(str(selected_end_quarter).replace("Q", ""))
+        _vs_filter_sig = (int(selected_start_year), _start_q_int, int(selected_end_year), _end_q_int)
+        if st.session_state.get("_vs_filter_sig") != _vs_filter_sig:
+            st.session_state["_vs_filter_sig"] = _vs_filter_sig
+            st.session_state["vs_year_a"] = int(selected_start_year)
+            st.session_state["vs_q_a"] = int(_start_q_int)
+            st.session_state["vs_year_b"] = int(selected_end_year)
+            st.session_state["vs_q_b"] = int(_end_q_int)
+
+        cmp_years = sorted(df_total_combined['Year'].unique().tolist()) if not df_total_combined.empty else sorted(df_preprocessed_time['Year'].unique().tolist())
+        cmp_quarters = [1, 2, 3, 4]
+
+        c1, c2, c3, c4 = st.columns([1.2, 1.2, 1.2, 1.2])
+        with c1:
+            vs_year_a = st.selectbox("Tahun A", cmp_years, key="vs_year_a")
+        with c2:
+            vs_q_a = st.selectbox("Kuartal A", cmp_quarters, format_func=lambda q: f"Q{q}", key="vs_q_a")
+        with c3:
+            vs_year_b = st.selectbox("Tahun B", cmp_years, key="vs_year_b")
+        with c4:
+            vs_q_b = st.selectbox("Kuartal B", cmp_quarters, format_func=lambda q: f"Q{q}", key="vs_q_b")
+
+        c5, c6 = st.columns([1.2, 1.6])
+        with c5:
+            vs_metric = st.selectbox("Metrik", ["Nominal", "Frekuensi"], key="vs_metric")
+        with c6:
+            vs_trx = st.selectbox("Jenis Transaksi", ["Incoming", "Outgoing", "Domestik", "Total"], key="vs_trx")
+
+        sum_trx_type = "Nilai" if vs_metric == "Nominal" else "Jumlah"
+
+        if vs_trx == "Incoming":
+            df_vs_src = df_growth
+            trx_code = "Inc"
+            is_combined = False
+        elif vs_trx == "Outgoing":
+            df_vs_src = df_growth
+            trx_code = "Out"
+            is_combined = False
+        elif vs_trx == "Domestik":
+            df_vs_src = df_growth
+            trx_code = "Dom"
+            is_combined = False
+        else:
+            df_vs_src = df_total_combined
+            trx_code = "Total"
+            is_combined = True
+
+        if trx_code == "Total":
+            make_quarter_vs_quarter_chart_total_breakdown(
+                df_growth=df_growth,
+                year_a=int(vs_year_a),
+                quarter_a=int(vs_q_a),
+                year_b=int(vs_year_b),
+                quarter_b=int(vs_q_b),
+                sum_trx_type=sum_trx_type,
                 font_size=_growth_font_size,
                 label_font_size=_growth_label_font_size,
                 legend_font_size=_growth_legend_font_size,
@@ -1727,412 +1288,120 @@ if st.session_state['df'] is not None:
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
-
-            # Perbandingan Periode (Quarter) - VS
-            st.markdown("<h3 style='margin-top: 25px; margin-bottom: 10px;'>🆚 Perbandingan Periode (Kuartal)</h3>", unsafe_allow_html=True)
-            st.markdown(
-                "<p style='color:#6b7280; margin-top:-6px; margin-bottom:12px;'>Pilih 2 periode (tahun & kuartal) untuk dibandingkan. Grafik hanya menampilkan 2 batang yang relevan.</p>",
-                unsafe_allow_html=True,
+        else:
+            make_quarter_vs_quarter_chart(
+                df=df_vs_src,
+                year_a=int(vs_year_a),
+                quarter_a=int(vs_q_a),
+                year_b=int(vs_year_b),
+                quarter_b=int(vs_q_b),
+                sum_trx_type=sum_trx_type,
+                trx_type=trx_code,
+                is_combined=is_combined,
+                font_size=_growth_font_size,
+                label_font_size=_growth_label_font_size,
+                legend_font_size=_growth_legend_font_size,
+                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+                axis_x_tick_bold=_growth_axis_x_tick_bold,
+                axis_y_tick_bold=_growth_axis_y_tick_bold,
+                chart_height=_growth_chart_height,
+                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
 
-            # Sinkronkan default Periode A/B dengan filter sidebar (Start/End)
-            _start_q_int = int(str(selected_start_quarter).replace("Q", ""))
-            _end_q_int = int(str(selected_end_quarter).replace("Q", ""))
-            _vs_filter_sig = (int(selected_start_year), _start_q_int, int(selected_end_year), _end_q_int)
-            if st.session_state.get("_vs_filter_sig") != _vs_filter_sig:
-                st.session_state["_vs_filter_sig"] = _vs_filter_sig
-                st.session_state["vs_year_a"] = int(selected_start_year)
-                st.session_state["vs_q_a"] = int(_start_q_int)
-                st.session_state["vs_year_b"] = int(selected_end_year)
-                st.session_state["vs_q_b"] = int(_end_q_int)
-
-            cmp_years = sorted(df_total_combined['Year'].unique().tolist()) if not df_total_combined.empty else sorted(df_preprocessed_time['Year'].unique().tolist())
-            cmp_quarters = [1, 2, 3, 4]
-
-            c1, c2, c3, c4 = st.columns([1.2, 1.2, 1.2, 1.2])
-            with c1:
-                vs_year_a = st.selectbox("Tahun A", cmp_years, key="vs_year_a")
-            with c2:
-                vs_q_a = st.selectbox("Kuartal A", cmp_quarters, format_func=lambda q: f"Q{q}", key="vs_q_a")
-            with c3:
-                vs_year_b = st.selectbox("Tahun B", cmp_years, key="vs_year_b")
-            with c4:
-                vs_q_b = st.selectbox("Kuartal B", cmp_quarters, format_func=lambda q: f"Q{q}", key="vs_q_b")
-
-            c5, c6 = st.columns([1.2, 1.6])
-            with c5:
-                vs_metric = st.selectbox("Metrik", ["Nominal", "Frekuensi"], key="vs_metric")
-            with c6:
-                vs_trx = st.selectbox("Jenis Transaksi", ["Incoming", "Outgoing", "Domestik", "Total"], key="vs_trx")
-
-            sum_trx_type = "Nilai" if vs_metric == "Nominal" else "Jumlah"
-
-            if vs_trx == "Incoming":
-                df_vs_src = df_nom_inc_filtered if sum_trx_type == "Nilai" else df_jumlah_inc_filtered
-                trx_code = "Inc"
-                is_combined = False
-            elif vs_trx == "Outgoing":
-                df_vs_src = df_nom_out_filtered if sum_trx_type == "Nilai" else df_jumlah_out_filtered
-                trx_code = "Out"
-                is_combined = False
-            elif vs_trx == "Domestik":
-                df_vs_src = df_nom_dom_filtered if sum_trx_type == "Nilai" else df_jumlah_dom_filtered
-                trx_code = "Dom"
-                is_combined = False
-            else:
-                df_vs_src = df_total_combined
-                trx_code = "Total"
-                is_combined = True
-
-            if trx_code == "Total":
-                df_vs_inc = df_nom_inc_filtered if sum_trx_type == "Nilai" else df_jumlah_inc_filtered
-                df_vs_out = df_nom_out_filtered if sum_trx_type == "Nilai" else df_jumlah_out_filtered
-                df_vs_dom = df_nom_dom_filtered if sum_trx_type == "Nilai" else df_jumlah_dom_filtered
-
-                make_quarter_vs_quarter_chart_total_breakdown(
-                    df_inc=df_vs_inc,
-                    df_out=df_vs_out,
-                    df_dom=df_vs_dom,
-                    year_a=int(vs_year_a),
-                    quarter_a=int(vs_q_a),
-                    year_b=int(vs_year_b),
-                    quarter_b=int(vs_q_b),
-                    sum_trx_type=sum_trx_type,
-                    font_size=_growth_font_size,
-                    label_font_size=_growth_label_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-            else:
-                make_quarter_vs_quarter_chart(
-                    df=df_vs_src,
-                    year_a=int(vs_year_a),
-                    quarter_a=int(vs_q_a),
-                    year_b=int(vs_year_b),
-                    quarter_b=int(vs_q_b),
-                    sum_trx_type=sum_trx_type,
-                    trx_type=trx_code,
-                    is_combined=is_combined,
-                    font_size=_growth_font_size,
-                    label_font_size=_growth_label_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-
-            # Tabel VS Market Share (Jakarta vs Nasional)
-            df_national_raw = st.session_state.get('df_national')
-            if df_national_raw is None:
-                st.info("Upload data nasional (Raw_JKTNasional) di Summary dulu untuk menampilkan tabel market share vs nasional.")
-            else:
-                try:
-                    df_national_q = add_quarter_column(df_national_raw.copy())
-                    df_national_grouped = preprocess_data_national(df_national_q, True, True)
-
-                    jkt_a = df_sum_time[(df_sum_time['Year'] == int(vs_year_a)) & (df_sum_time['Quarter'] == int(vs_q_a))].copy()
-                    nat_a = df_national_grouped[(df_national_grouped['Year'] == int(vs_year_a)) & (df_national_grouped['Quarter'] == int(vs_q_a))].copy()
-
-                    jkt_b = df_sum_time[(df_sum_time['Year'] == int(vs_year_b)) & (df_sum_time['Quarter'] == int(vs_q_b))].copy()
-                    nat_b = df_national_grouped[(df_national_grouped['Year'] == int(vs_year_b)) & (df_national_grouped['Quarter'] == int(vs_q_b))].copy()
-
-                    if jkt_a.empty or nat_a.empty or jkt_b.empty or nat_b.empty:
-                        st.warning("Data market share tidak lengkap untuk salah satu periode (A/B).")
+        # Tabel VS Market Share (Jakarta vs Nasional)
+        df_national_raw = st.session_state.get('df_national')
+        if df_national_raw is None:
+            st.info("Upload data nasional (Raw_JKTNasional) di Summary dulu untuk menampilkan tabel market share vs nasional.")
+        else:
+            try:
+                national = build_national_dataset(dataset_handle(df_national_raw), df_national_raw)
+                if national.dropped_rows:
+                    st.warning(
+                        f"{national.dropped_rows} baris data nasional diabaikan karena nilai Year/Month kosong atau tidak valid."
+                    )
+                df_national_grouped = national.rollup('Year', 'Quarter')
+
+                jkt_a = df_sum_time[(df_sum_time['Year'] == int(vs_year_a)) & (df_sum_time['Quarter'] == int(vs_q_a))].copy()
+                nat_a = df_national_grouped[(df_national_grouped['Year'] == int(vs_year_a)) & (df_national_grouped['Quarter'] == int(vs_q_a))].copy()
+
+                jkt_b = df_sum_time[(df_sum_time['Year'] == int(vs_year_b)) & (df_sum_time['Quarter'] == int(vs_q_b))].copy()
+                nat_b = df_national_grouped[(df_national_grouped['Year'] == int(vs_year_b)) & (df_national_grouped['Quarter'] == int(vs_q_b))].copy()
+
+                if jkt_a.empty or nat_a.empty or jkt_b.empty or nat_b.empty:
+                    st.warning("Data market share tidak lengkap untuk salah satu periode (A/B).")
+                else:
+                    def _build_ms_row(df_ms: pd.DataFrame, label: str) -> dict:
+                        # df_ms: output compile_data_market_share
+                        return {
+                            "Periode": label,
+                            "Jakarta Nom (T)": df_ms["Nominal (dalam triliun)"].iloc[0],
+                            "Nasional Nom (T)": df_ms["Nominal (dalam triliun)"].iloc[1],
+                            "Market Share Nom (%)": df_ms["Nominal (dalam triliun)"].iloc[2],
+                            "Jakarta Frek (Juta)": df_ms["Frekuensi (dalam jutaan)"].iloc[0],
+                            "Nasional Frek (Juta)": df_ms["Frekuensi (dalam jutaan)"].iloc[1],
+                            "Market Share Frek (%)": df_ms["Frekuensi (dalam jutaan)"].iloc[2],
+                        }
+
+                    if trx_code == "Total":
+                        ms_a_inc = compile_data_market_share(jkt_a, nat_a, "Inc")
+                        ms_a_out = compile_data_market_share(jkt_a, nat_a, "Out")
+                        ms_a_dom = compile_data_market_share(jkt_a, nat_a, "Dom")
+                        ms_a = compile_data_market_share(jkt_a, nat_a, "Total", ms_a_inc, ms_a_out, ms_a_dom)
+
+                        ms_b_inc = compile_data_market_share(jkt_b, nat_b, "Inc")
+                        ms_b_out = compile_data_market_share(jkt_b, nat_b, "Out")
+                        ms_b_dom = compile_data_market_share(jkt_b, nat_b, "Dom")
+                        ms_b = compile_data_market_share(jkt_b, nat_b, "Total", ms_b_inc, ms_b_out, ms_b_dom)
                     else:
-                        def _build_ms_row(df_ms: pd.DataFrame, label: str) -> dict:
-                            # df_ms: output compile_data_market_share
-                            return {
-                                "Periode": label,
-                                "Jakarta Nom (T)": df_ms["Nominal (dalam triliun)"].iloc[0],
-                                "Nasional Nom (T)": df_ms["Nominal (dalam triliun)"].iloc[1],
-                                "Market Share Nom (%)": df_ms["Nominal (dalam triliun)"].iloc[2],
-                                "Jakarta Frek (Juta)": df_ms["Frekuensi (dalam jutaan)"].iloc[0],
-                                "Nasional Frek (Juta)": df_ms["Frekuensi (dalam jutaan)"].iloc[1],
-                                "Market Share Frek (%)": df_ms["Frekuensi (dalam jutaan)"].iloc[2],
-                            }
-
-                        if trx_code == "Total":
-                            ms_a_inc = compile_data_market_share(jkt_a, nat_a, "Inc")
-                            ms_a_out = compile_data_market_share(jkt_a, nat_a, "Out")
-                            ms_a_dom = compile_data_market_share(jkt_a, nat_a, "Dom")
-                            ms_a = compile_data_market_share(jkt_a, nat_a, "Total", ms_a_inc, ms_a_out, ms_a_dom)
-
-                            ms_b_inc = compile_data_market_share(jkt_b, nat_b, "Inc")
-                            ms_b_out = compile_data_market_share(jkt_b, nat_b, "Out")
-                            ms_b_dom = compile_data_market_share(jkt_b, nat_b, "Dom")
-                            ms_b = compile_data_market_share(jkt_b, nat_b, "Total", ms_b_inc, ms_b_out, ms_b_dom)
-                        else:
-                            ms_a = compile_data_market_share(jkt_a, nat_a, trx_code)
-                            ms_b = compile_data_market_share(jkt_b, nat_b, trx_code)
-
-                        st.markdown("<h4 style='margin-top: 10px; margin-bottom: 10px;'>📋 Tabel VS - Market Share Jakarta vs Nasional</h4>", unsafe_allow_html=True)
-                        df_ms_vs = pd.DataFrame([
-                            _build_ms_row(ms_a, f"Q{int(vs_q_a)} {int(vs_year_a)}"),
-                            _build_ms_row(ms_b, f"Q{int(vs_q_b)} {int(vs_year_b)}"),
-                        ])
-                        st.dataframe(df_ms_vs, use_container_width=True, hide_index=True)
-                        st.caption("Market Share = (Jakarta / Nasional) × 100. Nominal dalam triliun, Frekuensi dalam jutaan.")
-                except Exception as e:
-                    st.warning(f"Gagal memproses market share vs nasional: {e}")
-            
-            st.divider()
-            
-            if selected_jenis_transaksi == 'Incoming' or selected_jenis_transaksi == 'All':
-                st.markdown("<h3 style='background-color: #f0f7ff; border-left: 5px solid #3b82f6; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>📥 INCOMING - Data Transaksi</h3>", unsafe_allow_html=True)
-                
-                # Display table with proper numeric sorting
-                df_inc_combined_display = rename_format_growth_df(df_inc_combined.copy(), "Inc")
-                st.dataframe(
-                    df_inc_combined_display, 
-                    use_container_width=True, 
-                    hide_index=True,
-                    column_config=_get_growth_column_config("Incoming")
-                )
-                
-                # Detail selection with dropdown
-                col_detail, col_empty = st.columns([3, 5])
-                with col_detail:
-                    period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_inc_combined.iterrows()]
-                    selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_inc_period", label_visibility="collapsed")
-                    if selected_period:
-                        for idx, row in df_inc_combined.iterrows():
-                            if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
-                                year_val = int(row['Year'])
-                                quarter_val = int(row['Quarter'])
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period} (Incoming)**")
-                                    _render_pjp_detail(df_preprocessed_time, year_val, quarter_val, "Incoming")
-                                break
-                
-                make_combined_bar_line_chart(
-                    df_jumlah_inc_filtered,
-                    "Jumlah",
-                    "Inc",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                make_combined_bar_line_chart(
-                    df_nom_inc_filtered,
-                    "Nilai",
-                    "Inc",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                st.divider()
-
-            if selected_jenis_transaksi == 'Outgoing' or selected_jenis_transaksi == 'All':
-                st.markdown("<h3 style='background-color: #fef2f2; border-left: 5px solid #ef4444; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>📤 OUTGOING - Data Transaksi</h3>", unsafe_allow_html=True)
-                
-                # Display table with proper numeric sorting
-                df_out_combined_display = rename_format_growth_df(df_out_combined.copy(), "Out")
-                st.dataframe(
-                    df_out_combined_display, 
-                    use_container_width=True, 
-                    hide_index=True,
-                    column_config=_get_growth_column_config("Outgoing")
-                )
-                
-                # Detail selection with dropdown
-                col_detail, col_empty = st.columns([3, 5])
-                with col_detail:
-                    period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_out_combined.iterrows()]
-                    selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_out_period", label_visibility="collapsed")
-                    if selected_period:
-                        for idx, row in df_out_combined.iterrows():
-                            if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
-                                year_val = int(row['Year'])
-                                quarter_val = int(row['Quarter'])
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period} (Outgoing)**")
-                                    _render_pjp_detail(df_preprocessed_time, year_val, quarter_val, "Outgoing")
-                                break
-                
-                make_combined_bar_line_chart(
-                    df_jumlah_out_filtered,
-                    "Jumlah",
-                    "Out",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                make_combined_bar_line_chart(
-                    df_nom_out_filtered,
-                    "Nilai",
-                    "Out",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                st.divider()
-                
-            if selected_jenis_transaksi == 'Domestik' or selected_jenis_transaksi == 'All':
-                st.markdown("<h3 style='background-color: #f0fdf4; border-left: 5px solid #16a34a; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>🏠 DOMESTIK - Data Transaksi</h3>", unsafe_allow_html=True)
-                
-                # Display table with proper numeric sorting
-                df_dom_combined_display = rename_format_growth_df(df_dom_combined.copy(), "Dom")
-                st.dataframe(
-                    df_dom_combined_display, 
-                    use_container_width=True, 
-                    hide_index=True,
-                    column_config=_get_growth_column_config("Domestik")
-                )
-                
-                # Detail selection with dropdown
-                col_detail, col_empty = st.columns([3, 5])
-                with col_detail:
-                    period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_dom_combined.iterrows()]
-                    selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_dom_period", label_visibility="collapsed")
-                    if selected_period:
-                        for idx, row in df_dom_combined.iterrows():
-                            if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
-                                year_val = int(row['Year'])
-                                quarter_val = int(row['Quarter'])
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period} (Domestik)**")
-                                    _render_pjp_detail(df_preprocessed_time, year_val, quarter_val, "Domestik")
-                                break
-                
-                make_combined_bar_line_chart(
-                    df_jumlah_dom_filtered,
-                    "Jumlah",
-                    "Dom",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                make_combined_bar_line_chart(
-                    df_nom_dom_filtered,
-                    "Nilai",
-                    "Dom",
-                    font_size=_growth_font_size,
-                    legend_font_size=_growth_legend_font_size,
-                    axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                    axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                    axis_x_tick_bold=_growth_axis_x_tick_bold,
-                    axis_y_tick_bold=_growth_axis_y_tick_bold,
-                    chart_height=_growth_chart_height,
-                    chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-                )
-                st.divider()
-
-            st.markdown("<h3 style='background-color: #fef3c7; border-left: 5px solid #f59e0b; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px; margin-top: 30px;'>💰 TOTAL KESELURUHAN - Data Transaksi (Kuartalan)</h3>", unsafe_allow_html=True)
-            st.markdown("<p style='color: #92400e; font-weight: 500; margin-bottom: 15px;'>Gabungan Data Transaksi Incoming + Outgoing + Domestik (Frekuensi & Nominal)</p>", unsafe_allow_html=True)
+                        ms_a = compile_data_market_share(jkt_a, nat_a, trx_code)
+                        ms_b = compile_data_market_share(jkt_b, nat_b, trx_code)
+
+                    st.markdown("<h4 style='margin-top: 10px; margin-bottom: 10px;'>📋 Tabel VS - Market Share Jakarta vs Nasional</h4>", unsafe_allow_html=True)
+                    df_ms_vs = pd.DataFrame([
+                        _build_ms_row(ms_a, f"Q{int(vs_q_a)} {int(vs_year_a)}"),
+                        _build_ms_row(ms_b, f"Q{int(vs_q_b)} {int(vs_year_b)}"),
+                    ])
+                    st.dataframe(df_ms_vs, use_container_width=True, hide_index=True)
+                    st.caption("Market Share = (Jakarta / Nasional) × 100. Nominal dalam triliun, Frekuensi dalam jutaan.")
+            except Exception as e:
+                st.warning(f"Gagal memproses market share vs nasional: {e}")
+        
+        st.divider()
+        
+        if selected_jenis_transaksi == 'Incoming' or selected_jenis_transaksi == 'All':
+            st.markdown("<h3 style='background-color: #f0f7ff; border-left: 5px solid #3b82f6; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>📥 INCOMING - Data Transaksi</h3>", unsafe_allow_html=True)
             
-            df_total_combined_display = df_total_combined.copy()
-            df_total_combined_display = rename_format_growth_df(df_total_combined_display, "Total")
+            # Display table with proper numeric sorting
+            df_inc_combined_display = rename_format_growth_df(flow_pair_view(df_growth, "Inc"), "Inc")
             st.dataframe(
-                df_total_combined_display, 
+                df_inc_combined_display, 
                 use_container_width=True, 
                 hide_index=True,
-                column_config=_get_growth_column_config("Total")
+                column_config=_get_growth_column_config("Incoming")
             )
             
             # Detail selection with dropdown
             col_detail, col_empty = st.columns([3, 5])
             with col_detail:
-                period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_total_combined.iterrows()]
-                selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_total_period", label_visibility="collapsed")
+                period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_growth.iterrows()]
+                selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_inc_period", label_visibility="collapsed")
                 if selected_period:
-                    for idx, row in df_total_combined.iterrows():
+                    for idx, row in df_growth.iterrows():
                         if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
                             year_val = int(row['Year'])
                             quarter_val = int(row['Quarter'])
                             
                             with st.container(border=True):
-                                st.markdown(f"**📊 Detail per PJP - {selected_period} (Total)**")
-                                _render_pjp_detail(df_preprocessed_time, year_val, quarter_val, "Total")
-                                st.divider()
-                                _render_pjp_supporting_tw_table(
-                                    df_base=df_preprocessed_time,
-                                    year=year_val,
-                                    quarter=quarter_val,
-                                    key_prefix=f"growth_tw_{year_val}Q{quarter_val}",
-                                )
+                                st.markdown(f"**📊 Detail per PJP - {selected_period} (Incoming)**")
+                                _render_pjp_detail(pjp_contribution, year_val, quarter_val, "Incoming")
                             break
-
-            st.markdown("<hr style='border-top: 2px dashed #f59e0b; margin: 20px 0;'>", unsafe_allow_html=True)
-            st.markdown("### 📊 Visualisasi Keseluruhan Data Transaksi (Frekuensi & Nominal Tergabung)")
-
-            st.caption(
-                "Grafik berikut menampilkan stacked bar (Incoming/Outgoing/Domestik) pada sumbu kiri dan garis Growth (YoY & QtQ) pada sumbu kanan. "
-                "Gunakan legend untuk menyembunyikan/menampilkan garis tertentu; label % akan ikut hilang saat garis di-hide."
-            )
-
-            # Visual-only filter: tampilkan/sematikan kuartal tertentu (growth tidak dihitung ulang)
-            overall_period_options = (
-                df_total_combined.assign(
-                    _period=lambda d: d["Year"].astype(int).astype(str) + " Q" + d["Quarter"].astype(int).astype(str)
-                )
-                .sort_values(["Year", "Quarter"])
-                ["_period"]
-                .dropna()
-                .astype(str)
-                .tolist()
-            )
-            overall_period_sig = "|".join(overall_period_options)
-            if st.session_state.get("overall_visible_period_sig") != overall_period_sig:
-                st.session_state["overall_visible_period_sig"] = overall_period_sig
-                st.session_state["overall_visible_periods"] = overall_period_options
-
-            st.multiselect(
-                "Tampilkan Kuartal",
-                options=overall_period_options,
-                key="overall_visible_periods",
-                help="Hanya menyaring tampilan chart. Nilai YoY/QtQ tetap nilai asli dari perhitungan data.",
-            )
-
-            st.markdown("#### 📦 Volume / Frekuensi")
-            st.caption("Sumbu kiri: Volume (Jutaan). Sumbu kanan: Growth YoY & QtQ (%).")
-
-            make_overall_total_stacked_growth_chart(
-                df_total=df_total_combined,
-                df_inc=df_jumlah_inc_filtered,
-                df_out=df_jumlah_out_filtered,
-                df_dom=df_jumlah_dom_filtered,
-                sum_trx_type="Jumlah",
-                is_month=False,
-                show_breakdown_growth=True,
-                visible_periods=st.session_state.get("overall_visible_periods"),
+            
+            make_combined_bar_line_chart(
+                df_growth,
+                "Jumlah",
+                "Inc",
                 font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
@@ -2141,29 +1410,11 @@ if st.session_state['df'] is not None:
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
-            _render_overall_growth_detail_table_quarterly(
-                df_total_combined=df_total_combined,
-                df_inc=df_jumlah_inc_filtered,
-                df_out=df_jumlah_out_filtered,
-                df_dom=df_jumlah_dom_filtered,
-                sum_trx_type="Jumlah",
-                visible_periods=st.session_state.get("overall_visible_periods"),
-                ordered_periods=overall_period_options,
-            )
-
-            st.markdown("#### 💰 Nominal")
-            st.caption("Sumbu kiri: Nilai (Rp Triliun). Sumbu kanan: Growth YoY & QtQ (%).")
-            make_overall_total_stacked_growth_chart(
-                df_total=df_total_combined,
-                df_inc=df_nom_inc_filtered,
-                df_out=df_nom_out_filtered,
-                df_dom=df_nom_dom_filtered,
-                sum_trx_type="Nilai",
-                is_month=False,
-                show_breakdown_growth=True,
-                visible_periods=st.session_state.get("overall_visible_periods"),
+            make_combined_bar_line_chart(
+                df_growth,
+                "Nilai",
+                "Inc",
                 font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
@@ -2172,568 +1423,872 @@ if st.session_state['df'] is not None:
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
-            _render_overall_growth_detail_table_quarterly(
-                df_total_combined=df_total_combined,
-                df_inc=df_nom_inc_filtered,
-                df_out=df_nom_out_filtered,
-                df_dom=df_nom_dom_filtered,
-                sum_trx_type="Nilai",
-                visible_periods=st.session_state.get("overall_visible_periods"),
-                ordered_periods=overall_period_options,
-            )
+            st.divider()
 
-        # MONTHLY SECTION
-        if st.session_state['view_mode'] == 'monthly':
-            st.subheader("📅 Data Transaksi Bulanan")
-            
-            # KPI Cards - Monthly
-            st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 Ringkasan Transaksi</h3>", unsafe_allow_html=True)
-            
-            # Calculate totals
-            total_inc_freq_m = df_inc_combined_month['Sum of Fin Jumlah Inc'].sum()
-            total_inc_value_m = df_inc_combined_month['Sum of Fin Nilai Inc'].sum()
-            total_out_freq_m = df_out_combined_month['Sum of Fin Jumlah Out'].sum()
-            total_out_value_m = df_out_combined_month['Sum of Fin Nilai Out'].sum()
-            total_dom_freq_m = df_dom_combined_month['Sum of Fin Jumlah Dom'].sum()
-            total_dom_value_m = df_dom_combined_month['Sum of Fin Nilai Dom'].sum()
-            total_all_freq_m = total_inc_freq_m + total_out_freq_m + total_dom_freq_m
-            total_all_value_m = total_inc_value_m + total_out_value_m + total_dom_value_m
-
-            inc_t_m = qround_float(total_inc_value_m / 1e12, decimals=2, none=0.0) or 0.0
-            out_t_m = qround_float(total_out_value_m / 1e12, decimals=2, none=0.0) or 0.0
-            dom_t_m = qround_float(total_dom_value_m / 1e12, decimals=2, none=0.0) or 0.0
-            tot_t_m = qround_float(inc_t_m + out_t_m + dom_t_m, decimals=2, none=0.0) or 0.0
-            
-            col1_kpi, col2_kpi, col3_kpi, col4_kpi = st.columns(4)
-            
-            with col1_kpi:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #F5B0CB;">
-                    <div class="kpi-title">📥 INCOMING</div>
-                    <div class="kpi-value-main" style="color: #F5B0CB;">{total_inc_freq_m:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_t_m, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col2_kpi:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #F5CBA7;">
-                    <div class="kpi-title">📤 OUTGOING</div>
-                    <div class="kpi-value-main" style="color: #F5CBA7;">{total_out_freq_m:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_t_m, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            with col3_kpi:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #5DADE2;">
-                    <div class="kpi-title">🏠 DOMESTIK</div>
-                    <div class="kpi-value-main" style="color: #5DADE2;">{total_dom_freq_m:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_t_m, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
+        if selected_jenis_transaksi == 'Outgoing' or selected_jenis_transaksi == 'All':
+            st.markdown("<h3 style='background-color: #fef2f2; border-left: 5px solid #ef4444; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>📤 OUTGOING - Data Transaksi</h3>", unsafe_allow_html=True)
             
-            with col4_kpi:
-                st.markdown(f"""
-                <div class="kpi-card" style="border-left-color: #6366f1;">
-                    <div class="kpi-title">💰 TOTAL</div>
-                    <div class="kpi-value-main" style="color: #6366f1;">{total_all_freq_m:,.0f}</div>
-                    <div class="kpi-value-sub">Frekuensi</div>
-                    <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_t_m, decimals=2, none='0.00')} T</div>
-                    <div class="kpi-value-sub">Nilai</div>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
-            
-            # Grafik Gabungan (Stacked Bar + Line) - Monthly
-            st.markdown("<h3 style='margin-bottom: 15px;'>📊 Grafik Gabungan - Nilai Transaksi</h3>", unsafe_allow_html=True)
-            make_stacked_bar_line_chart_combined(
-                df_inc_combined_month,
-                df_out_combined_month,
-                df_dom_combined_month,
-                is_month=True,
-                font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
-                legend_font_size=_growth_legend_font_size,
-                chart_height=_growth_chart_height,
-                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+            # Display table with proper numeric sorting
+            df_out_combined_display = rename_format_growth_df(flow_pair_view(df_growth, "Out"), "Out")
+            st.dataframe(
+                df_out_combined_display, 
+                use_container_width=True, 
+                hide_index=True,
+                column_config=_get_growth_column_config("Outgoing")
             )
             
-            st.divider()
-            
-            col1, col2, col3 = st.columns(3)
-            
-            if selected_jenis_transaksi == 'Incoming' or selected_jenis_transaksi == 'All':
-                with col1:
-                    st.markdown("<h4 style='background-color: #f0f7ff; border-left: 5px solid #3b82f6; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>📥 INCOMING (Bulanan)</h4>", unsafe_allow_html=True)
-                    
-                    df_inc_combined_month_display = rename_format_growth_monthly_df(df_inc_combined_month.copy(), "Inc")
-                    st.dataframe(
-                        df_inc_combined_month_display, 
-                        use_container_width=True, 
-                        hide_index=True,
-                        column_config=_get_growth_column_config("Incoming")
-                    )
-                    
-                    # Detail selection with dropdown
-                    period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_inc_combined_month.iterrows()]
-                    selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_inc_m_period", label_visibility="collapsed")
-                    if selected_period_m:
-                        for idx, row in df_inc_combined_month.iterrows():
-                            if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
-                                year_val = int(row['Year'])
-                                month_val = row['Month']
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Incoming)**")
-                                    _render_pjp_detail_month(df_preprocessed_time, year_val, str(month_val), "Incoming")
-                                break
-            
-            if selected_jenis_transaksi == 'Outgoing' or selected_jenis_transaksi == 'All':
-                with col2:
-                    st.markdown("<h4 style='background-color: #fef2f2; border-left: 5px solid #ef4444; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>📤 OUTGOING (Bulanan)</h4>", unsafe_allow_html=True)
-                    
-                    df_out_combined_month_display = rename_format_growth_monthly_df(df_out_combined_month.copy(), "Out")
-                    st.dataframe(
-                        df_out_combined_month_display, 
-                        use_container_width=True, 
-                        hide_index=True,
-                        column_config=_get_growth_column_config("Outgoing")
-                    )
-                    
-                    # Detail selection with dropdown
-                    period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_out_combined_month.iterrows()]
-                    selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_out_m_period", label_visibility="collapsed")
-                    if selected_period_m:
-                        for idx, row in df_out_combined_month.iterrows():
-                            if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
-                                year_val = int(row['Year'])
-                                month_val = row['Month']
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Outgoing)**")
-                                    _render_pjp_detail_month(df_preprocessed_time, year_val, str(month_val), "Outgoing")
-                                break
-            
-            if selected_jenis_transaksi == 'Domestik' or selected_jenis_transaksi == 'All':
-                with col3:
-                    st.markdown("<h4 style='background-color: #f0fdf4; border-left: 5px solid #16a34a; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>🏠 DOMESTIK (Bulanan)</h4>", unsafe_allow_html=True)
-                    
-                    df_dom_combined_month_display = rename_format_growth_monthly_df(df_dom_combined_month.copy(), "Dom")
-                    st.dataframe(
-                        df_dom_combined_month_display, 
-                        use_container_width=True, 
-                        hide_index=True,
-                        column_config=_get_growth_column_config("Domestik")
-                    )
-                    
-                    # Detail selection with dropdown
-                    period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_dom_combined_month.iterrows()]
-                    selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_dom_m_period", label_visibility="collapsed")
-                    if selected_period_m:
-                        for idx, row in df_dom_combined_month.iterrows():
-                            if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
-                                year_val = int(row['Year'])
-                                month_val = row['Month']
-                                
-                                with st.container(border=True):
-                                    st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Domestik)**")
-                                    _render_pjp_detail_month(df_preprocessed_time, year_val, str(month_val), "Domestik")
-                                break
-            
-            st.divider()
+            # Detail selection with dropdown
+            col_detail, col_empty = st.columns([3, 5])
+            with col_detail:
+                period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_growth.iterrows()]
+                selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_out_period", label_visibility="collapsed")
+                if selected_period:
+                    for idx, row in df_growth.iterrows():
+                        if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
+                            year_val = int(row['Year'])
+                            quarter_val = int(row['Quarter'])
+                            
+                            with st.container(border=True):
+                                st.markdown(f"**📊 Detail per PJP - {selected_period} (Outgoing)**")
+                                _render_pjp_detail(pjp_contribution, year_val, quarter_val, "Outgoing")
+                            break
             
             make_combined_bar_line_chart(
-                df_jumlah_inc_month_filtered,
-                "Jumlah",
-                "Inc",
-                True,
-                font_size=_growth_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                chart_height=_growth_chart_height,
-                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-            )
-            make_combined_bar_line_chart(
-                df_nom_inc_month_filtered,
-                "Nilai",
-                "Inc",
-                True,
-                font_size=_growth_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                chart_height=_growth_chart_height,
-                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-            )
-
-            make_combined_bar_line_chart(
-                df_jumlah_out_month_filtered,
+                df_growth,
                 "Jumlah",
                 "Out",
-                True,
                 font_size=_growth_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+                axis_x_tick_bold=_growth_axis_x_tick_bold,
+                axis_y_tick_bold=_growth_axis_y_tick_bold,
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
             make_combined_bar_line_chart(
-                df_nom_out_month_filtered,
+                df_growth,
                 "Nilai",
                 "Out",
-                True,
                 font_size=_growth_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+                axis_x_tick_bold=_growth_axis_x_tick_bold,
+                axis_y_tick_bold=_growth_axis_y_tick_bold,
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
-
+            st.divider()
+            
+        if selected_jenis_transaksi == 'Domestik' or selected_jenis_transaksi == 'All':
+            st.markdown("<h3 style='background-color: #f0fdf4; border-left: 5px solid #16a34a; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px;'>🏠 DOMESTIK - Data Transaksi</h3>", unsafe_allow_html=True)
+            
+            # Display table with proper numeric sorting
+            df_dom_combined_display = rename_format_growth_df(flow_pair_view(df_growth, "Dom"), "Dom")
+            st.dataframe(
+                df_dom_combined_display, 
+                use_container_width=True, 
+                hide_index=True,
+                column_config=_get_growth_column_config("Domestik")
+            )
+            
+            # Detail selection with dropdown
+            col_detail, col_empty = st.columns([3, 5])
+            with col_detail:
+                period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_growth.iterrows()]
+                selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_dom_period", label_visibility="collapsed")
+                if selected_period:
+                    for idx, row in df_growth.iterrows():
+                        if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
+                            year_val = int(row['Year'])
+                            quarter_val = int(row['Quarter'])
+                            
+                            with st.container(border=True):
+                                st.markdown(f"**📊 Detail per PJP - {selected_period} (Domestik)**")
+                                _render_pjp_detail(pjp_contribution, year_val, quarter_val, "Domestik")
+                            break
+            
             make_combined_bar_line_chart(
-                df_jumlah_dom_month_filtered,
+                df_growth,
                 "Jumlah",
                 "Dom",
-                True,
                 font_size=_growth_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+                axis_x_tick_bold=_growth_axis_x_tick_bold,
+                axis_y_tick_bold=_growth_axis_y_tick_bold,
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
             make_combined_bar_line_chart(
-                df_nom_dom_month_filtered,
+                df_growth,
                 "Nilai",
                 "Dom",
-                True,
                 font_size=_growth_font_size,
                 legend_font_size=_growth_legend_font_size,
                 axis_x_tick_font_size=_growth_axis_x_tick_font_size,
                 axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+                axis_x_tick_bold=_growth_axis_x_tick_bold,
+                axis_y_tick_bold=_growth_axis_y_tick_bold,
                 chart_height=_growth_chart_height,
                 chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
             )
+            st.divider()
 
-            st.markdown("<h3 style='background-color: #fef3c7; border-left: 5px solid #f59e0b; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px; margin-top: 30px;'>💰 TOTAL KESELURUHAN - Data Transaksi (Bulanan)</h3>", unsafe_allow_html=True)
-            st.markdown("<p style='color: #92400e; font-weight: 500; margin-bottom: 15px;'>Gabungan Data Transaksi Incoming + Outgoing + Domestik per Bulan (Frekuensi & Nominal)</p>", unsafe_allow_html=True)
-            df_total_month_combined_display = df_total_month_combined.copy()
-            df_total_month_combined_display = rename_format_growth_monthly_df(df_total_month_combined_display, "Total")
-            st.dataframe(
-                df_total_month_combined_display, 
-                use_container_width=True, 
-                hide_index=True,
-                column_config=_get_growth_column_config("Total")
+        st.markdown("<h3 style='background-color: #fef3c7; border-left: 5px solid #f59e0b; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px; margin-top: 30px;'>💰 TOTAL KESELURUHAN - Data Transaksi (Kuartalan)</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='color: #92400e; font-weight: 500; margin-bottom: 15px;'>Gabungan Data Transaksi Incoming + Outgoing + Domestik (Frekuensi & Nominal)</p>", unsafe_allow_html=True)
+        
+        df_total_combined_display = df_total_combined.copy()
+        df_total_combined_display = rename_format_growth_df(df_total_combined_display, "Total")
+        st.dataframe(
+            df_total_combined_display, 
+            use_container_width=True, 
+            hide_index=True,
+            column_config=_get_growth_column_config("Total")
+        )
+        
+        # Detail selection with dropdown
+        col_detail, col_empty = st.columns([3, 5])
+        with col_detail:
+            period_options = [f"Q{int(row['Quarter'])} {int(row['Year'])}" for _, row in df_total_combined.iterrows()]
+            selected_period = st.selectbox("Pilih periode untuk detail", period_options, key="sel_total_period", label_visibility="collapsed")
+            if selected_period:
+                for idx, row in df_total_combined.iterrows():
+                    if f"Q{int(row['Quarter'])} {int(row['Year'])}" == selected_period:
+                        year_val = int(row['Year'])
+                        quarter_val = int(row['Quarter'])
+                        
+                        with st.container(border=True):
+                            st.markdown(f"**📊 Detail per PJP - {selected_period} (Total)**")
+                            _render_pjp_detail(pjp_contribution, year_val, quarter_val, "Total")
+                            st.divider()
+                            _render_pjp_supporting_tw_table(
+                                contribution=pjp_contribution,
+                                year=year_val,
+                                quarter=quarter_val,
+                                key_prefix=f"growth_tw_{year_val}Q{quarter_val}",
+                            )
+                        break
+
+        st.markdown("<hr style='border-top: 2px dashed #f59e0b; margin: 20px 0;'>", unsafe_allow_html=True)
+        st.markdown("### 📊 Visualisasi Keseluruhan Data Transaksi (Frekuensi & Nominal Tergabung)")
+
+        st.caption(
+            "Grafik berikut menampilkan stacked bar (Incoming/Outgoing/Domestik) pada sumbu kiri dan garis Growth (YoY & QtQ) pada sumbu kanan. "
+            "Gunakan legend untuk menyembunyikan/menampilkan garis tertentu; label % akan ikut hilang saat garis di-hide."
+        )
+
+        # Visual-only filter: tampilkan/sematikan kuartal tertentu (growth tidak dihitung ulang)
+        overall_period_options = (
+            df_total_combined.assign(
+                _period=lambda d: d["Year"].astype(int).astype(str) + " Q" + d["Quarter"].astype(int).astype(str)
             )
-            
-            # Detail selection with dropdown for monthly
-            col_detail_m, col_empty_m = st.columns([3, 5])
-            with col_detail_m:
-                period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_total_month_combined.iterrows()]
-                selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_total_m_period", label_visibility="collapsed")
+            .sort_values(["Year", "Quarter"])
+            ["_period"]
+            .dropna()
+            .astype(str)
+            .tolist()
+        )
+        overall_period_sig = "|".join(overall_period_options)
+        if st.session_state.get("overall_visible_period_sig") != overall_period_sig:
+            st.session_state["overall_visible_period_sig"] = overall_period_sig
+            st.session_state["overall_visible_periods"] = overall_period_options
+
+        st.multiselect(
+            "Tampilkan Kuartal",
+            options=overall_period_options,
+            key="overall_visible_periods",
+            help="Hanya menyaring tampilan chart. Nilai YoY/QtQ tetap nilai asli dari perhitungan data.",
+        )
+
+        st.markdown("#### 📦 Volume / Frekuensi")
+        st.caption("Sumbu kiri: Volume (Jutaan). Sumbu kanan: Growth YoY & QtQ (%).")
+
+        make_overall_total_stacked_growth_chart(
+            df_total=df_growth,
+            sum_trx_type="Jumlah",
+            is_month=False,
+            show_breakdown_growth=True,
+            visible_periods=st.session_state.get("overall_visible_periods"),
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        _render_overall_growth_detail_table_quarterly(
+            df_growth=df_growth,
+            sum_trx_type="Jumlah",
+            visible_periods=st.session_state.get("overall_visible_periods"),
+            ordered_periods=overall_period_options,
+        )
+
+        st.markdown("#### 💰 Nominal")
+        st.caption("Sumbu kiri: Nilai (Rp Triliun). Sumbu kanan: Growth YoY & QtQ (%).")
+        make_overall_total_stacked_growth_chart(
+            df_total=df_growth,
+            sum_trx_type="Nilai",
+            is_month=False,
+            show_breakdown_growth=True,
+            visible_periods=st.session_state.get("overall_visible_periods"),
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        _render_overall_growth_detail_table_quarterly(
+            df_growth=df_growth,
+            sum_trx_type="Nilai",
+            visible_periods=st.session_state.get("overall_visible_periods"),
+            ordered_periods=overall_period_options,
+        )
+
+    # MONTHLY SECTION
+    if st.session_state['view_mode'] == 'monthly':
+        st.subheader("📅 Data Transaksi Bulanan")
+        
+        # KPI Cards - Monthly
+        st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 Ringkasan Transaksi</h3>", unsafe_allow_html=True)
+        
+        # Calculate totals
+        total_inc_freq_m = df_growth_month['Sum of Fin Jumlah Inc'].sum()
+        total_inc_value_m = df_growth_month['Sum of Fin Nilai Inc'].sum()
+        total_out_freq_m = df_growth_month['Sum of Fin Jumlah Out'].sum()
+        total_out_value_m = df_growth_month['Sum of Fin Nilai Out'].sum()
+        total_dom_freq_m = df_growth_month['Sum of Fin Jumlah Dom'].sum()
+        total_dom_value_m = df_growth_month['Sum of Fin Nilai Dom'].sum()
+        total_all_freq_m = total_inc_freq_m + total_out_freq_m + total_dom_freq_m
+
+        inc_t_m = qround_float(total_inc_value_m / 1e12, decimals=2, none=0.0) or 0.0
+        out_t_m = qround_float(total_out_value_m / 1e12, decimals=2, none=0.0) or 0.0
+        dom_t_m = qround_float(total_dom_value_m / 1e12, decimals=2, none=0.0) or 0.0
+        tot_t_m = qround_float(inc_t_m + out_t_m + dom_t_m, decimals=2, none=0.0) or 0.0
+        
+        col1_kpi, col2_kpi, col3_kpi, col4_kpi = st.columns(4)
+        
+        with col1_kpi:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #F5B0CB;">
+                <div class="kpi-title">📥 INCOMING</div>
+                <div class="kpi-value-main" style="color: #F5B0CB;">{total_inc_freq_m:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_t_m, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col2_kpi:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #F5CBA7;">
+                <div class="kpi-title">📤 OUTGOING</div>
+                <div class="kpi-value-main" style="color: #F5CBA7;">{total_out_freq_m:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_t_m, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col3_kpi:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #5DADE2;">
+                <div class="kpi-title">🏠 DOMESTIK</div>
+                <div class="kpi-value-main" style="color: #5DADE2;">{total_dom_freq_m:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_t_m, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        with col4_kpi:
+            st.markdown(f"""
+            <div class="kpi-card" style="border-left-color: #6366f1;">
+                <div class="kpi-title">💰 TOTAL</div>
+                <div class="kpi-value-main" style="color: #6366f1;">{total_all_freq_m:,.0f}</div>
+                <div class="kpi-value-sub">Frekuensi</div>
+                <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_t_m, decimals=2, none='0.00')} T</div>
+                <div class="kpi-value-sub">Nilai</div>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("<div style='margin-top: 30px;'></div>", unsafe_allow_html=True)
+        
+        # Grafik Gabungan (Stacked Bar + Line) - Monthly
+        st.markdown("<h3 style='margin-bottom: 15px;'>📊 Grafik Gabungan - Nilai Transaksi</h3>", unsafe_allow_html=True)
+        make_stacked_bar_line_chart_combined(
+            df_growth_month,
+            is_month=True,
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        
+        st.divider()
+        
+        col1, col2, col3 = st.columns(3)
+        
+        if selected_jenis_transaksi == 'Incoming' or selected_jenis_transaksi == 'All':
+            with col1:
+                st.markdown("<h4 style='background-color: #f0f7ff; border-left: 5px solid #3b82f6; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>📥 INCOMING (Bulanan)</h4>", unsafe_allow_html=True)
+                
+                df_inc_combined_month_display = rename_format_growth_monthly_df(flow_pair_view(df_growth_month, "Inc"), "Inc")
+                st.dataframe(
+                    df_inc_combined_month_display, 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config=_get_growth_column_config("Incoming")
+                )
+                
+                # Detail selection with dropdown
+                period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_growth_month.iterrows()]
+                selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_inc_m_period", label_visibility="collapsed")
+                if selected_period_m:
+                    for idx, row in df_growth_month.iterrows():
+                        if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
+                            year_val = int(row['Year'])
+                            month_val = row['Month']
+                            
+                            with st.container(border=True):
+                                st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Incoming)**")
+                                _render_pjp_detail_month(pjp_month_contribution, year_val, str(month_val), "Incoming")
+                            break
+        
+        if selected_jenis_transaksi == 'Outgoing' or selected_jenis_transaksi == 'All':
+            with col2:
+                st.markdown("<h4 style='background-color: #fef2f2; border-left: 5px solid #ef4444; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>📤 OUTGOING (Bulanan)</h4>", unsafe_allow_html=True)
+                
+                df_out_combined_month_display = rename_format_growth_monthly_df(flow_pair_view(df_growth_month, "Out"), "Out")
+                st.dataframe(
+                    df_out_combined_month_display, 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config=_get_growth_column_config("Outgoing")
+                )
+                
+                # Detail selection with dropdown
+                period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_growth_month.iterrows()]
+                selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_out_m_period", label_visibility="collapsed")
                 if selected_period_m:
-                    for idx, row in df_total_month_combined.iterrows():
+                    for idx, row in df_growth_month.iterrows():
                         if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
                             year_val = int(row['Year'])
                             month_val = row['Month']
                             
                             with st.container(border=True):
-                                st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Total)**")
-                                _render_pjp_detail_month(df_preprocessed_time, year_val, str(month_val), "Total")
+                                st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Outgoing)**")
+                                _render_pjp_detail_month(pjp_month_contribution, year_val, str(month_val), "Outgoing")
                             break
+        
+        if selected_jenis_transaksi == 'Domestik' or selected_jenis_transaksi == 'All':
+            with col3:
+                st.markdown("<h4 style='background-color: #f0fdf4; border-left: 5px solid #16a34a; padding: 10px 12px; border-radius: 5px; margin-bottom: 15px;'>🏠 DOMESTIK (Bulanan)</h4>", unsafe_allow_html=True)
+                
+                df_dom_combined_month_display = rename_format_growth_monthly_df(flow_pair_view(df_growth_month, "Dom"), "Dom")
+                st.dataframe(
+                    df_dom_combined_month_display, 
+                    use_container_width=True, 
+                    hide_index=True,
+                    column_config=_get_growth_column_config("Domestik")
+                )
+                
+                # Detail selection with dropdown
+                period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_growth_month.iterrows()]
+                selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_dom_m_period", label_visibility="collapsed")
+                if selected_period_m:
+                    for idx, row in df_growth_month.iterrows():
+                        if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
+                            year_val = int(row['Year'])
+                            month_val = row['Month']
+                            
+                            with st.container(border=True):
+                                st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Domestik)**")
+                                _render_pjp_detail_month(pjp_month_contribution, year_val, str(month_val), "Domestik")
+                            break
+        
+        st.divider()
+        
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Jumlah",
+            "Inc",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Nilai",
+            "Inc",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
 
-            st.markdown("<hr style='border-top: 2px dashed #f59e0b; margin: 20px 0;'>", unsafe_allow_html=True)
-            st.markdown("### 📅 Visualisasi Keseluruhan Data Transaksi (Frekuensi & Nominal Tergabung)")
-            make_overall_total_stacked_growth_chart(
-                df_total=df_total_month_combined,
-                df_inc=df_jumlah_inc_month_filtered,
-                df_out=df_jumlah_out_month_filtered,
-                df_dom=df_jumlah_dom_month_filtered,
-                sum_trx_type="Jumlah",
-                is_month=True,
-                font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                axis_x_tick_bold=_growth_axis_x_tick_bold,
-                axis_y_tick_bold=_growth_axis_y_tick_bold,
-                chart_height=_growth_chart_height,
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Jumlah",
+            "Out",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Nilai",
+            "Out",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Jumlah",
+            "Dom",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+        make_combined_bar_line_chart(
+            df_growth_month,
+            "Nilai",
+            "Dom",
+            True,
+            font_size=_growth_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+
+        st.markdown("<h3 style='background-color: #fef3c7; border-left: 5px solid #f59e0b; padding: 12px 15px; border-radius: 5px; margin-bottom: 20px; margin-top: 30px;'>💰 TOTAL KESELURUHAN - Data Transaksi (Bulanan)</h3>", unsafe_allow_html=True)
+        st.markdown("<p style='color: #92400e; font-weight: 500; margin-bottom: 15px;'>Gabungan Data Transaksi Incoming + Outgoing + Domestik per Bulan (Frekuensi & Nominal)</p>", unsafe_allow_html=True)
+        df_total_month_combined_display = df_total_month_combined.copy()
+        df_total_month_combined_display = rename_format_growth_monthly_df(df_total_month_combined_display, "Total")
+        st.dataframe(
+            df_total_month_combined_display, 
+            use_container_width=True, 
+            hide_index=True,
+            column_config=_get_growth_column_config("Total")
+        )
+        
+        # Detail selection with dropdown for monthly
+        col_detail_m, col_empty_m = st.columns([3, 5])
+        with col_detail_m:
+            period_options_m = [f"{row['Month']} {int(row['Year'])}" for _, row in df_total_month_combined.iterrows()]
+            selected_period_m = st.selectbox("Detail:", period_options_m, key="sel_total_m_period", label_visibility="collapsed")
+            if selected_period_m:
+                for idx, row in df_total_month_combined.iterrows():
+                    if f"{row['Month']} {int(row['Year'])}" == selected_period_m:
+                        year_val = int(row['Year'])
+                        month_val = row['Month']
+                        
+                        with st.container(border=True):
+                            st.markdown(f"**📊 Detail per PJP - {selected_period_m} (Total)**")
+                            _render_pjp_detail_month(pjp_month_contribution, year_val, str(month_val), "Total")
+                        break
+
+        st.markdown("<hr style='border-top: 2px dashed #f59e0b; margin: 20px 0;'>", unsafe_allow_html=True)
+        st.markdown("### 📅 Visualisasi Keseluruhan Data Transaksi (Frekuensi & Nominal Tergabung)")
+        make_overall_total_stacked_growth_chart(
+            df_total=df_growth_month,
+            sum_trx_type="Jumlah",
+            is_month=True,
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            chart_height=_growth_chart_height,
+        )
+        make_overall_total_stacked_growth_chart(
+            df_total=df_growth_month,
+            sum_trx_type="Nilai",
+            is_month=True,
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            chart_height=_growth_chart_height,
+        )
+
+    # YEARLY SECTION
+    if st.session_state['view_mode'] == 'yearly':
+        st.subheader("🗓️ Data Transaksi Tahunan")
+        st.caption("Catatan: tanda '*' berarti data tahun tersebut tidak lengkap (terpotong karena filter Start/End Quarter).")
+
+        # KPI Cards - Yearly (per Tahun)
+        if df_total_combined is None or df_total_combined.empty:
+            st.info("Tidak ada data pada rentang tahun/kuartal yang dipilih.")
+        else:
+            def _safe_year_sum(df_src: pd.DataFrame | None, value_col: str) -> pd.Series:
+                if df_src is None or df_src.empty:
+                    return pd.Series(dtype="float64")
+                if "Year" not in df_src.columns or value_col not in df_src.columns:
+                    return pd.Series(dtype="float64")
+                dfc = df_src[["Year", value_col]].copy()
+                dfc["Year"] = pd.to_numeric(dfc["Year"], errors="coerce")
+                dfc[value_col] = pd.to_numeric(dfc[value_col], errors="coerce")
+                dfc = dfc.dropna(subset=["Year"]).copy()
+                if dfc.empty:
+                    return pd.Series(dtype="float64")
+                dfc["Year"] = dfc["Year"].astype(int)
+                return dfc.groupby("Year", observed=False)[value_col].sum()
+
+            years = (
+                df_total_combined["Year"].dropna().astype(int).sort_values().unique().tolist()
+                if "Year" in df_total_combined.columns
+                else []
             )
-            make_overall_total_stacked_growth_chart(
-                df_total=df_total_month_combined,
-                df_inc=df_nom_inc_month_filtered,
-                df_out=df_nom_out_month_filtered,
-                df_dom=df_nom_dom_month_filtered,
-                sum_trx_type="Nilai",
-                is_month=True,
-                font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                axis_x_tick_bold=_growth_axis_x_tick_bold,
-                axis_y_tick_bold=_growth_axis_y_tick_bold,
-                chart_height=_growth_chart_height,
+
+            q_counts = (
+                df_total_combined.groupby("Year", observed=False)["Quarter"].nunique()
+                if {"Year", "Quarter"}.issubset(set(df_total_combined.columns))
+                else pd.Series(dtype="int64")
             )
+            is_partial_map = {int(y): (int(q_counts.get(int(y), 0)) < 4) for y in years}
+
+            # Annual totals (Nominal)
+            inc_nom_y = _safe_year_sum(df_growth, "Sum of Fin Nilai Inc")
+            out_nom_y = _safe_year_sum(df_growth, "Sum of Fin Nilai Out")
+            dom_nom_y = _safe_year_sum(df_growth, "Sum of Fin Nilai Dom")
+
+            # Annual totals (Frekuensi)
+            inc_freq_y = _safe_year_sum(df_growth, "Sum of Fin Jumlah Inc")
+            out_freq_y = _safe_year_sum(df_growth, "Sum of Fin Jumlah Out")
+            dom_freq_y = _safe_year_sum(df_growth, "Sum of Fin Jumlah Dom")
+
+            yearly = pd.DataFrame({"Year": years})
+            yearly["Incoming_Nominal"] = yearly["Year"].map(inc_nom_y).fillna(0.0)
+            yearly["Outgoing_Nominal"] = yearly["Year"].map(out_nom_y).fillna(0.0)
+            yearly["Domestik_Nominal"] = yearly["Year"].map(dom_nom_y).fillna(0.0)
+            yearly["Total_Nominal"] = yearly["Incoming_Nominal"] + yearly["Outgoing_Nominal"] + yearly["Domestik_Nominal"]
+
+            yearly["Incoming_Frekuensi"] = yearly["Year"].map(inc_freq_y).fillna(0.0)
+            yearly["Outgoing_Frekuensi"] = yearly["Year"].map(out_freq_y).fillna(0.0)
+            yearly["Domestik_Frekuensi"] = yearly["Year"].map(dom_freq_y).fillna(0.0)
+            yearly["Total_Frekuensi"] = yearly["Incoming_Frekuensi"] + yearly["Outgoing_Frekuensi"] + yearly["Domestik_Frekuensi"]
+
+            yearly["YoY_Total_Nominal"] = yearly["Total_Nominal"].pct_change() * 100
+            yearly["YoY_Total_Frekuensi"] = yearly["Total_Frekuensi"].pct_change() * 100
+
+            def _fmt_yoy(v: float | None) -> str:
+                if v is None or pd.isna(v):
+                    return "-"
+                return (
+                    format_id_percent(v, decimals=2, show_sign=True, none="-", space_before_percent=False)
+                    .replace(",00%", "%")
+                )
 
-        # YEARLY SECTION
-        if st.session_state['view_mode'] == 'yearly':
-            st.subheader("🗓️ Data Transaksi Tahunan")
-            st.caption("Catatan: tanda '*' berarti data tahun tersebut tidak lengkap (terpotong karena filter Start/End Quarter).")
+            st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 KPI Tahunan</h3>", unsafe_allow_html=True)
 
-            # KPI Cards - Yearly (per Tahun)
-            if df_total_combined is None or df_total_combined.empty:
-                st.info("Tidak ada data pada rentang tahun/kuartal yang dipilih.")
-            else:
-                def _safe_year_sum(df_src: pd.DataFrame | None, value_col: str) -> pd.Series:
-                    if df_src is None or df_src.empty:
-                        return pd.Series(dtype="float64")
-                    if "Year" not in df_src.columns or value_col not in df_src.columns:
-                        return pd.Series(dtype="float64")
-                    dfc = df_src[["Year", value_col]].copy()
-                    dfc["Year"] = pd.to_numeric(dfc["Year"], errors="coerce")
-                    dfc[value_col] = pd.to_numeric(dfc[value_col], errors="coerce")
-                    dfc = dfc.dropna(subset=["Year"]).copy()
-                    if dfc.empty:
-                        return pd.Series(dtype="float64")
-                    dfc["Year"] = dfc["Year"].astype(int)
-                    return dfc.groupby("Year", observed=False)[value_col].sum()
-
-                years = (
-                    df_total_combined["Year"].dropna().astype(int).sort_values().unique().tolist()
-                    if "Year" in df_total_combined.columns
-                    else []
-                )
+            year_labels = [f"{int(y)}{'*' if is_partial_map.get(int(y), False) else ''}" for y in years]
+            label_to_year = {lbl: int(lbl.replace("*", "")) for lbl in year_labels}
+            selected_year_label = st.selectbox(
+                "Pilih Tahun (untuk KPI)",
+                options=year_labels,
+                index=(len(year_labels) - 1) if year_labels else 0,
+                key="yearly_kpi_year",
+            )
+            selected_year = label_to_year.get(selected_year_label, years[-1] if years else None)
 
-                q_counts = (
-                    df_total_combined.groupby("Year", observed=False)["Quarter"].nunique()
-                    if {"Year", "Quarter"}.issubset(set(df_total_combined.columns))
-                    else pd.Series(dtype="int64")
-                )
-                is_partial_map = {int(y): (int(q_counts.get(int(y), 0)) < 4) for y in years}
-
-                # Annual totals (Nominal)
-                inc_nom_y = _safe_year_sum(df_nom_inc_filtered, "Sum of Fin Nilai Inc")
-                out_nom_y = _safe_year_sum(df_nom_out_filtered, "Sum of Fin Nilai Out")
-                dom_nom_y = _safe_year_sum(df_nom_dom_filtered, "Sum of Fin Nilai Dom")
-
-                # Annual totals (Frekuensi)
-                inc_freq_y = _safe_year_sum(df_jumlah_inc_filtered, "Sum of Fin Jumlah Inc")
-                out_freq_y = _safe_year_sum(df_jumlah_out_filtered, "Sum of Fin Jumlah Out")
-                dom_freq_y = _safe_year_sum(df_jumlah_dom_filtered, "Sum of Fin Jumlah Dom")
-
-                yearly = pd.DataFrame({"Year": years})
-                yearly["Incoming_Nominal"] = yearly["Year"].map(inc_nom_y).fillna(0.0)
-                yearly["Outgoing_Nominal"] = yearly["Year"].map(out_nom_y).fillna(0.0)
-                yearly["Domestik_Nominal"] = yearly["Year"].map(dom_nom_y).fillna(0.0)
-                yearly["Total_Nominal"] = yearly["Incoming_Nominal"] + yearly["Outgoing_Nominal"] + yearly["Domestik_Nominal"]
-
-                yearly["Incoming_Frekuensi"] = yearly["Year"].map(inc_freq_y).fillna(0.0)
-                yearly["Outgoing_Frekuensi"] = yearly["Year"].map(out_freq_y).fillna(0.0)
-                yearly["Domestik_Frekuensi"] = yearly["Year"].map(dom_freq_y).fillna(0.0)
-                yearly["Total_Frekuensi"] = yearly["Incoming_Frekuensi"] + yearly["Outgoing_Frekuensi"] + yearly["Domestik_Frekuensi"]
-
-                yearly["YoY_Total_Nominal"] = yearly["Total_Nominal"].pct_change() * 100
-                yearly["YoY_Total_Frekuensi"] = yearly["Total_Frekuensi"].pct_change() * 100
-
-                def _fmt_yoy(v: float | None) -> str:
-                    if v is None or pd.isna(v):
-                        return "-"
-                    return (
-                        format_id_percent(v, decimals=2, show_sign=True, none="-", space_before_percent=False)
-                        .replace(",00%", "%")
-                    )
+            row = yearly[yearly["Year"] == int(selected_year)].iloc[0] if selected_year is not None else None
 
-                st.markdown("<h3 style='margin-top: 20px; margin-bottom: 15px;'>📈 KPI Tahunan</h3>", unsafe_allow_html=True)
+            if row is not None:
+                inc_freq = float(row["Incoming_Frekuensi"]) if not pd.isna(row["Incoming_Frekuensi"]) else 0.0
+                out_freq = float(row["Outgoing_Frekuensi"]) if not pd.isna(row["Outgoing_Frekuensi"]) else 0.0
+                dom_freq = float(row["Domestik_Frekuensi"]) if not pd.isna(row["Domestik_Frekuensi"]) else 0.0
+                tot_freq = float(row["Total_Frekuensi"]) if not pd.isna(row["Total_Frekuensi"]) else 0.0
 
-                year_labels = [f"{int(y)}{'*' if is_partial_map.get(int(y), False) else ''}" for y in years]
-                label_to_year = {lbl: int(lbl.replace("*", "")) for lbl in year_labels}
-                default_label = year_labels[-1] if year_labels else None
-                selected_year_label = st.selectbox(
-                    "Pilih Tahun (untuk KPI)",
-                    options=year_labels,
-                    index=(len(year_labels) - 1) if year_labels else 0,
-                    key="yearly_kpi_year",
-                )
-                selected_year = label_to_year.get(selected_year_label, years[-1] if years else None)
-
-                row = yearly[yearly["Year"] == int(selected_year)].iloc[0] if selected_year is not None else None
-
-                if row is not None:
-                    inc_freq = float(row["Incoming_Frekuensi"]) if not pd.isna(row["Incoming_Frekuensi"]) else 0.0
-                    out_freq = float(row["Outgoing_Frekuensi"]) if not pd.isna(row["Outgoing_Frekuensi"]) else 0.0
-                    dom_freq = float(row["Domestik_Frekuensi"]) if not pd.isna(row["Domestik_Frekuensi"]) else 0.0
-                    tot_freq = float(row["Total_Frekuensi"]) if not pd.isna(row["Total_Frekuensi"]) else 0.0
-
-                    inc_nom = float(row["Incoming_Nominal"]) if not pd.isna(row["Incoming_Nominal"]) else 0.0
-                    out_nom = float(row["Outgoing_Nominal"]) if not pd.isna(row["Outgoing_Nominal"]) else 0.0
-                    dom_nom = float(row["Domestik_Nominal"]) if not pd.isna(row["Domestik_Nominal"]) else 0.0
-                    tot_nom = float(row["Total_Nominal"]) if not pd.isna(row["Total_Nominal"]) else 0.0
-
-                    col1, col2, col3, col4 = st.columns(4)
-
-                    with col1:
-                        st.markdown(f"""
-                        <div class="kpi-card" style="border-left-color: #F5B0CB;">
-                            <div class="kpi-title">📥 INCOMING ({selected_year_label})</div>
-                            <div class="kpi-value-main" style="color: #F5B0CB;">{inc_freq:,.0f}</div>
-                            <div class="kpi-value-sub">Frekuensi</div>
-                            <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_nom/1e12, decimals=2, none='0.00')} T</div>
-                            <div class="kpi-value-sub">Nilai</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    with col2:
-                        st.markdown(f"""
-                        <div class="kpi-card" style="border-left-color: #F5CBA7;">
-                            <div class="kpi-title">📤 OUTGOING ({selected_year_label})</div>
-                            <div class="kpi-value-main" style="color: #F5CBA7;">{out_freq:,.0f}</div>
-                            <div class="kpi-value-sub">Frekuensi</div>
-                            <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_nom/1e12, decimals=2, none='0.00')} T</div>
-                            <div class="kpi-value-sub">Nilai</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    with col3:
-                        st.markdown(f"""
-                        <div class="kpi-card" style="border-left-color: #5DADE2;">
-                            <div class="kpi-title">🏠 DOMESTIK ({selected_year_label})</div>
-                            <div class="kpi-value-main" style="color: #5DADE2;">{dom_freq:,.0f}</div>
-                            <div class="kpi-value-sub">Frekuensi</div>
-                            <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_nom/1e12, decimals=2, none='0.00')} T</div>
-                            <div class="kpi-value-sub">Nilai</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    with col4:
-                        st.markdown(f"""
-                        <div class="kpi-card" style="border-left-color: #6366f1;">
-                            <div class="kpi-title">💰 TOTAL ({selected_year_label})</div>
-                            <div class="kpi-value-main" style="color: #6366f1;">{tot_freq:,.0f}</div>
-                            <div class="kpi-value-sub">Frekuensi</div>
-                            <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_nom/1e12, decimals=2, none='0.00')} T</div>
-                            <div class="kpi-value-sub">Nilai</div>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                    # YoY info for selected year (Total)
-                    yoy_nom = yearly.loc[yearly["Year"] == int(selected_year), "YoY_Total_Nominal"].iloc[0]
-                    yoy_freq = yearly.loc[yearly["Year"] == int(selected_year), "YoY_Total_Frekuensi"].iloc[0]
-                    st.caption(f"YoY Total Nominal: {_fmt_yoy(yoy_nom)} | YoY Total Frekuensi: {_fmt_yoy(yoy_freq)}")
-
-                with st.expander("📋 Ringkasan Tahunan (Tabel)", expanded=False):
-                    table = yearly.copy()
-                    table["Incoming (Rp T)"] = table["Incoming_Nominal"] / 1e12
-                    table["Outgoing (Rp T)"] = table["Outgoing_Nominal"] / 1e12
-                    table["Domestik (Rp T)"] = table["Domestik_Nominal"] / 1e12
-                    table["Total (Rp T)"] = table["Total_Nominal"] / 1e12
-                    table["YoY Total Nominal (%)"] = table["YoY_Total_Nominal"]
-                    table["YoY Total Frekuensi (%)"] = table["YoY_Total_Frekuensi"]
-                    table["Data Lengkap?"] = table["Year"].map(lambda y: "Lengkap" if not is_partial_map.get(int(y), False) else "Parsial*")
-
-                    for c in [
+                inc_nom = float(row["Incoming_Nominal"]) if not pd.isna(row["Incoming_Nominal"]) else 0.0
+                out_nom = float(row["Outgoing_Nominal"]) if not pd.isna(row["Outgoing_Nominal"]) else 0.0
+                dom_nom = float(row["Domestik_Nominal"]) if not pd.isna(row["Domestik_Nominal"]) else 0.0
+                tot_nom = float(row["Total_Nominal"]) if not pd.isna(row["Total_Nominal"]) else 0.0
+
+                col1, col2, col3, col4 = st.columns(4)
+
+                with col1:
+                    st.markdown(f"""
+                    <div class="kpi-card" style="border-left-color: #F5B0CB;">
+                        <div class="kpi-title">📥 INCOMING ({selected_year_label})</div>
+                        <div class="kpi-value-main" style="color: #F5B0CB;">{inc_freq:,.0f}</div>
+                        <div class="kpi-value-sub">Frekuensi</div>
+                        <div class="kpi-value-main" style="color: #F5B0CB; margin-top: 12px;">Rp {format_en_decimal(inc_nom/1e12, decimals=2, none='0.00')} T</div>
+                        <div class="kpi-value-sub">Nilai</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                with col2:
+                    st.markdown(f"""
+                    <div class="kpi-card" style="border-left-color: #F5CBA7;">
+                        <div class="kpi-title">📤 OUTGOING ({selected_year_label})</div>
+                        <div class="kpi-value-main" style="color: #F5CBA7;">{out_freq:,.0f}</div>
+                        <div class="kpi-value-sub">Frekuensi</div>
+                        <div class="kpi-value-main" style="color: #F5CBA7; margin-top: 12px;">Rp {format_en_decimal(out_nom/1e12, decimals=2, none='0.00')} T</div>
+                        <div class="kpi-value-sub">Nilai</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                with col3:
+                    st.markdown(f"""
+                    <div class="kpi-card" style="border-left-color: #5DADE2;">
+                        <div class="kpi-title">🏠 DOMESTIK ({selected_year_label})</div>
+                        <div class="kpi-value-main" style="color: #5DADE2;">{dom_freq:,.0f}</div>
+                        <div class="kpi-value-sub">Frekuensi</div>
+                        <div class="kpi-value-main" style="color: #5DADE2; margin-top: 12px;">Rp {format_en_decimal(dom_nom/1e12, decimals=2, none='0.00')} T</div>
+                        <div class="kpi-value-sub">Nilai</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                with col4:
+                    st.markdown(f"""
+                    <div class="kpi-card" style="border-left-color: #6366f1;">
+                        <div class="kpi-title">💰 TOTAL ({selected_year_label})</div>
+                        <div class="kpi-value-main" style="color: #6366f1;">{tot_freq:,.0f}</div>
+                        <div class="kpi-value-sub">Frekuensi</div>
+                        <div class="kpi-value-main" style="color: #6366f1; margin-top: 12px;">Rp {format_en_decimal(tot_nom/1e12, decimals=2, none='0.00')} T</div>
+                        <div class="kpi-value-sub">Nilai</div>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+                # YoY info for selected year (Total)
+                yoy_nom = yearly.loc[yearly["Year"] == int(selected_year), "YoY_Total_Nominal"].iloc[0]
+                yoy_freq = yearly.loc[yearly["Year"] == int(selected_year), "YoY_Total_Frekuensi"].iloc[0]
+                st.caption(f"YoY Total Nominal: {_fmt_yoy(yoy_nom)} | YoY Total Frekuensi: {_fmt_yoy(yoy_freq)}")
+
+            with st.expander("📋 Ringkasan Tahunan (Tabel)", expanded=False):
+                table = yearly.copy()
+                table["Incoming (Rp T)"] = table["Incoming_Nominal"] / 1e12
+                table["Outgoing (Rp T)"] = table["Outgoing_Nominal"] / 1e12
+                table["Domestik (Rp T)"] = table["Domestik_Nominal"] / 1e12
+                table["Total (Rp T)"] = table["Total_Nominal"] / 1e12
+                table["YoY Total Nominal (%)"] = table["YoY_Total_Nominal"]
+                table["YoY Total Frekuensi (%)"] = table["YoY_Total_Frekuensi"]
+                table["Data Lengkap?"] = table["Year"].map(lambda y: "Lengkap" if not is_partial_map.get(int(y), False) else "Parsial*")
+
+                for c in [
+                    "Incoming (Rp T)",
+                    "Outgoing (Rp T)",
+                    "Domestik (Rp T)",
+                    "Total (Rp T)",
+                    "YoY Total Nominal (%)",
+                    "YoY Total Frekuensi (%)",
+                ]:
+                    if c in table.columns:
+                        table[c] = pd.to_numeric(table[c], errors="coerce").map(lambda x: qround_float(x, decimals=2, none=0.0))
+
+                if {"Incoming (Rp T)", "Outgoing (Rp T)", "Domestik (Rp T)", "Total (Rp T)"}.issubset(set(table.columns)):
+                    table["Total (Rp T)"] = (
+                        pd.to_numeric(table["Incoming (Rp T)"], errors="coerce").fillna(0.0)
+                        + pd.to_numeric(table["Outgoing (Rp T)"], errors="coerce").fillna(0.0)
+                        + pd.to_numeric(table["Domestik (Rp T)"], errors="coerce").fillna(0.0)
+                    ).map(lambda x: qround_float(x, decimals=2, none=0.0))
+
+                st.dataframe(
+                    table[[
+                        "Year",
                         "Incoming (Rp T)",
                         "Outgoing (Rp T)",
                         "Domestik (Rp T)",
                         "Total (Rp T)",
                         "YoY Total Nominal (%)",
                         "YoY Total Frekuensi (%)",
-                    ]:
-                        if c in table.columns:
-                            table[c] = pd.to_numeric(table[c], errors="coerce").map(lambda x: qround_float(x, decimals=2, none=0.0))
-
-                    if {"Incoming (Rp T)", "Outgoing (Rp T)", "Domestik (Rp T)", "Total (Rp T)"}.issubset(set(table.columns)):
-                        table["Total (Rp T)"] = (
-                            pd.to_numeric(table["Incoming (Rp T)"], errors="coerce").fillna(0.0)
-                            + pd.to_numeric(table["Outgoing (Rp T)"], errors="coerce").fillna(0.0)
-                            + pd.to_numeric(table["Domestik (Rp T)"], errors="coerce").fillna(0.0)
-                        ).map(lambda x: qround_float(x, decimals=2, none=0.0))
-
-                    st.dataframe(
-                        table[[
-                            "Year",
-                            "Incoming (Rp T)",
-                            "Outgoing (Rp T)",
-                            "Domestik (Rp T)",
-                            "Total (Rp T)",
-                            "YoY Total Nominal (%)",
-                            "YoY Total Frekuensi (%)",
-                            "Data Lengkap?",
-                        ]],
-                        use_container_width=True,
-                        hide_index=True,
-                        column_config={
-                            "Year": st.column_config.NumberColumn("Year", format="%d"),
-                            "Incoming (Rp T)": st.column_config.NumberColumn("Incoming (Rp T)", format="%.2f"),
-                            "Outgoing (Rp T)": st.column_config.NumberColumn("Outgoing (Rp T)", format="%.2f"),
-                            "Domestik (Rp T)": st.column_config.NumberColumn("Domestik (Rp T)", format="%.2f"),
-                            "Total (Rp T)": st.column_config.NumberColumn("Total (Rp T)", format="%.2f"),
-                            "YoY Total Nominal (%)": st.column_config.NumberColumn("YoY Total Nominal (%)", format="%+.2f%%"),
-                            "YoY Total Frekuensi (%)": st.column_config.NumberColumn("YoY Total Frekuensi (%)", format="%+.2f%%"),
-                        },
-                    )
+                        "Data Lengkap?",
+                    ]],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={
+                        "Year": st.column_config.NumberColumn("Year", format="%d"),
+                        "Incoming (Rp T)": st.column_config.NumberColumn("Incoming (Rp T)", format="%.2f"),
+                        "Outgoing (Rp T)": st.column_config.NumberColumn("Outgoing (Rp T)", format="%.2f"),
+                        "Domestik (Rp T)": st.column_config.NumberColumn("Domestik (Rp T)", format="%.2f"),
+                        "Total (Rp T)": st.column_config.NumberColumn("Total (Rp T)", format="%.2f"),
+                        "YoY Total Nominal (%)": st.column_config.NumberColumn("YoY Total Nominal (%)", format="%+.2f%%"),
+                        "YoY Total Frekuensi (%)": st.column_config.NumberColumn("YoY Total Frekuensi (%)", format="%+.2f%%"),
+                    },
+                )
 
-            st.markdown(
-                "<h3 style='margin-bottom: 15px;'>📊 Grafik Tahunan — Nilai Transaksi (Rp Triliun) + YoY (%)</h3>",
-                unsafe_allow_html=True,
-            )
-            make_yearly_stacked_bar_yoy_chart(
-                df_inc=df_nom_inc_filtered,
-                df_out=df_nom_out_filtered,
-                df_dom=df_nom_dom_filtered,
-                font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                axis_x_tick_bold=_growth_axis_x_tick_bold,
-                axis_y_tick_bold=_growth_axis_y_tick_bold,
-                axis_x_tick_weight=_growth_axis_x_tick_weight,
-                axis_y_tick_weight=_growth_axis_y_tick_weight,
-                chart_height=_growth_chart_height,
-                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
-            )
+        st.markdown(
+            "<h3 style='margin-bottom: 15px;'>📊 Grafik Tahunan — Nilai Transaksi (Rp Triliun) + YoY (%)</h3>",
+            unsafe_allow_html=True,
+        )
+        make_yearly_stacked_bar_yoy_chart(
+            df_growth=df_growth,
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            axis_x_tick_weight=_growth_axis_x_tick_weight,
+            axis_y_tick_weight=_growth_axis_y_tick_weight,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
 
-            st.markdown(
-                "<h3 style='margin-top: 20px; margin-bottom: 15px;'>📊 Grafik Tahunan (Khusus 2025 = Jan–Sep) — Nilai Transaksi (Rp Triliun) + YoY (%)</h3>",
-                unsafe_allow_html=True,
-            )
-            st.caption(
-                "Sumbu nilai dalam Rp Triliun (Rp T). Bar 2025 memakai akumulasi Jan–Sep, tahun lainnya Jan–Des. "
-                "Untuk YoY 2025: bandingkan Jan–Sep 2025 vs Jan–Sep 2024; YoY 2024 tetap full-year vs 2023."
-            )
-            make_yearly_stacked_bar_yoy_chart_ytd(
-                df_inc=df_nom_inc_month_filtered,
-                df_out=df_nom_out_month_filtered,
-                df_dom=df_nom_dom_month_filtered,
-                end_month=9,
-                cap_years={2025},
-                default_end_month=12,
-                yoy_cap_years={2025},
-                font_size=_growth_font_size,
-                label_font_size=_growth_label_font_size,
-                legend_font_size=_growth_legend_font_size,
-                axis_x_tick_font_size=_growth_axis_x_tick_font_size,
-                axis_y_tick_font_size=_growth_axis_y_tick_font_size,
-                axis_x_tick_bold=_growth_axis_x_tick_bold,
-                axis_y_tick_bold=_growth_axis_y_tick_bold,
-                axis_x_tick_weight=_growth_axis_x_tick_weight,
-                axis_y_tick_weight=_growth_axis_y_tick_weight,
-                chart_height=_growth_chart_height,
-                chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        st.markdown(
+            "<h3 style='margin-top: 20px; margin-bottom: 15px;'>📊 Grafik Tahunan (Khusus 2025 = Jan–Sep) — Nilai Transaksi (Rp Triliun) + YoY (%)</h3>",
+            unsafe_allow_html=True,
+        )
+        st.caption(
+            "Sumbu nilai dalam Rp Triliun (Rp T). Bar 2025 memakai akumulasi Jan–Sep, tahun lainnya Jan–Des. "
+            "Untuk YoY 2025: bandingkan Jan–Sep 2025 vs Jan–Sep 2024; YoY 2024 tetap full-year vs 2023."
+        )
+        make_yearly_stacked_bar_yoy_chart_ytd(
+            df_growth=df_growth_month,
+            end_month=9,
+            cap_years={2025},
+            default_end_month=12,
+            yoy_cap_years={2025},
+            font_size=_growth_font_size,
+            label_font_size=_growth_label_font_size,
+            legend_font_size=_growth_legend_font_size,
+            axis_x_tick_font_size=_growth_axis_x_tick_font_size,
+            axis_y_tick_font_size=_growth_axis_y_tick_font_size,
+            axis_x_tick_bold=_growth_axis_x_tick_bold,
+            axis_y_tick_bold=_growth_axis_y_tick_bold,
+            axis_x_tick_weight=_growth_axis_x_tick_weight,
+            axis_y_tick_weight=_growth_axis_y_tick_weight,
+            chart_height=_growth_chart_height,
+            chart_width=_growth_chart_width if _growth_chart_width > 0 else None,
+        )
+
+
+# Initial Page Setup
+set_page_visuals("viz")
+
+if st.session_state['df'] is not None:
+    df_source = st.session_state['df']
+    df = df_source
+    with st.sidebar:
+        with st.expander("Filter Multilicense", True):
+            ml_mode_ui = st.radio(
+                "Mode Perhitungan",
+                options=["Termasuk Multilicense", "Tanpa Multilicense"],
+                index=0,
+                key="growth_multilicense_mode",
+                help=(
+                    "Termasuk = seluruh data. Tanpa = data PJP multilicense dikeluarkan mulai tanggal efektif masing-masing."
+                ),
             )
 
+            ml_mode = "exclude" if ml_mode_ui == "Tanpa Multilicense" else "include"
+            data_handle = dataset_handle(df_source, ml_mode)
+            df, _ml_mask = apply_multilicense_mode(df_source, ml_mode, data_handle)
+
+            if df_source is not None and not df_source.empty:
+                total_rows = int(len(df_source))
+                ml_rows = int(_ml_mask.sum()) if len(_ml_mask) else 0
+                shown_rows = int(len(df))
+                st.caption(
+                    f"Baris data: total {total_rows:,} | multilicense aktif {ml_rows:,} | digunakan {shown_rows:,}"
+                )
+
+        with st.expander("Filter Growth", True):
+            if df is None or df.empty:
+                st.warning("Tidak ada data setelah filter multilicense. Ubah mode perhitungan.")
+                st.stop()
+
+            unique_years = sorted(df['Year'].unique().tolist())
+            quarters = ['Q1', 'Q2', 'Q3', 'Q4']
+            
+            # Start Year & Quarter
+            col_y1, col_q1 = st.columns(2)
+            with col_y1:
+                selected_start_year = st.selectbox('Start Year:', unique_years)
+            with col_q1:
+                selected_start_quarter = st.selectbox('Start Quarter:', quarters)
+            
+            # End Year & Quarter
+            col_y2, col_q2 = st.columns(2)
+            with col_y2:
+                selected_end_year = st.selectbox('End Year:', unique_years, index=len(unique_years) - 1)
+            with col_q2:
+                selected_end_quarter = st.selectbox('End Quarter:', quarters, index=3)
+
+            jenis_transaksi = ['All', 'Incoming', 'Outgoing', 'Domestik']
+            selected_jenis_transaksi = st.selectbox('Select Jenis Transaksi:', jenis_transaksi)
+
+        st.info("Use the filters to adjust the year-quarter range and transaction type.")
+
+    with (st.spinner('Loading and filtering data...')):
+        cube = build_cube(data_handle, df)
+        df_preprocessed_time = cube.base
+        # Kontribusi growth per PJP (di atas matriks PJP x kuartal) untuk detail & driver naratif
+        pjp_contribution = cube.growth_contribution(QUARTER)
+        pjp_month_contribution = cube.growth_contribution(MONTH)
+
+        df_sum_time = cube.rollup('Year', 'Quarter')
+
+        # Satu frame growth lebar per grain (semua measure + growth), lalu filter
+        # rentang Year-Quarter (kontinyu) sekali untuk semua frame
+        windowed = filter_period_frames(
+            {'quarter': cube.growth_frame(is_month=False), 'month': cube.growth_frame(is_month=True)},
+            (selected_start_year, int(str(selected_start_quarter).replace("Q", ""))),
+            (selected_end_year, int(str(selected_end_quarter).replace("Q", ""))),
+            trim_zero={'month': TOTAL_MEASURES},
+        )
+        df_growth = windowed['quarter']
+        df_growth_month = windowed['month']
+
+        df_total_combined = total_view(df_growth)
+        df_total_month_combined = total_view(df_growth_month)
+
+    _render_growth_charts(
+        df_growth=df_growth,
+        df_growth_month=df_growth_month,
+        df_total_combined=df_total_combined,
+        df_total_month_combined=df_total_month_combined,
+        df_sum_time=df_sum_time,
+        df_preprocessed_time=df_preprocessed_time,
+        pjp_contribution=pjp_contribution,
+        pjp_month_contribution=pjp_month_contribution,
+        selected_start_year=selected_start_year,
+        selected_start_quarter=selected_start_quarter,
+        selected_end_year=selected_end_year,
+        selected_end_quarter=selected_end_quarter,
+        selected_jenis_transaksi=selected_jenis_transaksi,
+    )
+
 else:
     st.warning("Please Upload the Main Excel File first in the Summary Section.")
 
@@ -1,117 +1,15 @@
-import pandas as pd
 import streamlit as st
 import calendar
-from datetime import date
 
 from service.preprocess import *
 from service.visualize import *
+from service.cube import build_cube
+from service.memo import dataset_handle
+from service.multilicense import apply_multilicense_mode
+from service.national import build_national_dataset, national_totals
+from service.period import MONTH, filter_period_range, filter_year_range
 
 
-# Rules multilicense: aktif mulai tanggal efektif (inclusive)
-_MULTILICENSE_RULES: list[dict] = [
-    {"sandi": "777930115", "pjp": "Brankas Teknologi Indonesia", "effective": date(2024, 9, 20)},
-    {"sandi": "777930112", "pjp": "Durian Pay Indonesia", "effective": date(2025, 6, 25)},
-    {"sandi": "777962497", "pjp": "Ionpay Network", "effective": date(2021, 7, 1)},
-    {"sandi": "777930038", "pjp": "Kharisma Catur Mandala", "effective": date(2021, 7, 1)},
-    {"sandi": "777962104", "pjp": "MCP Indo Utama", "effective": date(2021, 7, 1)},
-    {"sandi": "777930118", "pjp": "Smart Fintech For You", "effective": date(2024, 4, 24)},
-]
-
-
-def _norm_text(value) -> str:
-    if value is None:
-        return ""
-    return " ".join(str(value).strip().lower().split())
-
-
-def _month_to_int(value) -> int | None:
-    if value is None:
-        return None
-    if isinstance(value, (int, float)):
-        m = int(value)
-        return m if 1 <= m <= 12 else None
-
-    s = str(value).strip().lower()
-    if not s:
-        return None
-    if s.isdigit():
-        m = int(s)
-        return m if 1 <= m <= 12 else None
-
-    month_en = {
-        "january": 1, "february": 2, "march": 3, "april": 4,
-        "may": 5, "june": 6, "july": 7, "august": 8,
-        "september": 9, "october": 10, "november": 11, "december": 12,
-    }
-    month_id = {
-        "januari": 1, "februari": 2, "maret": 3, "april": 4,
-        "mei": 5, "juni": 6, "juli": 7, "agustus": 8,
-        "september": 9, "oktober": 10, "november": 11, "desember": 12,
-    }
-    return month_en.get(s) or month_id.get(s)
-
-
-def _effective_period_date(df: pd.DataFrame) -> pd.Series:
-    year = pd.to_numeric(df.get("Year"), errors="coerce")
-    if "Month" in df.columns:
-        month_series = df["Month"].map(_month_to_int)
-    elif "Quarter" in df.columns:
-        q = pd.to_numeric(df["Quarter"], errors="coerce")
-        month_series = (q * 3).astype("Int64")
-    else:
-        month_series = pd.Series([12] * len(df), index=df.index)
-
-    month_num = pd.to_numeric(month_series, errors="coerce")
-    out = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
-    valid = year.notna() & month_num.notna()
-    if valid.any():
-        y = year[valid].astype(int)
-        m = month_num[valid].astype(int)
-        out.loc[valid] = pd.to_datetime({"year": y, "month": m, "day": 1}, errors="coerce") + pd.offsets.MonthEnd(0)
-    return out
-
-
-def _multilicense_mask(df: pd.DataFrame) -> pd.Series:
-    if df is None or df.empty:
-        return pd.Series([], dtype=bool)
-
-    name_col = "Nama PJP" if "Nama PJP" in df.columns else ("PJP" if "PJP" in df.columns else None)
-    code_candidates = ["Sandi PJP", "Sandi_PJP", "SandiPJP", "Kode PJP", "Kode_PJP", "Kode"]
-    code_col = next((c for c in code_candidates if c in df.columns), None)
-
-    if name_col is None and code_col is None:
-        return pd.Series([False] * len(df), index=df.index)
-
-    period_date = _effective_period_date(df)
-    name_norm = df[name_col].astype(str).map(_norm_text) if name_col else pd.Series([""] * len(df), index=df.index)
-    code_norm = (
-        df[code_col].astype("string").str.replace(r"\D", "", regex=True).fillna("").astype(str)
-        if code_col else pd.Series([""] * len(df), index=df.index)
-    )
-
-    mask = pd.Series([False] * len(df), index=df.index)
-    for rule in _MULTILICENSE_RULES:
-        r_name = _norm_text(rule.get("pjp"))
-        r_code = str(rule.get("sandi", "")).strip()
-        r_date = pd.Timestamp(rule.get("effective"))
-
-        hit_name = (name_norm == r_name) if r_name else pd.Series([False] * len(df), index=df.index)
-        hit_code = (code_norm == r_code) if r_code else pd.Series([False] * len(df), index=df.index)
-        hit_entity = hit_name | hit_code
-        hit_period = period_date.notna() & (period_date >= r_date)
-        mask = mask | (hit_entity & hit_period)
-
-    return mask
-
-
-def _apply_multilicense_mode(df: pd.DataFrame, mode: str) -> tuple[pd.DataFrame, pd.Series]:
-    if df is None or df.empty:
-        return df, pd.Series([], dtype=bool)
-    mask_ml = _multilicense_mask(df)
-    if str(mode) == "exclude":
-        return df.loc[~mask_ml].copy(), mask_ml
-    return df.copy(), mask_ml
-
 # Initial Page Setup
 set_page_visuals("viz")
 
@@ -130,7 +28,8 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
                 help="Tanpa Multilicense = data multilicense aktif (sesuai tanggal efektif) dikeluarkan.",
             )
             ml_mode = "exclude" if ml_mode_ui == "Tanpa Multilicense" else "include"
-            df, _ml_mask = _apply_multilicense_mode(df_source, ml_mode)
+            data_handle = dataset_handle(df_source, ml_mode)
+            df, _ml_mask = apply_multilicense_mode(df_source, ml_mode, data_handle)
             total_rows = int(len(df_source)) if df_source is not None else 0
             ml_rows = int(_ml_mask.sum()) if len(_ml_mask) else 0
             shown_rows = int(len(df)) if df is not None else 0
@@ -177,31 +76,18 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
                 # Mode filter: pilih melihat per Quarter atau per Range (start-end)
                 selected_mode = st.radio('Mode Filter:', ['Quarter', 'Range'], horizontal=True, key='key_mode_filter')
 
-            df_national = add_quarter_column(df_national)
-            # Siapkan versi national/prekspased grouped untuk Quarter dan Month
-            df_national_grouped_q = preprocess_data_national(df_national, True, True)
-            df_national_grouped_m = preprocess_data_national(df_national, False, False)
-            df_preprocessed = preprocess_data(df, True)
-
-            df_preprocessed_grouped_q = df_preprocessed.groupby(['Year', 'Quarter'], observed=False).agg({
-                'Sum of Fin Jumlah Inc': 'sum',
-                'Sum of Fin Jumlah Out': 'sum',
-                'Sum of Fin Jumlah Dom': 'sum',
-                'Sum of Fin Nilai Inc': 'sum',
-                'Sum of Fin Nilai Out': 'sum',
-                'Sum of Fin Nilai Dom': 'sum',
-                'Sum of Total Nom': 'sum'
-            }).reset_index()
-
-            df_preprocessed_grouped_m = df_preprocessed.groupby(['Year', 'Month'], observed=False).agg({
-                'Sum of Fin Jumlah Inc': 'sum',
-                'Sum of Fin Jumlah Out': 'sum',
-                'Sum of Fin Jumlah Dom': 'sum',
-                'Sum of Fin Nilai Inc': 'sum',
-                'Sum of Fin Nilai Out': 'sum',
-                'Sum of Fin Nilai Dom': 'sum',
-                'Sum of Total Nom': 'sum'
-            }).reset_index()
+            # Siapkan versi national/prekspased grouped untuk Quarter dan Month (dari cube)
+            national = build_national_dataset(dataset_handle(df_national), df_national)
+            if national.dropped_rows:
+                st.warning(
+                    f"{national.dropped_rows} baris data nasional diabaikan karena nilai Year/Month kosong atau tidak valid."
+                )
+            df_national_grouped_q = national.rollup('Year', 'Quarter')
+            df_national_grouped_m = national.rollup('Year', 'Month')
+            cube = build_cube(data_handle, df)
+
+            df_preprocessed_grouped_q = cube.rollup('Year', 'Quarter')
+            df_preprocessed_grouped_m = cube.rollup('Year', 'Month')
 
     # Filter untuk quarter tertentu (per tahun)
     # Filter untuk quarter tertentu (per tahun)
@@ -222,43 +108,12 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
     start_month_num = month_to_num[selected_start_month]
     end_month_num = month_to_num[selected_end_month]
 
-    # Filter manual untuk range tahun dan bulan
+    # Filter range tahun dan bulan lewat key yyyymm (bulan yang tidak dikenali terbuang)
     def filter_year_month_range(df, start_year, end_year, start_month, end_month):
         if 'Month' not in df.columns:
             # Jika tidak ada kolom Month, hanya filter tahun saja
-            return df[(df['Year'] >= start_year) & (df['Year'] <= end_year)]
-        # Mapping nama bulan ke angka
-        month_to_num = {m.lower(): i+1 for i, m in enumerate(months)}
-
-        def to_month_num(v):
-            # Handle numeric months or month names
-            try:
-                if pd.isna(v):
-                    return None
-            except Exception:
-                pass
-            # numeric (int/float or string digits)
-            try:
-                if isinstance(v, (int, float)):
-                    return int(v)
-                s = str(v).strip()
-                if s.isdigit():
-                    return int(s)
-            except Exception:
-                pass
-            # name
-            s = str(v).strip().lower()
-            return month_to_num.get(s)
-
-        df = df.copy()
-        df['MonthNum'] = df['Month'].apply(to_month_num)
-        # Drop rows where MonthNum could not be parsed
-        df = df[df['MonthNum'].notna()]
-        # Filter kombinasi tahun dan bulan
-        df_filtered = df[(df['Year'] > start_year) | ((df['Year'] == start_year) & (df['MonthNum'] >= start_month))]
-        df_filtered = df_filtered[(df_filtered['Year'] < end_year) | ((df_filtered['Year'] == end_year) & (df_filtered['MonthNum'] <= end_month))]
-        df_filtered = df_filtered.drop(columns=['MonthNum'], errors='ignore')
-        return df_filtered
+            return filter_year_range(df, start_year, end_year)
+        return filter_period_range(df, MONTH, (start_year, start_month), (end_year, end_month))
 
     # Untuk range (month-level) gunakan grouped by month / raw preprocessed
     df_national_filtered_year = filter_year_month_range(df_national_grouped_m, selected_start_year, selected_end_year, start_month_num, end_month_num)
@@ -290,32 +145,6 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
         s = f"{int(round(value)):,.0f}"
         return s.replace(",", ".")
 
-    def _sum_cols(df_: pd.DataFrame, cols: list[str]) -> float:
-        present = [c for c in cols if c in df_.columns]
-        if not present or df_ is None or df_.empty:
-            return 0.0
-        values = pd.to_numeric(df_[present].sum(axis=1), errors="coerce").fillna(0)
-        return float(values.sum())
-
-    def _national_totals(df_nat_filtered: pd.DataFrame) -> tuple[float, float]:
-        """Return (nominal_total, frek_total) from national dataframe.
-
-        Some files have 'Nom Nasional Total' empty/0 while Inc/Out/Dom are filled.
-        In that case compute total = Inc+Out+Dom.
-        """
-        nom_total = _sum_cols(df_nat_filtered, ["Nom Nasional Total"])
-        frek_total = _sum_cols(df_nat_filtered, ["Frek Nasional Total"])
-
-        if nom_total == 0.0:
-            nom_total = _sum_cols(df_nat_filtered, ["Nom Nasional Inc", "Nom Nasional Out", "Nom Nasional Dom"])
-        if frek_total == 0.0:
-            frek_total = _sum_cols(df_nat_filtered, ["Frek Nasional Inc", "Frek Nasional Out", "Frek Nasional Dom"])
-
-        return nom_total, frek_total
-
-    # Raw_JKTNasional stores nominal in "miliar" (billions of Rupiah)
-    _NOMINAL_NATIONAL_SCALE_TO_RP = 1_000_000_000.0
-
     try:
         # Gunakan scope (Quarter atau Range) untuk menghitung average ticket
         ticket_scope = compute_average_ticket_size(df_scope_preprocessed, df_scope_national)
@@ -325,8 +154,7 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
         total_freq_dki_q = float(ticket_scope.get("total_freq_dki", 0.0) or 0.0)
 
         # Luar DKI: gunakan national totals dari scope
-        total_nom_out_q, total_freq_out_q = _national_totals(df_scope_national)
-        total_nom_out_q = total_nom_out_q * _NOMINAL_NATIONAL_SCALE_TO_RP
+        total_nom_out_q, total_freq_out_q = national_totals(df_scope_national)
         avg_outside_q = (total_nom_out_q / total_freq_out_q) if total_freq_out_q else 0.0
 
         st.markdown("#### Rata-rata nominal per transaksi (Average Ticket)")
@@ -411,8 +239,7 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
         total_nom_dki_y = float(ticket_y.get("total_nominal_dki", 0.0) or 0.0)
         total_freq_dki_y = float(ticket_y.get("total_freq_dki", 0.0) or 0.0)
 
-        total_nom_out_y, total_freq_out_y = _national_totals(df_national_filtered_year)
-        total_nom_out_y = total_nom_out_y * _NOMINAL_NATIONAL_SCALE_TO_RP
+        total_nom_out_y, total_freq_out_y = national_totals(df_national_filtered_year)
         avg_outside_y = (total_nom_out_y / total_freq_out_y) if total_freq_out_y else 0.0
 
         st.caption(
@@ -4,6 +4,10 @@ import calendar
 
 from service.preprocess import *
 from service.visualize import *
+from service.cube import build_cube
+from service.memo import dataset_handle
+from service.national import build_national_dataset
+from service.period import MONTH, filter_period_range
 
 # Initial Page Setup
 set_page_visuals("viz")
@@ -53,28 +57,17 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
                 end_month = start_month
         st.info("Gunakan filter untuk memilih nama PJP dan rentang tanggal transaksi.")
 
-    df_national_preprocessed_year = preprocess_data_national(df_national, True)
-    df_national_preprocessed_month = preprocess_data_national(df_national, False)
-    df_preprocessed = preprocess_data(df, True)
+    national = build_national_dataset(dataset_handle(df_national), df_national)
+    if national.dropped_rows:
+        st.warning(
+            f"{national.dropped_rows} baris data nasional diabaikan karena nilai Year/Month kosong atau tidak valid."
+        )
+    df_national_preprocessed_year = national.rollup('Year')
+    df_national_preprocessed_month = national.rollup('Year', 'Month')
+    cube = build_cube(dataset_handle(df), df)
 
-    df_preprocessed_grouped_year = df_preprocessed.groupby(['Nama PJP', 'Year']).agg({
-        'Sum of Fin Jumlah Inc': 'sum',
-        'Sum of Fin Jumlah Out': 'sum',
-        'Sum of Fin Jumlah Dom': 'sum',
-        'Sum of Fin Nilai Inc': 'sum',
-        'Sum of Fin Nilai Out': 'sum',
-        'Sum of Fin Nilai Dom': 'sum',
-        'Sum of Total Nom': 'sum'
-    }).reset_index()
-    df_preprocessed_grouped_month = df_preprocessed.groupby(['Nama PJP', 'Year', 'Month'], observed=True).agg({
-        'Sum of Fin Jumlah Inc': 'sum',
-        'Sum of Fin Jumlah Out': 'sum',
-        'Sum of Fin Jumlah Dom': 'sum',
-        'Sum of Fin Nilai Inc': 'sum',
-        'Sum of Fin Nilai Out': 'sum',
-        'Sum of Fin Nilai Dom': 'sum',
-        'Sum of Total Nom': 'sum'
-    }).reset_index()
+    df_preprocessed_grouped_year = cube.rollup('Nama PJP', 'Year')
+    df_preprocessed_grouped_month = cube.rollup('Nama PJP', 'Year', 'Month', observed=True)
 
     if selected_pjp == 'All':
         st.warning("Silakan pilih PJP untuk menampilkan profil.")
@@ -97,54 +90,14 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
             (df_preprocessed_grouped_month['Year'] <= end_year)
         ]
         
-        # Apply month filtering berdasarkan tahun
-        # Jika start_year == end_year, filter bulan antara start_month sampai end_month
-        # Jika start_year < end_year, filter: bulan >= start_month untuk start_year, bulan <= end_month untuk end_year, semua bulan untuk tahun di tengah
-        
-        # Get list of months between start and end
-        start_month_idx = months_list.index(start_month)
-        end_month_idx = months_list.index(end_month)
-        months_in_range_start = months_list[start_month_idx:]  # From start_month to December
-        months_in_range_end = months_list[:end_month_idx+1]    # From January to end_month
-        
-        if start_year == end_year:
-            # Same year - filter month between start and end
-            df_grouped_filtered_month = df_grouped_filtered_month[
-                df_grouped_filtered_month['Month'].isin(months_list[start_month_idx:end_month_idx+1])
-            ]
-        else:
-            # Different years - apply smart month filtering
-            condition = (
-                ((df_grouped_filtered_month['Year'] == start_year) & (df_grouped_filtered_month['Month'].isin(months_in_range_start))) |
-                ((df_grouped_filtered_month['Year'] == end_year) & (df_grouped_filtered_month['Month'].isin(months_in_range_end))) |
-                ((df_grouped_filtered_month['Year'] > start_year) & (df_grouped_filtered_month['Year'] < end_year))
-            )
-            df_grouped_filtered_month = df_grouped_filtered_month[condition]
+        # Range (start_year, start_month) .. (end_year, end_month) sebagai key yyyymm
+        period_start = (start_year, months_list.index(start_month) + 1)
+        period_end = (end_year, months_list.index(end_month) + 1)
+        df_grouped_filtered_month = filter_period_range(df_grouped_filtered_month, MONTH, period_start, period_end)
 
         df_incoming_month = process_data_profile_month(df_grouped_filtered_month, "Inc")
         df_outgoing_month = process_data_profile_month(df_grouped_filtered_month, "Out")
         df_domestic_month = process_data_profile_month(df_grouped_filtered_month, "Dom")
-        
-        # Re-apply month filtering setelah processing untuk memastikan tidak ada data di luar range
-        if start_year == end_year:
-            df_incoming_month = df_incoming_month[
-                df_incoming_month['Month'].isin(months_list[start_month_idx:end_month_idx+1])
-            ]
-            df_outgoing_month = df_outgoing_month[
-                df_outgoing_month['Month'].isin(months_list[start_month_idx:end_month_idx+1])
-            ]
-            df_domestic_month = df_domestic_month[
-                df_domestic_month['Month'].isin(months_list[start_month_idx:end_month_idx+1])
-            ]
-        else:
-            condition_refilter = (
-                ((df_incoming_month['Year'] == start_year) & (df_incoming_month['Month'].isin(months_in_range_start))) |
-                ((df_incoming_month['Year'] == end_year) & (df_incoming_month['Month'].isin(months_in_range_end))) |
-                ((df_incoming_month['Year'] > start_year) & (df_incoming_month['Year'] < end_year))
-            )
-            df_incoming_month = df_incoming_month[condition_refilter]
-            df_outgoing_month = df_outgoing_month[condition_refilter]
-            df_domestic_month = df_domestic_month[condition_refilter]
 
         data_jumlah_inc = compile_data_profile(df_grouped_filtered_year, df_grouped_national_filtered_year, "Jumlah",
                                                "Inc")
@@ -208,7 +161,8 @@ if st.session_state['df_national'] is not None and st.session_state['df'] is not
             
             with st.spinner('Memproses data pertumbuhan...'):
                 # Get growth data untuk PJP
-                pjp_growth_data = get_pjp_growth_data(df_preprocessed, selected_pjp, is_month=False)
+                # Slice dari growth semua PJP yang di-cache di cube
+                pjp_growth_data = pjp_growth_slice(cube.pjp_growth(is_month=False), selected_pjp)
                 
                 if pjp_growth_data and 'total' in pjp_growth_data:
                     df_total_growth = pjp_growth_data['total'].copy()
@@ -1,6 +1,5 @@
 import pandas as pd
 import streamlit as st
-from datetime import date
 
 from service.formatting import format_id_percent
 import calendar
@@ -8,114 +7,14 @@ import calendar
 from service.preprocess import *
 from service.visualize import *
 from service.database import *
+from service.schema import has_clean_periods
+from service.cube import build_cube
+from service.memo import dataset_handle
+from service.multilicense import apply_multilicense_mode
+from service.workbook_cache import workbook_digest
+from service.dataset_store import append_workbook, clear_store, list_partitions, read_store, TRX_TABLE
 
 
-# Rules multilicense: aktif mulai tanggal efektif (inclusive)
-_MULTILICENSE_RULES: list[dict] = [
-    {"sandi": "777930115", "pjp": "Brankas Teknologi Indonesia", "effective": date(2024, 9, 20)},
-    {"sandi": "777930112", "pjp": "Durian Pay Indonesia", "effective": date(2025, 6, 25)},
-    {"sandi": "777962497", "pjp": "Ionpay Network", "effective": date(2021, 7, 1)},
-    {"sandi": "777930038", "pjp": "Kharisma Catur Mandala", "effective": date(2021, 7, 1)},
-    {"sandi": "777962104", "pjp": "MCP Indo Utama", "effective": date(2021, 7, 1)},
-    {"sandi": "777930118", "pjp": "Smart Fintech For You", "effective": date(2024, 4, 24)},
-]
-
-
-def _norm_text(value) -> str:
-    if value is None:
-        return ""
-    return " ".join(str(value).strip().lower().split())
-
-
-def _month_to_int(value) -> int | None:
-    if value is None:
-        return None
-
-    if isinstance(value, (int, float)):
-        m = int(value)
-        return m if 1 <= m <= 12 else None
-
-    s = str(value).strip().lower()
-    if not s:
-        return None
-    if s.isdigit():
-        m = int(s)
-        return m if 1 <= m <= 12 else None
-
-    month_en = {
-        "january": 1, "february": 2, "march": 3, "april": 4,
-        "may": 5, "june": 6, "july": 7, "august": 8,
-        "september": 9, "october": 10, "november": 11, "december": 12,
-    }
-    month_id = {
-        "januari": 1, "februari": 2, "maret": 3, "april": 4,
-        "mei": 5, "juni": 6, "juli": 7, "agustus": 8,
-        "september": 9, "oktober": 10, "november": 11, "desember": 12,
-    }
-    return month_en.get(s) or month_id.get(s)
-
-
-def _effective_period_date(df: pd.DataFrame) -> pd.Series:
-    year = pd.to_numeric(df.get("Year"), errors="coerce")
-    if "Month" in df.columns:
-        month_series = df["Month"].map(_month_to_int)
-    elif "Quarter" in df.columns:
-        q = pd.to_numeric(df["Quarter"], errors="coerce")
-        month_series = (q * 3).astype("Int64")
-    else:
-        month_series = pd.Series([12] * len(df), index=df.index)
-
-    month_num = pd.to_numeric(month_series, errors="coerce")
-    out = pd.Series(pd.NaT, index=df.index, dtype="datetime64[ns]")
-    valid = year.notna() & month_num.notna()
-    if valid.any():
-        y = year[valid].astype(int)
-        m = month_num[valid].astype(int)
-        out.loc[valid] = pd.to_datetime({"year": y, "month": m, "day": 1}, errors="coerce") + pd.offsets.MonthEnd(0)
-    return out
-
-
-def _multilicense_mask(df: pd.DataFrame) -> pd.Series:
-    if df is None or df.empty:
-        return pd.Series([], dtype=bool)
-
-    name_col = "Nama PJP" if "Nama PJP" in df.columns else ("PJP" if "PJP" in df.columns else None)
-    code_candidates = ["Sandi PJP", "Sandi_PJP", "SandiPJP", "Kode PJP", "Kode_PJP", "Kode"]
-    code_col = next((c for c in code_candidates if c in df.columns), None)
-
-    if name_col is None and code_col is None:
-        return pd.Series([False] * len(df), index=df.index)
-
-    period_date = _effective_period_date(df)
-    name_norm = df[name_col].astype(str).map(_norm_text) if name_col else pd.Series([""] * len(df), index=df.index)
-    code_norm = (
-        df[code_col].astype("string").str.replace(r"\D", "", regex=True).fillna("").astype(str)
-        if code_col else pd.Series([""] * len(df), index=df.index)
-    )
-
-    mask = pd.Series([False] * len(df), index=df.index)
-    for rule in _MULTILICENSE_RULES:
-        r_name = _norm_text(rule.get("pjp"))
-        r_code = str(rule.get("sandi", "")).strip()
-        r_date = pd.Timestamp(rule.get("effective"))
-
-        hit_name = (name_norm == r_name) if r_name else pd.Series([False] * len(df), index=df.index)
-        hit_code = (code_norm == r_code) if r_code else pd.Series([False] * len(df), index=df.index)
-        hit_entity = hit_name | hit_code
-        hit_period = period_date.notna() & (period_date >= r_date)
-        mask = mask | (hit_entity & hit_period)
-
-    return mask
-
-
-def _apply_multilicense_mode(df: pd.DataFrame, mode: str) -> tuple[pd.DataFrame, pd.Series]:
-    if df is None or df.empty:
-        return df, pd.Series([], dtype=bool)
-    mask_ml = _multilicense_mask(df)
-    if str(mode) == "exclude":
-        return df.loc[~mask_ml].copy(), mask_ml
-    return df.copy(), mask_ml
-
 # Initial Page Setup
 set_page_visuals("viz")
 
@@ -134,22 +33,112 @@ uploaded_file = st.file_uploader("Choose an Excel file",
                                  type=["xlsx", "xls"],
                                  help="Pastikan upload file Excel Data LTDBB PJP LR JKT yang memiliki dua worksheet, yaitu: 'Trx_PJPJKT' dan 'Raw_JKTNasional'.")
 
+with st.sidebar:
+    use_store = st.toggle(
+        "Gabung ke dataset lokal",
+        value=False,
+        key="use_dataset_store",
+        help="Upload di-append per (Year, Month) ke dataset lokal; bulan yang sama diganti dengan upload terbaru. "
+             "Semua halaman membaca gabungan dataset tersebut. Dataset lokal dipakai bersama semua pengguna "
+             "server ini yang mengaktifkan opsi ini.",
+    )
+    if use_store and st.button("Kosongkan dataset lokal", use_container_width=True, type="secondary",
+                               help="Menghapus dataset lokal untuk semua pengguna server ini."):
+        clear_store()
+        for _key in ('df', 'df_national', 'file_name', 'file_digest', 'file_upload_id', 'store_report'):
+            st.session_state[_key] = None
+        st.rerun()
+
 if uploaded_file is not None:
     file_name = uploaded_file.name
+    # Digest dihitung sekali per upload (file_id baru tiap upload), lalu diteruskan ke load_workbook_data
+    if uploaded_file.file_id == st.session_state.get('file_upload_id') and st.session_state.get('file_digest'):
+        file_digest = st.session_state['file_digest']
+    else:
+        file_digest = workbook_digest(uploaded_file.getvalue())
+        st.session_state['file_upload_id'] = uploaded_file.file_id
 
-    if file_name != st.session_state['file_name']:
+    # Dedupe berdasarkan isi file, bukan hanya nama (file revisi sering bernama sama)
+    if (file_name != st.session_state['file_name'] or file_digest != st.session_state.get('file_digest')
+            or use_store != st.session_state.get('file_store_mode')):
         st.session_state['file_name'] = file_name
-        df = load_data(uploaded_file, False)
-        df_national = load_data(uploaded_file, True)
+        st.session_state['file_digest'] = file_digest
+        st.session_state['file_store_mode'] = use_store
+        df, df_national, load_timings = load_workbook_data(uploaded_file, file_digest)
+        st.session_state['load_timings'] = load_timings
+        st.session_state['schema_report'] = df.attrs.get('schema_report') if df is not None else None
+        st.session_state['coercion_failed'] = {
+            col: stats['failed']
+            for frame in (df, df_national) if frame is not None
+            for col, stats in frame.attrs.get('coercion_report', {}).items()
+            if stats.get('failed')
+        }
+        if use_store and (df is not None or df_national is not None):
+            _store_report = append_workbook(df, df_national)
+            st.session_state['store_report'] = {t: r.as_dict() for t, r in _store_report.items()}
+            merged = read_store()
+            if merged is not None:
+                df, df_national = merged
         st.session_state['df'] = df
         st.session_state['df_national'] = df_national
     else:
         df = st.session_state['df']
         df_national = st.session_state['df_national']
 else:
+    if use_store and st.session_state['df'] is None:
+        # Belum ada upload di sesi ini -> pakai dataset lokal kalau sudah terisi
+        merged = read_store()
+        if merged is not None:
+            st.session_state['df'], st.session_state['df_national'] = merged
     df = st.session_state['df']
     df_national = st.session_state['df_national']
 
+if use_store:
+    _partitions = list_partitions(TRX_TABLE)
+    if _partitions:
+        with st.sidebar:
+            _first, _last = _partitions[0], _partitions[-1]
+            _caption = (
+                f"Dataset lokal: {len(_partitions)} bulan "
+                f"({calendar.month_abbr[_first[1]]} {_first[0]} - {calendar.month_abbr[_last[1]]} {_last[0]})"
+            )
+            _trx_report = (st.session_state.get('store_report') or {}).get(TRX_TABLE)
+            if _trx_report:
+                _caption += (
+                    f" | upload terakhir: {len(_trx_report['written'])} bulan ditulis,"
+                    f" {len(_trx_report['unchanged'])} tidak berubah"
+                )
+            st.caption(_caption)
+
+_dropped_store_rows = {
+    t: r['dropped_rows'] for t, r in (st.session_state.get('store_report') or {}).items() if r.get('dropped_rows')
+}
+if use_store and _dropped_store_rows:
+    st.warning(
+        "Baris tanpa Year/Month valid tidak masuk dataset lokal: "
+        + ", ".join(f"{t} ({n:,} baris)" for t, n in _dropped_store_rows.items())
+    )
+
+if st.session_state.get('load_timings'):
+    _timings = st.session_state['load_timings']
+    with st.sidebar:
+        st.caption(
+            "Waktu baca workbook: "
+            + " | ".join(f"{k} {v:.2f}s" for k, v in _timings.items())
+        )
+        _schema_report = st.session_state.get('schema_report')
+        if _schema_report:
+            st.caption(
+                f"Memori Trx_PJPJKT: {_schema_report['bytes_before'] / 1e6:.1f} MB"
+                f" -> {_schema_report['bytes_after'] / 1e6:.1f} MB"
+            )
+
+if st.session_state.get('coercion_failed'):
+    st.warning(
+        "Sebagian sel angka tidak bisa dibaca dan dianggap kosong: "
+        + ", ".join(f"{col} ({n:,} sel)" for col, n in st.session_state['coercion_failed'].items())
+    )
+
 if df is not None and df_national is not None:
     # Optional DB-based filter for DKI PJP reference
     if st.session_state.get("_pjp_reference_cache") is None:
@@ -172,8 +161,10 @@ if df is not None and df_national is not None:
 
     show_db_error_banner(clear=False)
 
+    df_source = df
+    list_pjp_code_dki = []
+    ml_mode = "include"
     if list_pjp_dki:
-        list_pjp_code_dki = []
         for pjp in list_pjp_dki:
             try:
                 list_pjp_code_dki.append(int(pjp['code']))
@@ -199,17 +190,23 @@ if df is not None and df_national is not None:
                 )
                 ml_mode = "exclude" if ml_mode_ui == "Tanpa Multilicense" else "include"
                 _df_before_ml = df
-                df, _ml_mask = _apply_multilicense_mode(_df_before_ml, ml_mode)
+                df, _ml_mask = apply_multilicense_mode(_df_before_ml, ml_mode, dataset_handle(df_source, ml_mode))
 
                 total_rows = int(len(_df_before_ml)) if _df_before_ml is not None else 0
                 ml_rows = int(_ml_mask.sum()) if len(_ml_mask) else 0
                 shown_rows = int(len(df)) if df is not None else 0
                 st.caption(f"Baris data: total {total_rows:,} | multilicense aktif {ml_rows:,} | digunakan {shown_rows:,}")
 
+    # Handle cube: isi sumber + filter DKI + mode multilicense
+    data_handle = dataset_handle(df_source, ml_mode, tuple(list_pjp_code_dki))
+
     # Normalize time columns safely to avoid IntCastingNaNError
+    # (kolom sudah integer dari skema ingest -> tidak perlu coerce ulang)
     time_cols = ['Year', 'Quarter', 'Month']
-    for col in time_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce').replace([float('inf'), float('-inf')], pd.NA)
+    if not has_clean_periods(df, time_cols):
+        df = df.copy()  # frame hasil multilicense dipakai bersama (cache)
+        for col in time_cols:
+            df[col] = pd.to_numeric(df[col], errors='coerce').replace([float('inf'), float('-inf')], pd.NA)
 
     invalid_time_mask = (
         df['Year'].isna()
@@ -230,7 +227,8 @@ if df is not None and df_national is not None:
         st.error("Tidak ada data valid setelah pembersihan kolom waktu (Year/Quarter/Month).")
         st.stop()
 
-    df[time_cols] = df[time_cols].astype('int64')
+    if not has_clean_periods(df, time_cols):
+        df[time_cols] = df[time_cols].astype('int64')
 
     pjp_list = ['All'] + df['Nama PJP'].unique().tolist()
     years = ['All'] + list(df['Year'].unique())
@@ -251,8 +249,9 @@ if df is not None and df_national is not None:
             else:
                 selected_quarter = st.selectbox('Select Quarter:', quarters, key="key_quarter_trx")
 
-    df_preprocessed = preprocess_data(df)
-    df_preprocessed_time = preprocess_data(df, is_trx=True)
+    cube = build_cube(data_handle, df)
+    df_preprocessed = cube.quarterly()
+    df_preprocessed_time = cube.base
 
     filtered_df = filter_data(df=df_preprocessed,
                               selected_pjp=selected_pjp,